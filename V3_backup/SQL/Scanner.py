@@ -26,9 +26,10 @@ except Exception:
     pdfplumber = None
 
 try:
-    from pdf2image import convert_from_path
+    from pdf2image import convert_from_path, pdfinfo_from_path
 except Exception:
     convert_from_path = None
+    pdfinfo_from_path = None
 
 try:
     import pytesseract
@@ -42,6 +43,35 @@ except Exception:
     cv2 = None
     np = None
 
+# Gemeinsamer OCR-Cache (liegt eine Ebene über SQL/)
+try:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from ocr_cache import file_sha256, get_ocr_cache
+except Exception:
+    file_sha256 = None
+    get_ocr_cache = None
+
+OCR_DPI = 500
+OCR_FALLBACK_DPI = 350
+# Kernkonfiguration: LSTM, Deutsch (DPI-Angabe je Bild)
+OCR_CONFIG_BASE = "--oem 1 -l deu"
+
+# Funk-Rechnungen: Layout-Lauf mit geringem DPI, danach nur der Einzelposten-Ausschnitt
+# mit steigendem DPI, bis die Kennung-Summen plausibel sind (Netto × 1,2 ≈ Brutto) und
+# auf der letzten Seite zusammen die Gesamtzeile ergeben
+FUNK_LAYOUT_DPI = 150
+FUNK_CROP_DPIS = (300, 500)
+FUNK_CROP_MARGIN = 0.01          # Rand um den Ausschnitt (Anteil der Seitenhöhe)
+PLAUSIBILITY_TOLERANCE = 0.5     # EUR
+# Cache-Eintrag für Seiten vor "Einzelposten zu Rechnung" (werden nicht erneut gelesen)
+FUNK_NO_REGION = "[kein Einzelposten-Bereich]"
+# Betrag mit optionalen Tausendern per Punkt ODER Leerzeichen (z. B. 1 197,23)
+AMOUNT_PATTERN = r'(?<!\d)(?:\d{1,3}(?:[\.\s]\d{3})*|\d+),\d{2}(?!\d)'
+# Steuersätze in der zweiten Spalte der Summenzeilen (Netto, Satz %, MWSt, Brutto)
+VAT_RATES = (10.0, 20.0)
+# Deskew: minAreaRect über eine Stichprobe statt über jedes dunkle Pixel
+DESKEW_MAX_POINTS = 200_000
+
 
 def _extract_text_pdf_first(pdf_path: Path) -> str:
     text = ""
@@ -76,8 +106,10 @@ def _preprocess_for_ocr(pil_image):
     )
     # Deskew
     coords = np.column_stack(np.where(thr < 255))
+    if len(coords) > DESKEW_MAX_POINTS:
+        coords = coords[::len(coords) // DESKEW_MAX_POINTS + 1]
     if coords.size > 0:
-        rect = cv2.minAreaRect(coords)
+        rect = cv2.minAreaRect(coords.astype(np.float32))
         angle = rect[-1]
         angle = -(90 + angle) if angle < -45 else -angle
         (h, w) = thr.shape[:2]
@@ -86,35 +118,72 @@ def _preprocess_for_ocr(pil_image):
     return thr
 
 
+def _ocr_image(img, dpi: int = OCR_DPI) -> str:
+    pre = _preprocess_for_ocr(img)
+    config_base = f"{OCR_CONFIG_BASE} --dpi {dpi}"
+    try:
+        # PSM 6 zuerst
+        t6 = pytesseract.image_to_string(pre, config=f"{config_base} --psm 6")
+        if t6 and len(t6.strip()) > 20:
+            return t6
+        # PSM 11 als Fallback
+        return pytesseract.image_to_string(pre, config=f"{config_base} --psm 11")
+    except Exception:
+        try:
+            return pytesseract.image_to_string(img, lang='deu', config='--oem 1 --psm 6')
+        except Exception:
+            return ""
+
+
+def _ocr_cache_config() -> str:
+    # Vorverarbeitung gehört zum Schlüssel: ohne OpenCV liest Tesseract das Rohbild
+    return f"scanner {OCR_CONFIG_BASE} --psm 6/11 {'cv2' if cv2 is not None else 'raw'}"
+
+
+def _render_page(pdf_path: Path, page: int):
+    """Rastert eine Seite mit hohem DPI (Fallback auf geringeren DPI); Rückgabe (Bild, DPI)."""
+    for dpi in (OCR_DPI, OCR_FALLBACK_DPI):
+        try:
+            images = convert_from_path(str(pdf_path), dpi=dpi, first_page=page, last_page=page)
+            return (images[0] if images else None), dpi
+        except Exception:
+            if dpi == OCR_FALLBACK_DPI:
+                raise
+    return None, OCR_FALLBACK_DPI
+
+
 def _ocr_pages(pdf_path: Path) -> str:
     if convert_from_path is None or pytesseract is None:
         return ""
-    # Hoher DPI-Wert für bessere OCR
+    cache = get_ocr_cache() if get_ocr_cache is not None else None
     try:
-        images = convert_from_path(str(pdf_path), dpi=500)
-    except Exception:
-        # Fallback DPI
-        images = convert_from_path(str(pdf_path), dpi=350)
-
-    texts = []
-    for img in images:
-        pre = _preprocess_for_ocr(img)
-        # Kernkonfiguration: LSTM, Deutsch, hoher DPI
-        config_base = "--oem 1 -l deu --dpi 500"
+        page_count = int(pdfinfo_from_path(str(pdf_path))["Pages"]) if cache is not None else 0
+        digest = file_sha256(pdf_path) if page_count else None
+    except Exception as e:
+        print(f"[WARN] OCR-Cache nicht nutzbar: {e}")
+        page_count, digest = 0, None
+
+    if not page_count:
+        # Ohne Cache: alle Seiten auf einmal rastern
         try:
-            # PSM 6 zuerst
-            t6 = pytesseract.image_to_string(pre, config=f"{config_base} --psm 6")
-            if t6 and len(t6.strip()) > 20:
-                texts.append(t6)
-                continue
-            # PSM 11 als Fallback
-            t11 = pytesseract.image_to_string(pre, config=f"{config_base} --psm 11")
-            texts.append(t11)
+            images = convert_from_path(str(pdf_path), dpi=OCR_DPI)
         except Exception:
-            try:
-                texts.append(pytesseract.image_to_string(img, lang='deu', config='--oem 1 --psm 6'))
-            except Exception:
-                texts.append("")
+            images = convert_from_path(str(pdf_path), dpi=OCR_FALLBACK_DPI)
+        return "\n".join(_ocr_image(img) for img in images)
+
+    # Seitenweise; bereits gelesene Seiten (gleicher Inhalt, DPI, Konfiguration) kommen aus dem Cache
+    config = _ocr_cache_config()
+    texts = []
+    for page in range(1, page_count + 1):
+        text = cache.get(digest, page, OCR_DPI, config)
+        if text is None:
+            text = cache.get(digest, page, OCR_FALLBACK_DPI, config)
+        if text is None:
+            img, dpi = _render_page(pdf_path, page)
+            text = _ocr_image(img) if img is not None else ""
+            if text.strip():
+                cache.put(digest, page, dpi, config, text)
+        texts.append(text)
     return "\n".join(texts)
 
 
@@ -222,11 +291,21 @@ def process_abrechnung(pdf_path: Path) -> dict:
 # === FUNK-RECHNUNG (Gesamt Kennung ...) ===
 def _parse_number(token: str) -> float | None:
     try:
-        return float(token.replace('.', '').replace(',', '.'))
+        return float(re.sub(r'[\.\s]', '', token).replace(',', '.'))
     except Exception:
         return None
 
 
+def _is_region_start(line: str) -> bool:
+    return re.search(r"Einzelposten\s+zu\s+Rechnung", line, re.IGNORECASE) is not None
+
+
+def _is_total_line(line: str) -> bool:
+    # Finale Gesamtzeile beginnt typischerweise mit "Gesamt " und hat zwei Beträge
+    return bool(re.match(r"\s*Gesamt\s+\d|\s*Gesamt\s+\d{1,3}[\s\d\.,]*", line)
+                or re.match(r"\s*Gesamt\s+$", line))
+
+
 def _slice_relevant_text(full_text: str) -> str:
     """Schneidet den für die Abrechnung relevanten Bereich heraus:
     Von der Zeile mit "Einzelposten zu Rechnung" bis zur Zeile, die mit
@@ -237,13 +316,9 @@ def _slice_relevant_text(full_text: str) -> str:
     start_idx = None
     end_idx = None
     for i, ln in enumerate(raw_lines):
-        if start_idx is None and re.search(r"Einzelposten\s+zu\s+Rechnung", ln, re.IGNORECASE):
+        if start_idx is None and _is_region_start(ln):
             start_idx = i
-        # Finale Gesamtzeile beginnt typischerweise mit "Gesamt " und hat zwei Beträge
-        if re.match(r"\s*Gesamt\s+\d|\s*Gesamt\s+\d{1,3}[\s\d\.,]*", ln):
-            end_idx = i
-            break
-        if re.match(r"\s*Gesamt\s+$", ln):
+        if _is_total_line(ln):
             end_idx = i
             break
     if start_idx is not None and end_idx is not None and end_idx > start_idx:
@@ -251,14 +326,23 @@ def _slice_relevant_text(full_text: str) -> str:
     return full_text
 
 
+def _drop_vat_rate_column(amounts: list[str]) -> list[str]:
+    """Entfernt die Steuersatz-Spalte nach ihrer Position (zweiter von mindestens vier Beträgen).
+
+    Ein Betrag von 20,00 € an anderer Stelle (z.B. als Brutto) bleibt erhalten.
+    """
+    if len(amounts) >= 4 and _parse_number(amounts[1]) in VAT_RATES:
+        return amounts[:1] + amounts[2:]
+    return amounts
+
+
 def _parse_gesamt_kennung_lines(full_text: str, trace: bool = False) -> list[dict]:
     # Nur relevanten Bereich betrachten
     sliced = _slice_relevant_text(full_text)
     lines = [ln.strip() for ln in sliced.splitlines() if ln.strip()]
     results: list[dict] = []
 
-    # Betrag mit optionalen Tausendern per Punkt ODER Leerzeichen (z. B. 1 197,23)
-    AMT = r'(?<!\d)(?:\d{1,3}(?:[\.\s]\d{3})*|\d+),\d{2}(?!\d)'
+    AMT = AMOUNT_PATTERN
     pattern = re.compile(rf'^\s*Gesamt\s+Kennung\s+([A-Z0-9]+)(.*)$', re.IGNORECASE)
 
     for ln in lines:
@@ -269,8 +353,8 @@ def _parse_gesamt_kennung_lines(full_text: str, trace: bool = False) -> list[dic
             kennung = m.group(1)
             tail = m.group(2)
             amounts = re.findall(AMT, tail)
-            # Filtere die MWSt-Prozentspalte (genau 20,00) konsequent heraus
-            amounts = [a for a in amounts if a.strip() != '20,00']
+            # MWSt-Prozentspalte nach Position herausnehmen (nicht jeden Betrag von 20,00)
+            amounts = _drop_vat_rate_column(amounts)
             if trace:
                 print(f"[TRACE] line='{ln}' | amounts_raw={re.findall(AMT, tail)} | amounts_filtered={amounts}")
             # Falls 3 Beträge (Netto, MWSt, Brutto) vorhanden: nimm 1. und letzten
@@ -314,9 +398,9 @@ def _parse_gesamt_kennung_lines(full_text: str, trace: bool = False) -> list[dic
             # Kennung grob extrahieren
             km = re.search(r'^\s*Gesamt\s+Kennung\s+([A-Z0-9]+)', ln, re.IGNORECASE)
             kennung = km.group(1) if km else ''
-            amounts = [a for a in re.findall(AMT, ln) if a.strip() != '20,00']
+            amounts = _drop_vat_rate_column(re.findall(AMT, ln))
             if len(amounts) >= 2:
-                netto_s, brutto_s = amounts[-2], amounts[-1]
+                netto_s, brutto_s = amounts[0], amounts[-1]
                 if trace:
                     print(f"[TRACE] fallback-line kennung={kennung} netto={netto_s} brutto={brutto_s}")
                 results.append({'kennung': kennung, 'netto': _parse_number(netto_s), 'brutto': _parse_number(brutto_s)})
@@ -324,6 +408,195 @@ def _parse_gesamt_kennung_lines(full_text: str, trace: bool = False) -> list[dic
     return results
 
 
+def _kennung_totals_plausible(entries: list[dict]) -> bool:
+    """Alle Kennung-Summen erfüllen Netto × 1,2 ≈ Brutto (wie die Paarwahl in _parse_gesamt_kennung_lines)."""
+    if not entries:
+        return False
+    for entry in entries:
+        n, b = entry.get('netto'), entry.get('brutto')
+        if n is None or b is None or n <= 0 or abs(b - n * 1.2) > PLAUSIBILITY_TOLERANCE:
+            return False
+    return True
+
+
+def _gesamt_line_totals(full_text: str) -> tuple[float, float] | None:
+    """(Netto, Brutto) der finalen Gesamtzeile ("Gesamt 1.100,00 220,00 1.320,00"), sonst None."""
+    for ln in full_text.splitlines():
+        if 'kennung' in ln.lower() or not _is_total_line(ln):
+            continue
+        amounts = _drop_vat_rate_column(re.findall(AMOUNT_PATTERN, ln))
+        if len(amounts) >= 2:
+            netto, brutto = _parse_number(amounts[0]), _parse_number(amounts[-1])
+            if netto is not None and brutto is not None:
+                return netto, brutto
+    return None
+
+
+def _kennung_sums_match_total(entries: list[dict], totals: tuple[float, float] | None) -> bool:
+    """Summe der Kennung-Netto/Brutto-Beträge entspricht der Gesamtzeile."""
+    if not entries or totals is None:
+        return False
+    netto = sum(entry.get('netto') or 0.0 for entry in entries)
+    brutto = sum(entry.get('brutto') or 0.0 for entry in entries)
+    return abs(netto - totals[0]) <= PLAUSIBILITY_TOLERANCE and abs(brutto - totals[1]) <= PLAUSIBILITY_TOLERANCE
+
+
+def _funk_text_complete(text: str, reached_end: bool, prior_entries: list[dict]) -> bool:
+    """Ausschnitt genügt: Kennungen plausibel, auf der letzten Seite zusammen gleich der Gesamtzeile."""
+    entries = _parse_gesamt_kennung_lines(text)
+    if entries and not _kennung_totals_plausible(entries):
+        return False
+    if not reached_end:
+        return bool(entries)
+    return _kennung_sums_match_total(prior_entries + entries, _gesamt_line_totals(text))
+
+
+def _ocr_lines(image, dpi: int) -> list[tuple[str, int, int]]:
+    """OCR mit Layout: (Zeilentext, oben, unten) in Pixeln des Bildes."""
+    data = pytesseract.image_to_data(image, config=f"{OCR_CONFIG_BASE} --dpi {dpi} --psm 6",
+                                     output_type=pytesseract.Output.DICT)
+    lines: dict[tuple, list] = {}
+    for i, word in enumerate(data['text']):
+        if not word or not word.strip():
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        top, bottom = data['top'][i], data['top'][i] + data['height'][i]
+        if key in lines:
+            entry = lines[key]
+            entry[0].append(word)
+            entry[1] = min(entry[1], top)
+            entry[2] = max(entry[2], bottom)
+        else:
+            lines[key] = [[word], top, bottom]
+    ordered = sorted(lines.values(), key=lambda entry: entry[1])
+    return [(" ".join(words), top, bottom) for words, top, bottom in ordered]
+
+
+def _region_bounds(lines: list[tuple[str, int, int]], height: int, in_region: bool):
+    """Ausschnitt (oben, unten) der Einzelposten auf einer Seite und ob die Gesamtzeile darauf liegt.
+
+    Rückgabe None, wenn die Seite keinen relevanten Bereich hat (vor "Einzelposten zu Rechnung").
+    Die Gesamtzeile gehört zum Ausschnitt, damit _slice_relevant_text sie als Ende erkennt.
+    """
+    top = 0 if in_region else None
+    for text, line_top, line_bottom in lines:
+        if top is None and _is_region_start(text):
+            top = line_top
+        elif top is not None and _is_total_line(text):
+            return (top, line_bottom), True
+    if top is None:
+        return None
+    return (top, height), False
+
+
+def _ocr_funk_page(pdf_path: Path, page: int, in_region: bool, prior_entries: list[dict] | None = None,
+                   trace: bool = False):
+    """Eine Seite einer Funk-Rechnung adaptiv lesen; Rückgabe (Text des Ausschnitts, DPI, Ende erreicht) oder None.
+
+    prior_entries: Kennung-Summen der vorherigen Seiten (für den Abgleich mit der Gesamtzeile).
+    """
+    prior_entries = list(prior_entries or [])
+    images = convert_from_path(str(pdf_path), dpi=FUNK_LAYOUT_DPI, first_page=page, last_page=page, grayscale=True)
+    if not images:
+        return None
+    layout = images[0]
+    lines = _ocr_lines(layout, FUNK_LAYOUT_DPI)
+    bounds = _region_bounds(lines, layout.height, in_region)
+    if bounds is None:
+        if trace:
+            print(f"[TRACE] Seite {page}: kein Einzelposten-Bereich")
+        return None
+    (top, bottom), reached_end = bounds
+
+    # Schon der Layout-Lauf kann genügen
+    text = "\n".join(line for line, line_top, _ in lines if top <= line_top < bottom)
+    if _funk_text_complete(text, reached_end, prior_entries):
+        if trace:
+            print(f"[TRACE] Seite {page}: Kennung-Summen plausibel bei {FUNK_LAYOUT_DPI} DPI")
+        return text, FUNK_LAYOUT_DPI, reached_end
+
+    # Sonst nur den Ausschnitt mit steigendem DPI neu lesen (das Seitenbild wird sofort verworfen)
+    margin = int(layout.height * FUNK_CROP_MARGIN)
+    box = (max(0, top - margin), min(layout.height, bottom + margin))
+    used_dpi = FUNK_LAYOUT_DPI
+    for dpi in FUNK_CROP_DPIS:
+        scale = dpi / FUNK_LAYOUT_DPI
+        images = convert_from_path(str(pdf_path), dpi=dpi, first_page=page, last_page=page, grayscale=True)
+        if not images:
+            break
+        crop = images[0].crop((0, int(box[0] * scale), images[0].width, int(box[1] * scale)))
+        images = None
+        text, used_dpi = _ocr_image(crop, dpi), dpi
+        if trace:
+            print(f"[TRACE] Seite {page}: {len(_parse_gesamt_kennung_lines(text))} Kennung(en) bei {dpi} DPI "
+                  f"(Ausschnitt {crop.width}x{crop.height})")
+        if _funk_text_complete(text, reached_end, prior_entries):
+            break
+    return text, used_dpi, reached_end
+
+
+def _ocr_funk_invoice(pdf_path: Path, trace: bool = False) -> str:
+    """OCR für Funk-Rechnungen: nur der Einzelposten-Bereich, DPI nur so hoch wie nötig.
+
+    Seiten vor "Einzelposten zu Rechnung" werden nur im Layout-Lauf gelesen (und als
+    solche gecacht), nach der Gesamtzeile wird abgebrochen. Ohne erkennbaren Bereich
+    (z.B. keine Funk-Rechnung) wird wie bisher die ganze PDF gelesen.
+    """
+    if convert_from_path is None or pytesseract is None or pdfinfo_from_path is None:
+        return _ocr_pages(pdf_path)
+    try:
+        page_count = int(pdfinfo_from_path(str(pdf_path))["Pages"])
+    except Exception as e:
+        print(f"[WARN] Seitenzahl nicht lesbar, OCR der ganzen PDF: {e}")
+        return _ocr_pages(pdf_path)
+
+    cache = get_ocr_cache() if get_ocr_cache is not None else None
+    digest = None
+    if cache is not None:
+        try:
+            digest = file_sha256(pdf_path)
+        except OSError:
+            cache = None
+    config = f"scanner-funk-adaptive {_ocr_cache_config()}"
+
+    texts = []
+    entries: list[dict] = []
+    in_region = False
+    for page in range(1, page_count + 1):
+        cached = None
+        if cache is not None:
+            for dpi in (FUNK_LAYOUT_DPI,) + FUNK_CROP_DPIS:
+                cached = cache.get(digest, page, dpi, config)
+                if cached is not None:
+                    break
+        if cached == FUNK_NO_REGION and not in_region:
+            continue
+        if cached is not None and cached != FUNK_NO_REGION:
+            text, reached_end = cached, any(_is_total_line(ln) for ln in cached.splitlines())
+        else:
+            try:
+                result = _ocr_funk_page(pdf_path, page, in_region, entries, trace=trace)
+            except Exception as e:
+                print(f"[WARN] Adaptive OCR fehlgeschlagen (Seite {page}), OCR der ganzen PDF: {e}")
+                return _ocr_pages(pdf_path)
+            if result is None:
+                if cache is not None:
+                    cache.put(digest, page, FUNK_LAYOUT_DPI, config, FUNK_NO_REGION)
+                continue
+            text, dpi, reached_end = result
+            if cache is not None and text.strip():
+                cache.put(digest, page, dpi, config, text)
+        texts.append(text)
+        entries.extend(_parse_gesamt_kennung_lines(text))
+        in_region = True
+        if reached_end:
+            break
+
+    if not texts:
+        return _ocr_pages(pdf_path)
+    return "\n".join(texts)
+
+
 def _load_kennung_map_from_db() -> dict:
     """Lädt Mapping Kennung -> Kennzeichen aus SQL/database.db (vehicles.rfrnc → vehicles.license_plate)."""
     mapping = {}
@@ -395,7 +668,7 @@ def save_to_funk_db(entries: list[dict], month: int, year: int, trace: bool = Fa
 def process_funk_invoice(pdf_path: Path, trace: bool = False) -> list[dict]:
     text = _extract_text_pdf_first(pdf_path)
     if len(text.strip()) < 100:
-        text = _ocr_pages(pdf_path)
+        text = _ocr_funk_invoice(pdf_path, trace=trace)
     entries = _parse_gesamt_kennung_lines(text, trace=trace)
     return entries
 
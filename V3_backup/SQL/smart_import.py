@@ -1,10 +1,71 @@
+import codecs
+import hashlib
 import sqlite3
 import pandas as pd
 import re
+from collections import Counter
 from pathlib import Path
 from tkinter.filedialog import askopenfilenames
 from tkinter import Tk, messagebox
 import os
+import sys
+
+# Fahrernamen-Index, Fuzzy-Matcher und Plattform-Tabellen (liegen im Projektverzeichnis neben den QML-Backends)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+try:
+    from driver_match_index import index_report_table
+except ImportError:
+    index_report_table = None
+try:
+    from fuzzy_matcher import BatchFuzzyMatcher
+except ImportError:
+    BatchFuzzyMatcher = None
+try:
+    from platform_reports import insert_report_rows, normalize_numeric_columns, record_imported_table
+except ImportError:
+    insert_report_rows = None
+    normalize_numeric_columns = None
+    record_imported_table = None
+try:
+    from taxi_totals import VEHICLE_DIGITS_COLUMN, ensure_vehicle_digits
+except ImportError:
+    VEHICLE_DIGITS_COLUMN = "fahrzeug_nummer"
+    ensure_vehicle_digits = None
+
+# Abgeleitete bzw. technische Spalten – nicht Teil des Imports und des Duplikatschlüssels
+ABGELEITETE_SPALTEN = ("id", "import_key", "year", VEHICLE_DIGITS_COLUMN)
+
+# Taxi-Umsatzlisten (40100 oder 31300 – Quelle muss gewählt werden)
+TAXI_UMSATZLISTE = "uportal_getumsatzliste"
+
+# Zeilen pro Block beim Streaming-Import (Speicherbedarf unabhängig von der Dateigröße)
+IMPORT_CHUNK_SIZE = 5000
+
+# Dateianfang, aus dem Trennzeichen und Kodierung bestimmt werden
+HEADER_BYTES = 64 * 1024
+
+PLATTFORM_DATENBANKEN = {
+    "uber": "uber.sqlite",
+    "bolt": "bolt.sqlite",
+    "40100": "40100.sqlite",
+    "31300": "31300.sqlite",
+}
+
+# Schlüsselspalten der Duplikaterkennung je Plattform.
+# None = ganze Zeile: Taxi-Buchungen haben keine eindeutige Belegnummer
+# (mehrere Buchungen je Abschluss), identische Buchungen werden mitgezählt.
+DUPLIKAT_SPALTEN = {
+    "uber": ["first_name", "last_name", "driver_name"],
+    "bolt": ["driver_name"],
+    "40100": None,
+    "31300": None,
+}
+
+# Betragsspalten der Taxi-Exporte (Komma-Dezimaltext) – beim Import einmal nach REAL, auf Cent gerundet
+GELD_SPALTEN = {
+    "40100": ["Fahrtkosten", "Trinkgeld", "Umsatz", "Bargeld"],
+    "31300": ["Fahrtkosten", "Trinkgeld", "Gesamt", "10%", "20%"],
+}
 
 # === Fahrermatching-Funktionen ===
 def lade_fahrerliste():
@@ -18,30 +79,26 @@ def lade_fahrerliste():
         print(f"⚠️ Fehler beim Laden der Fahrerliste: {e}")
         return []
 
+def match_names(import_names, fahrerliste):
+    """Führt Fahrermatching für alle Namen einer Datei in einem Batch durch"""
+    import_names = [str(n) for n in import_names]
+    if not fahrerliste or BatchFuzzyMatcher is None:
+        return ["" for _ in import_names]
+    
+    matcher = BatchFuzzyMatcher(fahrerliste)
+    return [m.target if m is not None and m.accepted else "" for m in matcher.best_matches(import_names)]
+
 def match_name(import_name, fahrerliste):
-    """Führt Fahrermatching durch"""
-    if not fahrerliste:
-        return ""
-    
-    tokens = [t.strip().lower() for t in re.split(r"[ ,]+", str(import_name)) if t.strip()]
-    best_match = ""
-    best_score = 0
-    
-    for fahrer in fahrerliste:
-        fahrer_tokens = [t.strip().lower() for t in fahrer.split() if t.strip()]
-        matches = sum(1 for t in tokens if t in fahrer_tokens)
-        if matches > best_score:
-            best_score = matches
-            best_match = fahrer
-    
-    if best_score >= 2 and len(tokens) >= 2:
-        return best_match
-    else:
-        return ""
+    """Führt Fahrermatching für einen einzelnen Namen durch"""
+    return match_names([import_name], fahrerliste)[0]
 
-def erkenne_plattform_aus_spalten(df):
-    """Erkennt die Plattform basierend auf den vorhandenen Spalten"""
-    spalten = [col.lower().strip() for col in df.columns]
+# Spalten, die nur eine der beiden Taxi-Quellen liefert (exakter Spaltenname)
+SPALTEN_31300 = ("beleg", "zeitpunkt", "leistung", "tour", "gesamt", "kst", "10%", "20%", "bemerkung")
+SPALTEN_40100 = ("umsatz", "bargeld")
+
+def _spalten_scores(df):
+    """Kleingeschriebene Spaltennamen und Übereinstimmungen je Plattform (Taxi unter '40100')"""
+    spalten = [str(col).lower().strip() for col in getattr(df, "columns", df)]
     
     # Uber-Erkennung
     uber_indikatoren = [
@@ -66,21 +123,44 @@ def erkenne_plattform_aus_spalten(df):
     ]
     taxi_score = sum(1 for ind in taxi_indikatoren if any(ind in spalte for spalte in spalten))
     
-    # Beste Übereinstimmung finden
     scores = {
         "uber": uber_score,
         "bolt": bolt_score,
         "40100": taxi_score
     }
+    return spalten, scores
+
+def erkenne_plattform_aus_spalten(df):
+    """Erkennt die Plattform basierend auf den vorhandenen Spalten (DataFrame oder Liste der Kopfzeile)
+
+    None, wenn keine Plattform passt oder eine Taxi-Umsatzliste weder 40100 noch
+    31300 eindeutig zuzuordnen ist (Quelle muss gewählt werden, siehe
+    ist_taxi_umsatzliste).
+    """
+    spalten, scores = _spalten_scores(df)
     
+    # Beste Übereinstimmung finden
     best_platform = max(scores, key=scores.get)
     best_score = scores[best_platform]
     
     # Mindestens 3 Spalten müssen übereinstimmen
-    if best_score >= 3:
-        return best_platform
-    else:
+    if best_score < 3:
         return None
+    if best_platform == "40100":
+        # 40100 und 31300 teilen sich die meisten Spalten; die Quelle zeigen Gesamt/Zeitpunkt/... bzw. Umsatz/Bargeld
+        score_31300 = sum(1 for spalte in SPALTEN_31300 if spalte in spalten)
+        score_40100 = sum(1 for spalte in SPALTEN_40100 if spalte in spalten)
+        if score_31300 > score_40100:
+            return "31300"
+        if score_31300 == score_40100:
+            # Gleichstand (z.B. weder Umsatz noch Gesamt): nicht raten
+            return None
+    return best_platform
+
+def ist_taxi_umsatzliste(df):
+    """True, wenn die Spalten zu einer Taxi-Umsatzliste (40100 oder 31300) passen"""
+    _, scores = _spalten_scores(df)
+    return max(scores, key=scores.get) == "40100" and scores["40100"] >= 3
 
 def extrahiere_kalenderwoche(filename):
     """Extrahiert die Kalenderwoche aus dem Dateinamen"""
@@ -189,8 +269,32 @@ def extrahiere_kalenderwoche(filename):
     
     return None
 
-def verarbeite_uber_daten(df, kalenderwoche):
-    """Verarbeitet Uber-Daten (wie in echter Abrechnung)"""
+def extrahiere_jahr(filename):
+    """Ermittelt das Berichtsjahr passend zu extrahiere_kalenderwoche (Fallback: aktuelles Jahr)"""
+    from datetime import datetime, timedelta
+    
+    end_date = None
+    taxi_match = re.search(r"(\d{4})\.(\d{2})\.(\d{2})_0000_(\d{4})\.(\d{2})\.(\d{2})_0000", filename)
+    range_match = re.search(r"(\d{8})-(\d{8})", filename)
+    try:
+        if taxi_match:
+            end_date = datetime.strptime("".join(taxi_match.group(4, 5, 6)), "%Y%m%d")
+        elif range_match:
+            end_date = datetime.strptime(range_match.group(2), "%Y%m%d")
+    except ValueError:
+        end_date = None
+    
+    if end_date is None:
+        return datetime.now().year
+    
+    # Vor dem ersten Montag des Jahres zählt die Woche zum Vorjahr (wie bei der KW-Berechnung)
+    year_start = datetime(end_date.year, 1, 1)
+    while year_start.weekday() != 0:
+        year_start += timedelta(days=1)
+    return end_date.year - 1 if end_date < year_start else end_date.year
+
+def verarbeite_uber_daten(df, kalenderwoche, fahrerliste=None):
+    """Verarbeitet Uber-Daten (wie in echter Abrechnung); fahrerliste einmal je Datei übergeben"""
     print("🔍 Erkenne Uber-Format...")
     
     # Debug: Zeige verfügbare Spalten
@@ -267,21 +371,22 @@ def verarbeite_uber_daten(df, kalenderwoche):
             df[col] = pd.to_numeric(df[col], errors="coerce")
     
     # Fahrermatching (nur für interne Verarbeitung, nicht für DB)
-    fahrerliste = lade_fahrerliste()
+    if fahrerliste is None:
+        fahrerliste = lade_fahrerliste()
     if "first_name" in df.columns and "last_name" in df.columns:
         df["import_name"] = df["first_name"].fillna("") + " " + df["last_name"].fillna("")
-        matched_names = df["import_name"].apply(lambda n: match_name(n, fahrerliste))
+        matched_names = pd.Series(match_names(df["import_name"].tolist(), fahrerliste), index=df.index)
         print(f"   Fahrermatching: {len(matched_names[matched_names != ''])} von {len(df)} Fahrern gematcht")
         df.drop(columns=["import_name"], inplace=True)
     elif "driver_name" in df.columns:
-        matched_names = df["driver_name"].apply(lambda n: match_name(n, fahrerliste))
+        matched_names = pd.Series(match_names(df["driver_name"].fillna("").tolist(), fahrerliste), index=df.index)
         print(f"   Fahrermatching: {len(matched_names[matched_names != ''])} von {len(df)} Fahrern gematcht")
     
     df["week"] = kalenderwoche
     return df, "uber.sqlite"
 
-def verarbeite_bolt_daten(df, kalenderwoche):
-    """Verarbeitet Bolt-Daten (inkl. neue Performance-Dateien)"""
+def verarbeite_bolt_daten(df, kalenderwoche, fahrerliste=None):
+    """Verarbeitet Bolt-Daten (inkl. neue Performance-Dateien); fahrerliste einmal je Datei übergeben"""
     print("🔍 Erkenne Bolt-Format...")
     
     # Debug: Zeige verfügbare Spalten
@@ -352,14 +457,28 @@ def verarbeite_bolt_daten(df, kalenderwoche):
             df[col] = pd.to_numeric(df[col], errors="coerce")
     
     # Fahrermatching (nur für interne Verarbeitung, nicht für DB)
-    fahrerliste = lade_fahrerliste()
+    if fahrerliste is None:
+        fahrerliste = lade_fahrerliste()
     if "driver_name" in df.columns:
-        matched_names = df["driver_name"].apply(lambda n: match_name(n, fahrerliste))
+        matched_names = pd.Series(match_names(df["driver_name"].fillna("").tolist(), fahrerliste), index=df.index)
         print(f"   Fahrermatching: {len(matched_names[matched_names != ''])} von {len(df)} Fahrern gematcht")
     
     df["week"] = kalenderwoche
     return df, "bolt.sqlite"
 
+def normalisiere_geldspalten(df, spalten):
+    """Wandelt Komma-Dezimaltext ('12,50', '1 234,00') einmalig in Zahlen, auf Cent gerundet"""
+    for col in spalten:
+        if col in df.columns:
+            werte = (
+                df[col].astype(str)
+                .str.replace(",", ".")
+                .str.replace(" ", "")
+                .replace("nan", None)
+            )
+            df[col] = pd.to_numeric(werte, errors="coerce").round(2)
+    return df
+
 def verarbeite_40100_daten(df, kalenderwoche):
     """Verarbeitet 40100/Taxi-Daten"""
     print("🔍 Erkenne 40100/Taxi-Format...")
@@ -375,15 +494,7 @@ def verarbeite_40100_daten(df, kalenderwoche):
     df = df[[col for col in zielspalten if col in df.columns]].copy()
     
     # Numerische Spalten bereinigen
-    for col in ["Fahrtkosten", "Trinkgeld", "Umsatz", "Bargeld"]:
-        if col in df.columns:
-            df[col] = (
-                df[col].astype(str)
-                .str.replace(",", ".")
-                .str.replace(" ", "")
-                .replace("nan", None)
-            )
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    normalisiere_geldspalten(df, GELD_SPALTEN["40100"])
     
     df["week"] = kalenderwoche
     return df, "40100.sqlite"
@@ -403,16 +514,7 @@ def verarbeite_31300_daten(df, kalenderwoche):
     df = df[[col for col in zielspalten if col in df.columns]].copy()
     
     # Numerische Spalten bereinigen
-    numeric_cols = ["Fahrtkosten", "Trinkgeld", "Gesamt", "10%", "20%"]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = (
-                df[col].astype(str)
-                .str.replace(",", ".")
-                .str.replace(" ", "")
-                .replace("nan", None)
-            )
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    normalisiere_geldspalten(df, GELD_SPALTEN["31300"])
     
     # Kein Fahrermatching für 31300 (wie im echten import.py)
     
@@ -506,8 +608,233 @@ def erstelle_tabelle(conn, platform, tabelle):
     cursor = conn.cursor()
     cursor.execute(create_sql[platform])
 
+def _quote(spalte):
+    return '"' + spalte.replace('"', '""') + '"'
+
+def _tabellen_spalten(conn, tabelle):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(tabelle)})")]
+
+def _schluessel_spalten(platform, spalten):
+    """Spalten, aus denen import_key gebildet wird (ohne week, year und abgeleitete Spalten)"""
+    inhalt = [c for c in spalten if c != "week" and c not in ABGELEITETE_SPALTEN]
+    if DUPLIKAT_SPALTEN.get(platform) is None:
+        return inhalt
+    return [c for c in DUPLIKAT_SPALTEN[platform] if c in inhalt]
+
+class ImportSchluessel:
+    """SQLite-Funktion import_key(year, week, ...): Hash der Schlüsselspalten.
+
+    Mit Wiederholungszählung erhält die n-te identische Zeile einer Woche einen
+    eigenen Schlüssel – ein erneuter Import derselben Datei erzeugt dieselben
+    Schlüssel und wird vom UNIQUE-Index verworfen.
+    """
+    def __init__(self, mit_wiederholung):
+        self.mit_wiederholung = mit_wiederholung
+        self.gesehen = Counter()
+
+    def __call__(self, year, week, *werte):
+        inhalt = "\x1f".join("\x00" if w is None else str(w) for w in werte)
+        schluessel = hashlib.sha1(inhalt.encode("utf-8")).hexdigest()
+        if self.mit_wiederholung:
+            n = self.gesehen[(year, week, schluessel)]
+            self.gesehen[(year, week, schluessel)] += 1
+            if n:
+                schluessel = hashlib.sha1(f"{schluessel}#{n}".encode("utf-8")).hexdigest()
+        return schluessel
+
+def stelle_import_schluessel_sicher(conn, platform, tabelle):
+    """Ergänzt year und import_key samt UNIQUE-Index (year, week, import_key); Altbestand wird einmalig befüllt
+
+    Zeilen aus der Zeit vor der Spalte year behalten year = NULL (Jahr unbekannt)
+    und gelten damit für keinen Import als Duplikat; das Jahr vergibt erst die
+    Migration (platform_reports --jahr).
+    """
+    spalten = _tabellen_spalten(conn, tabelle)
+    if "year" not in spalten:
+        conn.execute(f"ALTER TABLE {_quote(tabelle)} ADD COLUMN year INTEGER")
+    if "import_key" not in spalten:
+        conn.execute(f"ALTER TABLE {_quote(tabelle)} ADD COLUMN import_key TEXT")
+    index = "idx_" + tabelle + "_import_key"
+    index_spalten = [row[2] for row in conn.execute(f"PRAGMA index_info({_quote(index)})")]
+    if index_spalten and "year" not in index_spalten:
+        # Index aus der Zeit ohne Jahr: dieselbe KW eines anderen Jahres wäre ein Duplikat
+        conn.execute(f"DROP INDEX {_quote(index)}")
+    offen = conn.execute(f"SELECT COUNT(*) FROM {_quote(tabelle)} WHERE import_key IS NULL").fetchone()[0]
+    if offen:
+        # Vorhandene Wiederholungen bekommen eigene Schlüssel, damit der Index angelegt werden kann
+        conn.create_function("import_key", -1, ImportSchluessel(mit_wiederholung=True))
+        key_sql = ", ".join(_quote(c) for c in _schluessel_spalten(platform, spalten))
+        conn.execute(f"""
+            UPDATE {_quote(tabelle)} SET import_key = import_key(year, week, {key_sql})
+            WHERE import_key IS NULL
+        """)
+        print(f"   🔑 import_key für {offen} bestehende Zeilen in {tabelle} ergänzt")
+    conn.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {_quote(index)} "
+        f"ON {_quote(tabelle)} (year, week, import_key)"
+    )
+
+def stelle_geldspalten_sicher(conn, platform, tabelle):
+    """Altbestand mit Text-Beträgen einmalig nach REAL wandeln (import_key wird danach neu aufgebaut)"""
+    if normalize_numeric_columns is None or platform not in GELD_SPALTEN:
+        return 0
+    umgewandelt = normalize_numeric_columns(conn, tabelle, GELD_SPALTEN[platform])
+    if umgewandelt:
+        print(f"   🔢 {umgewandelt} Text-Beträge in {tabelle} in Zahlen umgewandelt")
+    return umgewandelt
+
+def erkenne_csv_format(csv_datei):
+    """Trennzeichen und Kodierung der CSV aus den ersten HEADER_BYTES der Datei
+
+    Ein am Ende des Ausschnitts abgeschnittenes UTF-8-Zeichen zählt nicht als
+    Fehler. Zeigt sich erst weiter hinten, dass die Datei kein UTF-8 ist,
+    wiederholt importiere_csv_stream den Import mit latin-1.
+    """
+    with open(csv_datei, "rb") as f:
+        anfang = f.read(HEADER_BYTES)
+    try:
+        text = codecs.getincrementaldecoder("utf-8")().decode(anfang, final=False)
+        encoding = "utf-8"
+    except UnicodeDecodeError:
+        # Fallback für andere Kodierungen
+        encoding = "latin-1"
+        text = anfang.decode(encoding)
+    header = text.split("\n", 1)[0]
+    sep = ";" if header.count(";") > header.count(",") else ","
+    return sep, encoding
+
+PLATTFORM_VERARBEITUNG = {
+    "uber": verarbeite_uber_daten,
+    "bolt": verarbeite_bolt_daten,
+    "40100": verarbeite_40100_daten,
+    "31300": verarbeite_31300_daten,
+}
+
+def importiere_csv_stream(csv_datei, conn, platform, kw, jahr, chunksize=IMPORT_CHUNK_SIZE):
+    """Streaming-Import einer CSV in report_KW{kw}: blockweise lesen, INSERT OR IGNORE per executemany.
+
+    Duplikate – innerhalb der Datei wie gegenüber früheren Importen desselben
+    Jahres – verwirft der UNIQUE-Index (year, week, import_key), ohne die Woche
+    vorher zu laden. Es wird nicht committet: der Aufrufer schließt die
+    Transaktion (eine pro Datei). Rückgabe: Anzahl neu eingefügter Zeilen.
+    """
+    tabelle = f"report_KW{kw}"
+    sep, encoding = erkenne_csv_format(csv_datei)
+
+    erstelle_tabelle(conn, platform, tabelle)
+    stelle_geldspalten_sicher(conn, platform, tabelle)
+    stelle_import_schluessel_sicher(conn, platform, tabelle)
+
+    # Zwischentabelle mit denselben Spaltentypen: Schlüssel entstehen aus denselben Werten wie in der Zieltabelle
+    conn.execute("DROP TABLE IF EXISTS temp.import_staging")
+    spalten = [c for c in _tabellen_spalten(conn, tabelle) if c not in ABGELEITETE_SPALTEN]
+    conn.execute(f"""
+        CREATE TEMP TABLE import_staging AS
+        SELECT {", ".join(_quote(c) for c in spalten)}, import_key FROM main.{_quote(tabelle)} WHERE 0
+    """)
+    conn.execute("CREATE INDEX temp.idx_import_staging_key ON import_staging (import_key)")
+    # Fahrerliste einmal je Datei statt je Block
+    fahrerliste = lade_fahrerliste() if platform in ("uber", "bolt") else None
+
+    neu = 0
+    try:
+        try:
+            for anzahl in _importiere_bloecke(csv_datei, conn, platform, kw, jahr, spalten, sep, encoding,
+                                              chunksize, fahrerliste):
+                neu += anzahl
+        except UnicodeDecodeError:
+            if encoding == "latin-1":
+                raise
+            # Nicht-UTF-8-Zeichen hinter dem Dateianfang: mit latin-1 neu lesen; die bereits
+            # übernommenen Blöcke erzeugen dieselben import_key und werden als Duplikate verworfen
+            print("   ⚠️ Datei ist nicht durchgehend UTF-8 – Import mit latin-1 wiederholt")
+            for anzahl in _importiere_bloecke(csv_datei, conn, platform, kw, jahr, spalten, sep, "latin-1",
+                                              chunksize, fahrerliste):
+                neu += anzahl
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.import_staging")
+    if record_imported_table is not None and 1 <= int(kw) <= 53:
+        # Ohne Altbestand ohne Jahr steht die ganze Woche in 'reports': Migration überspringt die Tabelle
+        record_imported_table(conn, platform, tabelle, int(jahr))
+    if ensure_vehicle_digits is not None and platform in GELD_SPALTEN:
+        # Fahrzeugnummer (mit Index) für die Summenabfragen der Abrechnung
+        ensure_vehicle_digits(conn, tabelle)
+    return neu
+
+def _importiere_bloecke(csv_datei, conn, platform, kw, jahr, spalten, sep, encoding, chunksize, fahrerliste):
+    """Liest die CSV blockweise in report_KW{kw}, spiegelt neue Zeilen aus dem Block nach 'reports'
+
+    Liefert je Block die Anzahl neu eingefügter Zeilen.
+    """
+    kalenderwoche = f"KW{kw}"
+    tabelle = f"report_KW{kw}"
+    spalten_sql = ", ".join(_quote(c) for c in spalten)
+    key_sql = ", ".join(_quote(c) for c in _schluessel_spalten(platform, spalten))
+    # Neue Wiederholungszählung je Durchgang (auch bei der Wiederholung mit latin-1)
+    conn.create_function("import_key", -1, ImportSchluessel(DUPLIKAT_SPALTEN[platform] is None))
+    verarbeitung = PLATTFORM_VERARBEITUNG[platform]
+
+    for chunk in pd.read_csv(csv_datei, sep=sep, encoding=encoding, chunksize=chunksize):
+        chunk.columns = chunk.columns.str.strip()
+        if fahrerliste is not None:
+            df, _ = verarbeitung(chunk, kalenderwoche, fahrerliste)
+        else:
+            df, _ = verarbeitung(chunk, kalenderwoche)
+        df_spalten = [c for c in df.columns if c in spalten]
+        if df.empty or not df_spalten:
+            continue
+
+        werte = df[df_spalten].astype(object)
+        werte = werte.where(werte.notna(), None)
+        conn.execute("DELETE FROM temp.import_staging")
+        conn.executemany(
+            f"INSERT INTO temp.import_staging ({', '.join(_quote(c) for c in df_spalten)}) "
+            f"VALUES ({', '.join('?' for _ in df_spalten)})",
+            werte.itertuples(index=False, name=None),
+        )
+        conn.execute(f"UPDATE temp.import_staging SET import_key = import_key(:jahr, week, {key_sql})",
+                     {"jahr": int(jahr)})
+
+        # Neu sind Zeilen, deren Schlüssel weder im Jahr/in der Woche vorhanden ist noch früher im Block
+        # vorkommt; die leere Zwischentabelle vergibt rowid 1..n in Blockreihenfolge
+        neue_positionen = [row[0] - 1 for row in conn.execute(f"""
+            SELECT s.rowid FROM temp.import_staging AS s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM main.{_quote(tabelle)} AS t
+                WHERE t.year = :jahr AND t.week = s.week AND t.import_key = s.import_key
+            )
+            AND s.rowid = (
+                SELECT MIN(d.rowid) FROM temp.import_staging AS d
+                WHERE d.import_key = s.import_key AND d.week IS s.week
+            )
+            ORDER BY s.rowid
+        """, {"jahr": int(jahr)})]
+        conn.execute(f"""
+            INSERT OR IGNORE INTO {_quote(tabelle)} ({spalten_sql}, year, import_key)
+            SELECT {spalten_sql}, :jahr, import_key FROM temp.import_staging ORDER BY rowid
+        """, {"jahr": int(jahr)})
+        if insert_report_rows is not None and neue_positionen and 1 <= int(kw) <= 53:
+            # Jahresfähige Plattform-Tabelle (year, kw) parallel aus dem Block befüllen
+            insert_report_rows(conn, platform, df.iloc[neue_positionen][df_spalten], jahr, int(kw))
+        yield len(neue_positionen)
+
+def erkenne_plattform_aus_dateiname(filename):
+    """Plattform anhand des Dateinamens; None bei Taxi-Umsatzlisten (Quelle muss gewählt werden) oder unbekannt"""
+    filename_lower = filename.lower()
+    if TAXI_UMSATZLISTE in filename_lower:
+        return None
+    if "uber" in filename_lower or "driver_performance" in filename_lower:
+        return "uber"
+    if "bolt" in filename_lower or "drivers performance" in filename_lower or "earnings per driver" in filename_lower:
+        return "bolt"
+    if "31300" in filename_lower:
+        return "31300"
+    if "40100" in filename_lower or "taxi" in filename_lower:
+        return "40100"
+    return None
+
 def verarbeite_datei(csv_datei, platform_choice=None):
-    """Hauptfunktion zur Dateiverarbeitung"""
+    """Hauptfunktion zur Dateiverarbeitung (Rückgabe: Anzahl neuer Zeilen, None bei Abbruch/Fehler)"""
     filename = Path(csv_datei).name
     print(f"\n📁 Verarbeite: {filename}")
     
@@ -517,33 +844,13 @@ def verarbeite_datei(csv_datei, platform_choice=None):
         print(f"⚠️ Keine Kalenderwoche im Dateinamen {filename} gefunden")
         return
     
-    kalenderwoche = f"KW{kw}"
-    tabelle = f"report_KW{kw}"
-    
-    # Trennzeichen erkennen
-    try:
-        with open(csv_datei, "r", encoding="utf-8") as f:
-            header = f.readline()
-            sep = ";" if header.count(";") > header.count(",") else ","
-    except UnicodeDecodeError:
-        # Fallback für andere Kodierungen
-        with open(csv_datei, "r", encoding="latin-1") as f:
-            header = f.readline()
-            sep = ";" if header.count(";") > header.count(",") else ","
-    
-    # CSV laden
-    try:
-        df = pd.read_csv(csv_datei, sep=sep, encoding="utf-8")
-    except UnicodeDecodeError:
-        df = pd.read_csv(csv_datei, sep=sep, encoding="latin-1")
-    
-    df.columns = df.columns.str.strip()
+    jahr = extrahiere_jahr(filename)
     
     # Plattform erkennen (wie in import.py - Dateinamen-basiert)
     filename_lower = filename.lower()
     
     # Spezielle Erkennung für Taxi-Umsatz-Dateien
-    if "uportal_getumsatzliste" in filename_lower:
+    if TAXI_UMSATZLISTE in filename_lower:
         if platform_choice:
             # Plattform wurde bereits ausgewählt (z.B. aus GUI)
             platform = platform_choice
@@ -575,69 +882,40 @@ def verarbeite_datei(csv_datei, platform_choice=None):
                 except EOFError:
                     print(f"\n   ❌ Import abgebrochen.")
                     return
-    elif "uber" in filename_lower or "driver_performance" in filename_lower:
-        platform = "uber"
-    elif "bolt" in filename_lower or "drivers performance" in filename_lower or "earnings per driver" in filename_lower:
-        platform = "bolt"
-    elif "31300" in filename_lower:
-        platform = "31300"
-    elif "40100" in filename_lower or "taxi" in filename_lower:
-        platform = "40100"
+    elif platform_choice:
+        # Bereits klassifiziert (Datenseite: Spalten der Kopfzeile) – nicht erneut am Dateinamen raten
+        platform = platform_choice
     else:
-        print(f"⚠️ Plattform für {filename} nicht erkannt")
-        print(f"   Dateiname: {filename}")
-        return
+        platform = erkenne_plattform_aus_dateiname(filename)
+        if platform is None:
+            print(f"⚠️ Plattform für {filename} nicht erkannt")
+            print(f"   Dateiname: {filename}")
+            return
     
     print(f"✅ Plattform erkannt: {platform}")
     
-    # Daten verarbeiten
-    if platform == "uber":
-        df, db_name = verarbeite_uber_daten(df, kalenderwoche)
-    elif platform == "bolt":
-        df, db_name = verarbeite_bolt_daten(df, kalenderwoche)
-    elif platform == "40100":
-        df, db_name = verarbeite_40100_daten(df, kalenderwoche)
-    elif platform == "31300":
-        df, db_name = verarbeite_31300_daten(df, kalenderwoche)
-    
-    # In Datenbank speichern (im SQL-Ordner)
+    # In Datenbank speichern (im SQL-Ordner), blockweise in einer Transaktion
+    db_path = Path(__file__).parent / PLATTFORM_DATENBANKEN[platform]
+    tabelle = f"report_KW{kw}"
     try:
-        # Stelle sicher, dass der SQL-Ordner existiert
-        sql_dir = Path(__file__).parent
-        db_path = sql_dir / db_name
         conn = sqlite3.connect(db_path)
-        erstelle_tabelle(conn, platform, tabelle)
-        
-        # Duplikate prüfen
-        if platform == "uber":
-            check_sql = f"SELECT first_name, last_name FROM {tabelle} WHERE week = ?"
-            merge_cols = ["first_name", "last_name"]
-        elif platform == "bolt":
-            check_sql = f"SELECT driver_name FROM {tabelle} WHERE week = ?"
-            merge_cols = ["driver_name"]
-        elif platform == "40100":
-            check_sql = f"SELECT Fahrername, Abschluss FROM {tabelle} WHERE week = ?"
-            merge_cols = ["Fahrername", "Abschluss"]
-        elif platform == "31300":
-            check_sql = f"SELECT Fahrername, Abschluss FROM {tabelle} WHERE week = ?"
-            merge_cols = ["Fahrername", "Abschluss"]
-        
         try:
-            existing = pd.read_sql_query(check_sql, conn, params=[kalenderwoche])
-            if not existing.empty:
-                df = df.merge(existing, on=merge_cols, how="left", indicator=True)
-                df = df[df["_merge"] == "left_only"].drop(columns=["_merge"])
-        except Exception as e:
-            print(f"⚠️ Fehler bei Duplikatsprüfung: {e}")
+            neu = importiere_csv_stream(csv_datei, conn, platform, kw, jahr)
+            indexed = index_report_table(conn, platform, tabelle) if neu and index_report_table is not None else 0
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
         
-        if not df.empty:
-            df.to_sql(tabelle, conn, if_exists="append", index=False)
-            print(f"✅ {len(df)} Zeilen importiert: {filename} → {db_path} → {tabelle}")
+        if neu:
+            print(f"✅ {neu} Zeilen importiert: {filename} → {db_path} → {tabelle}")
+            if indexed:
+                print(f"🔎 Namensindex aktualisiert: {indexed} Fahrer")
         else:
             print(f"ℹ️ Keine neuen Daten importiert: {filename}")
-        
-        conn.commit()
-        conn.close()
+        return neu
         
     except Exception as e:
         print(f"❌ Fehler beim Speichern: {e}")
@@ -1915,6 +1915,28 @@ Rectangle {
             // Ergebnis automatisch neu berechnen wenn sich Einsteiger-Wert ändert (debounced)
             ergebnisUpdateTimer.restart();
         }
+        
+        function onDuplikatGefunden(vergleich) {
+            // Speichern wartet auf die Entscheidung, die Datenbank ist dabei nicht gesperrt
+            duplicateDialog.fahrer = vergleich.fahrer;
+            duplicateDialog.fahrzeug = vergleich.fahrzeug;
+            duplicateDialog.kw = vergleich.kw;
+            duplicateDialog.bestehendText = vergleich.bestehend;
+            duplicateDialog.neuText = vergleich.neu;
+            duplicateDialog.visible = true;
+        }
+    }
+
+    // Duplikat-Dialog beim Speichern (bestehenden behalten / ersetzen / abbrechen)
+    DuplicateComparisonDialog {
+        id: duplicateDialog
+        visible: false
+        
+        onChoiceMade: function(choice) {
+            console.log("Duplikat-Entscheidung:", choice);
+            duplicateDialog.visible = false;
+            abrechnungsBackend.loeseDuplikat(choice);
+        }
     }
 
     Component.onCompleted: {
@@ -54,6 +54,7 @@ Rectangle {
     property bool hasData: datenBackend ? datenBackend.hasData : false
     property var statisticsData: datenBackend ? datenBackend.statistics : ({})
     property string statusMessage: datenBackend ? datenBackend.statusMessage : "Bereit"
+    property var explorerSummary: datenBackend ? datenBackend.explorerSummary : ({})
     
     // Performance Properties
     property var performanceData: datenBackend ? datenBackend.performanceData : ({})
@@ -722,10 +723,53 @@ Rectangle {
                                     
                                     Text {
                                         anchors.centerIn: parent
-                                        text: hasData ? "🥧 Pie Chart wird angezeigt..." : "📊 Keine Daten verfügbar"
+                                        text: "📊 Keine Daten verfügbar"
                                         font.family: ubuntuFont.name
                                         font.pixelSize: style.fontSizeNormal
                                         color: style.textSecondary
+                                        visible: Object.keys(explorerSummary).length === 0
+                                    }
+                                    
+                                    // Zeilen und Umsatz je Plattform aus dem Daten-Explorer
+                                    Column {
+                                        anchors.fill: parent
+                                        anchors.margins: style.spacingNormal
+                                        spacing: style.spacingSmall
+                                        
+                                        Repeater {
+                                            model: Object.keys(explorerSummary)
+                                            
+                                            delegate: RowLayout {
+                                                width: parent.width
+                                                spacing: style.spacingSmall
+                                                
+                                                Text {
+                                                    text: modelData
+                                                    font.family: ubuntuFont.name
+                                                    font.pixelSize: style.fontSizeSmall
+                                                    font.bold: true
+                                                    color: style.text
+                                                    Layout.preferredWidth: 60
+                                                }
+                                                
+                                                Text {
+                                                    text: explorerSummary[modelData].rows + " Zeilen"
+                                                    font.family: ubuntuFont.name
+                                                    font.pixelSize: style.fontSizeSmall
+                                                    color: style.textSecondary
+                                                    Layout.preferredWidth: 90
+                                                }
+                                                
+                                                Text {
+                                                    text: "€ " + explorerSummary[modelData].earnings.toFixed(2)
+                                                    font.family: ubuntuFont.name
+                                                    font.pixelSize: style.fontSizeSmall
+                                                    color: style.text
+                                                    Layout.fillWidth: true
+                                                    horizontalAlignment: Text.AlignRight
+                                                }
+                                            }
+                                        }
                                     }
                                 }
                             }
@@ -768,7 +812,7 @@ Rectangle {
                                     spacing: style.spacingNormal
                                     
                                     Text {
-                                        text: "Datum"
+                                        text: "Woche"
                                         font.family: ubuntuFont.name
                                         font.pixelSize: style.fontSizeSmall
                                         font.bold: true
@@ -804,7 +848,7 @@ Rectangle {
                                     }
                                     
                                     Text {
-                                        text: "Status"
+                                        text: "Fahrzeug"
                                         font.family: ubuntuFont.name
                                         font.pixelSize: style.fontSizeSmall
                                         font.bold: true
@@ -821,16 +865,8 @@ Rectangle {
                                 clip: true
                                 
                                 ListView {
-                                    model: ListModel {
-                                        ListElement { datum: "2024-01-15"; platform: "Uber"; fahrer: "Max M."; umsatz: "€ 45.20"; status: "Abgeschlossen" }
-                                        ListElement { datum: "2024-01-15"; platform: "Bolt"; fahrer: "Anna S."; umsatz: "€ 38.50"; status: "Abgeschlossen" }
-                                        ListElement { datum: "2024-01-14"; platform: "40100"; fahrer: "Max M."; umsatz: "€ 52.80"; status: "Abgeschlossen" }
-                                        ListElement { datum: "2024-01-14"; platform: "Uber"; fahrer: "Anna S."; umsatz: "€ 41.30"; status: "Abgeschlossen" }
-                                        ListElement { datum: "2024-01-13"; platform: "Bolt"; fahrer: "Max M."; umsatz: "€ 47.90"; status: "Abgeschlossen" }
-                                        ListElement { datum: "2024-01-13"; platform: "Uber"; fahrer: "Anna S."; umsatz: "€ 39.20"; status: "Abgeschlossen" }
-                                        ListElement { datum: "2024-01-12"; platform: "40100"; fahrer: "Max M."; umsatz: "€ 48.60"; status: "Abgeschlossen" }
-                                        ListElement { datum: "2024-01-12"; platform: "Bolt"; fahrer: "Anna S."; umsatz: "€ 35.80"; status: "Abgeschlossen" }
-                                    }
+                                    // Zeilen seitenweise aus dem Daten-Explorer (fetchMore beim Scrollen)
+                                    model: datenBackend ? datenBackend.explorerModel : null
                                     
                                     delegate: Rectangle {
                                         width: parent.width
@@ -843,7 +879,7 @@ Rectangle {
                                             spacing: style.spacingSmall
                                             
                                             Text {
-                                                text: datum
+                                                text: model.week
                                                 font.family: ubuntuFont.name
                                                 font.pixelSize: style.fontSizeSmall
                                                 color: style.text
@@ -851,7 +887,7 @@ Rectangle {
                                             }
                                             
                                             Text {
-                                                text: platform
+                                                text: model.platform
                                                 font.family: ubuntuFont.name
                                                 font.pixelSize: style.fontSizeSmall
                                                 color: style.text
@@ -859,7 +895,7 @@ Rectangle {
                                             }
                                             
                                             Text {
-                                                text: fahrer
+                                                text: model.driver
                                                 font.family: ubuntuFont.name
                                                 font.pixelSize: style.fontSizeSmall
                                                 color: style.text
@@ -867,26 +903,20 @@ Rectangle {
                                             }
                                             
                                             Text {
-                                                text: umsatz
+                                                text: "€ " + Number(model.earnings).toFixed(2)
                                                 font.family: ubuntuFont.name
                                                 font.pixelSize: style.fontSizeSmall
                                                 color: style.text
                                                 Layout.preferredWidth: 60
                                             }
                                             
-                                            Rectangle {
-                                                Layout.preferredWidth: 70
-                                                Layout.preferredHeight: 18
-                                                color: style.success
-                                                radius: style.radiusSmall
-                                                
-                                                Text {
-                                                    anchors.centerIn: parent
-                                                    text: status
-                                                    font.family: ubuntuFont.name
-                                                    font.pixelSize: style.fontSizeSmall
-                                                    color: style.text
-                                                }
+                                            Text {
+                                                text: model.vehicle
+                                                font.family: ubuntuFont.name
+                                                font.pixelSize: style.fontSizeSmall
+                                                color: style.textSecondary
+                                                Layout.fillWidth: true
+                                                elide: Text.ElideRight
                                             }
                                         }
                                     }
@@ -610,13 +610,29 @@ Rectangle {
             }
             
             Text {
-                text: "Datenvorschau"
+                text: datenBackend ? datenBackend.statusMessage : "Datenvorschau"
                 color: Style.textMuted
                 font.pixelSize: 14
                 Layout.alignment: Qt.AlignHCenter
             }
             
-            Item { Layout.fillHeight: true }
+            // Zeilen seitenweise aus dem Daten-Explorer (fetchMore beim Scrollen)
+            ListView {
+                Layout.fillWidth: true
+                Layout.fillHeight: true
+                clip: true
+                model: datenBackend ? datenBackend.explorerModel : null
+                
+                delegate: RowLayout {
+                    width: ListView.view.width
+                    spacing: Style.spacingSmall
+                    
+                    Text { text: model.week; color: Style.text; font.family: ubuntuFont.name; font.pixelSize: 12; Layout.preferredWidth: 80 }
+                    Text { text: model.platform; color: Style.textMuted; font.family: ubuntuFont.name; font.pixelSize: 12; Layout.preferredWidth: 50 }
+                    Text { text: model.driver; color: Style.text; font.family: ubuntuFont.name; font.pixelSize: 12; Layout.fillWidth: true; elide: Text.ElideRight }
+                    Text { text: "€ " + Number(model.earnings).toFixed(2); color: Style.text; font.family: ubuntuFont.name; font.pixelSize: 12; horizontalAlignment: Text.AlignRight; Layout.preferredWidth: 80 }
+                }
+            }
         }
     }
 
@@ -741,6 +757,20 @@ Rectangle {
                 Layout.alignment: Qt.AlignHCenter
             }
             
+            // Zeilen und Umsatz je Plattform für den aktuellen Filter
+            Repeater {
+                model: datenBackend ? Object.keys(datenBackend.explorerSummary) : []
+                
+                delegate: RowLayout {
+                    Layout.fillWidth: true
+                    spacing: Style.spacingSmall
+                    
+                    Text { text: modelData; color: Style.text; font.family: ubuntuFont.name; font.pixelSize: 14; font.bold: true; Layout.preferredWidth: 60 }
+                    Text { text: datenBackend.explorerSummary[modelData].rows + " Zeilen"; color: Style.textMuted; font.family: ubuntuFont.name; font.pixelSize: 14; Layout.fillWidth: true }
+                    Text { text: "€ " + datenBackend.explorerSummary[modelData].earnings.toFixed(2); color: Style.text; font.family: ubuntuFont.name; font.pixelSize: 14 }
+                }
+            }
+            
             Item { Layout.fillHeight: true }
         }
     }
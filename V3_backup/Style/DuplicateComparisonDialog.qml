@@ -0,0 +1,140 @@
+import QtQuick 2.15
+import QtQuick.Controls 2.15
+import QtQuick.Layouts 1.15
+import Style 1.0
+
+Rectangle {
+    id: duplicateDialog
+    width: 700
+    height: 500
+    radius: 12
+    color: Style.background
+    border.color: Style.border
+    border.width: 1
+
+    // Zentrieren im Parent
+    anchors.centerIn: parent
+    z: 1000
+
+    property string fahrer: ""
+    property string fahrzeug: ""
+    property string kw: ""
+    property string bestehendText: ""
+    property string neuText: ""
+
+    // choice: "keep_existing", "replace" oder "cancel"
+    signal choiceMade(string choice)
+
+    // Klicks nicht an die Seite darunter durchreichen
+    MouseArea {
+        anchors.fill: parent
+    }
+
+    ColumnLayout {
+        anchors.fill: parent
+        spacing: 20
+        anchors.margins: 28
+
+        // Header
+        Text {
+            text: "Für " + fahrer + " - " + fahrzeug + " - KW " + kw + " existiert bereits ein Eintrag:"
+            font.pixelSize: 18
+            color: Style.text
+            font.family: "Ubuntu"
+            font.bold: true
+            wrapMode: Text.WordWrap
+            horizontalAlignment: Text.AlignHCenter
+            Layout.fillWidth: true
+        }
+
+        // Vergleich bestehender / neuer Eintrag
+        RowLayout {
+            Layout.fillWidth: true
+            Layout.fillHeight: true
+            spacing: 20
+
+            Repeater {
+                model: [
+                    { titel: "Bestehender Eintrag:", inhalt: duplicateDialog.bestehendText },
+                    { titel: "Neuer Eintrag:", inhalt: duplicateDialog.neuText }
+                ]
+
+                ColumnLayout {
+                    Layout.fillWidth: true
+                    Layout.fillHeight: true
+                    spacing: 8
+
+                    Text {
+                        text: modelData.titel
+                        color: Style.text
+                        font.pixelSize: 14
+                        font.family: "Ubuntu"
+                        font.bold: true
+                    }
+
+                    Rectangle {
+                        Layout.fillWidth: true
+                        Layout.fillHeight: true
+                        color: Style.surface
+                        border.color: Style.buttonBorder
+                        border.width: 1
+                        radius: 4
+
+                        Text {
+                            anchors.fill: parent
+                            anchors.margins: 10
+                            text: modelData.inhalt
+                            color: Style.text
+                            font.pixelSize: 12
+                            font.family: "Space Mono"
+                            wrapMode: Text.WordWrap
+                        }
+                    }
+                }
+            }
+        }
+
+        // Buttons
+        RowLayout {
+            Layout.fillWidth: true
+            spacing: 12
+
+            Item { Layout.fillWidth: true }
+
+            Repeater {
+                model: [
+                    { label: "Bestehenden behalten", choice: "keep_existing", farbe: "#2E86AB" },
+                    { label: "Durch neuen ersetzen", choice: "replace", farbe: "#A23B72" },
+                    { label: "Abbrechen", choice: "cancel", farbe: Style.textMuted }
+                ]
+
+                Button {
+                    id: choiceButton
+                    text: modelData.label
+                    height: 40
+
+                    background: Rectangle {
+                        color: choiceButton.hovered ? Style.buttonHover : "transparent"
+                        border.color: modelData.farbe
+                        border.width: 1
+                        radius: 4
+                    }
+
+                    contentItem: Text {
+                        text: choiceButton.text
+                        color: modelData.farbe
+                        horizontalAlignment: Text.AlignHCenter
+                        verticalAlignment: Text.AlignVCenter
+                        font.pixelSize: 13
+                        font.family: "Ubuntu"
+                        font.bold: modelData.choice !== "cancel"
+                    }
+
+                    onClicked: {
+                        duplicateDialog.choiceMade(modelData.choice)
+                    }
+                }
+            }
+        }
+    }
+}
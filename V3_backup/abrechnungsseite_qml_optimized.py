@@ -1,4 +1,4 @@
-from PySide6.QtCore import QObject, Slot, Signal, Property, QAbstractListModel, Qt
+from PySide6.QtCore import QObject, Slot, Signal, Property, QAbstractListModel, Qt, QTimer
 from PySide6.QtQml import QQmlApplicationEngine
 from PySide6.QtWidgets import QApplication, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QWidget
 from PySide6.QtGui import Qt
@@ -12,58 +12,18 @@ from generic_wizard import GenericWizard
 from datetime import datetime, timedelta
 import calendar
 import json
-from threading import Lock
-
-class DatabaseConnectionPool:
-    """Connection Pool für SQLite-Verbindungen"""
-    
-    def __init__(self, max_connections=5):
-        self.max_connections = max_connections
-        self.connections = {}
-        self.lock = Lock()
-    
-    def get_connection(self, db_path):
-        """Holt eine Verbindung aus dem Pool oder erstellt eine neue"""
-        with self.lock:
-            if db_path not in self.connections:
-                self.connections[db_path] = []
-            
-            # Prüfe ob eine verfügbare Verbindung existiert
-            for conn in self.connections[db_path]:
-                try:
-                    # Teste die Verbindung
-                    conn.execute("SELECT 1")
-                    return conn
-                except:
-                    # Verbindung ist ungültig, entferne sie
-                    try:
-                        conn.close()
-                    except:
-                        pass
-                    self.connections[db_path].remove(conn)
-            
-            # Erstelle neue Verbindung
-            if len(self.connections[db_path]) < self.max_connections:
-                conn = sqlite3.connect(db_path)
-                self.connections[db_path].append(conn)
-                return conn
-            else:
-                # Verwende die erste verfügbare Verbindung
-                return self.connections[db_path][0] if self.connections[db_path] else sqlite3.connect(db_path)
-    
-    def close_all(self):
-        """Schließt alle Verbindungen"""
-        with self.lock:
-            for db_path, connections in self.connections.items():
-                for conn in connections:
-                    try:
-                        conn.close()
-                    except:
-                        pass
-            self.connections.clear()
-
-# Globale Connection Pool Instanz
-db_pool = DatabaseConnectionPool()
+from driver_match_index import DriverNameIndex
+from fuzzy_matcher import BatchFuzzyMatcher, clean_name
+from vehicle_ledger import (REVENUE as LEDGER_REVENUE, RUNNING_COSTS as LEDGER_RUNNING_COSTS, billing_year,
+                            prepare_vehicle_table, refresh_billing_week, update_weekly_summary)
+from taxi_totals import TaxiTotals, load_taxi_rows, load_taxi_totals, vehicle_digits
+from billing_results import BillingResult, PlatformResult, parse_betrag
+from billing_graph import build_billing_graph
+from billing_cache import EvaluationCache, EvaluationPrefetcher
+from billing_evaluation import EvaluationService
+from connection_manager import connect
+from billing_store import (MAIN_SCHEMA, REVENUE_SCHEMA, RUNNING_COSTS_SCHEMA, billing_transaction,
+                           find_revenue_conflicts, qualified)
 
 def safe_float(val):
     """Globale Hilfsfunktion für sichere Float-Konvertierung"""
@@ -145,6 +105,9 @@ class AbrechnungsSeiteQML(QObject):
     incomeChanged = Signal()
     abrechnungsergebnisChanged = Signal()
     
+    # Duplikat beim Speichern: Vergleichsdaten für den QML-Dialog
+    duplikatGefunden = Signal('QVariantMap')
+    
     def __init__(self):
         super().__init__()
         self._fahrer_list = []
@@ -153,6 +116,13 @@ class AbrechnungsSeiteQML(QObject):
         self._ergebnisse = []
         self._current_page = 0
         self._found_pages = []
+        self._taxi_sources = {}  # Plattform → (db_path, Tabelle, Fahrzeugziffern) für die Detailansicht
+        self._auswertungs_cache = EvaluationCache("SQL")  # (Fahrer, Fahrzeug, KW) → geladene Auswertung
+        self._prefetcher = EvaluationPrefetcher(self._auswertungs_cache, self._lade_plattformdaten)
+        self._auswertung_service = EvaluationService(self._prefetcher, self)
+        self._auswertung_service.evaluationFinished.connect(self._auswertung_fertig)
+        self._auswertung_service.evaluationFailed.connect(self._auswertung_fehlgeschlagen)
+        self._auswertung_anfrage = (None, None, None)  # (Fahrer, Fahrzeug, KW) der neuesten Anfrage
         self._fahrer_label = ""
         self._wizard_data = {}
         self._show_wizard = True
@@ -166,8 +136,16 @@ class AbrechnungsSeiteQML(QObject):
         self._input_gas_text = ""
         self._input_einsteiger = 0.0
         self._input_einsteiger_text = ""
+        self._billing = BillingResult()  # Zahlen der aktuellen Auswertung (von _collect_platform_data gefüllt)
+        self._recalc = build_billing_graph()  # Formeln Anteil → Income → Ergebnis (inkrementell)
+        self._pending_signals = []  # Property-Signale für den nächsten Event-Loop-Durchlauf
+        self._signal_flush_geplant = False
+        self._anteil = 0.0
+        self._income = 0.0
+        self._abrechnungsergebnis = 0.0
         self._input_expense = 0.0
         self._expense_cache = []  # Zwischenspeicher für neue Ausgaben
+        self._pending_save = None  # deal_result, das auf die Duplikat-Entscheidung wartet
         # Daten laden
         self.load_fahrer()
         self.load_fahrzeuge()
@@ -353,6 +331,7 @@ class AbrechnungsSeiteQML(QObject):
         if self._input_einsteiger != value:
             # Speichere den eingegebenen Wert direkt
             self._input_einsteiger = value
+            self._billing.einsteiger = parse_betrag(value)  # einmal parsen, Berechnungen lesen den Float
             self.debug_print(f"inputEinsteiger gesetzt auf: {value}", "INPUT")
             
         self.inputEinsteigerChanged.emit()
@@ -449,8 +428,7 @@ class AbrechnungsSeiteQML(QObject):
             if not getattr(self, '_einsteiger_mode', False):
                 # Im Einsteiger-Modus: Gesamtbetrag = Umsatz + Einsteiger
                 umsatz = self._headcard_umsatz + self._headcard_trinkgeld
-                einsteiger = float(self._input_einsteiger) if self._input_einsteiger else 0.0
-                gesamtbetrag = umsatz + einsteiger
+                gesamtbetrag = umsatz + self._billing.einsteiger
                 return f"{gesamtbetrag:.2f}"
             else:
                 # Im Gesamtbetrag-Modus: Zeige den eingegebenen Wert
@@ -461,11 +439,11 @@ class AbrechnungsSeiteQML(QObject):
 
     def load_fahrer(self):
         try:
-            # Verwende Connection Pool
-            conn = db_pool.get_connection("SQL/database.db")
-            cursor = conn.cursor()
-            cursor.execute("SELECT first_name, last_name, status FROM drivers")
-            rows = cursor.fetchall()
+            conn = connect("SQL/database.db")
+            try:
+                rows = conn.execute("SELECT first_name, last_name, status FROM drivers").fetchall()
+            finally:
+                conn.close()
             self._fahrer_list = []
             for row in rows:
                 first_name, last_name, status = row
@@ -484,15 +462,14 @@ class AbrechnungsSeiteQML(QObject):
             print(f"Fehler beim Laden der Fahrer: {e}")
             self._fahrer_list = []  # Sicherstellen, dass Liste initialisiert ist
             self.fahrerChanged.emit()
-        # Kein finally block - Connection bleibt im Pool
             
     def load_fahrzeuge(self):
         try:
-            # Verwende Connection Pool
-            conn = db_pool.get_connection("SQL/database.db")
-            cursor = conn.cursor()
-            cursor.execute("SELECT license_plate, rfrnc FROM vehicles")
-            rows = cursor.fetchall()
+            conn = connect("SQL/database.db")
+            try:
+                rows = conn.execute("SELECT license_plate, rfrnc FROM vehicles").fetchall()
+            finally:
+                conn.close()
             self._fahrzeug_list = []
             for row in rows:
                 kennzeichen, rfrnc = row
@@ -510,12 +487,11 @@ class AbrechnungsSeiteQML(QObject):
             print(f"Fehler beim Laden der Fahrzeuge: {e}")
             self._fahrzeug_list = []  # Sicherstellen, dass Liste initialisiert ist
             self.fahrzeugChanged.emit()
-        # Kein finally block - Connection bleibt im Pool
             
     def load_kalenderwochen(self):
         try:
             db_path = os.path.join("SQL", "40100.sqlite")
-            conn = sqlite3.connect(db_path)
+            conn = connect(db_path)
             cursor = conn.cursor()
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'report_KW%'")
             tables = [row[0] for row in cursor.fetchall()]
@@ -572,7 +548,7 @@ class AbrechnungsSeiteQML(QObject):
             
             # Fahrer-ID aus der Datenbank holen
             try:
-                conn = sqlite3.connect("SQL/database.db")
+                conn = connect("SQL/database.db")
                 cursor = conn.cursor()
                 cursor.execute("SELECT driver_id FROM drivers WHERE first_name || ' ' || last_name = ?", (fahrer,))
                 result = cursor.fetchone()
@@ -624,9 +600,10 @@ class AbrechnungsSeiteQML(QObject):
             self._found_pages = []
             self._current_page = 0
             
-            # WICHTIG: Auch die Input-Werte zurücksetzen, die von _get_platform_umsatz verwendet werden
+            # WICHTIG: Auch die Input-Werte und das Zahlenmodell zurücksetzen
             self._input_einsteiger = ""
             self._input_gas = ""
+            self._billing = BillingResult()
             
             # HeadCard-Werte zurücksetzen
             self._headcard_umsatz = 0.0
@@ -800,38 +777,24 @@ class AbrechnungsSeiteQML(QObject):
             
         self._fahrer_label = fahrer
         self._kw_label = kw  # WICHTIG: KW-Label für Garage-Berechnung setzen
-        self._found_pages = []
         
-        # 1. Fahrer-Deal aus database.db holen
-        deal = None
-        garage = 0.0
-        pauschale = 500.0  # Standard-Wert
-        umsatzgrenze = 1200.0  # Standard-Wert
-        try:
-            conn_deal = sqlite3.connect("SQL/database.db")
-            cursor_deal = conn_deal.cursor()
-            cursor_deal.execute("SELECT deal, garage, pauschale, umsatzgrenze FROM deals WHERE name = ?", (fahrer,))
-            row = cursor_deal.fetchone()
-            if row:
-                deal = row[0]
-                garage = row[1] if row[1] is not None else 0.0
-                pauschale = row[2] if row[2] is not None else 500.0
-                umsatzgrenze = row[3] if row[3] is not None else 1200.0
-                # Deal-Daten geladen
-            else:
-                # Kein Deal-Eintrag gefunden
-                pass
-        except Exception as e:
-            deal = None
-            garage = 0.0
-            pauschale = 500.0
-            umsatzgrenze = 1200.0
-            # Fehler beim Laden der Deal-Daten
-        finally:
-            try:
-                conn_deal.close()
-            except:
-                pass
+        # Laden im Thread-Pool (Cache/Prefetch, SQLite, Matching); eine neue Auswahl löst die alte ab,
+        # Ergebnis kommt über _auswertung_fertig im Hauptthread
+        self._auswertung_anfrage = (fahrer, fahrzeug, kw)
+        self._auswertung_service.submit(fahrer, fahrzeug, kw)
+
+    @Slot(int, object, bool)
+    def _auswertung_fertig(self, generation, eintrag, aus_cache):
+        """Übernimmt das Ergebnis der neuesten Auswertung (ältere liefert der Service nicht mehr)"""
+        fahrer, fahrzeug, kw = self._auswertung_anfrage
+        if aus_cache:
+            self.debug_print(f"Auswertung aus Cache: {fahrer} / {fahrzeug} / KW{kw}", "CACHE")
+        
+        # 1. Fahrer-Deal (deal, garage, pauschale, umsatzgrenze) mit Standardwerten
+        deal, garage, pauschale, umsatzgrenze = eintrag.deal_row or (None, None, None, None)
+        garage = garage if garage is not None else 0.0
+        pauschale = pauschale if pauschale is not None else 500.0
+        umsatzgrenze = umsatzgrenze if umsatzgrenze is not None else 1200.0
                 
         # Setze die Backend-Variablen
         self._monthly_garage = garage  # WICHTIG: _monthly_garage statt _garage
@@ -841,237 +804,108 @@ class AbrechnungsSeiteQML(QObject):
         
         # Deal-spezifische Konfiguration wird bereits in _lade_deal_aus_datenbank() gesetzt
         
+        self._found_pages = list(eintrag.found_pages)
+        self._taxi_sources = dict(eintrag.taxi_sources)
+        self.foundPagesChanged.emit()
+            
+        if not self._found_pages:
+            self._ergebnisse = [{"type": "error", "message": "Keine Einträge gefunden."}]
+            self.ergebnisseChanged.emit()
+            return
+        # Deal ist bereits in auswerten() aus der Datenbank gesetzt
+        # Übersichtsseite anzeigen
+        self.show_overview_page()
+        
+        # Nachbarwochen im Hintergrund vorladen (nächste KW ist meist die nächste Abrechnung)
+        self._prefetcher.prefetch(fahrer, fahrzeug, kw)
+
+    @Slot(int, str)
+    def _auswertung_fehlgeschlagen(self, generation, message):
+        print(f"❌ Fehler bei der Auswertung: {message}")
+        self._found_pages = []
+        self._taxi_sources = {}
+        self.foundPagesChanged.emit()
+        self._ergebnisse = [{"type": "error", "message": f"Auswertung fehlgeschlagen: {message}"}]
+        self.ergebnisseChanged.emit()
+        
+    def _lade_plattformdaten(self, fahrer, fahrzeug, kw, deal):
+        """Lädt Taxi-Summen und Uber/Bolt-Zeilen einer Auswahl, ohne den Seitenzustand zu ändern.
+
+        Rückgabe: (found_pages, taxi_sources, failed_sources) für den Auswertungs-Cache;
+        failed_sources nennt Quellen, deren Abfrage mit einem Fehler abbrach.
+        """
+        found_pages = []
+        taxi_sources = {}
+        failed_sources = []
+        
         # 2. Fahrzeug-Daten aus 40100 und 31300 laden
         if fahrzeug and kw:
-            kennzeichen_nummer = "".join(filter(str.isdigit, fahrzeug))
+            kennzeichen_nummer = vehicle_digits(fahrzeug)
             table_name = f"report_KW{kw}"
             db_path_40100 = os.path.abspath(os.path.join("SQL", "40100.sqlite"))
             db_path_31300 = os.path.abspath(os.path.join("SQL", "31300.sqlite"))
             
-            # In 40100 suchen
-            try:
-                conn = sqlite3.connect(db_path_40100)
-                df_40100 = pd.read_sql_query(f"SELECT * FROM {table_name} WHERE Fahrzeug LIKE ?", conn, params=[f"%{kennzeichen_nummer}%"])
-                if not df_40100.empty:
-                    self._found_pages.append(("40100", df_40100.copy(), deal))
-            except Exception as e:
-                print(f"[INFO] Keine Daten in 40100 für KW{kw} gefunden oder Fehler: {e}")
-            finally:
-                try: 
-                    conn.close()
-                except: 
-                    pass
-            
-            # In 31300 suchen
-            try:
-                conn = sqlite3.connect(db_path_31300)
-                df_31300 = pd.read_sql_query(f"SELECT * FROM {table_name} WHERE Fahrzeug LIKE ?", conn, params=[f"%{kennzeichen_nummer}%"])
-                if not df_31300.empty:
-                    self.debug_print(f"31300-Matching: Fahrzeug={fahrzeug}, KW={kw}, Treffer={len(df_31300)}", "MATCHING")
-                    if not df_31300.empty:
-                        self.debug_print(f"31300-Matching: Erste Zeilen gefunden", "MATCHING")
-                        self._found_pages.append(("31300", df_31300.copy(), deal))
-                    else:
-                        self.debug_print("31300-Matching: Keine Einträge gefunden", "MATCHING")
-            except Exception as e:
-                print(f"[INFO] Keine Daten in 31300 für KW{kw} gefunden oder Fehler: {e}")
-            finally:
-                try: 
-                    conn.close()
-                except: 
-                    pass
+            for platform, db_path in [("40100", db_path_40100), ("31300", db_path_31300)]:
+                conn = None
+                try:
+                    conn = connect(db_path)
+                    # Nur die Wochensummen (Aggregat über den Fahrzeugnummer-Index), Buchungen erst in show_details
+                    totals = load_taxi_totals(conn, platform, table_name, kennzeichen_nummer)
+                    self.debug_print(f"{platform}-Matching: Fahrzeug={fahrzeug}, KW={kw}, Treffer={totals.rows if totals else 0}", "MATCHING")
+                    if totals is not None:
+                        found_pages.append((platform, totals, deal))
+                        taxi_sources[platform] = (db_path, table_name, kennzeichen_nummer)
+                except Exception as e:
+                    print(f"[INFO] Keine Daten in {platform} für KW{kw} gefunden oder Fehler: {e}")
+                    failed_sources.append(platform)
+                finally:
+                    try:
+                        if conn is not None:
+                            conn.close()
+                    except:
+                        pass
                     
         # 3. Fahrer in Uber und Bolt suchen (erweitertes Matching mit robuster Normalisierung)
-        def clean_name(name):
-            """Normalisiert Namen für robustes Matching.
-            - Kleinbuchstaben, Mehrfach-Leerzeichen → ein Leerzeichen
-            - Bindestriche/Unterstriche → Leerzeichen
-            - 'al' Präfix → 'el' (häufige Variante)
-            - Trimmt führende/trailing Spaces
-            """
-            s = str(name).lower()
-            s = s.replace("-", " ").replace("_", " ")
-            s = re.sub(r"\s+", " ", s)
-            s = re.sub(r"\bal\s+", "el ", s)
-            return s.strip()
-
-        def levenshtein_distance(s1, s2):
-            """Berechnet die Levenshtein-Distanz zwischen zwei Strings"""
-            if len(s1) < len(s2):
-                return levenshtein_distance(s2, s1)
-            
-            if len(s2) == 0:
-                return len(s1)
-            
-            previous_row = list(range(len(s2) + 1))
-            for i, c1 in enumerate(s1):
-                current_row = [i + 1]
-                for j, c2 in enumerate(s2):
-                    insertions = previous_row[j + 1] + 1
-                    deletions = current_row[j] + 1
-                    substitutions = previous_row[j] + (c1 != c2)
-                    current_row.append(min(insertions, deletions, substitutions))
-                previous_row = current_row
-            
-            return previous_row[-1]
-
-        def fuzzy_match_score(search_name, target_name, max_distance=3):
-            """Verbesserter Fuzzy-Score (Dice/Jaccard/Coverage, Reihenfolge-/Präfix-Boni, leichter Distanz-Anteil)."""
-            if not search_name or not target_name:
-                return 0.0
-            if search_name == target_name:
-                return 100.0
-
-            search_tokens = clean_name(search_name).split()
-            target_tokens = clean_name(target_name).split()
-
-            def extend_el(tokens):
-                ext = tokens.copy()
-                for i, token in enumerate(tokens):
-                    if token == 'el' and i + 1 < len(tokens):
-                        ext.append('el' + tokens[i + 1])
-                return ext
-
-            search_ext = extend_el(search_tokens)
-            target_ext = extend_el(target_tokens)
-
-            set_search = set(search_ext)
-            set_target = set(target_ext)
-            inter = set_search & set_target
-            union = set_search | set_target
-            inter_size = len(inter)
-
-            if inter_size == 0 and levenshtein_distance(search_name, target_name) > max_distance:
-                return 0.0
-
-            dice = (2 * inter_size) / max(1, (len(set_search) + len(set_target)))
-            jaccard = inter_size / max(1, len(union))
-            coverage = inter_size / max(1, len(set_search))
-
-            order_bonus = 0.0
-            if search_tokens and target_tokens and search_tokens[0] == target_tokens[0]:
-                order_bonus += 8.0
-            if search_tokens and target_tokens and search_tokens[-1] == target_tokens[-1]:
-                order_bonus += 8.0
-
-            prefix_bonus = 0.0
-            for st in search_tokens:
-                if any(tt.startswith(st) or st.startswith(tt) for tt in target_tokens):
-                    prefix_bonus += 2.0
-            prefix_bonus = min(prefix_bonus, 8.0)
-
-            arabic_bonus = 0.0
-            if any(t == 'el' or t.startswith('el') for t in search_tokens) and any(t == 'el' or t.startswith('el') for t in target_tokens):
-                arabic_bonus = 20.0
-
-            distance = levenshtein_distance(search_name, target_name)
-            max_len = max(len(search_name), len(target_name))
-            norm_dist = (distance / max_len) if max_len else 1.0
-            distance_score = max(0.0, 100.0 - (norm_dist * 100.0)) / 100.0
-
-            base = (0.55 * dice + 0.20 * coverage + 0.10 * jaccard + 0.15 * distance_score) * 100.0
-            score = base + order_bonus + prefix_bonus + arabic_bonus
-            return float(max(0.0, min(100.0, score)))
-
         clean_fahrer_label = clean_name(fahrer)
-        search_tokens = clean_fahrer_label.split()
-
-        def token_coverage(search_tokens_local, target_clean: str):
-            tgt_tokens = target_clean.split()
-            if not search_tokens_local:
-                return 0.0, 0
-            inter = len(set(search_tokens_local) & set(tgt_tokens))
-            coverage = inter / max(1, len(set(search_tokens_local)))
-            order = 0
-            if tgt_tokens:
-                if search_tokens_local[0:1] == tgt_tokens[0:1]:
-                    order += 1
-                if search_tokens_local[-1:] == tgt_tokens[-1:]:
-                    order += 1
-            return float(coverage), int(order)
-
-        def debug_matching(df, label, db_name, min_score=65, min_coverage=0.5):
-            # Nur tatsächlich akzeptierte Matches ausgeben
-            if df is None or df.empty:
-                print(f"⚠️ {db_name}: Kein ausreichender Match für '{label}'")
-                return
-            cols = list(df.columns)
-            name_col = "_combo_name" if "_combo_name" in cols else ("_driver_name_clean" if "_driver_name_clean" in cols else None)
-            if name_col and "_match" in cols:
-                row = df.iloc[0]
-                cov = float(row["_coverage"]) if "_coverage" in cols else 0.0
-                order = int(row["_order"]) if "_order" in cols else 0
-                ok = (float(row["_match"]) >= min_score) and (cov >= min_coverage) and (order >= 1 or label in str(row[name_col]))
-                if ok:
-                    print(f"✅ {db_name}-Match akzeptiert: '{label}' → '{row[name_col]}' (Score: {row['_match']:.1f}, Coverage: {cov:.2f}, Order: {order})")
-                else:
-                    print(f"⚠️ {db_name}-Kandidat verworfen: '{label}' → '{row[name_col]}' (Score: {row['_match']:.1f}, Coverage: {cov:.2f}, Order: {order})")
 
+        # Kandidaten kommen aus dem persistenten Namensindex (driver_match_index);
+        # geladen wird nur die akzeptierte Zeile statt der ganzen Wochentabelle.
         for db_name, db_file in [("Uber", "uber.sqlite"), ("Bolt", "bolt.sqlite")]:
             db_path = os.path.abspath(os.path.join("SQL", db_file))
             table_name = f"report_KW{kw}"
+            conn = None
             try:
-                conn = sqlite3.connect(db_path)
-                df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-                if db_name == "Uber":
-                    if "first_name" in df.columns and "last_name" in df.columns:
-                        df["_combo_name"] = (df["first_name"].fillna("") + " " + df["last_name"].fillna("")).apply(clean_name)
-                        df["_match"] = df["_combo_name"].apply(lambda name: fuzzy_match_score(clean_fahrer_label, name))
-                        # Zusatzkriterien: Coverage und Reihenfolge
-                        cov_ord = df["_combo_name"].apply(lambda n: token_coverage(search_tokens, n))
-                        df["_coverage"] = cov_ord.apply(lambda x: x[0])
-                        df["_order"] = cov_ord.apply(lambda x: x[1])
-                        # Kandidaten rangieren
-                        df = df.sort_values(["_match", "_coverage", "_order"], ascending=False)
-                        # Annahme nur, wenn Schwellen erfüllt
-                        if not df.empty and df.iloc[0]["_match"] >= 65 and (df.iloc[0]["_coverage"] >= 0.5) and (df.iloc[0]["_order"] >= 1 or clean_fahrer_label in df.iloc[0]["_combo_name"]):
-                            df = df.iloc[[0]]
-                        else:
-                            df = df.iloc[0:0]
-                        # Debug-Ausgabe nach finaler Entscheidung
-                        dbg_df = df.copy()
-                        if dbg_df.empty:
-                            # Für Debug den Top-Kandidaten anzeigen
-                            dbg_df = df if not df.empty else None
-                        debug_matching(df if not df.empty else None, clean_fahrer_label, db_name)
-                        df = df.drop(columns=["_match", "_combo_name", "_coverage", "_order"])
-                    else:
-                        df = df.iloc[0:0]
-                elif db_name == "Bolt":
-                    if "driver_name" in df.columns:
-                        df["_driver_name_clean"] = df["driver_name"].apply(clean_name)
-                        df["_match"] = df["_driver_name_clean"].apply(lambda name: fuzzy_match_score(clean_fahrer_label, name))
-                        cov_ord = df["_driver_name_clean"].apply(lambda n: token_coverage(search_tokens, n))
-                        df["_coverage"] = cov_ord.apply(lambda x: x[0])
-                        df["_order"] = cov_ord.apply(lambda x: x[1])
-                        df = df.sort_values(["_match", "_coverage", "_order"], ascending=False)
-                        if not df.empty and df.iloc[0]["_match"] >= 65 and (df.iloc[0]["_coverage"] >= 0.5) and (df.iloc[0]["_order"] >= 1 or clean_fahrer_label in df.iloc[0]["_driver_name_clean"]):
-                            df = df.iloc[[0]]
-                        else:
-                            df = df.iloc[0:0]
-                        debug_matching(df if not df.empty else None, clean_fahrer_label, db_name)
-                        df = df.drop(columns=["_match", "_driver_name_clean", "_coverage", "_order"])
-                    else:
-                        df = df.iloc[0:0]
-                if not df.empty:
-                    self._found_pages.append((db_name, df.copy(), deal))
+                if not os.path.exists(db_path):
+                    continue
+                conn = connect(db_path)
+                name_index = DriverNameIndex(conn, db_name.lower())
+                candidates = name_index.candidates(table_name, clean_fahrer_label)
+                if not candidates:
+                    print(f"⚠️ {db_name}: Kein ausreichender Match für '{clean_fahrer_label}'")
+                    continue
+                # Alle Kandidaten in einem Schritt bewerten (gemeinsamer Batch-Matcher)
+                matcher = BatchFuzzyMatcher([name_clean for _, name_clean in candidates])
+                match = matcher.best_matches([clean_fahrer_label])[0]
+                row_id = candidates[match.index][0]
+                # Annahme nur, wenn Schwellen erfüllt
+                if match.accepted:
+                    print(f"✅ {db_name}-Match akzeptiert: '{clean_fahrer_label}' → '{match.target}' (Score: {match.score:.1f}, Coverage: {match.coverage:.2f}, Order: {match.order})")
+                    df = pd.read_sql_query(f"SELECT * FROM {table_name} WHERE rowid = ?", conn, params=[row_id])
+                    if not df.empty:
+                        found_pages.append((db_name, df, deal))
+                else:
+                    print(f"⚠️ {db_name}-Kandidat verworfen: '{clean_fahrer_label}' → '{match.target}' (Score: {match.score:.1f}, Coverage: {match.coverage:.2f}, Order: {match.order})")
             except Exception as e:
-                pass
+                print(f"[INFO] Keine Daten in {db_name} für KW{kw} gefunden oder Fehler: {e}")
+                failed_sources.append(db_name)
             finally:
                 try:
-                    conn.close()
+                    if conn is not None:
+                        conn.close()
                 except:
                     pass
-                    
-        self.foundPagesChanged.emit()
-            
-        if not self._found_pages:
-            self._ergebnisse = [{"type": "error", "message": "Keine Einträge gefunden."}]
-            self.ergebnisseChanged.emit()
-            return
-        # Deal ist bereits in auswerten() aus der Datenbank gesetzt
-        # Übersichtsseite anzeigen
-        self.show_overview_page()
+        
+        return found_pages, taxi_sources, failed_sources
         
     def auswerten_from_wizard(self):
         """Auswertung basierend auf Wizard-Daten"""
@@ -1085,11 +919,11 @@ class AbrechnungsSeiteQML(QObject):
         self._current_page = -1  # Übersichtsseite
         self.currentPageChanged.emit()
         
-        # Daten sammeln und verarbeiten
-        platform_data = self._collect_platform_data()
+        # Zahlenmodell einmal füllen
+        billing = self._collect_platform_data()
         
         # HeadCard-Werte berechnen
-        self._calculate_headcard_values(platform_data)
+        self._calculate_headcard_values(billing)
         
         # Garage-Berechnung
         self._calculate_garage_costs()
@@ -1101,48 +935,39 @@ class AbrechnungsSeiteQML(QObject):
         self._calculate_auto_tank_value()
         
         # Ergebnisse zusammenstellen und anzeigen
-        self._create_overview_results(platform_data)
+        self._create_overview_results(billing)
         
         # Finale Ergebnis-Berechnung
-        taxi_total = platform_data.get('taxi_total', 0.0)
-        self.update_ergebnis(taxi_total=float(taxi_total))
+        self.update_ergebnis(taxi_total=billing.umsatz("Taxi"))
     
     def _collect_platform_data(self):
-        """Sammelt und verarbeitet Daten von allen Plattformen"""
-        data = {
-            'sum_40100': 0, 'sum_31300': 0, 'sum_uber': 0, 'sum_bolt': 0,
-            'sum_bargeld': 0, 'uber_gross_total': 0.0, 'bolt_echter_umsatz': 0.0,
-            'bolt_rider_tips': 0.0, 'bolt_cash_collected': 0.0, 'uber_cash_collected': 0.0,
-            '_40100_real': 0.0, '_40100_trinkgeld': 0.0, '_40100_trinkgeld_gesamt': 0.0, '_40100_bargeld': 0.0,
-            '_31300_real': 0.0, '_31300_trinkgeld': 0.0, '_31300_trinkgeld_gesamt': 0.0, '_31300_bargeld': 0.0,
-            'details_40100': [], 'details_31300': [], 'details_uber': [], 'details_bolt': []
-        }
+        """Füllt das Zahlenmodell einmal aus allen gefundenen Plattformen"""
+        billing = BillingResult(einsteiger=self._billing.einsteiger)
         
         self.debug_print(f"Gefundene Datenquellen: {len(self._found_pages)}", "DATA")
         
-        for db_name, df, deal in self._found_pages:
-            self.debug_print(f"Verarbeite {db_name}: {len(df) if df is not None else 0} Datensätze", "DATA")
-            
-            if db_name == "40100" and df is not None:
-                self._process_40100_data(df, deal, data)
-            elif db_name == "31300" and df is not None:
-                self._process_31300_data(df, deal, data)
-            elif db_name == "Uber" and df is not None:
-                self._process_uber_data(df, deal, data)
-            elif db_name == "Bolt" and df is not None:
-                self._process_bolt_data(df, deal, data)
-        
-        return data
-        
-
-        
-    def calculate_uber_details(self, df):
-        werte = self._berechne_platform_werte(df, "Uber")
+        for db_name, quelle, deal in self._found_pages:
+            if quelle is None:
+                continue
+            if db_name == "40100":
+                billing.taxi_40100.add(PlatformResult.from_taxi(quelle))
+            elif db_name == "31300":
+                billing.taxi_31300.add(PlatformResult.from_taxi(quelle))
+            elif db_name == "Uber":
+                billing.uber.add(self._platform_result(quelle, "Uber"))
+            elif db_name == "Bolt":
+                billing.bolt.add(self._platform_result(quelle, "Bolt"))
+        
+        self._billing = billing
+        return billing
+        
+    @staticmethod
+    def calculate_uber_details(result):
         return [
-            {"label": "Total", "value": f"{werte['gross_total']:.2f} €"},
-            {"label": "Anteil", "value": f"{werte['anteil']:.2f} €"},
-            {"label": "Bargeld", "value": f"{werte['cash_collected']:.2f} €"},
-            {"label": "Restbetrag", "value": f"{werte['restbetrag']:.2f} €"}
+            {"label": "Total", "value": f"{result.total:.2f} €"},
+            {"label": "Anteil", "value": f"{result.anteil:.2f} €"},
+            {"label": "Bargeld", "value": f"{result.bargeld:.2f} €"},
+            {"label": "Restbetrag", "value": f"{result.restbetrag:.2f} €"}
         ]
         
 
@@ -1159,24 +984,24 @@ class AbrechnungsSeiteQML(QObject):
         ergebnisse = []
         
         if db_name == "40100":
-            ergebnisse = self.calculate_40100_results(df, deal)
+            ergebnisse = self.calculate_40100_results(PlatformResult.from_taxi(df), deal)
         elif db_name == "Uber":
-            ergebnisse = self.calculate_uber_results(df)
+            ergebnisse = self.calculate_uber_results(self._platform_result(df, "Uber"))
         elif db_name == "Bolt":
-            ergebnisse = self.calculate_bolt_results(df)
+            ergebnisse = self.calculate_bolt_results(self._platform_result(df, "Bolt"))
             
         self._ergebnisse = ergebnisse
         self.ergebnisseChanged.emit()
         
 
         
-    def calculate_uber_results(self, df):
-        werte = self._berechne_platform_werte(df, "Uber")
+    @staticmethod
+    def calculate_uber_results(result):
         return [
             {"type": "title", "text": "Uber"},
-            {"type": "value", "label": "Total", "value": f"{werte['gross_total']:.2f} €", "hint": "/ 2"},
-            {"type": "value", "label": "Anteil", "value": f"{werte['anteil']:.2f} €", "hint": "- Auszahlung"},
-            {"type": "value", "label": "Restbetrag", "value": f"{werte['restbetrag']:.2f} €", "hint": ""}
+            {"type": "value", "label": "Total", "value": f"{result.total:.2f} €", "hint": "/ 2"},
+            {"type": "value", "label": "Anteil", "value": f"{result.anteil:.2f} €", "hint": "- Auszahlung"},
+            {"type": "value", "label": "Restbetrag", "value": f"{result.restbetrag:.2f} €", "hint": ""}
         ]
         
 
@@ -1192,10 +1017,29 @@ class AbrechnungsSeiteQML(QObject):
     def show_details(self):
         if self._current_page >= 0 and self._current_page < len(self._found_pages):
             db_name, df, deal = self._found_pages[self._current_page]
+            if isinstance(df, TaxiTotals):
+                df = self._lade_taxi_buchungen(db_name)
             if df is not None:
                 print(f"Details für {db_name}:")
                 print(df.to_string())
 
+    def _lade_taxi_buchungen(self, platform):
+        """Einzelbuchungen einer Taxi-Plattform für die Detailansicht (erst bei Bedarf)."""
+        source = self._taxi_sources.get(platform)
+        if source is None:
+            return None
+        db_path, table_name, kennzeichen_nummer = source
+        conn = None
+        try:
+            conn = connect(db_path)
+            return load_taxi_rows(conn, table_name, kennzeichen_nummer)
+        except Exception as e:
+            print(f"[INFO] Buchungen aus {platform} nicht geladen: {e}")
+            return None
+        finally:
+            if conn is not None:
+                conn.close()
+
     @Slot(result=dict)
     def get_current_selection(self):
         """Gibt die aktuelle Auswahl zurück"""
@@ -1221,492 +1065,79 @@ class AbrechnungsSeiteQML(QObject):
     @Slot()
     def update_ergebnis(self, taxi_total=None):
         """Aktualisiert das Ergebnis basierend auf aktuellen Werten und Deal-Typen"""
-        try:
-            print(f"\n📊 ERGEBNIS-BERECHNUNG STARTET:")
-            
-            # 1. Anteil berechnen (Deal-abhängig)
-            anteil = self._calculate_anteil_once()
-            
-            # 2. Income berechnen (nach Abzügen)
-            income = self._calculate_income_once(anteil)
-            
-            # 3. Finales Abrechnungsergebnis berechnen
-            abrechnungsergebnis = self._calculate_abrechnungsergebnis_once(income)
-            
-            # 4. Werte setzen
-            self._anteil = anteil
-            self._income = income
-            self._abrechnungsergebnis = abrechnungsergebnis
-            self._ergebnis = abrechnungsergebnis  # Für Kompatibilität
-            
-            # 5. Signals emittieren
-            self.anteilChanged.emit()
-            self.incomeChanged.emit()
-            self.abrechnungsergebnisChanged.emit()
-            self.ergebnisChanged.emit()
-            
-            print(f"\n✅ ERGEBNIS-BERECHNUNG ABGESCHLOSSEN:")
-            print(f"   📊 Anteil: {anteil:.2f}€")
-            print(f"   💰 Income: {income:.2f}€")
-            print(f"   📈 Abrechnungsergebnis: {abrechnungsergebnis:.2f}€\n")
-            
-        except Exception as e:
-            print(f"❌ Fehler bei Ergebnis-Berechnung: {e}")
-            # Fallback: Setze alle Werte auf 0
-            self._anteil = 0.0
-            self._income = 0.0
-            self._abrechnungsergebnis = 0.0
-            self._ergebnis = 0.0
-            self.anteilChanged.emit()
-            self.incomeChanged.emit()
-            self.abrechnungsergebnisChanged.emit()
-            self.ergebnisChanged.emit()
+        self._neu_berechnen()
+        print(f"✅ ERGEBNIS (Deal: {getattr(self, '_deal', '%')}): Anteil {self._anteil:.2f}€, "
+              f"Income {self._income:.2f}€, Abrechnungsergebnis {self._abrechnungsergebnis:.2f}€")
 
-    def _calculate_overlay_income(self):
-        """Berechnet das Overlay-Income basierend auf den aktuellen Faktoren (P-Deal und C-Deal Logik)"""
-        try:
-            print(f"   📋 OVERLAY-INCOME BERECHNUNG:")
-            
-            # Faktoren aus den aktuellen Werten holen
-            taxi_faktor = getattr(self, '_taxi_faktor', 0.0)
-            uber_faktor = getattr(self, '_uber_faktor', 0.0)
-            bolt_faktor = getattr(self, '_bolt_faktor', 0.0)
-            einsteiger_faktor = getattr(self, '_einsteiger_faktor', 0.0)
-            tank_faktor = getattr(self, '_tank_faktor', 0.0)
-            garage_faktor = getattr(self, '_garage_faktor', 0.0)
-            
-            print(f"      Faktoren: Taxi={taxi_faktor:.2f}, Uber={uber_faktor:.2f}, Bolt={bolt_faktor:.2f}")
-            print(f"      Einsteiger={einsteiger_faktor:.2f}, Tank={tank_faktor:.2f}, Garage={garage_faktor:.2f}")
-            
-            # Prüfe, ob es sich um einen P-Deal handelt (mindestens ein Faktor ist 0)
-            has_any_p_deal = (taxi_faktor == 0.0 or uber_faktor == 0.0 or
-                             bolt_faktor == 0.0 or einsteiger_faktor == 0.0)
-            
-            if has_any_p_deal:
-                print(f"      P-Deal erkannt - verwende Pauschale + Bonus-Logik")
-                # P-Deal Logik: Pauschale + Bonus bei Überschreitung der Umsatzgrenze
-                result = getattr(self, '_pauschale', 0.0)
-                
-                total_umsatz = getattr(self, '_headcard_umsatz', 0.0)
-                umsatzgrenze = getattr(self, '_umsatzgrenze', 0.0)
-                
-                if total_umsatz > umsatzgrenze:
-                    bonus = (total_umsatz - umsatzgrenze) * 0.1
-                    result += bonus
-                    print(f"      Pauschale: {getattr(self, '_pauschale', 0.0):.2f}€")
-                    print(f"      Bonus: {bonus:.2f}€ (10% von Überschuss)")
-                else:
-                    print(f"      Pauschale: {result:.2f}€ (kein Bonus)")
-                
-                return result
-            else:
-                print(f"      C-Deal erkannt - verwende Faktor-basierte Berechnung")
-                # C-Deal Logik: Faktor-basierte Berechnung
-                result = 0.0
-                
-                # Plattform-Umsätze mit Faktoren
-                taxi_umsatz = self._get_platform_umsatz('Taxi')
-                uber_umsatz = self._get_platform_umsatz('Uber')
-                bolt_umsatz = self._get_platform_umsatz('Bolt')
-                
-                result += taxi_umsatz * taxi_faktor
-                result += uber_umsatz * uber_faktor
-                result += bolt_umsatz * bolt_faktor
-                
-                # Einsteiger
-                einsteiger_input = float(self._input_einsteiger) if hasattr(self, '_input_einsteiger') and self._input_einsteiger else 0.0
-                result += einsteiger_input * einsteiger_faktor
-                
-                # Tank-Abzug
-                tank_input = float(self._input_gas) if hasattr(self, '_input_gas') and self._input_gas else 0.0
-                result -= tank_input * tank_faktor
-                
-                # Garage-Abzug
-                if hasattr(self, '_monthly_garage') and self._monthly_garage > 0:
-                    daily_garage = self._calculate_daily_garage_cost()
-                    result -= daily_garage * garage_faktor
-                
-                print(f"      C-Deal Ergebnis: {result:.2f}€")
-                return result
-            
-        except Exception as e:
-            print(f"      ❌ Fehler bei _calculate_overlay_income: {e}")
-            return 0.0
+    def _billing_inputs(self):
+        """Aktuelle Eingaben der Abrechnungsformeln (siehe billing_graph.BILLING_INPUTS)"""
+        return {
+            "deal": getattr(self, '_deal', '%'),
+            "pauschale": float(getattr(self, '_pauschale', 0.0) or 0.0),
+            "umsatzgrenze": float(getattr(self, '_umsatzgrenze', 0.0) or 0.0),
+            "gesamt_umsatz": float(self._headcard_umsatz),
+            "taxi_umsatz": self._billing.umsatz("Taxi"),
+            "uber_umsatz": self._billing.umsatz("Uber"),
+            "bolt_umsatz": self._billing.umsatz("Bolt"),
+            "einsteiger": self._billing.einsteiger,
+            "tank": parse_betrag(self._input_gas),
+            "taxi_faktor": float(getattr(self, '_taxi_faktor', 0.0)),
+            "uber_faktor": float(getattr(self, '_uber_faktor', 0.0)),
+            "bolt_faktor": float(getattr(self, '_bolt_faktor', 0.0)),
+            "einsteiger_faktor": float(self._einsteiger_faktor),
+            "tank_faktor": float(self._tank_faktor),
+            "garage_faktor": float(self._garage_faktor),
+            "monthly_garage": float(self._monthly_garage or 0.0),
+            "kw": self._current_kw or "",
+            "expenses": self.total_expenses,
+            "credit_card": float(getattr(self, '_headcard_credit_card', 0.0)),
+        }
 
-    def _calculate_anteil_once(self) -> float:
-        """OPTIMIERT: Berechnet den Anteil einmalig (Deal-abhängig)"""
-        try:
-            print(f"   📋 ANTEIL-BERECHNUNG (Deal: {self._deal}):")
-            
-            if self._deal == "P":
-                result = self._calculate_p_deal_anteil()
-            elif self._deal == "%":
-                result = self._calculate_percent_deal_anteil()
-            elif self._deal == "C":
-                result = self._calculate_custom_deal_anteil()
-            else:
-                result = self._calculate_default_anteil()
-            
-            print(f"   ✅ ANTEIL: {result:.2f}€\n")
-            return result
-            
-        except Exception as e:
-            print(f"Fehler bei Anteil-Berechnung: {e}")
-            return 0.0
-    
-    def _calculate_income_once(self, anteil: float) -> float:
-        """OPTIMIERT: Berechnet das Income einmalig (nach Abzügen)"""
-        try:
-            print(f"   📋 INCOME-BERECHNUNG:")
-            
-            # Start mit dem Anteil
-            income = anteil
-            
-            # Tank-Abzug (Deal-abhängig)
-            tank_abzug = self._calculate_tank_abzug()
-            income -= tank_abzug
-            print(f"      Tank-Abzug: {tank_abzug:.2f}€")
-            
-            # Garage-Abzug
-            garage_abzug = self._calculate_garage_abzug()
-            income -= garage_abzug
-            print(f"      Garage-Abzug: {garage_abzug:.2f}€")
-            
-            # Expenses vom Income abziehen (indirekt zum Ergebnis hinzufügen)
-            expenses_total = self._calculate_total_expenses()
-            income -= expenses_total
-            print(f"      Expenses-Abzug: -{expenses_total:.2f}€")
-            
-            print(f"   ✅ INCOME: {income:.2f}€\n")
-            return income
-            
-        except Exception as e:
-            print(f"Fehler bei Income-Berechnung: {e}")
-            return 0.0
-    
-    def _calculate_abrechnungsergebnis_once(self, income: float) -> float:
-        """OPTIMIERT: Berechnet das finale Abrechnungsergebnis einmalig (Bankomat - Income)"""
-        try:
-            print(f"   📋 ABRECHNUNGSERGEBNIS-BERECHNUNG:")
-            
-            credit_card = getattr(self, '_headcard_credit_card', 0.0)
-            
-            # Finale Berechnung: Credit Card - Income
-            # Expenses sind bereits im Income berücksichtigt (abgezogen)
-            result = credit_card - income
-            
-            print(f"      Credit Card: {credit_card:.2f}€")
-            print(f"      Income: {income:.2f}€ (bereits mit Expenses-Abzug)")
-            print(f"   ✅ ABRECHNUNGSERGEBNIS: {result:.2f}€\n")
-            return result
-            
-        except Exception as e:
-            print(f"Fehler bei Abrechnungsergebnis-Berechnung: {e}")
-            return 0.0
-    
-    def _calculate_p_deal_anteil(self) -> float:
-        """Berechnet P-Deal Anteil"""
-        try:
-            print(f"   📋 P-DEAL ANTEIL:")
-            
-            # Pauschale
-            result = self._pauschale
-            print(f"      Pauschale: {result:.2f}€")
-            
-            # Umsatzgrenze prüfen
-            total_umsatz = self._headcard_umsatz
-            print(f"      Gesamtumsatz: {total_umsatz:.2f}€")
-            print(f"      Umsatzgrenze: {self._umsatzgrenze:.2f}€")
-            
-            if total_umsatz > self._umsatzgrenze:
-                bonus = (total_umsatz - self._umsatzgrenze) * 0.1
-                result += bonus
-                print(f"      Bonus: {bonus:.2f}€ (10% von Überschuss)")
-            else:
-                print(f"      Kein Bonus (Umsatz unter Grenze)")
-            
-            print(f"      Berechneter Anteil: {result:.2f}€")
-            return result
-        except Exception as e:
-            print(f"Fehler bei P-Deal-Berechnung: {e}")
-            print(f"      ❌ Fehler: {e}")
-            return 0.0
-    
-    def _calculate_percent_deal_anteil(self) -> float:
-        """Berechnet Prozent-Deal Anteil"""
-        try:
-            print(f"   📋 %-DEAL ANTEIL:")
-            
-            # Umsätze aller Plattformen
-            taxi_umsatz = self._get_platform_umsatz('Taxi')  # Nur einmal Taxi holen
-            uber_umsatz = self._get_platform_umsatz('Uber')
-            bolt_umsatz = self._get_platform_umsatz('Bolt')
-            
-            print(f"      Taxi-Umsatz: {taxi_umsatz:.2f}€")
-            print(f"      Uber-Umsatz: {uber_umsatz:.2f}€")
-            print(f"      Bolt-Umsatz: {bolt_umsatz:.2f}€")
-            
-            # Gesamtumsatz
-            total_umsatz = taxi_umsatz + uber_umsatz + bolt_umsatz
-            print(f"      Gesamtumsatz: {total_umsatz:.2f}€")
-            
-            # 50% Anteil
-            anteil_50 = total_umsatz * 0.5
-            print(f"      50% Anteil: {anteil_50:.2f}€")
-            
-            # Einsteiger-Plus (50%)
-            einsteiger_input = float(getattr(self, '_input_einsteiger', 0.0)) if getattr(self, '_input_einsteiger', 0.0) else 0.0
-            einsteiger_plus = einsteiger_input * 0.5
-            print(f"      Einsteiger-Plus (50%): {einsteiger_input:.2f}€ × 0.5 = {einsteiger_plus:.2f}€")
-            
-            # Tank ist KEINE Einkommensquelle - wird nur als Ausgabe behandelt
-            print(f"      Tank: Wird nur als Ausgabe in der Income-Berechnung behandelt")
-            
-            # Finaler Anteil (ohne Tank)
-            result = anteil_50 + einsteiger_plus
-            print(f"      Berechneter Anteil: {result:.2f}€")
-            
-            return result
-            
-        except Exception as e:
-            print(f"Fehler bei %-Deal-Berechnung: {e}")
-            print(f"      ❌ Fehler: {e}")
-            return 0.0
-    
-    def _calculate_custom_deal_anteil(self) -> float:
-        """Berechnet Custom-Deal Anteil"""
-        try:
-            print(f"   📋 CUSTOM-DEAL ANTEIL:")
-            
-            # Faktor-basierte Berechnung mit Plattform-spezifischen Umsätzen
-            result = 0.0
-            
-            # Plattform-spezifische Umsätze extrahieren
-            taxi_umsatz = self._get_platform_umsatz('Taxi')  # Nur einmal Taxi holen
-            uber_umsatz = self._get_platform_umsatz('Uber')
-            bolt_umsatz = self._get_platform_umsatz('Bolt')
-            
-            print(f"      Plattform-Umsätze:")
-            print(f"         Taxi: {taxi_umsatz:.2f}€ × {self._taxi_faktor:.2f} = {taxi_umsatz * self._taxi_faktor:.2f}€")
-            print(f"         Uber: {uber_umsatz:.2f}€ × {self._uber_faktor:.2f} = {uber_umsatz * self._uber_faktor:.2f}€")
-            print(f"         Bolt: {bolt_umsatz:.2f}€ × {self._bolt_faktor:.2f} = {bolt_umsatz * self._bolt_faktor:.2f}€")
-            
-            # Plattform-Faktoren mit spezifischen Umsätzen
-            result += taxi_umsatz * self._taxi_faktor
-            result += uber_umsatz * self._uber_faktor
-            result += bolt_umsatz * self._bolt_faktor
-            
-            print(f"      Zwischensumme (Plattformen): {result:.2f}€")
-            
-            # Einsteiger
-            einsteiger_input = float(getattr(self, '_input_einsteiger', 0.0)) if getattr(self, '_input_einsteiger', 0.0) else 0.0
-            einsteiger_anteil = einsteiger_input * self._einsteiger_faktor
-            result += einsteiger_anteil
-            print(f"      Einsteiger: {einsteiger_input:.2f}€ × {self._einsteiger_faktor:.2f} = {einsteiger_anteil:.2f}€")
-            
-            # Tank-Abzug (faktorbasiert)
-            tank_input = float(getattr(self, '_input_gas', 0.0)) if getattr(self, '_input_gas', 0.0) else 0.0
-            tank_abzug = tank_input * self._tank_faktor
-            result -= tank_abzug
-            print(f"      Tank-Abzug: {tank_input:.2f}€ × {self._tank_faktor:.2f} = {tank_abzug:.2f}€")
-            
-            # Garage-Abzug mit korrekter Berechnung
-            if hasattr(self, '_monthly_garage') and self._monthly_garage > 0:
-                daily_garage = self._calculate_daily_garage_cost()
-                garage_abzug = daily_garage * self._garage_faktor
-                result -= garage_abzug
-                print(f"      Garage-Abzug: {daily_garage:.2f}€ × {self._garage_faktor:.2f} = {garage_abzug:.2f}€")
-            else:
-                print(f"      Garage-Abzug: Keine Garage-Kosten")
-            
-            print(f"      Berechneter Anteil: {result:.2f}€")
-            
-            return result
-        except Exception as e:
-            print(f"Fehler bei Custom-Deal-Berechnung: {e}")
-            print(f"      ❌ Fehler: {e}")
-            return 0.0
-    
-    def _calculate_default_anteil(self) -> float:
-        """Berechnet Standard-Anteil"""
-        try:
-            print(f"   📋 DEFAULT-DEAL ANTEIL:")
-            result = self._headcard_umsatz * 0.5
-            print(f"      Gesamtumsatz: {self._headcard_umsatz:.2f}€")
-            print(f"      50% Standard-Anteil: {result:.2f}€")
-            return result
-        except Exception as e:
-            print(f"Fehler bei Standard-Berechnung: {e}")
-            print(f"      ❌ Fehler: {e}")
-            return 0.0
-    
-    def _calculate_tank_abzug(self) -> float:
-        """Berechnet Tank-Abzug (Deal-abhängig)"""
-        try:
-            tank_input = float(getattr(self, '_input_gas', 0.0)) if getattr(self, '_input_gas', 0.0) else 0.0
-            
-            if self._deal == "P":
-                # Bei P-Deals: Kein Tank-Abzug
-                return 0.0
-            elif self._deal == "%":
-                # Bei %-Deals: 50% Tank-Abzug
-                return tank_input * 0.5
-            elif self._deal == "C":
-                # Bei C-Deals: Tank wird bereits im Anteil abgezogen
-                return 0.0
-            else:
-                # Fallback: Kein Abzug
-                return 0.0
-                
-        except Exception as e:
-            print(f"Fehler bei Tank-Abzug-Berechnung: {e}")
-            return 0.0
-    
-    def _calculate_garage_abzug(self) -> float:
-        """Berechnet Garage-Abzug"""
-        try:
-            if hasattr(self, '_monthly_garage') and self._monthly_garage > 0:
-                daily_garage = self._calculate_daily_garage_cost()
-                garage_faktor = getattr(self, '_garage_faktor', 0.5)
-                garage_abzug = daily_garage * garage_faktor
-                print(f"Garage-Abzug berechnet: {daily_garage:.2f}€ × {garage_faktor} = {garage_abzug:.2f}€")
-                return garage_abzug
-            else:
-                print("Garage-Abzug: Keine monatlichen Garage-Kosten konfiguriert")
-                return 0.0
-        except Exception as e:
-            print(f"Fehler bei Garage-Abzug-Berechnung: {e}")
-            return 0.0
-            
-    def _calculate_daily_garage_cost(self) -> float:
-        """OPTIMIERT: Berechnet die täglichen Garage-Kosten mit Caching"""
-        try:
-            if not hasattr(self, '_monthly_garage') or self._monthly_garage <= 0:
-                return 0.0
-            
-            # OPTIMIERT: Cache für KW-spezifische Garage-Kosten
-            kw = getattr(self, '_current_kw', "") if hasattr(self, '_current_kw') else ""
-            if not kw:
-                return 0.0
-            
-            cache_key = f"garage_{kw}"
-            if hasattr(self, '_garage_cache') and cache_key in self._garage_cache:
-                cached_value = self._garage_cache[cache_key]
-                print(f"Garage-Cache-Hit für KW{kw}: {cached_value:.2f}€")
-                return cached_value
-            
-            # Berechnung nur einmal durchführen
-            result = self._calculate_garage_cost_impl(kw)
-            
-            # Cache initialisieren falls nicht vorhanden
-            if not hasattr(self, '_garage_cache'):
-                self._garage_cache = {}
-            
-            self._garage_cache[cache_key] = result
-            print(f"Garage-Cache-Update für KW{kw}: {result:.2f}€")
-            return result
-                
-        except Exception as e:
-            print(f"Fehler bei Garage-Berechnung: {e}")
-            return 0.0
-            
-    def _calculate_garage_cost_impl(self, kw: str) -> float:
-        """INTERNE IMPLEMENTATION: Berechnet die täglichen Garage-Kosten"""
-        try:
-            # Jahr und Monat aus KW berechnen
-            jahr = datetime.now().year
-            kw_int = int(kw.replace("KW", "")) if kw else None
-            if kw_int is None:
-                return 0.0
-            
-            # Ersten Tag der KW berechnen
-            erster_tag_kw = datetime.strptime(f'{jahr}-W{kw_int}-1', "%Y-W%W-%w")
-            monat = erster_tag_kw.month
-            
-            # Anzahl Montage im Monat berechnen
-            cal = calendar.Calendar(firstweekday=0)
-            montage = [d for d in cal.itermonthdates(jahr, monat) if d.weekday() == 0 and d.month == monat]
-            anzahl_montage = len(montage)
-            
-            if anzahl_montage > 0:
-                # Tägliche Garage-Kosten = Monatliche Kosten ÷ Anzahl Montage
-                daily_garage = self._monthly_garage / anzahl_montage
-                print(f"Garage-Berechnung: Monatlich={self._monthly_garage}€, Montage={anzahl_montage}, Täglich={daily_garage:.2f}€")
-                return daily_garage
-            else:
-                print(f"Keine Montage im Monat {monat} gefunden")
-                return 0.0
-                
-        except Exception as e:
-            print(f"Fehler bei Garage-Berechnung-Impl: {e}")
-            return 0.0
-    
-    def _calculate_total_expenses(self) -> float:
-        """OPTIMIERT: Berechnet Gesamt-Expenses mit Caching"""
+    def _neu_berechnen(self, *signale):
+        """Rechnet nur die betroffenen Formeln neu und meldet geänderte Properties einmal pro Event-Loop-Durchlauf.
+
+        signale: zusätzlich zu meldende Signale (Namen), z.B. 'ergebnisChanged' für die Faktor-Properties.
+        """
         try:
-            # OPTIMIERT: Verwende die gecachte Property
-            return self.total_expenses
-            
+            changed = self._recalc.set_inputs(self._billing_inputs())
+            self._anteil = self._recalc["anteil"]
+            self._income = self._recalc["income"]
+            self._abrechnungsergebnis = self._recalc["abrechnungsergebnis"]
         except Exception as e:
-            print(f"Fehler bei Expenses-Berechnung: {e}")
-            return 0.0
+            print(f"❌ Fehler bei Ergebnis-Berechnung: {e}")
+            # Fallback: Setze alle Werte auf 0 und baue den Graphen neu auf
+            self._recalc = build_billing_graph()
+            self._anteil = self._income = self._abrechnungsergebnis = 0.0
+            changed = {"anteil", "income", "abrechnungsergebnis"}
+        self._ergebnis = self._abrechnungsergebnis  # Für Kompatibilität
+
+        signale = list(signale)
+        if "anteil" in changed:
+            signale.append("anteilChanged")
+        if "income" in changed:
+            signale.append("incomeChanged")
+        if "abrechnungsergebnis" in changed:
+            signale += ["abrechnungsergebnisChanged", "ergebnisChanged"]
+        self._melde_spaeter(*signale)
+
+    def _melde_spaeter(self, *signale):
+        """Sammelt Signale und emittiert jedes einmal im nächsten Event-Loop-Durchlauf"""
+        for name in signale:
+            if name not in self._pending_signals:
+                self._pending_signals.append(name)
+        if self._pending_signals and not self._signal_flush_geplant:
+            self._signal_flush_geplant = True
+            QTimer.singleShot(0, self._melde_gesammelte_signale)
+
+    def _melde_gesammelte_signale(self):
+        signale, self._pending_signals = self._pending_signals, []
+        self._signal_flush_geplant = False
+        for name in signale:
+            getattr(self, name).emit()
 
     def _get_platform_umsatz(self, platform):
-        """Holt den Umsatz für eine bestimmte Plattform"""
-        try:
-            # Debug-Ausgaben nur bei Bedarf
-            if hasattr(self, '_debug_mode') and self._debug_mode:
-                print(f"DEBUG: _get_platform_umsatz aufgerufen für Plattform: {platform}")
-            
-            if platform == 'Einsteiger':
-                einsteiger_value = float(self._input_einsteiger) if hasattr(self, '_input_einsteiger') and self._input_einsteiger else 0.0
-                return einsteiger_value
-            
-            # Aus den Ergebnissen holen
-            if hasattr(self, '_ergebnisse') and self._ergebnisse:
-                for ergebnis in self._ergebnisse:
-                    # Taxi/40100/31300 kombinieren für "Taxi"
-                    if (ergebnis.get('label') == platform or 
-                        (platform in ['40100', '31300', 'Taxi'] and ergebnis.get('label') == 'Taxi')):
-                        
-                        details = ergebnis.get('details', [])
-                        for detail in details:
-                            if platform in ['Taxi', '40100', '31300'] and detail.get('label') == 'Real':
-                                value_str = detail.get('value', '0').replace('€', '').replace(' ', '').strip()
-                                result = float(value_str) if value_str else 0.0
-                                return result
-                            elif platform in ['Uber', 'Bolt'] and detail.get('label') == 'Total':
-                                value_str = detail.get('value', '0').replace('€', '').replace(' ', '').strip()
-                                result = float(value_str) if value_str else 0.0
-                                return result
-                            elif platform in ['Uber', 'Bolt'] and detail.get('label') == 'Echter Umsatz':
-                                value_str = detail.get('value', '0').replace('€', '').replace(' ', '').strip()
-                                result = float(value_str) if value_str else 0.0
-                                return result
-            
-            # Fallback: Aus HeadCard-Werten holen (für den Fall, dass _ergebnisse noch nicht aktualisiert ist)
-            if platform == 'Taxi':
-                # KORRIGIERT: Taxi-Umsatz sollte nur 40100 + 31300 sein, nicht der gesamte HeadCard-Umsatz
-                # Verwende die separaten Taxi-Werte aus der show_overview_page Funktion
-                taxi_total = getattr(self, '_taxi_total', 0.0)  # Wird in show_overview_page gesetzt
-                if taxi_total > 0:
-                    return taxi_total
-                else:
-                    # Fallback: Berechne Taxi-Umsatz aus den separaten Werten
-                    sum_40100 = getattr(self, '_sum_40100', 0.0)
-                    sum_31300 = getattr(self, '_sum_31300', 0.0)
-                    return sum_40100 + sum_31300
-            elif platform == 'Uber':
-                return getattr(self, '_sum_uber', 0.0)
-            elif platform == 'Bolt':
-                return getattr(self, '_sum_bolt', 0.0)
-            
-            return 0.0
-            
-        except Exception as e:
-            if hasattr(self, '_debug_mode') and self._debug_mode:
-                print(f"DEBUG: Fehler bei _get_platform_umsatz für {platform}: {e}")
-            return 0.0
+        """Umsatz einer Plattform aus dem Zahlenmodell ('Taxi' = 40100 + 31300)"""
+        return self._billing.umsatz(platform)
 
     def show_duplicate_comparison_dialog(self, existing_entry, new_entry, fahrzeug, kw, fahrer, deal):
         """Zeigt einen Dialog zur Auswahl zwischen bestehendem und neuem Eintrag"""
@@ -1889,10 +1320,11 @@ class AbrechnungsSeiteQML(QObject):
 
     def _handle_duplicate_choice(self, dialog, choice, existing_entry, new_entry, fahrzeug):
         """Behandelt die Benutzerauswahl bei Duplikaten"""
+        conn = None
         try:
             import sqlite3
             db_path = os.path.join("SQL", "revenue.db")
-            conn = sqlite3.connect(db_path)
+            conn = connect(db_path)
             cursor = conn.cursor()
             
             if choice == "replace":
@@ -1918,18 +1350,21 @@ class AbrechnungsSeiteQML(QObject):
                 print(f"Bestehender Eintrag beibehalten für {existing_entry[3]} - KW {existing_entry[1]}")
             
             conn.commit()
-            conn.close()
             dialog.accept()
             
         except Exception as e:
             print(f"Fehler beim Verarbeiten der Duplikat-Auswahl: {e}")
             dialog.reject()
+        finally:
+            if conn:
+                conn.close()
 
     def _replace_expenses(self, fahrzeug, cw, driver):
         """Ersetzt Expenses für eine bestimmte KW"""
+        conn_exp = None
         try:
             db_path_exp = os.path.join("SQL", "running_costs.db")
-            conn_exp = sqlite3.connect(db_path_exp)
+            conn_exp = connect(db_path_exp)
             cursor_exp = conn_exp.cursor()
             
             # Erst prüfen, wie viele alte Expenses existieren
@@ -1973,18 +1408,20 @@ class AbrechnungsSeiteQML(QObject):
             print(f"Neue Expenses eingefügt: {new_count}")
             
             conn_exp.commit()
-            conn_exp.close()
             
         except Exception as e:
             print(f"Fehler beim Ersetzen der Expenses: {e}")
             import traceback
             traceback.print_exc()
+        finally:
+            if conn_exp:
+                conn_exp.close()
 
     def _get_expenses_for_week(self, fahrzeug, cw):
         """Holt alle Expenses für eine bestimmte KW"""
         try:
             db_path_exp = os.path.join("SQL", "running_costs.db")
-            conn_exp = sqlite3.connect(db_path_exp)
+            conn_exp = connect(db_path_exp)
             cursor_exp = conn_exp.cursor()
             
             cursor_exp.execute(f"SELECT * FROM '{fahrzeug}' WHERE cw = ? ORDER BY category, amount", (cw,))
@@ -1998,23 +1435,28 @@ class AbrechnungsSeiteQML(QObject):
 
     def _clear_expenses_for_week(self, fahrzeug, cw):
         """Löscht alle Expenses für eine bestimmte KW"""
+        conn_exp = None
         try:
             db_path_exp = os.path.join("SQL", "running_costs.db")
-            conn_exp = sqlite3.connect(db_path_exp)
+            conn_exp = connect(db_path_exp)
             cursor_exp = conn_exp.cursor()
             
             cursor_exp.execute(f"DELETE FROM '{fahrzeug}' WHERE cw = ?", (cw,))
             conn_exp.commit()
-            conn_exp.close()
             
         except Exception as e:
             print(f"Fehler beim Löschen der Expenses: {e}")
+        finally:
+            if conn_exp:
+                conn_exp.close()
 
     @Slot()
     def speichereUmsatz(self):
         """
-        Atomare Speichermethode: Führt alle Speicheroperationen in einer Transaktion aus.
-        Bei Fehler wird alles zurückgerollt (Rollback).
+        Zweiphasige Speichermethode:
+        1. Duplikate für (Fahrzeug, KW, Fahrer) mit einem Lesezugriff prüfen.
+        2. Bei Duplikat: Entscheidung über den QML-Dialog abwarten (duplikatGefunden → loeseDuplikat).
+        3. Alles in einer kurzen Schreibtransaktion speichern, ohne offenen Dialog.
         """
         print("🔵 SPEICHEREUMSATZ GESTARTET")
         print(f"📋 _wizard_data: {self._wizard_data}")
@@ -2027,87 +1469,143 @@ class AbrechnungsSeiteQML(QObject):
 
         print(f"✅ Deal-Ergebnis berechnet: {deal_result}")
 
-        # 2. Atomare Transaktion starten
-        print("🔄 Starte atomare Transaktion...")
+        # 2. Duplikate vorab prüfen (nur lesen, keine Sperre während der Rückfrage)
+        key = self._revenue_key(deal_result)
         try:
-            # Alle Speicheroperationen in einer Transaktion
-            self._speichere_atomare_transaktion(deal_result)
-            
-            # 3. Felder und Caches leeren (nur bei Erfolg)
-            print("🧹 Leere Caches und Felder...")
-            self._expense_cache = []
-            self._custom_deal_cache = {}
-            self.inputGas = ""
-            self.inputEinsteiger = ""
-            self.inputExpense = ""
-            
-            print("✅ SPEICHEREUMSATZ ERFOLGREICH BEENDET")
-            
+            konflikte = find_revenue_conflicts([key])
         except Exception as e:
-            print(f"❌ FEHLER BEIM SPEICHERN: {e}")
-            print("🔄 Rollback: Alle Änderungen wurden zurückgerollt")
-            # Bei Fehler: Keine Felder leeren, Daten bleiben erhalten
+            print(f"❌ FEHLER BEI DER DUPLIKATPRÜFUNG: {e}")
             return
 
-    def _speichere_atomare_transaktion(self, deal_result):
-        """
-        Führt alle Speicheroperationen in einer atomaren Transaktion aus.
-        Bei Fehler wird alles zurückgerollt.
-        Verwendet separate Verbindungen für jede Datenbank um Lock-Probleme zu vermeiden.
-        """
-        import sqlite3
-        import os
-        
-        # Separate Verbindungen für jede Datenbank
-        revenue_conn = None
-        expenses_conn = None
-        deals_conn = None
-        
+        if key in konflikte:
+            print(f"⚠️ Duplikat gefunden für {deal_result['fahrer']} KW{deal_result['kw']}, warte auf Entscheidung")
+            self._pending_save = deal_result
+            self.duplikatGefunden.emit(self._duplikat_vergleich(deal_result, konflikte[key]))
+            return
+
+        self._fuehre_speicherung_aus(deal_result, "replace")
+
+    @Slot(str)
+    def loeseDuplikat(self, choice):
+        """Entscheidung aus dem Duplikat-Dialog: 'replace', 'keep_existing' oder 'cancel'."""
+        deal_result, self._pending_save = self._pending_save, None
+        if deal_result is None:
+            print("⚠️ Keine Speicherung wartet auf eine Duplikat-Entscheidung")
+            return
+        if choice not in ("replace", "keep_existing"):
+            print("❌ Speicherung abgebrochen durch Benutzer")
+            return
+        self._fuehre_speicherung_aus(deal_result, choice)
+
+    def _revenue_key(self, deal_result):
+        """(Fahrzeug, KW, Fahrer) des Revenue-Eintrags."""
+        kw = int(deal_result["kw"]) if deal_result["kw"] else None
+        return (deal_result["fahrzeug"], kw, deal_result["fahrer"])
+
+    def _neue_ausgaben(self):
+        """Ausgaben des neuen Eintrags (Cache + Gas) für den Vergleich."""
+        ausgaben = [
+            {"category": exp.get('category', 'Unbekannt'), "amount": float(exp.get('amount', 0))}
+            for exp in getattr(self, '_expense_cache', [])
+        ]
+        if getattr(self, '_input_gas', None):
+            try:
+                # Komma durch Punkt ersetzen für korrekte Float-Konvertierung
+                gas_amount = float(str(self._input_gas).replace(',', '.'))
+                if gas_amount > 0:
+                    ausgaben.append({"category": "Gas", "amount": gas_amount})
+            except (ValueError, TypeError) as e:
+                print(f"DEBUG: Fehler bei Gas-Konvertierung: {e}, Wert: {self._input_gas}")
+        return ausgaben
+
+    @staticmethod
+    def _eintrag_text(deal, total, income, timestamp, ausgaben):
+        text = f"""💰 Deal: {deal}
+💵 Total: {total:.2f} €
+💸 Income: {income:.2f} €
+⏰ Timestamp: {timestamp}"""
+        if ausgaben:
+            text += "\n\n📋 Ausgaben:\n" + "\n".join(f"  • {exp['category']}: {exp['amount']:.2f} €" for exp in ausgaben)
+        return text
+
+    def _duplikat_vergleich(self, deal_result, bestehend):
+        """Daten für den QML-Vergleichsdialog (bestehender vs. neuer Eintrag)."""
+        return {
+            "fahrer": deal_result["fahrer"],
+            "fahrzeug": deal_result["fahrzeug"],
+            "kw": str(deal_result["kw"]),
+            "bestehend": self._eintrag_text(bestehend["deal"], bestehend["total"], bestehend["income"],
+                                            bestehend["timestamp"], bestehend["expenses"]),
+            "neu": self._eintrag_text(deal_result["deal"], float(deal_result["total"]), float(deal_result["income"]),
+                                      deal_result["timestamp"], self._neue_ausgaben()),
+        }
+
+    def _fuehre_speicherung_aus(self, deal_result, entscheidung):
+        """Schreibphase: eine Transaktion; Felder und Caches werden nur bei Erfolg geleert."""
+        print("🔄 Starte atomare Transaktion...")
         try:
-            # 1. Revenue-Eintrag speichern
-            print("💾 Speichere Revenue-Eintrag...")
-            revenue_conn = sqlite3.connect(os.path.join("SQL", "revenue.db"))
-            self._speichere_revenue_entry_atomare(deal_result, revenue_conn)
-            revenue_conn.commit()
-            revenue_conn.close()
-            revenue_conn = None
-            
-            # 2. Expenses speichern
-            print("💾 Speichere Expenses...")
-            expenses_conn = sqlite3.connect(os.path.join("SQL", "running_costs.db"))
-            self._speichere_expenses_atomare(deal_result, expenses_conn)
-            expenses_conn.commit()
-            expenses_conn.close()
-            expenses_conn = None
-            
-            # 3. Pauschale und Umsatzgrenze speichern
-            print("💾 Prüfe Pauschale und Umsatzgrenze für Speicherung...")
-            deals_conn = sqlite3.connect(os.path.join("SQL", "database.db"))
-            self._speichere_pauschale_umsatzgrenze_atomare(deal_result, deals_conn)
-            
-            # 4. Letzten Speicherstand speichern
-            print("💾 Speichere letzten Speicherstand in custom_deal_config...")
-            self._speichere_letzten_speicherstand_atomare(deal_result, deals_conn)
-            
-            # 5. Deals-Datenbank committen
-            deals_conn.commit()
-            deals_conn.close()
-            deals_conn = None
-            
-            print("✅ Alle Transaktionen erfolgreich committed")
+            self._speichere_atomare_transaktion(deal_result, entscheidung)
+            
+            # Felder und Caches leeren (nur bei Erfolg)
+            print("🧹 Leere Caches und Felder...")
+            self._expense_cache = []
+            self._custom_deal_cache = {}
+            self.inputGas = ""
+            self.inputEinsteiger = ""
+            self.inputExpense = ""
+            
+            print("✅ SPEICHEREUMSATZ ERFOLGREICH BEENDET")
             
+        except Exception as e:
+            print(f"❌ FEHLER BEIM SPEICHERN: {e}")
+            print("🔄 Rollback: Alle Änderungen wurden zurückgerollt")
+            # Bei Fehler: Keine Felder leeren, Daten bleiben erhalten
+
+    def _speichere_atomare_transaktion(self, deal_result, entscheidung="replace"):
+        """
+        Führt alle Speicheroperationen in einer atomaren Transaktion aus.
+        revenue.db und running_costs.db sind per ATTACH an database.db eingebunden,
+        damit genügt eine Verbindung mit einem einzigen Commit; bei Fehler wird alles zurückgerollt.
+        Die Wochensumme (weekly_summary) wird in derselben Transaktion nachgeführt.
+        entscheidung ist die vorab eingeholte Duplikat-Entscheidung ('replace' oder 'keep_existing').
+        """
+        try:
+            with billing_transaction() as conn:
+                # 1. Revenue-Eintrag speichern
+                print("💾 Speichere Revenue-Eintrag...")
+                self._speichere_revenue_entry_atomare(deal_result, conn, REVENUE_SCHEMA, entscheidung)
+
+                # 2. Expenses speichern
+                print("💾 Speichere Expenses...")
+                self._speichere_expenses_atomare(deal_result, conn, RUNNING_COSTS_SCHEMA)
+
+                # 3. Pauschale und Umsatzgrenze speichern
+                print("💾 Prüfe Pauschale und Umsatzgrenze für Speicherung...")
+                self._speichere_pauschale_umsatzgrenze_atomare(deal_result, conn)
+
+                # 4. Letzten Speicherstand speichern
+                print("💾 Speichere letzten Speicherstand in custom_deal_config...")
+                self._speichere_letzten_speicherstand_atomare(deal_result, conn)
+
+                # 5. Wochensumme für Fahrzeug/KW auf derselben Verbindung nachführen
+                if deal_result.get("fahrzeug") and deal_result.get("kw"):
+                    refresh_billing_week(conn, deal_result["fahrzeug"], int(deal_result["kw"]),
+                                         REVENUE_SCHEMA, RUNNING_COSTS_SCHEMA)
+
+            print("✅ Alle Änderungen in einer Transaktion committed")
+
         except Exception as e:
             print(f"❌ Fehler in atomarer Transaktion: {e}")
-            # Rollback aller noch offenen Verbindungen
-            for conn in [revenue_conn, expenses_conn, deals_conn]:
-                if conn:
-                    try:
-                        conn.rollback()
-                        conn.close()
-                    except:
-                        pass
             raise e  # Fehler weiterwerfen
 
+    def _aktualisiere_wochensumme(self, fahrzeug, kw):
+        """Rechnet weekly_summary für Fahrzeug/KW nach dem Speichern neu."""
+        try:
+            if fahrzeug and kw:
+                update_weekly_summary(fahrzeug, int(kw))
+        except Exception as e:
+            print(f"⚠️ Wochensumme für {fahrzeug} KW {kw} nicht aktualisiert: {e}")
+
     def _berechne_deal_result(self):
         """
         Deal-spezifische Logik: Gibt ein dict mit allen für die Speicherung nötigen Werten zurück.
@@ -2117,40 +1615,45 @@ class AbrechnungsSeiteQML(QObject):
         # Sicherstellen, dass beide Werte als Float behandelt werden
         headcard_umsatz = float(getattr(self, '_headcard_umsatz', 0.0))
         
-        # Sichere Konvertierung von input_einsteiger (kann leerer String sein)
-        input_einsteiger_raw = getattr(self, '_input_einsteiger', 0.0)
-        if input_einsteiger_raw == '' or input_einsteiger_raw is None:
-            input_einsteiger = 0.0
-        else:
-            input_einsteiger = float(input_einsteiger_raw)
-            
-        total = headcard_umsatz + input_einsteiger
+        total = headcard_umsatz + self._billing.einsteiger
         
         # Verwende bereits berechnete Werte aus update_ergebnis()
         income = getattr(self, '_income', 0.0)
         
+        # Abrechnungsjahr wird mit dem Eintrag gespeichert (nicht später aus dem Zeitstempel geraten)
+        kw = self._wizard_data.get("kw", "")
+        jahr = self._wizard_data.get("jahr") or (billing_year(int(kw)) if kw else None)
+        
         return {
             "deal": deal,
             "income": income,
             "total": total,
             "fahrer": self._wizard_data.get("fahrer", ""),
             "fahrzeug": self._wizard_data.get("fahrzeug", ""),
-            "kw": self._wizard_data.get("kw", ""),
+            "kw": kw,
+            "jahr": jahr,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
-    def _speichere_revenue_entry_atomare(self, deal_result, conn):
+    def _speichere_revenue_entry_atomare(self, deal_result, conn, schema=MAIN_SCHEMA, entscheidung="replace"):
         """
         Atomare Version: Speichert den Umsatz/Income-Eintrag in revenue.db.
-        Verwendet die übergebene Verbindung für die Transaktion.
-        Zeigt Vergleichsdialog bei Duplikaten.
+        Verwendet die übergebene Verbindung für die Transaktion; schema ist der
+        ATTACH-Alias von revenue.db. Die Duplikat-Entscheidung wurde vorher eingeholt
+        (speichereUmsatz/loeseDuplikat), hier wird nur noch geschrieben.
         """
+        if entscheidung == "keep_existing":
+            print("ℹ️ Bestehender Eintrag beibehalten")
+            return
+        
         cursor = conn.cursor()
-        table_vehicle = deal_result["fahrzeug"]
+        table_vehicle = qualified(schema, deal_result["fahrzeug"])
+        kw = int(deal_result["kw"]) if deal_result["kw"] else None
+        jahr = deal_result.get("jahr")
         
         # Tabelle erstellen falls nicht vorhanden
         cursor.execute(f"""
-            CREATE TABLE IF NOT EXISTS '{table_vehicle}' (
+            CREATE TABLE IF NOT EXISTS {table_vehicle} (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 cw INTEGER NOT NULL CHECK (cw BETWEEN 1 AND 52),
                 deal TEXT,
@@ -2158,70 +1661,30 @@ class AbrechnungsSeiteQML(QObject):
                 total DECIMAL(10,2),
                 taxed DECIMAL(10,2),
                 income DECIMAL(10,2) NOT NULL,
-                timestamp DATETIME
+                timestamp DATETIME,
+                year INTEGER
             )
         """)
+        # year-Spalte und Spiegel-Trigger in die zentrale revenue-Tabelle sicherstellen
+        prepare_vehicle_table(conn, LEDGER_REVENUE, deal_result["fahrzeug"], schema)
         
-        # Prüfe, ob bereits ein Eintrag für diese KW und Fahrer existiert
-        cursor.execute(f"""
-            SELECT * FROM '{table_vehicle}' WHERE cw = ? AND driver = ?
-        """, (
-            int(deal_result["kw"]) if deal_result["kw"] else None,
-            deal_result["fahrer"]
-        ))
-        existing_entry = cursor.fetchone()
-        
-        if existing_entry:
-            # Vergleichsdialog anzeigen
-            result = self.show_duplicate_comparison_dialog(
-                existing_entry,
-                {
-                    'cw': int(deal_result["kw"]) if deal_result["kw"] else None,
-                    'deal': deal_result["deal"],
-                    'driver': deal_result["fahrer"],
-                    'total': deal_result["total"],
-                    'income': deal_result["income"],
-                    'timestamp': deal_result["timestamp"]
-                },
-                deal_result["fahrzeug"],
-                deal_result["kw"],
-                deal_result["fahrer"],
-                deal_result["deal"]
-            )
-            
-            # Wenn Dialog abgebrochen wurde, Transaktion abbrechen
-            if result == 0:  # Dialog abgebrochen
-                print("❌ Speicherung abgebrochen durch Benutzer")
-                raise Exception("Speicherung abgebrochen durch Benutzer")
-            
-            # Wenn "Bestehenden behalten" gewählt wurde, alten Eintrag nicht löschen
-            if result == 1:  # Bestehenden behalten
-                print("ℹ️ Bestehender Eintrag beibehalten")
-                return
-            
-            # Wenn "Durch neuen ersetzen" gewählt wurde, alten Eintrag löschen
-            print("🔄 Ersetze bestehenden Eintrag durch neuen")
-        
-        # Alten Eintrag löschen falls vorhanden
+        # Alten Eintrag ersetzen falls vorhanden (gleiches Jahr bzw. Bestand ohne Jahr)
         cursor.execute(f"""
-            DELETE FROM '{table_vehicle}' WHERE cw = ? AND driver = ?
-        """, (
-            int(deal_result["kw"]) if deal_result["kw"] else None,
-            deal_result["fahrer"]
-        ))
+            DELETE FROM {table_vehicle} WHERE cw = ? AND driver = ? AND (year = ? OR year IS NULL)
+        """, (kw, deal_result["fahrer"], jahr))
         
-        # Neuen Eintrag einfügen
         cursor.execute(f"""
-            INSERT INTO '{table_vehicle}' (cw, deal, driver, total, taxed, income, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO {table_vehicle} (cw, deal, driver, total, taxed, income, timestamp, year)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, (
-            int(deal_result["kw"]) if deal_result["kw"] else None,
+            kw,
             deal_result["deal"],
             deal_result["fahrer"],
             deal_result["total"],
             deal_result["income"],  # taxed = income
             deal_result["income"],
-            deal_result["timestamp"]
+            deal_result["timestamp"],
+            jahr
         ))
         
         print(f"✅ Revenue-Eintrag atomar gespeichert: {deal_result['fahrer']} KW{deal_result['kw']}")
@@ -2238,80 +1701,83 @@ class AbrechnungsSeiteQML(QObject):
         from datetime import datetime
         db_path = os.path.join("SQL", "revenue.db")
         table_vehicle = deal_result["fahrzeug"]
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            CREATE TABLE IF NOT EXISTS '{table_vehicle}' (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                cw INTEGER NOT NULL CHECK (cw BETWEEN 1 AND 52),
-                deal TEXT,
-                driver TEXT,
-                total DECIMAL(10,2),
-                taxed DECIMAL(10,2),
-                income DECIMAL(10,2) NOT NULL,
-                timestamp DATETIME
-            )
-        """)
-        # Prüfe, ob bereits ein Eintrag für diese KW und Fahrer existiert
-        cursor.execute(f"""
-            SELECT * FROM '{table_vehicle}' WHERE cw = ? AND driver = ?
-        """, (
-            int(deal_result["kw"]) if deal_result["kw"] else None,
-            deal_result["fahrer"]
-        ))
-        existing_entry = cursor.fetchone()
-        if existing_entry:
-            # Vergleichsdialog anzeigen
-            result = self.show_duplicate_comparison_dialog(
-                existing_entry,
-                {
-                    'cw': int(deal_result["kw"]) if deal_result["kw"] else None,
-                    'deal': deal_result["deal"],
-                    'driver': deal_result["fahrer"],
-                    'total': deal_result["total"],
-                    'income': deal_result["income"],
-                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                },
-                table_vehicle,
-                deal_result["kw"],
-                deal_result["fahrer"],
-                deal_result["deal"]
-            )
-            from PySide6.QtWidgets import QDialog
-            if result != QDialog.Accepted:
-                conn.close()
-                return  # Speichern abbrechen, wenn nicht ersetzt werden soll
-            # Wenn ersetzt werden soll, alten Eintrag löschen
+        conn = connect(db_path)
+        try:
+            cursor = conn.cursor()
             cursor.execute(f"""
-                DELETE FROM '{table_vehicle}' WHERE cw = ? AND driver = ?
+                CREATE TABLE IF NOT EXISTS '{table_vehicle}' (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    cw INTEGER NOT NULL CHECK (cw BETWEEN 1 AND 52),
+                    deal TEXT,
+                    driver TEXT,
+                    total DECIMAL(10,2),
+                    taxed DECIMAL(10,2),
+                    income DECIMAL(10,2) NOT NULL,
+                    timestamp DATETIME
+                )
+            """)
+            # Prüfe, ob bereits ein Eintrag für diese KW und Fahrer existiert
+            cursor.execute(f"""
+                SELECT * FROM '{table_vehicle}' WHERE cw = ? AND driver = ?
             """, (
                 int(deal_result["kw"]) if deal_result["kw"] else None,
                 deal_result["fahrer"]
             ))
-        # Neuen Eintrag einfügen
-        cursor.execute(f"""
-            INSERT INTO '{table_vehicle}' (cw, deal, driver, total, taxed, income, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            int(deal_result["kw"]) if deal_result["kw"] else None,
-            deal_result["deal"],
-            deal_result["fahrer"],
-            deal_result["total"],
-            float(getattr(self, '_headcard_umsatz', 0.0)),  # Korrigiert: Gesamtumsatz ohne Einsteiger
-            deal_result["income"],
-            deal_result["timestamp"]
-        ))
-        conn.commit()
-        conn.close()
+            existing_entry = cursor.fetchone()
+            if existing_entry:
+                # Vergleichsdialog anzeigen
+                result = self.show_duplicate_comparison_dialog(
+                    existing_entry,
+                    {
+                        'cw': int(deal_result["kw"]) if deal_result["kw"] else None,
+                        'deal': deal_result["deal"],
+                        'driver': deal_result["fahrer"],
+                        'total': deal_result["total"],
+                        'income': deal_result["income"],
+                        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    },
+                    table_vehicle,
+                    deal_result["kw"],
+                    deal_result["fahrer"],
+                    deal_result["deal"]
+                )
+                from PySide6.QtWidgets import QDialog
+                if result != QDialog.Accepted:
+                    return  # Speichern abbrechen, wenn nicht ersetzt werden soll
+                # Wenn ersetzt werden soll, alten Eintrag löschen
+                cursor.execute(f"""
+                    DELETE FROM '{table_vehicle}' WHERE cw = ? AND driver = ?
+                """, (
+                    int(deal_result["kw"]) if deal_result["kw"] else None,
+                    deal_result["fahrer"]
+                ))
+            # Neuen Eintrag einfügen
+            cursor.execute(f"""
+                INSERT INTO '{table_vehicle}' (cw, deal, driver, total, taxed, income, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                int(deal_result["kw"]) if deal_result["kw"] else None,
+                deal_result["deal"],
+                deal_result["fahrer"],
+                deal_result["total"],
+                float(getattr(self, '_headcard_umsatz', 0.0)),  # Korrigiert: Gesamtumsatz ohne Einsteiger
+                deal_result["income"],
+                deal_result["timestamp"]
+            ))
+            conn.commit()
+        finally:
+            conn.close()
         # Deal in database.db aktualisieren
         db_path_db = os.path.join("SQL", "database.db")
-        conn_db = sqlite3.connect(db_path_db)
-        cursor_db = conn_db.cursor()
-        cursor_db.execute("""
-            UPDATE deals SET deal = ? WHERE name = ?
-        """, (deal_result["deal"], deal_result["fahrer"]))
-        conn_db.commit()
-        conn_db.close()
+        conn_db = connect(db_path_db)
+        try:
+            cursor_db = conn_db.cursor()
+            cursor_db.execute("""
+                UPDATE deals SET deal = ? WHERE name = ?
+            """, (deal_result["deal"], deal_result["fahrer"]))
+            conn_db.commit()
+        finally:
+            conn_db.close()
 
     def _speichere_pauschale_umsatzgrenze_atomare(self, deal_result, conn):
         """
@@ -2377,40 +1843,42 @@ class AbrechnungsSeiteQML(QObject):
             print(f"💾 Speichere geänderte Werte: Pauschale={aktuelle_pauschale}, Umsatzgrenze={aktuelle_umsatzgrenze}")
             
             db_path = os.path.join("SQL", "database.db")
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Prüfe, ob deals Tabelle existiert (Spalten pauschale und umsatzgrenze sind bereits vorhanden)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS deals (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE,
-                    deal TEXT,
-                    pauschale REAL DEFAULT 500.0,
-                    umsatzgrenze REAL DEFAULT 1200.0
-                )
-            """)
-            
-            # Prüfe, ob Eintrag für diesen Fahrer existiert
-            cursor.execute("SELECT * FROM deals WHERE name = ?", (fahrer,))
-            existing_entry = cursor.fetchone()
+            conn = connect(db_path)
+            try:
+                cursor = conn.cursor()
             
-            if existing_entry:
-                # Update bestehenden Eintrag
+                # Prüfe, ob deals Tabelle existiert (Spalten pauschale und umsatzgrenze sind bereits vorhanden)
                 cursor.execute("""
-                    UPDATE deals SET pauschale = ?, umsatzgrenze = ? WHERE name = ?
-                """, (aktuelle_pauschale, aktuelle_umsatzgrenze, fahrer))
-                print(f"✅ Pauschale und Umsatzgrenze für {fahrer} aktualisiert")
-            else:
-                # Erstelle neuen Eintrag
-                cursor.execute("""
-                    INSERT INTO deals (name, deal, pauschale, umsatzgrenze) 
-                    VALUES (?, ?, ?, ?)
-                """, (fahrer, deal_result["deal"], aktuelle_pauschale, aktuelle_umsatzgrenze))
-                print(f"✅ Neuer Eintrag für {fahrer} mit Pauschale und Umsatzgrenze erstellt")
+                    CREATE TABLE IF NOT EXISTS deals (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT UNIQUE,
+                        deal TEXT,
+                        pauschale REAL DEFAULT 500.0,
+                        umsatzgrenze REAL DEFAULT 1200.0
+                    )
+                """)
             
-            conn.commit()
-            conn.close()
+                # Prüfe, ob Eintrag für diesen Fahrer existiert
+                cursor.execute("SELECT * FROM deals WHERE name = ?", (fahrer,))
+                existing_entry = cursor.fetchone()
+            
+                if existing_entry:
+                    # Update bestehenden Eintrag
+                    cursor.execute("""
+                        UPDATE deals SET pauschale = ?, umsatzgrenze = ? WHERE name = ?
+                    """, (aktuelle_pauschale, aktuelle_umsatzgrenze, fahrer))
+                    print(f"✅ Pauschale und Umsatzgrenze für {fahrer} aktualisiert")
+                else:
+                    # Erstelle neuen Eintrag
+                    cursor.execute("""
+                        INSERT INTO deals (name, deal, pauschale, umsatzgrenze) 
+                        VALUES (?, ?, ?, ?)
+                    """, (fahrer, deal_result["deal"], aktuelle_pauschale, aktuelle_umsatzgrenze))
+                    print(f"✅ Neuer Eintrag für {fahrer} mit Pauschale und Umsatzgrenze erstellt")
+            
+                conn.commit()
+            finally:
+                conn.close()
         else:
             print("ℹ️ Pauschale und Umsatzgrenze unverändert, keine Speicherung nötig")
 
@@ -2481,78 +1949,80 @@ class AbrechnungsSeiteQML(QObject):
             print(f"💾 Speichere letzten Speicherstand für {fahrer}")
             
             db_path = os.path.join("SQL", "database.db")
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Prüfe, ob custom_deal_config Tabelle existiert
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS custom_deal_config (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    fahrer TEXT UNIQUE,
-                    config_json TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+            conn = connect(db_path)
+            try:
+                cursor = conn.cursor()
             
-            # Konvertiere Cache zu JSON
-            config_json = json.dumps(aktueller_cache)
+                # Prüfe, ob custom_deal_config Tabelle existiert
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS custom_deal_config (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        fahrer TEXT UNIQUE,
+                        config_json TEXT,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
             
-            # Prüfe, ob Eintrag für diesen Fahrer existiert
-            cursor.execute("SELECT * FROM custom_deal_config WHERE fahrer = ?", (fahrer,))
-            existing_entry = cursor.fetchone()
+                # Konvertiere Cache zu JSON
+                config_json = json.dumps(aktueller_cache)
             
-            if existing_entry:
-                # Update bestehenden Eintrag
-                cursor.execute("""
-                    UPDATE custom_deal_config SET config_json = ?, timestamp = CURRENT_TIMESTAMP 
-                    WHERE fahrer = ?
-                """, (config_json, fahrer))
-                print(f"✅ Letzten Speicherstand für {fahrer} aktualisiert")
-            else:
-                # Erstelle neuen Eintrag
-                cursor.execute("""
-                    INSERT INTO custom_deal_config (fahrer, config_json) 
-                    VALUES (?, ?)
-                """, (fahrer, config_json))
-                print(f"✅ Neuer Eintrag für {fahrer} mit letztem Speicherstand erstellt")
+                # Prüfe, ob Eintrag für diesen Fahrer existiert
+                cursor.execute("SELECT * FROM custom_deal_config WHERE fahrer = ?", (fahrer,))
+                existing_entry = cursor.fetchone()
             
-            conn.commit()
-            conn.close()
+                if existing_entry:
+                    # Update bestehenden Eintrag
+                    cursor.execute("""
+                        UPDATE custom_deal_config SET config_json = ?, timestamp = CURRENT_TIMESTAMP 
+                        WHERE fahrer = ?
+                    """, (config_json, fahrer))
+                    print(f"✅ Letzten Speicherstand für {fahrer} aktualisiert")
+                else:
+                    # Erstelle neuen Eintrag
+                    cursor.execute("""
+                        INSERT INTO custom_deal_config (fahrer, config_json) 
+                        VALUES (?, ?)
+                    """, (fahrer, config_json))
+                    print(f"✅ Neuer Eintrag für {fahrer} mit letztem Speicherstand erstellt")
+            
+                conn.commit()
+            finally:
+                conn.close()
         else:
             print("ℹ️ Kein Cache vorhanden, kein letzter Speicherstand zu speichern")
 
-    def _speichere_expenses_atomare(self, deal_result, conn):
+    def _speichere_expenses_atomare(self, deal_result, conn, schema=MAIN_SCHEMA):
         """
         Atomare Version: Speichert alle Expenses in running_costs.db.
-        Verwendet die übergebene Verbindung für die Transaktion.
+        Verwendet die übergebene Verbindung für die Transaktion; schema ist der
+        ATTACH-Alias von running_costs.db. Alle Zeilen gehen in einem executemany.
         """
         cursor = conn.cursor()
-        table_vehicle = deal_result["fahrzeug"]
+        table_vehicle = qualified(schema, deal_result["fahrzeug"])
         
         # Tabelle erstellen falls nicht vorhanden
         cursor.execute(f"""
-            CREATE TABLE IF NOT EXISTS '{table_vehicle}' (
+            CREATE TABLE IF NOT EXISTS {table_vehicle} (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 cw INTEGER,
                 amount DECIMAL(10,2),
                 category TEXT,
                 details TEXT,
-                timestamp DATETIME
+                timestamp DATETIME,
+                year INTEGER
             )
         """)
+        # year-Spalte und Spiegel-Trigger in die zentrale running_costs-Tabelle sicherstellen
+        prepare_vehicle_table(conn, LEDGER_RUNNING_COSTS, deal_result["fahrzeug"], schema)
         
         kw = int(deal_result["kw"]) if deal_result["kw"] else None
+        jahr = deal_result.get("jahr")
+        exp_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
         
-        # Alte Expenses für diese KW löschen
-        cursor.execute(f"DELETE FROM '{table_vehicle}' WHERE cw = ?", (kw,))
-        
-        # 1. Alle Einträge aus _expense_cache speichern
+        # 1. Alle Einträge aus _expense_cache
         for eintrag in getattr(self, '_expense_cache', []):
-            exp_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute(f"""
-                INSERT INTO '{table_vehicle}' (cw, amount, category, details, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
+            rows.append((
                 kw,
                 float(eintrag.get("amount", 0)),
                 eintrag.get("category", ""),
@@ -2560,7 +2030,7 @@ class AbrechnungsSeiteQML(QObject):
                 exp_timestamp
             ))
         
-        # 2. Parking speichern (Kategorie 'Parking', details = Faktor)
+        # 2. Parking (Kategorie 'Parking', details = Faktor)
         parking_amount = getattr(self, '_headcard_garage', 0.0)
         if parking_amount:
             # Faktor aus Overlay-Konfiguration holen, falls vorhanden
@@ -2569,19 +2039,9 @@ class AbrechnungsSeiteQML(QObject):
                 for item in self._overlay_config_cache:
                     if item.get('platform') == 'Garage':
                         parking_faktor = item.get('slider', 100) / 100.0
-            exp_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute(f"""
-                INSERT INTO '{table_vehicle}' (cw, amount, category, details, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                kw,
-                parking_amount,
-                'Parking',
-                f'Faktor: {parking_faktor:.2f}',
-                exp_timestamp
-            ))
+            rows.append((kw, parking_amount, 'Parking', f'Faktor: {parking_faktor:.2f}', exp_timestamp))
         
-        # 3. Tank speichern (Kategorie 'Gas', details = Faktor)
+        # 3. Tank (Kategorie 'Gas', details = Faktor)
         tank_amount_raw = getattr(self, '_input_gas', 0.0)
         if tank_amount_raw:
             try:
@@ -2595,23 +2055,20 @@ class AbrechnungsSeiteQML(QObject):
                         for item in self._overlay_config_cache:
                             if item.get('platform') == 'Tank':
                                 tank_faktor = item.get('slider', 100) / 100.0
-                    exp_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    cursor.execute(f"""
-                        INSERT INTO '{table_vehicle}' (cw, amount, category, details, timestamp)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (
-                        kw,
-                        tank_amount,
-                        'Gas',
-                        f'Faktor: {tank_faktor:.2f}',
-                        exp_timestamp
-                    ))
+                    rows.append((kw, tank_amount, 'Gas', f'Faktor: {tank_faktor:.2f}', exp_timestamp))
             except (ValueError, TypeError) as e:
                 print(f"DEBUG: Fehler bei Tank-Expense-Konvertierung: {e}, Wert: {tank_amount_raw}")
                 # Bei Fehler Tank-Expense überspringen
                 pass
         
-        print(f"✅ Expenses atomar gespeichert: {deal_result['fahrer']} KW{deal_result['kw']}")
+        # Alte Expenses für diese KW ersetzen (gleiches Jahr bzw. Bestand ohne Jahr)
+        cursor.execute(f"DELETE FROM {table_vehicle} WHERE cw = ? AND (year = ? OR year IS NULL)", (kw, jahr))
+        cursor.executemany(f"""
+            INSERT INTO {table_vehicle} (cw, amount, category, details, timestamp, year)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [row + (jahr,) for row in rows])
+        
+        print(f"✅ Expenses atomar gespeichert: {deal_result['fahrer']} KW{deal_result['kw']} ({len(rows)} Posten)")
 
     def _speichere_expenses(self, deal_result):
         """
@@ -2747,6 +2204,7 @@ class AbrechnungsSeiteQML(QObject):
                 # Nur setzen wenn sich der Wert wirklich geändert hat
                 if self._input_einsteiger != calculated_value:
                     self._input_einsteiger = calculated_value
+                    self._billing.einsteiger = einsteiger_differenz
                     print(f"[DEBUG] Gesamtbetrag-Modus: Eingabe={gesamtbetrag}€, Umsatz={umsatz}€, Einsteiger={einsteiger_differenz}€")
                     
                     # Signal emittieren für UI-Update
@@ -2836,32 +2294,34 @@ class AbrechnungsSeiteQML(QObject):
     def speichereOverlayKonfiguration(self, driver_id, fahrer, taxi_deal, taxi_slider, uber_deal, uber_slider, bolt_deal, bolt_slider, einsteiger_deal, einsteiger_slider, garage_slider, tank_slider):
         import sqlite3
         db_path = os.path.join("SQL", "database.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS custom_deal_config (
-                id INTEGER PRIMARY KEY,
-                fahrer TEXT NOT NULL,
-                taxi_deal INTEGER,
-                taxi_slider REAL,
-                uber_deal INTEGER,
-                uber_slider REAL,
-                bolt_deal INTEGER,
-                bolt_slider REAL,
-                einsteiger_deal INTEGER,
-                einsteiger_slider REAL,
-                garage_slider REAL,
-                tank_slider REAL,
-                FOREIGN KEY (id) REFERENCES drivers(driver_id) ON DELETE CASCADE
-            )
-        """)
-        cursor.execute("""
-            INSERT OR REPLACE INTO custom_deal_config
-            (id, fahrer, taxi_deal, taxi_slider, uber_deal, uber_slider, bolt_deal, bolt_slider, einsteiger_deal, einsteiger_slider, garage_slider, tank_slider)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (driver_id, fahrer, taxi_deal, taxi_slider, uber_deal, uber_slider, bolt_deal, bolt_slider, einsteiger_deal, einsteiger_slider, garage_slider, tank_slider))
-        conn.commit()
-        conn.close()
+        conn = connect(db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS custom_deal_config (
+                    id INTEGER PRIMARY KEY,
+                    fahrer TEXT NOT NULL,
+                    taxi_deal INTEGER,
+                    taxi_slider REAL,
+                    uber_deal INTEGER,
+                    uber_slider REAL,
+                    bolt_deal INTEGER,
+                    bolt_slider REAL,
+                    einsteiger_deal INTEGER,
+                    einsteiger_slider REAL,
+                    garage_slider REAL,
+                    tank_slider REAL,
+                    FOREIGN KEY (id) REFERENCES drivers(driver_id) ON DELETE CASCADE
+                )
+            """)
+            cursor.execute("""
+                INSERT OR REPLACE INTO custom_deal_config
+                (id, fahrer, taxi_deal, taxi_slider, uber_deal, uber_slider, bolt_deal, bolt_slider, einsteiger_deal, einsteiger_slider, garage_slider, tank_slider)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (driver_id, fahrer, taxi_deal, taxi_slider, uber_deal, uber_slider, bolt_deal, bolt_slider, einsteiger_deal, einsteiger_slider, garage_slider, tank_slider))
+            conn.commit()
+        finally:
+            conn.close()
         
         # Faktoren im Backend aktualisieren
         self._taxi_deal = taxi_deal
@@ -2902,7 +2362,7 @@ class AbrechnungsSeiteQML(QObject):
     def ladeOverlayKonfiguration(self, driver_id):
         import sqlite3
         db_path = os.path.join("SQL", "database.db")
-        conn = sqlite3.connect(db_path)
+        conn = connect(db_path)
         cursor = conn.cursor()
         
         # Erstelle die Tabelle falls sie nicht existiert
@@ -2968,16 +2428,14 @@ class AbrechnungsSeiteQML(QObject):
             return row if row else []
         except Exception as e:
             print(f"Fehler beim Laden der Overlay-Konfiguration: {e}")
-            conn.close()
             return []
+        finally:
+            conn.close()
 
     def _speichere_custom_deal(self):
         try:
             self._duplicate_replaced = False
             import sqlite3
-            db_path = os.path.join("SQL", "report.db")
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
             kw = self._wizard_data.get("kw", None)
             fahrzeug_raw = self._wizard_data.get("fahrzeug", None)
             fahrzeug = None
@@ -2990,7 +2448,7 @@ class AbrechnungsSeiteQML(QObject):
                     fahrzeug = fahrzeug_raw
             deal = getattr(self, '_deal', '%')
             fahrer = self._wizard_data.get("fahrer", None)
-            total = self._headcard_umsatz + self._input_einsteiger
+            total = self._headcard_umsatz + self._billing.einsteiger
             try:
                 jahr = datetime.now().year
                 kw_int = int(kw) if kw else None
@@ -3007,95 +2465,99 @@ class AbrechnungsSeiteQML(QObject):
             income = self._custom_deal_cache.get('custom_income', 0.0)
             db_path = os.path.join("SQL", "revenue.db")
             table_vehicle = fahrzeug
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS '{table_vehicle}' (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cw INTEGER NOT NULL CHECK (cw BETWEEN 1 AND 52),
-                    deal TEXT,
-                    driver TEXT,
-                    total DECIMAL(10,2),
-                    income DECIMAL(10,2) NOT NULL,
-                    timestamp DATETIME
-                )
-            """)
-            cursor.execute(f"""
-                SELECT * FROM '{table_vehicle}' 
-                WHERE cw = ? AND driver = ? AND deal = ?
-            """, (int(kw) if kw else None, fahrer, deal))
-            existing_entry = cursor.fetchone()
-            if existing_entry:
-                new_entry = {
-                    'cw': int(kw) if kw else None,
-                    'deal': deal,
-                    'driver': fahrer,
-                    'total': total,
-                    'income': income,
-                    'timestamp': timestamp
-                }
-                result = self.show_duplicate_comparison_dialog(existing_entry, new_entry, table_vehicle, kw, fahrer, deal)
-                if result == QDialog.Accepted:
-                    print("Duplikat wurde verarbeitet")
-                else:
-                    print("Speichern abgebrochen")
-                    conn.close()
-                    return
-            else:
+            conn = connect(db_path)
+            try:
+                cursor = conn.cursor()
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 cursor.execute(f"""
-                    INSERT INTO '{table_vehicle}' (cw, deal, driver, total, income, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (int(kw) if kw else None, deal, fahrer, total, income, timestamp))
-            conn.commit()
-            conn.close()
-            if not existing_entry or (existing_entry and hasattr(self, '_duplicate_replaced') and self._duplicate_replaced):
-                db_path_exp = os.path.join("SQL", "running_costs.db")
-                conn_exp = sqlite3.connect(db_path_exp)
-                cursor_exp = conn_exp.cursor()
-                cursor_exp.execute(f"""
                     CREATE TABLE IF NOT EXISTS '{table_vehicle}' (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        cw INTEGER,
-                        amount DECIMAL(10,2),
-                        category TEXT,
-                        details TEXT,
+                        cw INTEGER NOT NULL CHECK (cw BETWEEN 1 AND 52),
+                        deal TEXT,
+                        driver TEXT,
+                        total DECIMAL(10,2),
+                        income DECIMAL(10,2) NOT NULL,
                         timestamp DATETIME
                     )
                 """)
-                for eintrag in getattr(self, '_expense_cache', []):
-                    try:
-                        exp_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        cursor_exp.execute(f"""
-                            INSERT INTO '{table_vehicle}' (cw, amount, category, details, timestamp)
-                            VALUES (?, ?, ?, ?, ?)
-                        """, (
-                            int(kw) if kw else None,
-                            float(eintrag.get("amount", 0)),
-                            eintrag.get("category", ""),
-                            eintrag.get("details", ""),
-                            exp_timestamp
-                        ))
-                    except Exception as e:
-                        print(f"Fehler beim Speichern eines Expense-Eintrags: {e}")
-                # Parking wird bereits in _speichere_expenses() gespeichert, hier nicht doppelt
-                if hasattr(self, '_input_gas') and self._input_gas:
-                    try:
-                        exp_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        cursor_exp.execute(f"""
-                            INSERT INTO '{table_vehicle}' (cw, amount, category, details, timestamp)
-                            VALUES (?, ?, ?, ?, ?)
-                        """, (
-                            int(kw) if kw else None,
-                            float(self._input_gas),
-                            "Gas",
-                            "",
-                            exp_timestamp
-                        ))
-                    except Exception as e:
-                        print(f"Fehler beim Speichern des Gas-Eintrags: {e}")
-                conn_exp.commit()
-                conn_exp.close()
+                cursor.execute(f"""
+                    SELECT * FROM '{table_vehicle}' 
+                    WHERE cw = ? AND driver = ? AND deal = ?
+                """, (int(kw) if kw else None, fahrer, deal))
+                existing_entry = cursor.fetchone()
+                if existing_entry:
+                    new_entry = {
+                        'cw': int(kw) if kw else None,
+                        'deal': deal,
+                        'driver': fahrer,
+                        'total': total,
+                        'income': income,
+                        'timestamp': timestamp
+                    }
+                    result = self.show_duplicate_comparison_dialog(existing_entry, new_entry, table_vehicle, kw, fahrer, deal)
+                    if result == QDialog.Accepted:
+                        print("Duplikat wurde verarbeitet")
+                    else:
+                        print("Speichern abgebrochen")
+                        return
+                else:
+                    cursor.execute(f"""
+                        INSERT INTO '{table_vehicle}' (cw, deal, driver, total, income, timestamp)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (int(kw) if kw else None, deal, fahrer, total, income, timestamp))
+                conn.commit()
+            finally:
+                conn.close()
+            if not existing_entry or (existing_entry and hasattr(self, '_duplicate_replaced') and self._duplicate_replaced):
+                db_path_exp = os.path.join("SQL", "running_costs.db")
+                conn_exp = connect(db_path_exp)
+                try:
+                    cursor_exp = conn_exp.cursor()
+                    cursor_exp.execute(f"""
+                        CREATE TABLE IF NOT EXISTS '{table_vehicle}' (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            cw INTEGER,
+                            amount DECIMAL(10,2),
+                            category TEXT,
+                            details TEXT,
+                            timestamp DATETIME
+                        )
+                    """)
+                    for eintrag in getattr(self, '_expense_cache', []):
+                        try:
+                            exp_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            cursor_exp.execute(f"""
+                                INSERT INTO '{table_vehicle}' (cw, amount, category, details, timestamp)
+                                VALUES (?, ?, ?, ?, ?)
+                            """, (
+                                int(kw) if kw else None,
+                                float(eintrag.get("amount", 0)),
+                                eintrag.get("category", ""),
+                                eintrag.get("details", ""),
+                                exp_timestamp
+                            ))
+                        except Exception as e:
+                            print(f"Fehler beim Speichern eines Expense-Eintrags: {e}")
+                    # Parking wird bereits in _speichere_expenses() gespeichert, hier nicht doppelt
+                    if hasattr(self, '_input_gas') and self._input_gas:
+                        try:
+                            exp_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            cursor_exp.execute(f"""
+                                INSERT INTO '{table_vehicle}' (cw, amount, category, details, timestamp)
+                                VALUES (?, ?, ?, ?, ?)
+                            """, (
+                                int(kw) if kw else None,
+                                float(self._input_gas),
+                                "Gas",
+                                "",
+                                exp_timestamp
+                            ))
+                        except Exception as e:
+                            print(f"Fehler beim Speichern des Gas-Eintrags: {e}")
+                    conn_exp.commit()
+                finally:
+                    conn_exp.close()
+            self._aktualisiere_wochensumme(fahrzeug, kw)
             self._expense_cache = []
             self.inputGas = ""
             self.inputEinsteiger = ""
@@ -3164,38 +2626,33 @@ class AbrechnungsSeiteQML(QObject):
 
     @Slot(float)
     def setOverlayIncomeOhneEinsteiger(self, value):
+        # Nur Anzeige-Wert aus dem Overlay, fließt in keine Formel ein
         self._overlay_income_ohne_einsteiger = value
-        self.update_ergebnis()
         
     @Slot(float)
     def setEinsteigerFaktor(self, value):
         self._einsteiger_faktor = value
-        self.ergebnisChanged.emit()  # Signal für QML-Properties
-        self.update_ergebnis()
+        self._neu_berechnen("ergebnisChanged")  # Faktor-Properties hängen an ergebnisChanged
         
     @Slot(float)
     def setTankFaktor(self, value):
         self._tank_faktor = value
-        self.ergebnisChanged.emit()  # Signal für QML-Properties
-        self.update_ergebnis()
+        self._neu_berechnen("ergebnisChanged")  # Faktor-Properties hängen an ergebnisChanged
 
     @Slot(float)
     def setTaxiFaktor(self, value):
         self._taxi_faktor = value
-        self.ergebnisChanged.emit()  # Signal für QML-Properties
-        self.update_ergebnis()
+        self._neu_berechnen("ergebnisChanged")  # Faktor-Properties hängen an ergebnisChanged
         
     @Slot(float)
     def setUberFaktor(self, value):
         self._uber_faktor = value
-        self.ergebnisChanged.emit()  # Signal für QML-Properties
-        self.update_ergebnis()
+        self._neu_berechnen("ergebnisChanged")  # Faktor-Properties hängen an ergebnisChanged
         
     @Slot(float)
     def setBoltFaktor(self, value):
         self._bolt_faktor = value
-        self.ergebnisChanged.emit()  # Signal für QML-Properties
-        self.update_ergebnis()
+        self._neu_berechnen("ergebnisChanged")  # Faktor-Properties hängen an ergebnisChanged
 
     @Slot(str)
     def setDeal(self, value):
@@ -3205,28 +2662,24 @@ class AbrechnungsSeiteQML(QObject):
     @Slot(float)
     def setGarageFaktor(self, value):
         self._garage_faktor = value
-        self.ergebnisChanged.emit()  # Signal für QML-Properties
-        self.update_ergebnis()
+        self._neu_berechnen("ergebnisChanged")  # Faktor-Properties hängen an ergebnisChanged
         
     @Slot(float)
     def setPauschale(self, value):
         self._pauschale = value
-        self.pauschaleChanged.emit()
-        self.update_ergebnis()
+        self._neu_berechnen("pauschaleChanged")
         
     @Slot(float)
     def setUmsatzgrenze(self, value):
         self._umsatzgrenze = value
-        self.umsatzgrenzeChanged.emit()
-        self.update_ergebnis()
+        self._neu_berechnen("umsatzgrenzeChanged")
 
     @Slot(float)
     def setMonthlyGarage(self, value):
         """Setzt die monatlichen Garage-Kosten"""
         self._monthly_garage = value
         print(f"DEBUG: Monatliche Garage gesetzt: {value}€")
-        self.ergebnisChanged.emit()
-        self.update_ergebnis()
+        self._neu_berechnen("ergebnisChanged")
 
 
 
@@ -3239,7 +2692,7 @@ class AbrechnungsSeiteQML(QObject):
         umsatzgrenze = 1200.0
         
         try:
-            conn = sqlite3.connect("SQL/database.db")
+            conn = connect("SQL/database.db")
             cursor = conn.cursor()
             
             # Lade Deal-Daten aus deals Tabelle
@@ -3386,28 +2839,29 @@ class AbrechnungsSeiteQML(QObject):
         import json
         
         db_path = os.path.join("SQL", "database.db")
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Prüfe, ob custom_deal_config Tabelle existiert
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS custom_deal_config (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                fahrer TEXT UNIQUE,
-                config_json TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        conn = connect(db_path)
+        try:
+            cursor = conn.cursor()
         
-        # Lade Konfiguration für den Fahrer
-        cursor.execute("SELECT config_json FROM custom_deal_config WHERE fahrer = ?", (fahrername,))
-        result = cursor.fetchone()
+            # Prüfe, ob custom_deal_config Tabelle existiert
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS custom_deal_config (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fahrer TEXT UNIQUE,
+                    config_json TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
         
-        # Lade auch die monatlichen Garage-Kosten aus der deals Tabelle
-        cursor.execute("SELECT garage FROM deals WHERE name = ?", (fahrername,))
-        garage_result = cursor.fetchone()
+            # Lade Konfiguration für den Fahrer
+            cursor.execute("SELECT config_json FROM custom_deal_config WHERE fahrer = ?", (fahrername,))
+            result = cursor.fetchone()
         
-        conn.close()
+            # Lade auch die monatlichen Garage-Kosten aus der deals Tabelle
+            cursor.execute("SELECT garage FROM deals WHERE name = ?", (fahrername,))
+            garage_result = cursor.fetchone()
+        finally:
+            conn.close()
         
         # Setze monatliche Garage-Kosten
         if garage_result and garage_result[0] is not None:
@@ -3437,126 +2891,59 @@ class AbrechnungsSeiteQML(QObject):
         config = self.ladeOverlayKonfigurationByName(fahrername)
         return config
 
-    def _berechne_platform_werte(self, df, platform):
-        """Zentrale Berechnung für Plattformen wie Uber, Bolt, 40100"""
-        if df.empty:
-            if platform == "Bolt":
-                return {
-                    "net_earnings": 0.0,
-                    "rider_tips": 0.0,
-                    "cash_collected": 0.0,
-                    "echter_umsatz": 0.0,
-                    "anteil": 0.0,
-                    "restbetrag": 0.0
-                }
-            elif platform == "40100":
-                return {
-                    "gesamt_umsatz": 0.0,
-                    "trinkgeld": 0.0,
-                    "bargeld": 0.0,
-                    "echter_umsatz": 0.0,
-                    "anteil": 0.0,
-                    "restbetrag": 0.0
-                }
-            else:
-                return {
-                    "gross_total": 0.0,
-                    "cash_collected": 0.0,
-                    "anteil": 0.0,
-                    "restbetrag": 0.0
-                }
-        row_data = df.iloc[0]
-        if platform == "Uber":
-            gross_total = safe_float(row_data.get("gross_total", 0))
-            cash_collected = safe_float(row_data.get("cash_collected", 0))
-            anteil = gross_total / 2
-            restbetrag = anteil - cash_collected
-            return {
-                "gross_total": gross_total,
-                "cash_collected": cash_collected,
-                "anteil": anteil,
-                "restbetrag": restbetrag
-            }
-        elif platform == "Bolt":
-            net_earnings = safe_float(row_data.get("net_earnings", 0))
-            rider_tips = safe_float(row_data.get("rider_tips", 0))
-            cash_collected = safe_float(row_data.get("cash_collected", 0))
-            echter_umsatz = net_earnings - rider_tips
-            anteil = echter_umsatz / 2
-            restbetrag = anteil - cash_collected
-            return {
-                "net_earnings": net_earnings,
-                "rider_tips": rider_tips,
-                "cash_collected": cash_collected,
-                "echter_umsatz": echter_umsatz,
-                "anteil": anteil,
-                "restbetrag": restbetrag
-            }
-        elif platform == "40100":
-            if "Umsatz" in df.columns:
-                df["Umsatz"] = pd.to_numeric(df["Umsatz"].astype(str).str.replace(",", "."), errors="coerce")
-                umsatz_mask = (df["Umsatz"] <= 250) & (df["Umsatz"] >= -250)
-                umsatz_40100 = df.loc[umsatz_mask, "Umsatz"]
-            else:
-                umsatz_40100 = pd.Series(dtype=float)
-            gesamt_umsatz = umsatz_40100.sum()
-            # Trinkgeld für echten Umsatz: Gesamtsumme (ohne Filter)
-            trinkgeld_fuer_umsatz = df["Trinkgeld"].sum() if "Trinkgeld" in df.columns else 0
-            
-            # Trinkgeld für Anzeige: Summe nur wenn Buchungsart nicht 'Bar' enthält und Umsatz zwischen -250 und 250
-            trinkgeld_mask = umsatz_mask
-            if "Buchungsart" in df.columns:
-                trinkgeld_mask = trinkgeld_mask & ~df["Buchungsart"].str.contains("Bar", na=False)
-            trinkgeld = df.loc[trinkgeld_mask, "Trinkgeld"].sum() if "Trinkgeld" in df.columns else 0
-            bargeld = df.loc[umsatz_mask, "Bargeld"].sum() if "Bargeld" in df.columns else 0
-            echter_umsatz = gesamt_umsatz - trinkgeld_fuer_umsatz
-            anteil = echter_umsatz / 2
-            restbetrag = anteil - bargeld + trinkgeld
-            return {
-                "echter_umsatz": echter_umsatz,  # Erste Position für Card-Anzeige
-                "gesamt_umsatz": gesamt_umsatz,
-                "trinkgeld": trinkgeld,
-                "bargeld": bargeld,
-                "anteil": anteil,
-                "restbetrag": restbetrag
-            }
-        return {}
+    @staticmethod
+    def _spaltensumme(df, column):
+        if df is None or column not in df.columns:
+            return 0.0
+        return sum(safe_float(value) for value in df[column])
 
-    def calculate_bolt_details(self, df):
-        werte = self._berechne_platform_werte(df, "Bolt")
+    def _platform_result(self, df, platform):
+        """Zahlenmodell für Uber und Bolt (Taxi-Summen kommen aus taxi_totals)"""
+        if platform == "Uber":
+            return PlatformResult.from_uber(self._spaltensumme(df, "gross_total"),
+                                            self._spaltensumme(df, "cash_collected"))
+        if platform == "Bolt":
+            return PlatformResult.from_bolt(self._spaltensumme(df, "net_earnings"),
+                                            self._spaltensumme(df, "rider_tips"),
+                                            self._spaltensumme(df, "cash_collected"))
+        return PlatformResult()
+
+    # --- Formatierung für QML (nur hier werden Zahlen zu "123.45 €") ---
+    @staticmethod
+    def calculate_bolt_details(result):
         return [
-            {"label": "Echter Umsatz", "value": f"{werte['echter_umsatz']:.2f} €"},
-            {"label": "Anteil", "value": f"{werte['anteil']:.2f} €"},
-            {"label": "Bargeld", "value": f"{werte['cash_collected']:.2f} €"},
-            {"label": "Rest", "value": f"{werte['restbetrag']:.2f} €"}
+            {"label": "Echter Umsatz", "value": f"{result.umsatz:.2f} €"},
+            {"label": "Anteil", "value": f"{result.anteil:.2f} €"},
+            {"label": "Bargeld", "value": f"{result.bargeld:.2f} €"},
+            {"label": "Rest", "value": f"{result.restbetrag:.2f} €"}
         ]
 
-    def calculate_bolt_results(self, df):
-        werte = self._berechne_platform_werte(df, "Bolt")
+    @staticmethod
+    def calculate_bolt_results(result):
         return [
             {"type": "title", "text": "Bolt"},
-            {"type": "value", "label": "Total", "value": f"{werte['net_earnings']:.2f} €", "hint": ""},
-            {"type": "value", "label": "Echter Umsatz", "value": f"{werte['echter_umsatz']:.2f} €", "hint": "/ 2"},
-            {"type": "value", "label": "Anteil", "value": f"{werte['anteil']:.2f} €", "hint": "- Bargeld"},
-            {"type": "value", "label": "Rest", "value": f"{werte['restbetrag']:.2f} €", "hint": ""}
+            {"type": "value", "label": "Total", "value": f"{result.total:.2f} €", "hint": ""},
+            {"type": "value", "label": "Echter Umsatz", "value": f"{result.umsatz:.2f} €", "hint": "/ 2"},
+            {"type": "value", "label": "Anteil", "value": f"{result.anteil:.2f} €", "hint": "- Bargeld"},
+            {"type": "value", "label": "Rest", "value": f"{result.restbetrag:.2f} €", "hint": ""}
         ]
 
-    def calculate_40100_details(self, df, deal):
-        werte = self._berechne_platform_werte(df, "40100")
+    @staticmethod
+    def calculate_taxi_details(result):
         return [
-            {"label": "Real", "value": f"{werte['echter_umsatz']:.2f} €"},
-            {"label": "Anteil", "value": f"{werte['anteil']:.2f} €"},
-            {"label": "Bargeld", "value": f"{werte['bargeld']:.2f} €"},
-            {"label": "Rest", "value": f"{werte['restbetrag']:.2f} €"}
+            {"label": "Real", "value": f"{result.umsatz:.2f} €"},
+            {"label": "Anteil", "value": f"{result.anteil:.2f} €"},
+            {"label": "Bargeld", "value": f"{result.bargeld:.2f} €"},
+            {"label": "Rest", "value": f"{result.restbetrag:.2f} €"}
         ]
 
-    def calculate_40100_results(self, df, deal):
-        werte = self._berechne_platform_werte(df, "40100")
+    @staticmethod
+    def calculate_40100_results(result, deal):
         return [
-            {"type": "value", "label": "Total", "value": f"{werte['gesamt_umsatz']:.2f} €", "hint": "- Trinkgeld"},
-            {"type": "value", "label": "Real", "value": f"{werte['echter_umsatz']:.2f} €", "hint": "/ 2"},
-            {"type": "value", "label": "Anteil", "value": f"{werte['anteil']:.2f} €", "hint": "- Auszahlung"},
-            {"type": "value", "label": "Rest", "value": f"{werte['restbetrag']:.2f} €", "hint": ""}
+            {"type": "value", "label": "Total", "value": f"{result.total:.2f} €", "hint": "- Trinkgeld"},
+            {"type": "value", "label": "Real", "value": f"{result.umsatz:.2f} €", "hint": "/ 2"},
+            {"type": "value", "label": "Anteil", "value": f"{result.anteil:.2f} €", "hint": "- Auszahlung"},
+            {"type": "value", "label": "Rest", "value": f"{result.restbetrag:.2f} €", "hint": ""}
         ]
 
     def _calculate_auto_tank_value(self):
@@ -3579,130 +2966,24 @@ class AbrechnungsSeiteQML(QObject):
         except Exception as e:
             self.debug_print(f"Fehler bei automatischer Tank-Berechnung: {e}", "ERROR")
     
-    def _process_40100_data(self, df, deal, data):
-        """Verarbeitet 40100-Daten"""
-        if "Umsatz" in df.columns:
-            df["Umsatz"] = pd.to_numeric(df["Umsatz"].astype(str).str.replace(",", "."), errors="coerce")
-            umsatz_mask = (df["Umsatz"] <= 250) & (df["Umsatz"] >= -250)
-            umsatz_40100 = df.loc[umsatz_mask, "Umsatz"]
-        else:
-            umsatz_40100 = pd.Series(dtype=float)
-        
-        # KORRIGIERT: HeadCard-Umsatz = echter Umsatz (ohne Trinkgeld)
-        trinkgeld_fuer_umsatz_40100 = df["Trinkgeld"].sum() if "Trinkgeld" in df.columns else 0
-        echter_umsatz_40100 = umsatz_40100.sum() - trinkgeld_fuer_umsatz_40100
-        data['sum_40100'] += echter_umsatz_40100  # Echter Umsatz für HeadCard
-        
-        # Bargeld und Trinkgeld für gefilterte Werte
-        bargeld_40100 = df.loc[umsatz_mask, "Bargeld"].sum() if "Bargeld" in df.columns else 0
-        
-        # Trinkgeld für Anzeige
-        trinkgeld_mask = umsatz_mask
-        if "Buchungsart" in df.columns:
-            trinkgeld_mask = trinkgeld_mask & ~df["Buchungsart"].str.contains("Bar", na=False)
-        trinkgeld_40100 = df.loc[trinkgeld_mask, "Trinkgeld"].sum() if "Trinkgeld" in df.columns else 0
-        
-        data['sum_bargeld'] += bargeld_40100
-        data['_40100_trinkgeld'] += trinkgeld_40100
-        data['_40100_trinkgeld_gesamt'] += trinkgeld_fuer_umsatz_40100
-        data['_40100_bargeld'] += bargeld_40100
-        data['_40100_real'] += echter_umsatz_40100
-        data['details_40100'] = self.calculate_40100_details(df, deal)
-    
-    def _process_31300_data(self, df, deal, data):
-        """Verarbeitet 31300-Daten"""
-        if "Gesamt" in df.columns:
-            df['Gesamt'] = pd.to_numeric(df['Gesamt'], errors='coerce')
-            gesamt_mask = (df["Gesamt"] <= 250) & (df["Gesamt"] >= -250)
-            gesamt_31300 = df.loc[gesamt_mask, "Gesamt"]
-        else:
-            gesamt_31300 = pd.Series(dtype=float)
-        
-        umsatz_31300 = gesamt_31300.sum()
-        
-        # Bargeld berechnen
-        if "Buchungsart" in df.columns and "Gesamt" in df.columns:
-            bargeld_31300 = df.loc[df["Buchungsart"].str.contains("Bar", na=False), "Gesamt"].sum()
-        else:
-            bargeld_31300 = 0
-        
-        # Trinkgeld berechnen
-        trinkgeld_fuer_umsatz_31300 = df["Trinkgeld"].sum() if "Trinkgeld" in df.columns else 0
-        trinkgeld_mask = gesamt_mask
-        if "Buchungsart" in df.columns:
-            trinkgeld_mask = trinkgeld_mask & ~df["Buchungsart"].str.contains("Bar", na=False)
-        trinkgeld_31300 = df.loc[trinkgeld_mask, "Trinkgeld"].sum() if "Trinkgeld" in df.columns else 0
-        
-        echter_umsatz_31300 = umsatz_31300 - trinkgeld_fuer_umsatz_31300
-        anteil_31300 = echter_umsatz_31300 / 2
-        restbetrag_31300 = anteil_31300 - bargeld_31300 + trinkgeld_31300
-        
-        # KORRIGIERT: HeadCard-Umsatz = echter Umsatz (ohne Trinkgeld)
-        data['sum_31300'] += echter_umsatz_31300  # Echter Umsatz für HeadCard
-        data['sum_bargeld'] += bargeld_31300
-        data['_31300_trinkgeld'] += trinkgeld_31300
-        data['_31300_trinkgeld_gesamt'] += trinkgeld_fuer_umsatz_31300
-        data['_31300_bargeld'] += bargeld_31300
-        data['_31300_real'] += echter_umsatz_31300
-        data['details_31300'] = [
-            {"label": "Real", "value": f"{echter_umsatz_31300:.2f} €"},
-            {"label": "Anteil", "value": f"{anteil_31300:.2f} €"},
-            {"label": "Bargeld", "value": f"{bargeld_31300:.2f} €"},
-            {"label": "Rest", "value": f"{restbetrag_31300:.2f} €"}
-        ]
-    
-    def _process_uber_data(self, df, deal, data):
-        """Verarbeitet Uber-Daten"""
-        gross_total = df["gross_total"].sum() if "gross_total" in df.columns else 0
-        cash_collected = df["cash_collected"].sum() if "cash_collected" in df.columns else 0
-        
-        # Uber: Gesamtbetrag bleibt bestehen (kein Trinkgeld)
-        data['sum_uber'] += gross_total
-        data['sum_bargeld'] += cash_collected
-        data['uber_gross_total'] += gross_total
-        data['uber_cash_collected'] += cash_collected
-        data['details_uber'] = self.calculate_uber_details(df)
-    
-    def _process_bolt_data(self, df, deal, data):
-        """Verarbeitet Bolt-Daten"""
-        net_earnings = df["net_earnings"].sum() if "net_earnings" in df.columns else 0
-        rider_tips = df["rider_tips"].sum() if "rider_tips" in df.columns else 0
-        cash_collected = df["cash_collected"].sum() if "cash_collected" in df.columns else 0
-        
-        # KORRIGIERT: HeadCard-Umsatz = echter Umsatz (ohne Trinkgeld)
-        data['sum_bolt'] += net_earnings - rider_tips  # Echter Umsatz für HeadCard
-        data['sum_bargeld'] += cash_collected
-        data['bolt_rider_tips'] += rider_tips
-        data['bolt_cash_collected'] += cash_collected
-        data['bolt_echter_umsatz'] += net_earnings - rider_tips
-        data['details_bolt'] = self.calculate_bolt_details(df)
-    
-    def _calculate_headcard_values(self, data):
-        """Berechnet HeadCard-Werte aus den Plattform-Daten"""
-        taxi_total = data['sum_40100'] + data['sum_31300']
-        data['taxi_total'] = taxi_total
-        
-        # Speichere separate Werte für _get_platform_umsatz
-        self._taxi_total = taxi_total
-        self._sum_40100 = data['sum_40100']
-        self._sum_31300 = data['sum_31300']
-        self._sum_uber = data['sum_uber']
-        self._sum_bolt = data['sum_bolt']
+    def _calculate_headcard_values(self, billing):
+        """Berechnet HeadCard-Werte aus dem Zahlenmodell"""
+        taxi_total = billing.umsatz("Taxi")
         
         # HeadCard Summen berechnen
-        self._headcard_umsatz = float(data['sum_uber']) + float(data['sum_bolt']) + float(taxi_total)
+        self._headcard_umsatz = billing.gesamt_umsatz
         
         # DEBUG: Detaillierte Umsatz-Aufschlüsselung
         print(f"🔍 UMSATZ-AUFSCHLÜSSELUNG (KORRIGIERT):")
-        print(f"   Uber (gross_total): {data['sum_uber']:.2f}€ (kein Trinkgeld)")
-        print(f"   Bolt (echter Umsatz): {data['sum_bolt']:.2f}€ (net_earnings-rider_tips)")
-        print(f"   40100: {data['sum_40100']:.2f}€ (ohne Trinkgeld)")
-        print(f"   31300: {data['sum_31300']:.2f}€ (ohne Trinkgeld)")
+        print(f"   Uber (gross_total): {billing.uber.umsatz:.2f}€ (kein Trinkgeld)")
+        print(f"   Bolt (echter Umsatz): {billing.bolt.umsatz:.2f}€ (net_earnings-rider_tips)")
+        print(f"   40100: {billing.taxi_40100.umsatz:.2f}€ (ohne Trinkgeld)")
+        print(f"   31300: {billing.taxi_31300.umsatz:.2f}€ (ohne Trinkgeld)")
         print(f"   Taxi Total: {taxi_total:.2f}€")
         print(f"   GESAMTUMSATZ: {self._headcard_umsatz:.2f}€")
-        self._headcard_trinkgeld = data['bolt_rider_tips'] + data['_40100_trinkgeld'] + data['_31300_trinkgeld']
-        self._headcard_trinkgeld_gesamt = data['bolt_rider_tips'] + data['_40100_trinkgeld_gesamt'] + data['_31300_trinkgeld_gesamt']
-        self._headcard_bargeld = data['uber_cash_collected'] + data['bolt_cash_collected'] + data['_40100_bargeld'] + data['_31300_bargeld']
+        self._headcard_trinkgeld = billing.trinkgeld
+        self._headcard_trinkgeld_gesamt = billing.trinkgeld_gesamt
+        self._headcard_bargeld = billing.bargeld
         
         # Signals emittieren
         self.headcardUmsatzChanged.emit()
@@ -3715,7 +2996,7 @@ class AbrechnungsSeiteQML(QObject):
         """Berechnet Garage-Kosten basierend auf KW"""
         if not hasattr(self, '_monthly_garage') or self._monthly_garage == 0.0:
             try:
-                conn = sqlite3.connect("SQL/database.db")
+                conn = connect("SQL/database.db")
                 cursor = conn.cursor()
                 cursor.execute("SELECT garage FROM deals WHERE name = ?", (self._current_fahrer,))
                 garage_result = cursor.fetchone()
@@ -3752,27 +3033,27 @@ class AbrechnungsSeiteQML(QObject):
         
         self.headcardGarageChanged.emit()
     
-    def _create_overview_results(self, data):
-        """Erstellt die Ergebnis-Liste für die Übersicht"""
-        taxi_summe = data['sum_40100'] + data['sum_31300']
+    def _create_overview_results(self, billing):
+        """Erstellt die Ergebnis-Liste für die Übersicht (Formatierung für QML)"""
+        taxi_summe = billing.umsatz("Taxi")
         taxi_details = []
-        
-        if data['sum_40100'] > 0 and data['sum_31300'] > 0:
-            taxi_details = data['details_40100'] + data['details_31300']
-        elif data['sum_40100'] > 0:
-            taxi_details = data['details_40100']
-        else:
-            taxi_details = data['details_31300']
+        for teil in (billing.taxi_40100, billing.taxi_31300):
+            if teil.vorhanden and teil.umsatz > 0:
+                taxi_details += self.calculate_taxi_details(teil)
+        if not taxi_details and billing.taxi_31300.vorhanden:
+            taxi_details = self.calculate_taxi_details(billing.taxi_31300)
         
         headcard_cash = self._headcard_bargeld
         headcard_credit_card = (self._headcard_umsatz + self._headcard_trinkgeld) - self._headcard_bargeld
-        total_summe = data['sum_40100'] + data['sum_31300'] + data['sum_uber'] + data['sum_bolt']
+        total_summe = billing.gesamt_umsatz
         
         self._ergebnisse = [
             {"type": "title", "text": "Übersicht"},
             *([{"type": "summary", "label": "Taxi", "value": f"{taxi_summe:.2f} €", "details": taxi_details}] if taxi_summe > 0 else []),
-            {"type": "summary", "label": "Uber", "value": f"{data['sum_uber']:.2f} €", "details": data['details_uber']},
-            {"type": "summary", "label": "Bolt", "value": f"{data['sum_bolt']:.2f} €", "details": data['details_bolt']},
+            {"type": "summary", "label": "Uber", "value": f"{billing.uber.umsatz:.2f} €",
+             "details": self.calculate_uber_details(billing.uber) if billing.uber.vorhanden else []},
+            {"type": "summary", "label": "Bolt", "value": f"{billing.bolt.umsatz:.2f} €",
+             "details": self.calculate_bolt_details(billing.bolt) if billing.bolt.vorhanden else []},
             {"type": "summary", "label": "Bargeld", "value": f"{headcard_cash:.2f} €", "icon": "assets/icons/cash_gray.svg"},
             {"type": "summary", "label": "Kreditkarte", "value": f"{headcard_credit_card:.2f} €", "icon": "assets/icons/credit_card_gray.svg"},
             {"type": "summary", "label": "Gesamt", "value": f"{total_summe:.2f} €"}
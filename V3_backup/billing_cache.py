@@ -0,0 +1,324 @@
+"""
+Warm-Start-Cache der Abrechnungs-Auswertungen, Schlüssel (Fahrer, Fahrzeug, KW).
+
+Eine Auswertung (Deal-Zeile, gefundene Plattform-Summen, Taxi-Quellen) wird
+nach dem ersten Laden im Speicher gehalten; Wechsel zwischen bereits
+angesehenen Fahrern/Wochen brauchen weder SQLite noch Fuzzy-Matching.
+
+Gültigkeit ohne Hooks in die Importpfade (der Import läuft in eigenen
+Prozessen): Zu jedem Eintrag werden beim Laden die Datei-Stempel der Quellen
+(mtime, Größe, Änderungszähler von Datenbank und WAL), ein Fingerabdruck der
+Wochentabelle (max(rowid), COUNT(*)) und die Deal-Zeile gemerkt. Beim Abruf
+genügt meist ein os.stat plus Dateikopf je Datei; nur wenn sich eine Datei
+geändert hat, werden der Fingerabdruck genau dieser Woche bzw. die
+Deal-Zeile neu gelesen. Ein Import in eine andere Woche lässt den Eintrag
+gültig, ein Import in dieselbe Woche oder eine Deal-Änderung verwirft ihn.
+
+    cache = EvaluationCache("SQL")
+    entry = cache.get(key)
+    if entry is None:
+        snapshot = cache.snapshot(fahrer, kw)     # vor dem Laden erfassen
+        ...
+        entry = cache.put(key, snapshot, found_pages, taxi_sources)   # nur ohne fehlgeschlagene Quelle
+
+EvaluationPrefetcher lädt nach einer Auswertung die Nachbarwochen desselben
+Fahrers/Fahrzeugs in einem Hintergrund-Thread in den Cache (Abrechnungen
+laufen meist KW30 → KW31 → KW32). Wird eine Woche angefordert, die gerade
+vorgeladen wird, wartet load auf dieses Ergebnis statt doppelt zu laden.
+"""
+
+import os
+import sqlite3
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Event, RLock, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from connection_manager import connect
+
+# Plattform → Datei im SQL-Ordner (Wochentabellen report_KW{kw})
+SOURCE_DATABASES = {
+    "40100": "40100.sqlite",
+    "31300": "31300.sqlite",
+    "Uber": "uber.sqlite",
+    "Bolt": "bolt.sqlite",
+}
+DEAL_DATABASE = "database.db"
+
+MAX_ENTRIES = 32
+MAX_BYTES = 64 * 1024 * 1024
+
+# Nachbarwochen für den Prefetch (nächste zuerst) und maximale Wartezeit auf einen laufenden Prefetch
+PREFETCH_WEEKS = (1, -1)
+PREFETCH_WAIT = 30.0
+
+# (Fahrer, Fahrzeug, KW)
+CacheKey = Tuple[str, str, str]
+
+
+def cache_key(fahrer, fahrzeug, kw) -> CacheKey:
+    return (str(fahrer or ""), str(fahrzeug or ""), str(kw or ""))
+
+
+def file_stamp(path: str) -> Tuple:
+    """mtime/Größe/Kopfbytes von Datenbank und WAL-Datei; fehlende Dateien als None.
+
+    Die Kopfbytes enthalten den Änderungszähler der Datenbank (Offset 24) bzw.
+    Prüfpunkt-Nummer und Salt des WAL; damit fallen auch Schreibvorgänge
+    innerhalb derselben mtime-Auflösung auf.
+    """
+    stamp = []
+    for candidate, header in ((path, 28), (path + "-wal", 32)):
+        try:
+            st = os.stat(candidate)
+            with open(candidate, "rb") as f:
+                stamp.append((st.st_mtime_ns, st.st_size, f.read(header)))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _connect_existing(path: str) -> Optional[sqlite3.Connection]:
+    # Nur lesen; fehlende Dateien nicht durch connect anlegen
+    if not os.path.exists(path):
+        return None
+    return connect(path)
+
+
+def table_fingerprint(db_path: str, table: str) -> Optional[Tuple]:
+    """(max(rowid), COUNT(*)) der Tabelle; None, wenn Datei oder Tabelle fehlt."""
+    conn = _connect_existing(db_path)
+    if conn is None:
+        return None
+    try:
+        return tuple(conn.execute(f'SELECT MAX(rowid), COUNT(*) FROM "{table}"').fetchone())
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+
+def read_deal_row(db_path: str, fahrer: str) -> Optional[Tuple]:
+    """(deal, garage, pauschale, umsatzgrenze) des Fahrers aus deals."""
+    conn = _connect_existing(db_path)
+    if conn is None:
+        return None
+    try:
+        row = conn.execute("SELECT deal, garage, pauschale, umsatzgrenze FROM deals WHERE name = ?",
+                           (fahrer,)).fetchone()
+        return tuple(row) if row else None
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+
+@dataclass
+class Snapshot:
+    """Stand der Quellen unmittelbar vor dem Laden einer Auswertung."""
+    fahrer: str
+    deal_row: Optional[Tuple]
+    sources: Dict[str, str]                       # Datei → Wochentabelle
+    stamps: Dict[str, Tuple] = field(default_factory=dict)
+    fingerprints: Dict[str, Optional[Tuple]] = field(default_factory=dict)
+
+
+@dataclass
+class CachedEvaluation:
+    found_pages: List[tuple]                      # [(Plattform, TaxiTotals | DataFrame, deal)]
+    taxi_sources: Dict[str, tuple]
+    snapshot: Snapshot
+    size: int = 0
+
+    @property
+    def deal_row(self) -> Optional[Tuple]:
+        return self.snapshot.deal_row
+
+
+def _estimate_size(found_pages: List[tuple]) -> int:
+    size = 1024  # Grundlast je Eintrag (Tupel, Dicts, Snapshot)
+    for _, quelle, _ in found_pages:
+        if isinstance(quelle, pd.DataFrame):
+            size += int(quelle.memory_usage(deep=True).sum())
+        else:
+            size += sys.getsizeof(quelle)
+    return size
+
+
+class EvaluationCache:
+    """LRU-Cache mit Eintrags- und Speichergrenze; thread-sicher (auch für Prefetch)."""
+
+    def __init__(self, sql_dir: str = "SQL", max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.sql_dir = sql_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, CachedEvaluation]" = OrderedDict()
+        self._bytes = 0
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._entries
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _deal_path(self) -> str:
+        return os.path.join(self.sql_dir, DEAL_DATABASE)
+
+    def snapshot(self, fahrer: str, kw) -> Snapshot:
+        """Erfasst Stempel, Wochen-Fingerabdrücke und Deal-Zeile (vor dem Laden aufrufen)."""
+        table = f"report_KW{kw}"
+        sources = {os.path.join(self.sql_dir, filename): table for filename in SOURCE_DATABASES.values()}
+        deal_path = self._deal_path()
+        snapshot = Snapshot(fahrer, None, sources)
+        for path in list(sources) + [deal_path]:
+            snapshot.stamps[path] = file_stamp(path)
+        for path, source_table in sources.items():
+            snapshot.fingerprints[path] = table_fingerprint(path, source_table)
+        snapshot.deal_row = read_deal_row(deal_path, fahrer)
+        return snapshot
+
+    def _still_valid(self, snapshot: Snapshot) -> bool:
+        """Prüft nur Dateien mit geändertem Stempel genauer; aktualisiert die Stempel."""
+        changed = [path for path, stamp in snapshot.stamps.items() if file_stamp(path) != stamp]
+        for path in changed:
+            if path in snapshot.sources:
+                if table_fingerprint(path, snapshot.sources[path]) != snapshot.fingerprints.get(path):
+                    return False
+            elif read_deal_row(path, snapshot.fahrer) != snapshot.deal_row:
+                return False
+        for path in changed:
+            snapshot.stamps[path] = file_stamp(path)
+        return True
+
+    def get(self, key: CacheKey) -> Optional[CachedEvaluation]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if not self._still_valid(entry.snapshot):
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: CacheKey, snapshot: Snapshot, found_pages: List[tuple],
+            taxi_sources: Dict[str, tuple]) -> CachedEvaluation:
+        entry = CachedEvaluation(list(found_pages), dict(taxi_sources), snapshot, _estimate_size(found_pages))
+        with self._lock:
+            self._remove(key)
+            if entry.size > self.max_bytes:
+                # Allein zu groß: nicht cachen statt alle anderen Einträge zu verdrängen
+                return entry
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+        return entry
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, fahrer: Optional[str] = None, kw=None) -> int:
+        """Verwirft Einträge eines Fahrers und/oder einer KW (ohne Angabe: alle). Rückgabe: Anzahl."""
+        with self._lock:
+            keys = [key for key in self._entries
+                    if (fahrer is None or key[0] == fahrer) and (kw is None or key[2] == str(kw))]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+
+def adjacent_weeks(kw, offsets=PREFETCH_WEEKS) -> List[str]:
+    """Nachbarwochen innerhalb 1..53 in der Reihenfolge der offsets; nicht-numerische KW → []."""
+    try:
+        week = int(str(kw).replace("KW", ""))
+    except ValueError:
+        return []
+    return [str(week + offset) for offset in offsets if 1 <= week + offset <= 53]
+
+
+# loader(fahrer, fahrzeug, kw, deal) → (found_pages, taxi_sources, fehlgeschlagene Quellen)
+Loader = Callable[[str, str, str, Optional[str]], Tuple[List[tuple], Dict[str, tuple], List[str]]]
+
+
+class EvaluationPrefetcher:
+    """Lädt Auswertungen in den Cache – im Vordergrund (load) oder vorausschauend im Hintergrund (prefetch)."""
+
+    def __init__(self, cache: EvaluationCache, loader: Loader):
+        self.cache = cache
+        self.loader = loader
+        self._lock = RLock()
+        self._inflight: Dict[CacheKey, Event] = {}
+        self._generation = 0
+        self.prefetched = 0
+
+    def _load_into_cache(self, key: CacheKey) -> CachedEvaluation:
+        fahrer, fahrzeug, kw = key
+        # Stand der Quellen vor dem Laden festhalten; enthält auch die Deal-Zeile
+        snapshot = self.cache.snapshot(fahrer, kw)
+        deal = snapshot.deal_row[0] if snapshot.deal_row else None
+        found_pages, taxi_sources, failed = self.loader(fahrer, fahrzeug, kw, deal)
+        if failed:
+            # Unvollständig: Stempel und Fingerabdrücke ändern sich nicht, ein Cache-Eintrag
+            # würde die fehlende Quelle bis zum nächsten Import verschweigen
+            print(f"⚠️ Auswertung {fahrer}/{fahrzeug}/KW{kw} ohne {', '.join(failed)} – nicht gecacht")
+            return CachedEvaluation(list(found_pages), dict(taxi_sources), snapshot, _estimate_size(found_pages))
+        return self.cache.put(key, snapshot, found_pages, taxi_sources)
+
+    def load(self, fahrer, fahrzeug, kw) -> Tuple[CachedEvaluation, bool]:
+        """Auswertung aus dem Cache oder neu geladen; Rückgabe (Eintrag, aus_cache)."""
+        key = cache_key(fahrer, fahrzeug, kw)
+        with self._lock:
+            pending = self._inflight.get(key)
+        if pending is not None:
+            pending.wait(PREFETCH_WAIT)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry, True
+        return self._load_into_cache(key), False
+
+    def prefetch(self, fahrer, fahrzeug, kw, offsets=PREFETCH_WEEKS) -> Optional[Thread]:
+        """Startet das Vorladen der Nachbarwochen; ein neuer Aufruf löst einen laufenden ab."""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            keys = [cache_key(fahrer, fahrzeug, week) for week in adjacent_weeks(kw, offsets)]
+            keys = [key for key in keys if key not in self.cache and key not in self._inflight]
+            if not keys:
+                return None
+            for key in keys:
+                self._inflight[key] = Event()
+
+        def prefetch_task():
+            for key in keys:
+                try:
+                    # Abgelöst (neue Auswahl): restliche Wochen nicht mehr laden
+                    if generation == self._generation:
+                        self._load_into_cache(key)
+                        self.prefetched += 1
+                except Exception as e:
+                    print(f"⚠️ Prefetch KW{key[2]} fehlgeschlagen: {e}")
+                finally:
+                    with self._lock:
+                        event = self._inflight.pop(key, None)
+                    if event is not None:
+                        event.set()
+
+        thread = Thread(target=prefetch_task, daemon=True)
+        thread.start()
+        return thread
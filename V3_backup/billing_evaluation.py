@@ -0,0 +1,109 @@
+"""
+Asynchrone Auswertung der Abrechnungsseite.
+
+auswerten lädt Deal, Taxi-Summen und Uber/Bolt-Treffer (SQLite, pandas,
+Fuzzy-Matching) nicht mehr im Qt-Hauptthread, sondern in einem
+QThreadPool. Jede Anfrage bekommt eine fortlaufende Generation:
+
+- Noch nicht gestartete, überholte Anfragen werden aus der Warteschlange
+  des Pools genommen.
+- Überholte, bereits laufende Anfragen laufen zu Ende (SQLite lässt sich
+  nicht mittendrin abbrechen); ihr Ergebnis landet im Auswertungs-Cache,
+  wird aber nicht mehr an die Seite geliefert.
+- Nur die neueste Anfrage meldet sich über evaluationFinished bzw.
+  evaluationFailed (im Hauptthread, per Queued Connection).
+
+    service = EvaluationService(prefetcher)
+    service.evaluationFinished.connect(page._auswertung_fertig)
+    service.submit("Max Muster", "W135CTX", "31")
+"""
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+# Laufende, überholte Auswertungen sollen eine neue nicht blockieren
+MAX_THREADS = 2
+
+
+class _TaskSignals(QObject):
+    finished = Signal(int, object, bool)   # Generation, CachedEvaluation, aus_cache
+    failed = Signal(int, str)
+    skipped = Signal(int)
+
+
+class _EvaluationTask(QRunnable):
+    def __init__(self, service, generation, fahrer, fahrzeug, kw):
+        super().__init__()
+        self.service = service
+        self.generation = generation
+        self.args = (fahrer, fahrzeug, kw)
+        self.signals = _TaskSignals()
+
+    def run(self):
+        if not self.service.is_current(self.generation):
+            self.signals.skipped.emit(self.generation)  # überholt, bevor die Arbeit begann
+            return
+        try:
+            entry, aus_cache = self.service.prefetcher.load(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.finished.emit(self.generation, entry, aus_cache)
+
+
+class EvaluationService(QObject):
+    """Führt Auswertungen im Thread-Pool aus und liefert nur das Ergebnis der neuesten Anfrage."""
+
+    evaluationFinished = Signal(int, object, bool)
+    evaluationFailed = Signal(int, str)
+
+    def __init__(self, prefetcher, parent=None):
+        super().__init__(parent)
+        self.prefetcher = prefetcher
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(MAX_THREADS)
+        self._generation = 0
+        self._tasks = {}  # Generation → Task (Signale am Leben halten, bis das Ergebnis da ist)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self._generation
+
+    def submit(self, fahrer, fahrzeug, kw) -> int:
+        """Startet eine Auswertung und löst alle vorherigen ab; Rückgabe: Generation."""
+        self.cancel()
+        generation = self._generation
+        task = _EvaluationTask(self, generation, fahrer, fahrzeug, kw)
+        task.setAutoDelete(False)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        task.signals.skipped.connect(self._on_skipped)
+        self._tasks[generation] = task
+        self._pool.start(task)
+        return generation
+
+    def cancel(self) -> None:
+        """Verwirft laufende und wartende Auswertungen (Ergebnisse werden nicht mehr geliefert)."""
+        self._generation += 1
+        for generation, task in list(self._tasks.items()):
+            # Noch wartende Tasks aus der Warteschlange nehmen; laufende melden sich selbst ab
+            if self._pool.tryTake(task):
+                del self._tasks[generation]
+
+    @Slot(int, object, bool)
+    def _on_finished(self, generation, entry, aus_cache):
+        self._tasks.pop(generation, None)
+        if self.is_current(generation):
+            self.evaluationFinished.emit(generation, entry, aus_cache)
+
+    @Slot(int, str)
+    def _on_failed(self, generation, message):
+        self._tasks.pop(generation, None)
+        if self.is_current(generation):
+            self.evaluationFailed.emit(generation, message)
+
+    @Slot(int)
+    def _on_skipped(self, generation):
+        self._tasks.pop(generation, None)
@@ -0,0 +1,158 @@
+"""
+Inkrementelle Neuberechnung der Abrechnungsformeln.
+
+Die Formeln bilden einen kleinen Abhängigkeitsgraphen:
+
+    Eingaben (Faktoren, Umsätze, Deal, ...) → Plattform-Anteile → Anteil → Income → Ergebnis
+
+set_inputs übernimmt alle Eingaben, berechnet nur Knoten neu, deren
+Abhängigkeiten sich geändert haben, und bricht ab, sobald ein Knoten wieder
+denselben Wert liefert. Zurück kommt die Menge der geänderten Namen; daraus
+leitet die Abrechnungsseite ab, welche Properties sie melden muss.
+
+    graph = build_billing_graph()
+    changed = graph.set_inputs({"taxi_faktor": 0.45})
+    if "income" in changed: ...
+"""
+
+import calendar
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Set, Tuple
+
+# Eingaben mit Startwert
+BILLING_INPUTS = {
+    "deal": "",
+    "pauschale": 0.0,
+    "umsatzgrenze": 0.0,
+    "gesamt_umsatz": 0.0,
+    "taxi_umsatz": 0.0,
+    "uber_umsatz": 0.0,
+    "bolt_umsatz": 0.0,
+    "einsteiger": 0.0,
+    "tank": 0.0,
+    "taxi_faktor": 0.0,
+    "uber_faktor": 0.0,
+    "bolt_faktor": 0.0,
+    "einsteiger_faktor": 0.0,
+    "tank_faktor": 0.0,
+    "garage_faktor": 0.5,
+    "monthly_garage": 0.0,
+    "kw": "",
+    "expenses": 0.0,
+    "credit_card": 0.0,
+}
+
+
+class RecalcGraph:
+    """Eingaben plus abgeleitete Knoten in topologischer Reihenfolge (Reihenfolge von add_node)."""
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._inputs: Set[str] = set()
+        self._nodes: List[Tuple[str, Tuple[str, ...], Callable]] = []
+        self.evaluations = 0  # Anzahl Knotenberechnungen (Diagnose)
+
+    def add_input(self, name: str, value: Any) -> None:
+        self._inputs.add(name)
+        self._values[name] = value
+
+    def add_node(self, name: str, deps: Tuple[str, ...], fn: Callable) -> None:
+        missing = [dep for dep in deps if dep not in self._values]
+        if missing:
+            raise KeyError(f"Unbekannte Abhängigkeit für {name}: {missing}")
+        self._nodes.append((name, tuple(deps), fn))
+        self._values[name] = fn(*(self._values[dep] for dep in deps))
+
+    def __getitem__(self, name: str) -> Any:
+        return self._values[name]
+
+    def set_inputs(self, values: Mapping[str, Any]) -> Set[str]:
+        """Übernimmt Eingaben und rechnet nur betroffene Knoten neu; Rückgabe: geänderte Namen."""
+        changed = set()
+        for name, value in values.items():
+            if name not in self._inputs:
+                raise KeyError(f"Unbekannte Eingabe: {name}")
+            if self._values[name] != value:
+                self._values[name] = value
+                changed.add(name)
+        if not changed:
+            return changed
+        for name, deps, fn in self._nodes:
+            if changed.isdisjoint(deps):
+                continue
+            self.evaluations += 1
+            value = fn(*(self._values[dep] for dep in deps))
+            if value != self._values[name]:
+                self._values[name] = value
+                changed.add(name)
+        return changed
+
+
+def tagesgarage(monthly_garage: float, kw, jahr: int) -> float:
+    """Garage-Kosten je Abrechnungswoche: Monatsbetrag ÷ Anzahl Montage im Monat der KW."""
+    if monthly_garage <= 0 or not kw:
+        return 0.0
+    try:
+        kw_int = int(str(kw).replace("KW", ""))
+        erster_tag_kw = datetime.strptime(f'{jahr}-W{kw_int}-1', "%Y-W%W-%w")
+        monat = erster_tag_kw.month
+        cal = calendar.Calendar(firstweekday=0)
+        anzahl_montage = sum(1 for d in cal.itermonthdates(jahr, monat) if d.weekday() == 0 and d.month == monat)
+    except ValueError:
+        return 0.0
+    return monthly_garage / anzahl_montage if anzahl_montage else 0.0
+
+
+def _p_anteil(pauschale, gesamt_umsatz, umsatzgrenze):
+    # Pauschale + 10 % Bonus vom Umsatz über der Umsatzgrenze
+    if gesamt_umsatz > umsatzgrenze:
+        return pauschale + (gesamt_umsatz - umsatzgrenze) * 0.1
+    return pauschale
+
+
+def _anteil(deal, p_anteil, prozent_anteil, c_anteil, standard_anteil):
+    if deal == "P":
+        return p_anteil
+    if deal == "%":
+        return prozent_anteil
+    if deal == "C":
+        return c_anteil
+    return standard_anteil
+
+
+def build_billing_graph() -> RecalcGraph:
+    """Graph der Abrechnungsformeln (P-, %-, C- und Standard-Deal)."""
+    graph = RecalcGraph()
+    for name, value in BILLING_INPUTS.items():
+        graph.add_input(name, value)
+    graph.add_input("jahr", datetime.now().year)
+
+    # Garage
+    graph.add_node("tagesgarage", ("monthly_garage", "kw", "jahr"), tagesgarage)
+    graph.add_node("garage_abzug", ("tagesgarage", "garage_faktor"), lambda g, f: g * f)
+
+    # Plattform-Anteile (C-Deal)
+    graph.add_node("taxi_anteil", ("taxi_umsatz", "taxi_faktor"), lambda u, f: u * f)
+    graph.add_node("uber_anteil", ("uber_umsatz", "uber_faktor"), lambda u, f: u * f)
+    graph.add_node("bolt_anteil", ("bolt_umsatz", "bolt_faktor"), lambda u, f: u * f)
+    graph.add_node("einsteiger_anteil", ("einsteiger", "einsteiger_faktor"), lambda u, f: u * f)
+    graph.add_node("tank_anteil", ("tank", "tank_faktor"), lambda u, f: u * f)
+
+    # Anteil je Deal-Typ
+    graph.add_node("p_anteil", ("pauschale", "gesamt_umsatz", "umsatzgrenze"), _p_anteil)
+    graph.add_node("prozent_anteil", ("taxi_umsatz", "uber_umsatz", "bolt_umsatz", "einsteiger"),
+                   lambda taxi, uber, bolt, einsteiger: (taxi + uber + bolt) * 0.5 + einsteiger * 0.5)
+    graph.add_node("c_anteil", ("taxi_anteil", "uber_anteil", "bolt_anteil", "einsteiger_anteil",
+                                "tank_anteil", "garage_abzug"),
+                   lambda taxi, uber, bolt, einsteiger, tank, garage: taxi + uber + bolt + einsteiger - tank - garage)
+    graph.add_node("standard_anteil", ("gesamt_umsatz",), lambda umsatz: umsatz * 0.5)
+    graph.add_node("anteil", ("deal", "p_anteil", "prozent_anteil", "c_anteil", "standard_anteil"), _anteil)
+
+    # Income: Anteil minus Tank (nur %-Deal 50 %; beim C-Deal schon im Anteil), Garage und Expenses
+    graph.add_node("tank_abzug", ("deal", "tank"), lambda deal, tank: tank * 0.5 if deal == "%" else 0.0)
+    graph.add_node("income", ("anteil", "tank_abzug", "garage_abzug", "expenses"),
+                   lambda anteil, tank, garage, expenses: anteil - tank - garage - expenses)
+
+    # Abrechnungsergebnis: Bankomat minus Income
+    graph.add_node("abrechnungsergebnis", ("credit_card", "income"), lambda credit_card, income: credit_card - income)
+    return graph
@@ -0,0 +1,126 @@
+"""
+Zahlenmodell einer Abrechnung (Fahrer, Fahrzeug, KW).
+
+_collect_platform_data füllt je Plattform ein PlatformResult genau einmal;
+Anteil, Income und Ergebnis (auch bei jeder Slider-Bewegung im Overlay)
+lesen nur noch diese Floats. Formatiert ("123.45 €") wird erst an der
+QML-Grenze:
+
+    billing = BillingResult(einsteiger=120.0)
+    billing.taxi_40100.add(PlatformResult.from_taxi(totals))
+    billing.umsatz("Taxi") * taxi_faktor
+"""
+
+from dataclasses import dataclass, field
+
+TAXI_PLATFORMS = ("Taxi", "40100", "31300")
+
+
+def parse_betrag(value) -> float:
+    """Eingabe aus QML ('12,50', '12.50 €', '', 0.0) als Float; ungültig → 0.0."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value or "").replace("€", "").replace(",", ".").strip()
+    try:
+        return float(text) if text else 0.0
+    except ValueError:
+        return 0.0
+
+
+@dataclass(slots=True)
+class PlatformResult:
+    """Summen einer Plattform; alle Felder sind über mehrere Quellen addierbar."""
+    total: float = 0.0             # Brutto: Taxi Fahrten ±250 €, Uber gross_total, Bolt net_earnings
+    umsatz: float = 0.0            # echter Umsatz (ohne Trinkgeld) – Basis für Anteil und Deals
+    trinkgeld: float = 0.0         # Trinkgeld für HeadCard/Kreditkarte
+    trinkgeld_gesamt: float = 0.0
+    bargeld: float = 0.0
+    restbetrag: float = 0.0
+    quellen: int = 0               # Anzahl eingeflossener Datenquellen
+
+    @property
+    def anteil(self) -> float:
+        return self.umsatz / 2
+
+    @property
+    def vorhanden(self) -> bool:
+        return self.quellen > 0
+
+    def add(self, other: "PlatformResult") -> None:
+        self.total += other.total
+        self.umsatz += other.umsatz
+        self.trinkgeld += other.trinkgeld
+        self.trinkgeld_gesamt += other.trinkgeld_gesamt
+        self.bargeld += other.bargeld
+        self.restbetrag += other.restbetrag
+        self.quellen += other.quellen
+
+    @classmethod
+    def from_taxi(cls, totals) -> "PlatformResult":
+        """Aus taxi_totals.TaxiTotals (40100 bzw. 31300)."""
+        return cls(totals.umsatz, totals.echter_umsatz, totals.trinkgeld, totals.trinkgeld_gesamt,
+                   totals.bargeld, totals.restbetrag, 1)
+
+    @classmethod
+    def from_uber(cls, gross_total: float, cash_collected: float) -> "PlatformResult":
+        # Uber: Gesamtbetrag bleibt bestehen (kein Trinkgeld)
+        return cls(gross_total, gross_total, 0.0, 0.0, cash_collected, gross_total / 2 - cash_collected, 1)
+
+    @classmethod
+    def from_bolt(cls, net_earnings: float, rider_tips: float, cash_collected: float) -> "PlatformResult":
+        echter_umsatz = net_earnings - rider_tips
+        return cls(net_earnings, echter_umsatz, rider_tips, rider_tips, cash_collected,
+                   echter_umsatz / 2 - cash_collected, 1)
+
+
+@dataclass(slots=True)
+class BillingResult:
+    """Alle Plattformen einer Auswertung plus Einsteiger-Eingabe."""
+    taxi_40100: PlatformResult = field(default_factory=PlatformResult)
+    taxi_31300: PlatformResult = field(default_factory=PlatformResult)
+    uber: PlatformResult = field(default_factory=PlatformResult)
+    bolt: PlatformResult = field(default_factory=PlatformResult)
+    einsteiger: float = 0.0
+
+    @property
+    def taxi(self) -> PlatformResult:
+        """40100 und 31300 zusammen."""
+        taxi = PlatformResult()
+        taxi.add(self.taxi_40100)
+        taxi.add(self.taxi_31300)
+        return taxi
+
+    def platforms(self):
+        return (self.taxi_40100, self.taxi_31300, self.uber, self.bolt)
+
+    def umsatz(self, platform: str) -> float:
+        """Umsatz für Deal-Berechnungen: 'Taxi' (40100 + 31300), '40100', '31300', 'Uber', 'Bolt', 'Einsteiger'."""
+        if platform == "Taxi":
+            return self.taxi_40100.umsatz + self.taxi_31300.umsatz
+        if platform == "40100":
+            return self.taxi_40100.umsatz
+        if platform == "31300":
+            return self.taxi_31300.umsatz
+        if platform == "Uber":
+            return self.uber.umsatz
+        if platform == "Bolt":
+            return self.bolt.umsatz
+        if platform == "Einsteiger":
+            return self.einsteiger
+        return 0.0
+
+    @property
+    def gesamt_umsatz(self) -> float:
+        return sum(p.umsatz for p in self.platforms())
+
+    @property
+    def trinkgeld(self) -> float:
+        return sum(p.trinkgeld for p in self.platforms())
+
+    @property
+    def trinkgeld_gesamt(self) -> float:
+        return sum(p.trinkgeld_gesamt for p in self.platforms())
+
+    @property
+    def bargeld(self) -> float:
+        return sum(p.bargeld for p in self.platforms())
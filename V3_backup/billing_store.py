@@ -0,0 +1,140 @@
+"""
+Gemeinsame Schreibverbindung für das Speichern einer Abrechnung.
+
+Eine Abrechnung schreibt in drei Dateien: den Umsatz in revenue.db, die
+Ausgaben in running_costs.db und Pauschale/Speicherstand in database.db.
+Statt drei Verbindungen mit drei Commits wird database.db als 'main' geöffnet
+und die beiden anderen Dateien per ATTACH eingebunden. Alle Schreibvorgänge
+laufen in einer Transaktion mit genau einem Commit; bei einem Fehler wird
+alles zurückgerollt.
+
+    with billing_transaction() as conn:
+        conn.execute(f"INSERT INTO {qualified(REVENUE_SCHEMA, 'W135CTX')} ...")
+
+Rückfragen (z.B. bei Duplikaten) laufen vorher über find_revenue_conflicts
+mit einem reinen Lesezugriff; die Schreibtransaktion selbst wartet nie auf
+den Benutzer und hält die Sperren nur Millisekunden.
+
+Hinweis: database.db läuft im WAL-Modus. SQLite garantiert dann die
+Atomarität je Datei; ein Stromausfall genau während des Commits ist über
+Dateigrenzen hinweg nicht abgedeckt. Gegen Abbrüche durch Exceptions oder
+Dialog-Abbruch (der bisherige Fall halb gespeicherter Abrechnungen) schützt
+die eine Transaktion vollständig.
+"""
+
+import os
+import sqlite3
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+MAIN_SCHEMA = "main"
+REVENUE_SCHEMA = "revenue_db"
+RUNNING_COSTS_SCHEMA = "running_costs_db"
+
+# Schema-Alias → Datei im SQL-Ordner
+ATTACHED_DATABASES = {
+    REVENUE_SCHEMA: "revenue.db",
+    RUNNING_COSTS_SCHEMA: "running_costs.db",
+}
+
+BUSY_TIMEOUT = 10.0
+
+# (Fahrzeug, KW, Fahrer) – Schlüssel eines Revenue-Eintrags
+RevenueKey = Tuple[str, int, str]
+
+
+def qualified(schema: str, table: str) -> str:
+    """Schema-qualifizierter, gequoteter Tabellenname, z.B. revenue_db."W135CTX"."""
+    return f'{schema}."{table.replace(chr(34), chr(34) * 2)}"'
+
+
+def open_billing_connection(sql_dir: str = "SQL") -> sqlite3.Connection:
+    """database.db als main, revenue.db und running_costs.db per ATTACH eingebunden."""
+    conn = sqlite3.connect(os.path.join(sql_dir, "database.db"), timeout=BUSY_TIMEOUT)
+    try:
+        for schema, filename in ATTACHED_DATABASES.items():
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (os.path.join(sql_dir, filename),))
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+@contextmanager
+def billing_transaction(sql_dir: str = "SQL") -> Iterator[sqlite3.Connection]:
+    """Eine Schreibtransaktion über alle drei Dateien; Commit nur, wenn der Block fehlerfrei endet."""
+    conn = open_billing_connection(sql_dir)
+    try:
+        # IMMEDIATE: Schreibsperren sofort; Rückfragen sind zu diesem Zeitpunkt bereits beantwortet
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _tables(conn: sqlite3.Connection, schema: str) -> Set[str]:
+    return {row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")}
+
+
+def find_revenue_conflicts(keys: Iterable[RevenueKey], sql_dir: str = "SQL") -> Dict[RevenueKey, dict]:
+    """Sucht bestehende Revenue-Einträge für alle Schlüssel in einem Lesevorgang.
+
+    Liefert je Konflikt den Eintrag (id, deal, total, income, timestamp) und die
+    Ausgaben der KW als Liste von {category, amount}. Es wird nichts geschrieben.
+    """
+    by_plate: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+    for plate, cw, driver in keys:
+        if plate and cw is not None:
+            by_plate[plate].append((int(cw), driver))
+    if not by_plate:
+        return {}
+
+    conflicts: Dict[RevenueKey, dict] = {}
+    conn = open_billing_connection(sql_dir)
+    try:
+        # Ein Lese-Snapshot über beide Dateien
+        conn.execute("BEGIN")
+        revenue_tables = _tables(conn, REVENUE_SCHEMA)
+        cost_tables = _tables(conn, RUNNING_COSTS_SCHEMA)
+        for plate, plate_keys in by_plate.items():
+            if plate not in revenue_tables:
+                continue
+            where = " OR ".join(["(cw = ? AND driver = ?)"] * len(plate_keys))
+            params = [value for key in plate_keys for value in key]
+            rows = conn.execute(
+                f"SELECT id, cw, driver, deal, total, income, timestamp FROM {qualified(REVENUE_SCHEMA, plate)} "
+                f"WHERE {where} ORDER BY id",
+                params,
+            ).fetchall()
+            if not rows:
+                continue
+
+            expenses: Dict[int, List[dict]] = defaultdict(list)
+            if plate in cost_tables:
+                weeks = sorted({row[1] for row in rows})
+                for cw, category, amount in conn.execute(
+                    f"SELECT cw, category, amount FROM {qualified(RUNNING_COSTS_SCHEMA, plate)} "
+                    f"WHERE cw IN ({', '.join('?' * len(weeks))}) ORDER BY id",
+                    weeks,
+                ):
+                    expenses[cw].append({"category": category, "amount": float(amount or 0)})
+
+            for entry_id, cw, driver, deal, total, income, timestamp in rows:
+                # Bei mehrfachen Einträgen zählt der erste (wie fetchone im bisherigen Speicherpfad)
+                conflicts.setdefault((plate, cw, driver), {
+                    "id": entry_id,
+                    "deal": deal,
+                    "total": float(total or 0),
+                    "income": float(income or 0),
+                    "timestamp": timestamp,
+                    "expenses": expenses.get(cw, []),
+                })
+    finally:
+        conn.rollback()
+        conn.close()
+    return conflicts
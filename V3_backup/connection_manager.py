@@ -0,0 +1,274 @@
+"""
+Gemeinsame SQLite-Verbindungen für alle Backends.
+
+Statt eigener Pools je Seite (Abrechnung, DBManager, DataManager,
+Mitarbeiter) hält ein prozessweiter ConnectionManager genau eine
+Verbindung je Thread und Datenbankdatei:
+
+- Jede Verbindung bekommt dieselben PRAGMAs (WAL, mmap, Cache, ...) und
+  einen größeren Statement-Cache.
+- close() gibt nur die Ausleihe zurück; offene Transaktionen werden dabei
+  wie bisher verworfen, sobald die letzte Ausleihe des Threads endet.
+- Verschachtelte Ausleihen (z.B. eine Hilfsfunktion mit eigenem connect()
+  innerhalb einer offenen Ausleihe) teilen sich Verbindung und Transaktion:
+  commit()/rollback() der inneren Ausleihe gilt auch für die Änderungen der
+  äußeren. Wer eine eigene Transaktion braucht, nutzt eine eigene
+  sqlite3-Verbindung (wie billing_store).
+- row_factory gilt je Ausleihe und wird auf die Cursor gesetzt, nicht auf
+  die Verbindung; eine innere Ausleihe ändert die Zeilen der äußeren nicht.
+- Nach längerer Pause wird die Verbindung vor der Ausgabe geprüft und bei
+  Bedarf neu geöffnet.
+- stats() liefert Kennzahlen (geöffnet, wiederverwendet, Fehler, ...).
+
+    conn = connect("SQL/database.db")          # Ersatz für sqlite3.connect
+    try:
+        conn.execute("SELECT 1")
+    finally:
+        conn.close()
+
+    with connection("SQL/revenue.db", row_factory=sqlite3.Row) as conn:
+        ...
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Tuple
+
+# Für alle Datenbanken gleich; foreign_keys wird für ON DELETE CASCADE (drivers) gebraucht
+DEFAULT_PRAGMAS: Tuple[Tuple[str, str], ...] = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("foreign_keys", "ON"),
+    ("cache_size", "-16000"),          # 16 MB Page-Cache
+    ("temp_store", "MEMORY"),
+    ("mmap_size", str(64 * 1024 * 1024)),
+)
+BUSY_TIMEOUT = 30                      # Sekunden
+STATEMENT_CACHE = 256                  # vorbereitete Statements je Verbindung
+HEALTH_CHECK_INTERVAL = 30.0           # Sekunden Leerlauf bis zur Prüfung
+
+
+class SharedConnection(sqlite3.Connection):
+    """Verbindung eines Threads; close() beendet nur die Ausleihe."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._leases = 0
+        self._row_factories = []       # je Ausleihe, innerste zuletzt
+        self._last_used = time.monotonic()
+        self._manager = None
+        self._key = None
+
+    def cursor(self, *args, **kwargs):
+        cursor = super().cursor(*args, **kwargs)
+        if self._row_factories and self._row_factories[-1] is not None:
+            cursor.row_factory = self._row_factories[-1]
+        return cursor
+
+    # Die Kurzformen der Verbindung umgehen cursor(), daher hier über cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def close(self):
+        if self._manager is not None:
+            self._manager.release(self)
+        else:
+            super().close()
+
+    def _close_connection(self):
+        super().close()
+
+
+@dataclass
+class ConnectionStats:
+    opened: int = 0                    # neu geöffnete Verbindungen
+    acquired: int = 0                  # Ausleihen insgesamt
+    reused: int = 0                    # Ausleihen ohne neues connect
+    health_checks: int = 0
+    health_failures: int = 0           # defekte Verbindungen, neu geöffnet
+    pragma_failures: int = 0           # z. B. WAL bei gesperrter Datei
+    rollbacks: int = 0                 # beim Zurückgeben verworfene Transaktionen
+
+
+class ConnectionManager:
+    """Eine Verbindung je (Thread, Datenbankdatei) mit einheitlichen PRAGMAs."""
+
+    def __init__(self, pragmas=DEFAULT_PRAGMAS, timeout: float = BUSY_TIMEOUT,
+                 cached_statements: int = STATEMENT_CACHE, health_check_interval: float = HEALTH_CHECK_INTERVAL):
+        self.pragmas = tuple(pragmas)
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.health_check_interval = health_check_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = ConnectionStats()
+        # Alle offenen Verbindungen (auch anderer Threads) für close_all; beendete Threads fallen weg
+        self._connections = weakref.WeakSet()
+
+    @staticmethod
+    def _key(db_path) -> str:
+        db_path = str(db_path)
+        return db_path if db_path == ":memory:" else os.path.abspath(db_path)
+
+    def _thread_connections(self) -> Dict[str, SharedConnection]:
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        return self._local.connections
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self._stats, field, getattr(self._stats, field) + 1)
+
+    def _open(self, key: str) -> SharedConnection:
+        # check_same_thread=False nur, damit close_all aus dem Hauptthread schließen darf;
+        # ausgegeben wird jede Verbindung ausschließlich an ihren eigenen Thread
+        conn = sqlite3.connect(key, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements, factory=SharedConnection)
+        for name, value in self.pragmas:
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.Error:
+                self._count("pragma_failures")
+        conn._manager = self
+        conn._key = key
+        with self._lock:
+            self._connections.add(conn)
+        self._count("opened")
+        return conn
+
+    def _healthy(self, conn: SharedConnection) -> bool:
+        if time.monotonic() - conn._last_used < self.health_check_interval:
+            return True
+        self._count("health_checks")
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            self._count("health_failures")
+            return False
+
+    def acquire(self, db_path, row_factory=None) -> SharedConnection:
+        """Verbindung des aktuellen Threads für db_path; mit close() bzw. release() zurückgeben."""
+        key = self._key(db_path)
+        connections = self._thread_connections()
+        conn = connections.get(key)
+        if conn is not None and not self._healthy(conn):
+            self._discard(connections, key)
+            conn = None
+        if conn is None:
+            conn = self._open(key)
+            connections[key] = conn
+        else:
+            self._count("reused")
+        self._count("acquired")
+        conn._row_factories.append(row_factory)
+        conn._leases += 1
+        conn._last_used = time.monotonic()
+        return conn
+
+    def release(self, conn: SharedConnection) -> None:
+        """Beendet eine Ausleihe; nach der letzten wird eine offene Transaktion verworfen."""
+        conn._leases = max(0, conn._leases - 1)
+        if conn._row_factories:
+            conn._row_factories.pop()
+        conn._last_used = time.monotonic()
+        if conn._leases == 0:
+            # Direkt gesetzte row_factory nicht an die nächste Ausleihe weitergeben
+            conn.row_factory = None
+        if conn._leases == 0 and conn.in_transaction:
+            try:
+                conn.rollback()
+                self._count("rollbacks")
+            except sqlite3.Error:
+                pass
+
+    def _discard(self, connections: Dict[str, SharedConnection], key: str) -> None:
+        conn = connections.pop(key, None)
+        if conn is None:
+            return
+        with self._lock:
+            self._connections.discard(conn)
+        try:
+            conn._close_connection()
+        except sqlite3.Error:
+            pass
+
+    @contextmanager
+    def connection(self, db_path, row_factory=None):
+        """Context Manager: Ausleihe mit Rollback bei Fehlern."""
+        conn = self.acquire(db_path, row_factory)
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            self.release(conn)
+
+    def close_thread_connections(self) -> None:
+        """Schließt alle Verbindungen des aktuellen Threads (z. B. am Ende eines Worker-Threads)."""
+        connections = self._thread_connections()
+        for key in list(connections):
+            self._discard(connections, key)
+
+    def close_all(self) -> None:
+        """Schließt alle Verbindungen aller Threads (beim Beenden der Anwendung)."""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn._close_connection()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def stats(self) -> Dict:
+        """Kennzahlen als Dict, dazu offene Verbindungen gesamt und je Datenbank."""
+        with self._lock:
+            stats = asdict(self._stats)
+            databases: Dict[str, int] = {}
+            for conn in self._connections:
+                databases[conn._key] = databases.get(conn._key, 0) + 1
+        stats["open"] = sum(databases.values())
+        stats["databases"] = databases
+        return stats
+
+
+# Globale Instanz
+_connection_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_connection_manager() -> ConnectionManager:
+    """Gibt den prozessweiten ConnectionManager zurück"""
+    global _connection_manager
+    if _connection_manager is None:
+        with _manager_lock:
+            if _connection_manager is None:
+                _connection_manager = ConnectionManager()
+    return _connection_manager
+
+
+def connect(db_path, row_factory=None) -> SharedConnection:
+    """Ersatz für sqlite3.connect: gemeinsame Verbindung des Threads, close() gibt sie zurück."""
+    return get_connection_manager().acquire(db_path, row_factory)
+
+
+def connection(db_path, row_factory=None):
+    """Context Manager über die gemeinsame Verbindung des Threads."""
+    return get_connection_manager().connection(db_path, row_factory)
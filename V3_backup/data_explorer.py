@@ -0,0 +1,310 @@
+"""
+Abfragebasierter Daten-Explorer für die Datenseite.
+
+Zeitraum, Fahrer, Plattform und Suchtext der Datenseite werden in
+parametrisierte Abfragen auf die 'reports'-Tabellen der Plattform-
+Datenbanken (uber, bolt, 40100, 31300) übersetzt. Noch nicht migrierte
+report_KW-Tabellen (platform_reports.legacy_week_tables) werden mit
+abgefragt, und zwar nur ihre Zeilen ohne Jahr (legacy_rows_filter; die vom
+Import geschriebenen stehen schon in 'reports'). Sie zählen zum laufenden
+Jahr (legacy_year), ihre Zeilen-IDs sind negativ. Der Umsatz der
+Taxi-Plattformen entspricht der Abrechnung (taxi_totals: Einzelumsätze
+zwischen -250 und 250 €, abzüglich Trinkgeld). Geblättert wird per
+Keyset über (year, kw, id) – jede Seite nutzt idx_reports_year_kw und
+beginnt direkt hinter der letzten Zeile der vorherigen Seite, statt mit
+OFFSET alle vorherigen Zeilen erneut zu lesen. Die Plattformen werden
+dabei zu einer gemeinsamen, nach Woche absteigenden Liste gemischt.
+
+    explorer = DataExplorer("SQL")
+    filt = ExplorerFilter(time_range="month", platform="uber")
+    since = explorer.since(filt)
+    seite = explorer.page(filt, since=since)
+    weiter = explorer.page(filt, seite.cursor, since=since)
+"""
+
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from connection_manager import connection
+from platform_reports import PLATFORM_DB_FILES, REPORT_TABLE, amount_sql, legacy_rows_filter, legacy_week_tables
+from taxi_totals import MAX_UMSATZ_PRO_FAHRT, MIN_UMSATZ_PRO_FAHRT
+
+PAGE_SIZE = 200
+
+# Zeitraum der Datenseite → Anzahl Wochen bis zur neuesten importierten Woche
+TIME_RANGE_WEEKS = {"week": 1, "month": 5, "quarter": 13, "year": 52}
+
+
+def _taxi_betrag(column: str) -> str:
+    return f"COALESCE({amount_sql(column)}, 0)"
+
+
+def _im_rahmen(betrag: str) -> str:
+    return f"{betrag} BETWEEN {MIN_UMSATZ_PRO_FAHRT} AND {MAX_UMSATZ_PRO_FAHRT}"
+
+
+# Spalten je Plattform auf eine einheitliche Zeile abgebildet (Beträge wie in der Abrechnung;
+# ältere report_KW-Tabellen können Beträge noch als Text führen, daher amount_sql)
+PLATFORM_FIELDS: Dict[str, Dict[str, str]] = {
+    "uber": {
+        "driver": "COALESCE(NULLIF(TRIM(COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')), ''), driver_name, '')",
+        "vehicle": "''",
+        "earnings": f"COALESCE({amount_sql('gross_total')}, 0)",
+        "tips": "0.0",
+        "cash": f"COALESCE({amount_sql('cash_collected')}, 0)",
+    },
+    "bolt": {
+        "driver": "COALESCE(driver_name, '')",
+        "vehicle": "''",
+        "earnings": f"COALESCE({amount_sql('net_earnings')}, 0)",
+        "tips": f"COALESCE({amount_sql('rider_tips')}, 0)",
+        "cash": f"COALESCE({amount_sql('cash_collected')}, 0)",
+    },
+    "40100": {
+        "driver": "COALESCE(Fahrername, Fahrer, '')",
+        "vehicle": "COALESCE(Fahrzeug, '')",
+        # Je Zeile: Umsatz im Rahmen minus Trinkgeld, summiert = TaxiTotals.echter_umsatz
+        "earnings": (f"CASE WHEN {_im_rahmen(_taxi_betrag('Umsatz'))} THEN {_taxi_betrag('Umsatz')} ELSE 0.0 END"
+                     f" - {_taxi_betrag('Trinkgeld')}"),
+        "tips": _taxi_betrag("Trinkgeld"),
+        "cash": f"CASE WHEN {_im_rahmen(_taxi_betrag('Umsatz'))} THEN {_taxi_betrag('Bargeld')} ELSE 0.0 END",
+    },
+    "31300": {
+        "driver": "COALESCE(Fahrername, Fahrer, '')",
+        "vehicle": "COALESCE(Fahrzeug, '')",
+        "earnings": (f"CASE WHEN {_im_rahmen(_taxi_betrag('Gesamt'))} THEN {_taxi_betrag('Gesamt')} ELSE 0.0 END"
+                     f" - {_taxi_betrag('Trinkgeld')}"),
+        "tips": _taxi_betrag("Trinkgeld"),
+        # Kein Bargeld-Feld: Bar-Buchungen wie in taxi_totals
+        "cash": f"CASE WHEN COALESCE(instr(Buchungsart, 'Bar'), 0) > 0 THEN {_taxi_betrag('Gesamt')} ELSE 0.0 END",
+    },
+}
+
+Week = Tuple[int, int]
+Key = Tuple[int, int, int]     # (year, kw, id)
+
+
+class _Source(NamedTuple):
+    """Abgefragte Tabelle einer Plattform mit SQL-Ausdrücken für Jahr, KW und Zeilen-ID."""
+    table: str
+    year: str
+    kw: str
+    id: str
+    rows: str = ""      # zusätzliche Bedingung (Zeilen ohne Jahr einer report_KW-Tabelle)
+
+    @property
+    def order(self) -> str:
+        # Feste Jahr/KW (report_KW-Tabellen) nicht sortieren: Zahlen wären Spaltennummern
+        return ", ".join(f"{expr} DESC" for expr in (self.year, self.kw, self.id) if not expr.isdigit())
+
+
+REPORTS_SOURCE = _Source(REPORT_TABLE, "year", "kw", "id")
+
+
+@dataclass(frozen=True)
+class ExplorerFilter:
+    """Eingaben der Datenseite ('all' bzw. leer = kein Filter)."""
+    time_range: str = "week"
+    driver: str = "all"
+    platform: str = "all"
+    search: str = ""
+
+    def platforms(self) -> Tuple[str, ...]:
+        platform = str(self.platform or "all").lower()
+        if platform == "all":
+            return tuple(PLATFORM_DB_FILES)
+        return (platform,) if platform in PLATFORM_DB_FILES else ()
+
+
+@dataclass
+class ExplorerPage:
+    rows: List[dict]
+    cursor: Dict[str, Key] = field(default_factory=dict)     # letzte gelieferte Zeile je Plattform
+    exhausted: FrozenSet[str] = frozenset()                  # Plattformen ohne weitere Zeilen
+    has_more: bool = False
+
+
+def weeks_back(week: Week, weeks: int) -> Week:
+    """(Jahr, KW), die weeks-1 Wochen vor week liegt (ISO-Kalender)."""
+    year, kw = week
+    try:
+        monday = date.fromisocalendar(year, kw, 1)
+    except ValueError:
+        monday = date.fromisocalendar(year, 52, 1)  # KW 53 in Jahren ohne KW 53
+    start = monday - timedelta(weeks=max(weeks, 1) - 1)
+    iso = start.isocalendar()
+    return iso[0], iso[1]
+
+
+def _like(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class DataExplorer:
+    """Seitenweise Abfragen über alle Plattform-Datenbanken eines SQL-Ordners."""
+
+    def __init__(self, sql_dir: str = "SQL", page_size: int = PAGE_SIZE, legacy_year: Optional[int] = None):
+        self.sql_dir = sql_dir
+        self.page_size = page_size
+        # Jahr der report_KW-Tabellen ohne Jahresbezug (wie platform_reports --jahr)
+        self.legacy_year = int(legacy_year or datetime.now().year)
+
+    def _db_path(self, platform: str) -> Optional[str]:
+        path = os.path.join(self.sql_dir, PLATFORM_DB_FILES[platform])
+        # Fehlende Datenbanken nicht durch connect anlegen
+        return path if os.path.exists(path) else None
+
+    def _sources(self, conn) -> List[_Source]:
+        """'reports' (falls vorhanden) und die noch nicht migrierten report_KW-Tabellen."""
+        sources = []
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                        (REPORT_TABLE,)).fetchone():
+            sources.append(REPORTS_SOURCE)
+        for kw, table in sorted(legacy_week_tables(conn).items()):
+            sources.append(_Source(f'"{table}"', str(self.legacy_year), str(kw), "-rowid",
+                                   legacy_rows_filter(conn, table)))
+        return sources
+
+    def latest_week(self, filt: ExplorerFilter) -> Optional[Week]:
+        """Neueste importierte (Jahr, KW) der gewählten Plattformen (ein Indexzugriff je Datenbank)."""
+        latest = None
+        for platform in filt.platforms():
+            path = self._db_path(platform)
+            if path is None:
+                continue
+            try:
+                with connection(path) as conn:
+                    weeks = []
+                    for source in self._sources(conn):
+                        row = conn.execute(
+                            f"SELECT {source.year}, {source.kw} FROM {source.table} WHERE {source.rows or 1} "
+                            f"ORDER BY {source.order} LIMIT 1"
+                        ).fetchone()
+                        if row:
+                            weeks.append((int(row[0]), int(row[1])))
+            except Exception as e:
+                print(f"⚠️ Explorer: {platform} nicht lesbar: {e}")
+                continue
+            if weeks and (latest is None or max(weeks) > latest):
+                latest = max(weeks)
+        return latest
+
+    def since(self, filt: ExplorerFilter) -> Optional[Week]:
+        """Untergrenze (Jahr, KW) des Zeitraums; None = alle Wochen."""
+        weeks = TIME_RANGE_WEEKS.get(str(filt.time_range or "").lower())
+        if weeks is None:
+            return None
+        latest = self.latest_week(filt)
+        return weeks_back(latest, weeks) if latest else None
+
+    def _where(self, platform: str, filt: ExplorerFilter, since: Optional[Week],
+               after: Optional[Key] = None, source: _Source = REPORTS_SOURCE) -> Tuple[str, list]:
+        fields = PLATFORM_FIELDS[platform]
+        clauses, params = [], []
+        if source.rows:
+            clauses.append(source.rows)
+        if since is not None:
+            clauses.append(f"({source.year}, {source.kw}) >= (?, ?)")
+            params.extend(since)
+        if after is not None:
+            clauses.append(f"({source.year}, {source.kw}, {source.id}) < (?, ?, ?)")
+            params.extend(after)
+        driver = str(filt.driver or "").strip()
+        if driver and driver.lower() != "all":
+            clauses.append(f"{fields['driver']} LIKE ? ESCAPE '\\'")
+            params.append(_like(driver))
+        search = str(filt.search or "").strip()
+        if search:
+            clauses.append(f"({fields['driver']} LIKE ? ESCAPE '\\' OR {fields['vehicle']} LIKE ? ESCAPE '\\' "
+                           f"OR week LIKE ? ESCAPE '\\')")
+            params.extend([_like(search)] * 3)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _fetch(self, platform: str, filt: ExplorerFilter, since: Optional[Week], after: Optional[Key]) -> List[dict]:
+        path = self._db_path(platform)
+        if path is None:
+            return []
+        fields = PLATFORM_FIELDS[platform]
+        try:
+            with connection(path) as conn:
+                selects, params = [], []
+                for source in self._sources(conn):
+                    where, source_params = self._where(platform, filt, since, after, source)
+                    selects.append(
+                        f"SELECT {source.id} AS id, {source.year} AS year, {source.kw} AS kw, {fields['driver']}, "
+                        f"{fields['vehicle']}, {fields['earnings']}, {fields['tips']}, {fields['cash']} "
+                        f"FROM {source.table}{where} "
+                        f"ORDER BY {source.order} LIMIT ?")
+                    params.extend(source_params + [self.page_size])
+                if not selects:
+                    return []
+                if len(selects) == 1:
+                    sql = selects[0]
+                else:
+                    # Je Tabelle höchstens eine Seite, gemischt wird nur dieser Rest
+                    sql = (" UNION ALL ".join(f"SELECT * FROM ({select})" for select in selects)
+                           + " ORDER BY year DESC, kw DESC, id DESC LIMIT ?")
+                    params.append(self.page_size)
+                rows = conn.execute(sql, params).fetchall()
+        except Exception as e:
+            print(f"⚠️ Explorer: Abfrage {platform} fehlgeschlagen: {e}")
+            return []
+        return [
+            {"id": row_id, "platform": platform, "year": year, "kw": kw, "week": f"{year}-KW{kw:02d}",
+             "driver": driver, "vehicle": vehicle, "earnings": float(earnings), "tips": float(tips),
+             "cash": float(cash)}
+            for row_id, year, kw, driver, vehicle, earnings, tips, cash in rows
+        ]
+
+    def page(self, filt: ExplorerFilter, cursor: Optional[Dict[str, Key]] = None,
+             exhausted: FrozenSet[str] = frozenset(), since: Optional[Week] = None) -> ExplorerPage:
+        """Nächste Seite hinter cursor, über alle Plattformen nach (Jahr, KW) absteigend gemischt."""
+        cursor = dict(cursor or {})
+        platforms = [p for p in filt.platforms() if p not in exhausted]
+        rank = {platform: i for i, platform in enumerate(PLATFORM_DB_FILES)}
+
+        fetched = {platform: self._fetch(platform, filt, since, cursor.get(platform)) for platform in platforms}
+        merged = sorted(
+            (row for rows in fetched.values() for row in rows),
+            key=lambda row: (row["year"], row["kw"], -rank[row["platform"]], row["id"]),
+            reverse=True,
+        )[:self.page_size]
+
+        # Je Plattform ist der übernommene Teil ein Präfix ihrer (gleich sortierten) Abfrage
+        taken: Dict[str, int] = {}
+        for row in merged:
+            taken[row["platform"]] = taken.get(row["platform"], 0) + 1
+            cursor[row["platform"]] = (row["year"], row["kw"], row["id"])
+        done = set(exhausted)
+        for platform, rows in fetched.items():
+            if len(rows) < self.page_size and taken.get(platform, 0) == len(rows):
+                done.add(platform)
+        has_more = any(platform not in done for platform in filt.platforms())
+        return ExplorerPage(merged, cursor, frozenset(done), has_more)
+
+    def summary(self, filt: ExplorerFilter, since: Optional[Week] = None) -> Dict[str, Dict[str, float]]:
+        """Zeilen und Summen je Plattform für den Filter (ohne Seitenbegrenzung)."""
+        result = {}
+        for platform in filt.platforms():
+            path = self._db_path(platform)
+            if path is None:
+                continue
+            fields = PLATFORM_FIELDS[platform]
+            rows, earnings, cash = 0, 0.0, 0.0
+            try:
+                with connection(path) as conn:
+                    for source in self._sources(conn):
+                        where, params = self._where(platform, filt, since, source=source)
+                        n, e, c = conn.execute(
+                            f"SELECT COUNT(*), COALESCE(SUM({fields['earnings']}), 0), "
+                            f"COALESCE(SUM({fields['cash']}), 0) FROM {source.table}{where}", params
+                        ).fetchone()
+                        rows, earnings, cash = rows + n, earnings + e, cash + c
+            except Exception as e:
+                print(f"⚠️ Explorer: Summen {platform} fehlgeschlagen: {e}")
+                continue
+            result[platform] = {"rows": int(rows), "earnings": round(float(earnings), 2), "cash": round(float(cash), 2)}
+        return result
@@ -0,0 +1,81 @@
+"""
+QML-Modell für den Daten-Explorer der Datenseite.
+
+Die ListView holt Zeilen über canFetchMore/fetchMore nach, sobald sie ans
+Ende scrollt; jede Nachladung ist eine Keyset-Seite aus data_explorer.
+Gehalten werden nur die bisher angezeigten Seiten, nicht das ganze
+Ergebnis.
+
+    model = ExplorerModel(DataExplorer("SQL"))
+    model.reset(ExplorerFilter(time_range="month"), since)
+    engine.rootContext().setContextProperty("explorerModel", model)
+"""
+
+from PySide6.QtCore import QAbstractListModel, QByteArray, QModelIndex, Qt, Signal
+
+from data_explorer import DataExplorer, ExplorerFilter
+
+ROLE_NAMES = ("platform", "week", "driver", "vehicle", "earnings", "tips", "cash")
+
+
+class ExplorerModel(QAbstractListModel):
+    """Lazy geladene Explorer-Zeilen (Rollen: platform, week, driver, vehicle, earnings, tips, cash)."""
+
+    countChanged = Signal()
+
+    def __init__(self, explorer: DataExplorer, parent=None):
+        super().__init__(parent)
+        self._explorer = explorer
+        self._roles = {Qt.UserRole + 1 + i: name for i, name in enumerate(ROLE_NAMES)}
+        self._filter = ExplorerFilter()
+        self._since = None
+        self._rows = []
+        self._cursor = {}
+        self._exhausted = frozenset()
+        self._has_more = False
+
+    @property
+    def rows(self):
+        return self._rows
+
+    def reset(self, filt: ExplorerFilter, since=None) -> None:
+        """Neuer Filter: geladene Seiten verwerfen und die erste Seite holen."""
+        self.beginResetModel()
+        self._filter = filt
+        self._since = since
+        self._rows = []
+        self._cursor = {}
+        self._exhausted = frozenset()
+        self._has_more = True
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{row['week']} {row['platform']} {row['driver']}"
+        name = self._roles.get(role)
+        return row.get(name) if name else None
+
+    def roleNames(self):
+        return {role: QByteArray(name.encode()) for role, name in self._roles.items()}
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._has_more
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid() or not self._has_more:
+            return
+        page = self._explorer.page(self._filter, self._cursor, self._exhausted, since=self._since)
+        self._cursor, self._exhausted, self._has_more = page.cursor, page.exhausted, page.has_more
+        if page.rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(page.rows) - 1)
+            self._rows.extend(page.rows)
+            self.endInsertRows()
+            self.countChanged.emit()
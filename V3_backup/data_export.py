@@ -0,0 +1,270 @@
+"""
+Streaming-Export der Jahresdaten für die Buchhaltung.
+
+Revenue, laufende Kosten, Gehälter und Funk-Rechnungen eines Jahres werden
+blockweise (fetchmany) aus SQLite gelesen und direkt in die Zieldatei
+geschrieben – CSV, JSON, XLSX (openpyxl write-only) oder Parquet
+(pyarrow, je Block eine Row-Group). Im Speicher liegt nie mehr als ein
+Block. Fortschritt geht über einen Callback, Abbruch über ein Event; die
+Datei entsteht als '.part' und wird erst am Ende umbenannt.
+
+    cancel = threading.Event()
+    export_dataset("SQL", "revenue", 2025, "xlsx", "exports/revenue_2025.xlsx",
+                   progress=lambda done, total: ..., cancel=cancel)
+"""
+
+import csv
+import json
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from connection_manager import connection
+from vehicle_ledger import LEDGER_DB_FILES, REVENUE, RUNNING_COSTS
+
+# Optionale Writer
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    Workbook = None
+    OPENPYXL_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = pq = None
+    PYARROW_AVAILABLE = False
+
+BATCH_SIZE = 5000
+XLSX_MAX_ROWS = 1_048_575          # Excel-Zeilen je Blatt ohne Kopfzeile
+
+SALARIES = "salaries"
+FUNK = "funk"
+EXPORT_DATASETS = (REVENUE, RUNNING_COSTS, SALARIES, FUNK)
+
+# Gehälter und Funk liegen in Monatstabellen (MM_JJ)
+MONTHLY_DB_FILES = {SALARIES: "salaries.db", FUNK: "funk.db"}
+
+FORMAT_EXTENSIONS = {"csv": ".csv", "json": ".json", "xlsx": ".xlsx", "excel": ".xlsx", "parquet": ".parquet"}
+
+
+class ExportCancelled(Exception):
+    """Export wurde über das Cancel-Event abgebrochen."""
+
+
+@dataclass
+class ExportQuery:
+    """Eine Abfrage des Datensatzes (Monatstabellen ergeben mehrere)."""
+    db_path: str
+    sql: str
+    params: Tuple = ()
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _table_columns(conn, table: str) -> List[Tuple[str, str]]:
+    return [(row[1], (row[2] or "").upper()) for row in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+
+
+def export_filename(pattern: str, dataset: str, year: int, fmt: str, when: Optional[datetime] = None) -> str:
+    """Dateiname aus dem Export-Muster ({DATASET}, {YEAR}, {DATE}, {FMT}; '.ext' → Formatendung)."""
+    fmt = fmt.lower()
+    name = (pattern.replace("{DATASET}", dataset).replace("{YEAR}", str(year))
+            .replace("{DATE}", (when or datetime.now()).strftime("%Y%m%d_%H%M%S")).replace("{FMT}", fmt))
+    extension = FORMAT_EXTENSIONS[fmt]
+    return name[:-4] + extension if name.endswith(".ext") else name + extension
+
+
+def dataset_queries(sql_dir: str, dataset: str, year: int) -> Tuple[List[Tuple[str, str]], List[ExportQuery]]:
+    """Spalten (Name, Typ) und Abfragen eines Jahres; fehlende Datenbanken ergeben keine Abfragen."""
+    if dataset in LEDGER_DB_FILES:
+        db_path = os.path.join(sql_dir, LEDGER_DB_FILES[dataset])
+        if not os.path.exists(db_path):
+            return [], []
+        with connection(db_path) as conn:
+            columns = _table_columns(conn, dataset)
+        if not columns:
+            return [], []
+        select = ", ".join(_quote(name) for name, _ in columns)
+        # Index (license_plate, year, cw) der zentralen Tabelle
+        sql = f"SELECT {select} FROM {dataset} WHERE year = ? ORDER BY cw, license_plate, id"
+        return columns, [ExportQuery(db_path, sql, (int(year),))]
+
+    if dataset in MONTHLY_DB_FILES:
+        db_path = os.path.join(sql_dir, MONTHLY_DB_FILES[dataset])
+        if not os.path.exists(db_path):
+            return [], []
+        pattern = re.compile(rf"^(\d{{2}})_{str(year)[-2:]}$")
+        with connection(db_path) as conn:
+            names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            tables = sorted((name for name in names if pattern.match(name)), key=lambda n: int(n[:2]))
+            table_columns = {table: _table_columns(conn, table) for table in tables}
+        # Vereinigung der Spalten (ältere Monate können Spalten nicht haben)
+        columns: List[Tuple[str, str]] = [("monat", "TEXT")]
+        for table in tables:
+            for column in table_columns[table]:
+                if column[0] not in {name for name, _ in columns}:
+                    columns.append(column)
+        queries = []
+        for table in tables:
+            present = {name for name, _ in table_columns[table]}
+            select = ", ".join(_quote(name) if name in present else f"NULL AS {_quote(name)}"
+                               for name, _ in columns[1:])
+            queries.append(ExportQuery(db_path, f"SELECT ?, {select} FROM {_quote(table)} ORDER BY rowid", (table,)))
+        return (columns if tables else []), queries
+
+    raise ValueError(f"Unbekannter Datensatz: {dataset}")
+
+
+def count_rows(query: ExportQuery) -> int:
+    with connection(query.db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM ({query.sql})", query.params).fetchone()[0]
+
+
+# === Writer (open / write / close) ===
+
+class _CsvWriter:
+    def __init__(self, path: str, columns):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, _ in columns])
+
+    def write(self, rows: Sequence[tuple]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _JsonWriter:
+    def __init__(self, path: str, columns):
+        self._file = open(path, "w", encoding="utf-8")
+        self._names = [name for name, _ in columns]
+        self._first = True
+        self._file.write("[")
+
+    def write(self, rows: Sequence[tuple]) -> None:
+        for row in rows:
+            self._file.write("\n" if self._first else ",\n")
+            self._file.write(json.dumps(dict(zip(self._names, row)), ensure_ascii=False, default=str))
+            self._first = False
+
+    def close(self) -> None:
+        self._file.write("\n]\n")
+        self._file.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path: str, columns):
+        if not OPENPYXL_AVAILABLE:
+            raise RuntimeError("XLSX-Export benötigt openpyxl")
+        self._path = path
+        self._header = [name for name, _ in columns]
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self) -> None:
+        self._sheets += 1
+        self._sheet = self._workbook.create_sheet(title="Daten" if self._sheets == 1 else f"Daten {self._sheets}")
+        self._sheet.append(self._header)
+        self._sheet_rows = 0
+
+    def write(self, rows: Sequence[tuple]) -> None:
+        for row in rows:
+            if self._sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append(list(row))
+            self._sheet_rows += 1
+
+    def close(self) -> None:
+        self._workbook.save(self._path)
+
+
+def _arrow_type(sql_type: str):
+    if "INT" in sql_type:
+        return pa.int64()
+    if any(t in sql_type for t in ("REAL", "FLOA", "DOUB", "NUM")):
+        return pa.float64()
+    return pa.string()
+
+
+class _ParquetWriter:
+    def __init__(self, path: str, columns):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet-Export benötigt pyarrow")
+        self._schema = pa.schema([(name, _arrow_type(sql_type)) for name, sql_type in columns])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: Sequence[tuple]) -> None:
+        arrays = []
+        for i, field in enumerate(self._schema):
+            values = [row[i] for row in rows]
+            if pa.types.is_string(field.type):
+                values = [None if v is None else str(v) for v in values]
+            arrays.append(pa.array(values, type=field.type, from_pandas=False))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+_WRITERS = {"csv": _CsvWriter, "json": _JsonWriter, "xlsx": _XlsxWriter, "excel": _XlsxWriter,
+            "parquet": _ParquetWriter}
+
+
+def export_dataset(sql_dir: str, dataset: str, year: int, fmt: str, path: str,
+                   progress: Optional[Callable[[int, int], None]] = None, cancel=None,
+                   batch_size: int = BATCH_SIZE) -> int:
+    """Schreibt einen Datensatz eines Jahres nach path; Rückgabe: Anzahl Zeilen.
+
+    Wirft ExportCancelled, wenn cancel (threading.Event) gesetzt wird; die
+    unvollständige Datei wird dann entfernt.
+    """
+    fmt = fmt.lower()
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unbekanntes Exportformat: {fmt}")
+    columns, queries = dataset_queries(sql_dir, dataset, year)
+    total = sum(count_rows(query) for query in queries)
+    if progress:
+        progress(0, total)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    part_path = path + ".part"
+    writer = _WRITERS[fmt](part_path, columns)
+    done = 0
+    try:
+        for query in queries:
+            with connection(query.db_path) as conn:
+                cursor = conn.execute(query.sql, query.params)
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        raise ExportCancelled(f"Export {dataset} {year} abgebrochen")
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    writer.write(rows)
+                    done += len(rows)
+                    if progress:
+                        progress(done, total)
+        writer.close()
+        writer = None
+        os.replace(part_path, path)
+    finally:
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    return done
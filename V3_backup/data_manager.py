@@ -11,6 +11,11 @@ from dataclasses import dataclass
 from pathlib import Path
 import json
 import time
+from datetime import datetime
+
+from connection_manager import connect, get_connection_manager
+from platform_reports import REPORT_TABLE, legacy_rows_filter, legacy_week_tables, list_weeks
+from vehicle_ledger import REVENUE, RUNNING_COSTS, ensure_synced
 
 # Logging konfigurieren
 logging.basicConfig(level=logging.INFO)
@@ -35,66 +40,6 @@ class DatabaseConfig:
     connection_timeout: int = 30
     cache_timeout: int = 300  # 5 Minuten
 
-class ConnectionPool:
-    """Thread-sicheres Connection Pool für effiziente Datenbankverbindungen"""
-    
-    def __init__(self, db_path: str, max_connections: int = 10):
-        self.db_path = db_path
-        self.max_connections = max_connections
-        self._lock = threading.Lock()
-        self._thread_local = threading.local()
-        self._active_connections = 0
-        
-    def _create_connection(self) -> sqlite3.Connection:
-        """Erstellt eine neue Datenbankverbindung"""
-        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
-        conn.execute("PRAGMA foreign_keys = ON")
-        conn.execute("PRAGMA journal_mode = WAL")
-        conn.execute("PRAGMA synchronous = NORMAL")
-        conn.execute("PRAGMA cache_size = 10000")
-        conn.execute("PRAGMA temp_store = MEMORY")
-        return conn
-    
-    @contextmanager
-    def get_connection(self):
-        """Thread-sicherer Context Manager für Datenbankverbindungen"""
-        conn = None
-        try:
-            # Thread-lokale Verbindung verwenden
-            if not hasattr(self._thread_local, 'connection'):
-                with self._lock:
-                    if self._active_connections < self.max_connections:
-                        self._thread_local.connection = self._create_connection()
-                        self._active_connections += 1
-                    else:
-                        # Fallback: Neue Verbindung für diesen Thread
-                        self._thread_local.connection = self._create_connection()
-            
-            conn = self._thread_local.connection
-            yield conn
-        except Exception as e:
-            logger.error(f"Datenbankfehler: {e}")
-            if conn:
-                try:
-                    conn.rollback()
-                except:
-                    pass
-            raise
-        finally:
-            # Verbindung bleibt für den Thread bestehen
-            pass
-    
-    def close_thread_connection(self):
-        """Schließt die thread-lokale Verbindung"""
-        if hasattr(self._thread_local, 'connection'):
-            try:
-                self._thread_local.connection.close()
-                delattr(self._thread_local, 'connection')
-                with self._lock:
-                    self._active_connections = max(0, self._active_connections - 1)
-            except:
-                pass
-
 class DataCache:
     """Intelligenter Cache für häufig verwendete Daten"""
     
@@ -145,7 +90,8 @@ class DataManager:
     
     def __init__(self, config: DatabaseConfig = None):
         self.config = config or DatabaseConfig()
-        self._pools = {}
+        self._pools = {}  # Name → Pfad; Verbindungen kommen aus dem gemeinsamen ConnectionManager
+        self._connections = get_connection_manager()
         self._cache = DataCache(self.config.cache_timeout)
         self._lock = threading.Lock()
         
@@ -178,19 +124,14 @@ class DataManager:
             if not db_path.exists():
                 try:
                     # Erstelle leere SQLite-Datenbank
-                    conn = sqlite3.connect(path)
+                    conn = connect(path)
                     conn.close()
                     logger.info(f"Neue Datenbank erstellt: {path}")
                 except Exception as e:
                     logger.warning(f"Konnte Datenbank {path} nicht erstellen: {e}")
                     continue
             
-            # Initialisiere Connection Pool
-            try:
-                self._pools[name] = ConnectionPool(path, self.config.max_connections)
-                logger.info(f"Connection Pool für {name} initialisiert: {path}")
-            except Exception as e:
-                logger.warning(f"Connection Pool für {name} fehlgeschlagen: {e}")
+            self._pools[name] = path
         
         # Initialisiere alle Datenbanken
         self.initialize_all_databases()
@@ -300,10 +241,10 @@ class DataManager:
             logger.warning(f"Report-Datenbank-Initialisierung: {e}")
     
     def get_connection(self, db_name: str = 'main'):
-        """Holt eine Datenbankverbindung aus dem Pool"""
+        """Context Manager über die gemeinsame Verbindung des Threads für db_name"""
         if db_name not in self._pools:
             raise ValueError(f"Unbekannte Datenbank: {db_name}")
-        return self._pools[db_name].get_connection()
+        return self._connections.connection(self._pools[db_name])
     
     # === FAHRER-MANAGEMENT ===
     
@@ -372,9 +313,13 @@ class DataManager:
             logger.error(f"Fehler beim Laden der Fahrzeugliste: {e}")
             return []
     
-    def get_kalenderwochen(self, force_reload: bool = False) -> List[str]:
-        """Lädt die Kalenderwochen mit Caching"""
-        cache_key = "kalenderwochen"
+    def get_kalenderwochen(self, force_reload: bool = False, jahr: Optional[int] = None) -> List[str]:
+        """Lädt die Kalenderwochen mit Caching (aus dem (year, kw)-Index der Plattform-Tabelle)
+
+        Noch nicht migrierte report_KW-Tabellen (ohne Jahr) zählen wie im
+        Daten-Explorer zum laufenden Jahr und werden nur dafür mit aufgeführt.
+        """
+        cache_key = f"kalenderwochen_{jahr or 'all'}"
         
         if not force_reload:
             cached = self._cache.get(cache_key)
@@ -383,17 +328,12 @@ class DataManager:
         
         try:
             with self.get_connection('taxi') as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name LIKE 'report_KW%'
-                    ORDER BY name DESC
-                """)
-                tables = [row[0] for row in cursor.fetchall()]
+                weeks = list_weeks(conn, jahr)
+                kws = {kw for _, kw in weeks}
+                if jahr is None or int(jahr) == datetime.now().year:
+                    kws |= set(legacy_week_tables(conn))
                 
-                kw_list = sorted([
-                    t.replace("report_KW", "") for t in tables
-                ], reverse=True)
+                kw_list = sorted({f"{kw:02d}" for kw in kws}, reverse=True)
                 
                 self._cache.set(cache_key, kw_list)
                 logger.info(f"Kalenderwochen geladen: {len(kw_list)} Wochen")
@@ -434,9 +374,14 @@ class DataManager:
     
     # === PLATTFORM-DATEN ===
     
-    def get_platform_data(self, platform: str, kw: str) -> pd.DataFrame:
-        """Lädt Plattformdaten mit Caching"""
-        cache_key = f"platform_data_{platform}_{kw}"
+    def get_platform_data(self, platform: str, kw: str, jahr: Optional[int] = None) -> pd.DataFrame:
+        """Lädt Plattformdaten einer Woche mit Caching (ohne jahr: laufendes Jahr)
+
+        Zeilen ohne Jahr aus nicht migrierten report_KW-Tabellen zählen wie im
+        Daten-Explorer zum laufenden Jahr.
+        """
+        jahr = int(jahr or datetime.now().year)
+        cache_key = f"platform_data_{platform}_{jahr}_{kw}"
         
         cached = self._cache.get(cache_key)
         if cached is not None:
@@ -457,22 +402,23 @@ class DataManager:
                 logger.error(f"Unbekannte Plattform: {platform}")
                 return pd.DataFrame()
             
-            table_name = f"report_KW{kw}"
-            
             with self.get_connection(db_name) as conn:
-                # Prüfe ob Tabelle existiert
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name = ?
-                """, (table_name,))
-                
-                if not cursor.fetchone():
-                    logger.warning(f"Tabelle {table_name} nicht gefunden")
-                    return pd.DataFrame()
-                
-                # Lade Daten
-                df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+                # Lade Daten über den (year, kw)-Index
+                try:
+                    df = pd.read_sql_query(
+                        f"SELECT * FROM {REPORT_TABLE} WHERE year = ? AND kw = ?", conn, params=[jahr, int(kw)]
+                    )
+                except Exception:
+                    # Noch kein Import und keine Migration: Tabelle fehlt
+                    df = pd.DataFrame()
+                # Zeilen ohne Jahr der nicht migrierten Wochentabelle ergänzen
+                legacy = legacy_week_tables(conn).get(int(kw)) if jahr == datetime.now().year else None
+                if legacy:
+                    legacy_df = pd.read_sql_query(
+                        f'SELECT * FROM "{legacy}" WHERE {legacy_rows_filter(conn, legacy)}', conn
+                    )
+                    if not legacy_df.empty:
+                        df = legacy_df if df.empty else pd.concat([df, legacy_df], ignore_index=True)
                 
                 self._cache.set(cache_key, df)
                 logger.info(f"Plattformdaten geladen: {platform} KW{kw} - {len(df)} Zeilen")
@@ -497,21 +443,13 @@ class DataManager:
                 if vehicle:
                     df = pd.read_sql_query(f'SELECT * FROM "{vehicle}"', conn)
                 else:
-                    # Alle Revenue-Tabellen laden
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-                    tables = [row[0] for row in cursor.fetchall()]
-                    
-                    all_data = []
-                    for table in tables:
-                        try:
-                            df_part = pd.read_sql_query(f'SELECT * FROM "{table}"', conn)
-                            df_part['vehicle'] = table
-                            all_data.append(df_part)
-                        except Exception as e:
-                            logger.warning(f"Fehler beim Laden von {table}: {e}")
-                    
-                    df = pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
+                    # Alle Fahrzeuge aus der zentralen Revenue-Tabelle laden
+                    ensure_synced(conn, REVENUE)
+                    df = pd.read_sql_query(
+                        "SELECT source_id AS id, cw, deal, driver, total, taxed, income, timestamp, "
+                        "license_plate AS vehicle FROM revenue ORDER BY license_plate, source_id",
+                        conn
+                    )
                 
                 self._cache.set(cache_key, df)
                 logger.info(f"Revenue-Daten geladen: {len(df)} Zeilen")
@@ -534,21 +472,13 @@ class DataManager:
                 if vehicle:
                     df = pd.read_sql_query(f'SELECT * FROM "{vehicle}"', conn)
                 else:
-                    # Alle Betriebskosten-Tabellen laden
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-                    tables = [row[0] for row in cursor.fetchall()]
-                    
-                    all_data = []
-                    for table in tables:
-                        try:
-                            df_part = pd.read_sql_query(f'SELECT * FROM "{table}"', conn)
-                            df_part['vehicle'] = table
-                            all_data.append(df_part)
-                        except Exception as e:
-                            logger.warning(f"Fehler beim Laden von {table}: {e}")
-                    
-                    df = pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
+                    # Alle Fahrzeuge aus der zentralen Betriebskosten-Tabelle laden
+                    ensure_synced(conn, RUNNING_COSTS)
+                    df = pd.read_sql_query(
+                        "SELECT source_id AS id, cw, amount, category, details, timestamp, "
+                        "license_plate AS vehicle FROM running_costs ORDER BY license_plate, source_id",
+                        conn
+                    )
                 
                 self._cache.set(cache_key, df)
                 logger.info(f"Betriebskosten-Daten geladen: {len(df)} Zeilen")
@@ -769,10 +699,12 @@ class DataManager:
     
     def get_performance_stats(self) -> Dict:
         """Gibt Performance-Statistiken zurück"""
+        connection_stats = self._connections.stats()
         stats = {
             'cache_size': len(self._cache._cache),
-            'active_connections': sum(pool._active_connections for pool in self._pools.values()),
-            'total_connections': sum(len(pool._connections) + pool._active_connections for pool in self._pools.values()),
+            'active_connections': connection_stats['open'],
+            'total_connections': connection_stats['opened'],
+            'connections': connection_stats,
             'databases': list(self._pools.keys())
         }
         return stats
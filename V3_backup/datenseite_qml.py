@@ -115,6 +115,10 @@ class DatenSeiteQML(QObject):
     def cacheEnabled(self):
         return True  # Vereinfacht für die neue Implementierung
     
+    @Property(QObject, constant=True)
+    def explorerModel(self):
+        return self._new_backend.explorerModel
+    
     # Slots (kompatibel mit der alten Implementierung)
     @Slot(str, str, str)
     def loadData(self, time_range: str, driver: str, platform: str):
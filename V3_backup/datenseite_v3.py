@@ -3,21 +3,29 @@ import sys
 import threading
 import subprocess
 import sqlite3
+from dataclasses import replace
 from typing import List, Dict
 from pathlib import Path
 
 from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer
 
+from data_explorer import DataExplorer, ExplorerFilter
+from data_export import EXPORT_DATASETS, ExportCancelled, export_dataset, export_filename
+from data_explorer_model import ExplorerModel
+from import_classifier import classify_file
+from import_pipeline import FUNK, GEHALT, UMSATZ, ImportTask, run_pipeline
+
 # Import smart_import für echte Dateiverarbeitung
 SMART_IMPORT_AVAILABLE = False
 verarbeite_datei = None
+TAXI_UMSATZLISTE = "uportal_getumsatzliste"
 
 try:
     # Direkter Import aus dem SQL-Ordner
     sql_path = Path(__file__).parent / "SQL"
     if sql_path.exists():
         sys.path.insert(0, str(sql_path))
-        from smart_import import verarbeite_datei
+        from smart_import import TAXI_UMSATZLISTE, verarbeite_datei
         SMART_IMPORT_AVAILABLE = True
         print("✅ smart_import erfolgreich importiert")
     else:
@@ -37,6 +45,8 @@ class DatenSeiteQMLV3(QObject):
     platformSelectionRequested = Signal(str, str)  # filename, platforms
     platformSelectionCompleted = Signal(str)  # selected_platform
     monthYearSelectionRequested = Signal(str, str)  # filename, suggested_date
+    exportFeedbackChanged = Signal(str, str)  # type, message
+    _explorerLoaded = Signal(int, object, object)  # Generation, since, Summen je Plattform (aus dem Lade-Thread)
 
     def __init__(self):
         super().__init__()
@@ -49,10 +59,24 @@ class DatenSeiteQMLV3(QObject):
         self._import_progress: int = 0
         self._export_progress: int = 0
         self._export_dir: str = os.path.join(os.getcwd(), "exports")
-        self._export_pattern: str = "export_{DATE}_{FMT}.ext"
+        self._export_pattern: str = "export_{DATASET}_{YEAR}_{DATE}.ext"
+        self._export_cancel = None  # threading.Event des laufenden Exports
         self._next_job_id: int = 1
         self._pending_platform_selection = None  # Für asynchrone Plattform-Auswahl
         self._pending_month_year_selection = None  # Für asynchrone Monat/Jahr-Auswahl
+        self._platform_choices: Dict[str, str] = {}  # Dateipfad → gewählte Quelle (Taxi-Umsatzlisten)
+        
+        # Daten-Explorer: Filter → Abfragen auf die Plattform-Datenbanken, Zeilen lazy im Modell
+        self._filter = ExplorerFilter()
+        self._summary: Dict[str, Dict[str, float]] = {}
+        self._explorer = DataExplorer(os.path.join("SQL"))
+        self._explorer_model = ExplorerModel(self._explorer, self)
+        self._load_generation: int = 0
+        self._explorerLoaded.connect(self._on_explorer_loaded)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(300)  # Suche erst nach einer Tipp-Pause
+        self._search_timer.timeout.connect(self._reload_data)
 
     # Properties (kompatibel mit der alten Implementierung)
     @Property(bool, notify=dataChanged)
@@ -95,38 +119,77 @@ class DatenSeiteQMLV3(QObject):
     def exportDir(self) -> str:
         return self._export_dir
 
+    @Property(QObject, constant=True)
+    def explorerModel(self):
+        return self._explorer_model
+
+    @Property('QVariant', notify=dataChanged)
+    def explorerSummary(self):
+        return self._summary
+
     # Methoden, die in QML aufgerufen werden
     @Slot(str)
     def updateTimeRange(self, value: str) -> None:
-        self._status_message = f"Zeitraum: {value}"
-        self.dataChanged.emit()
+        self._filter = replace(self._filter, time_range=value)
+        self._reload_data()
 
     @Slot(str)
     def updateDriverFilter(self, value: str) -> None:
-        self._status_message = f"Fahrer: {value}"
-        self.dataChanged.emit()
+        self._filter = replace(self._filter, driver=value)
+        self._reload_data()
 
     @Slot(str)
     def updatePlatformFilter(self, value: str) -> None:
-        self._status_message = f"Plattform: {value}"
-        self.dataChanged.emit()
+        self._filter = replace(self._filter, platform=value)
+        self._reload_data()
 
     @Slot(str)
     def searchData(self, text: str) -> None:
-        self._status_message = f"Suche: {text}"
-        self.dataChanged.emit()
+        self._filter = replace(self._filter, search=text)
+        self._search_timer.start()
 
     @Slot()
     def refreshData(self) -> None:
+        self._reload_data()
+
+    def _reload_data(self) -> None:
+        """Ermittelt Zeitraum und Summen im Hintergrund; die Zeilen lädt danach das Modell seitenweise"""
+        self._search_timer.stop()
+        self._load_generation += 1
+        generation, filt = self._load_generation, self._filter
         self._is_loading = True
+        self._status_message = "Lade Daten..."
         self.dataChanged.emit()
-        
-        # Simuliere asynchrones Laden
-        QTimer.singleShot(1000, self._finish_refresh)
 
-    def _finish_refresh(self) -> None:
+        def load_task():
+            try:
+                since = self._explorer.since(filt)
+                summary = self._explorer.summary(filt, since)
+            except Exception as e:
+                print(f"❌ Fehler beim Laden der Daten: {e}")
+                since, summary = None, None
+            self._explorerLoaded.emit(generation, since, summary)
+
+        threading.Thread(target=load_task, daemon=True).start()
+
+    @Slot(int, object, object)
+    def _on_explorer_loaded(self, generation: int, since, summary) -> None:
+        if generation != self._load_generation:
+            return  # Filter wurde inzwischen geändert
         self._is_loading = False
-        self._status_message = "Daten aktualisiert"
+        if summary is None:
+            self._summary = {}
+            self._status_message = "Fehler beim Laden der Daten"
+            self.errorOccurred.emit("Datenseite", self._status_message)
+            self.dataChanged.emit()
+            return
+        self._summary = summary
+        self._explorer_model.reset(self._filter, since)
+        self._data_list = self._explorer_model.rows
+        zeilen = sum(werte["rows"] for werte in summary.values())
+        umsatz = sum(werte["earnings"] for werte in summary.values())
+        zeitraum = f"ab {since[0]}-KW{since[1]:02d}" if since else "alle Wochen"
+        self._status_message = f"{zeilen} Zeilen ({zeitraum}), Umsatz {umsatz:.2f} €"
         self.dataChanged.emit()
 
     @Slot()
@@ -145,32 +208,70 @@ class DatenSeiteQMLV3(QObject):
 
     @Slot(str)
     def exportDataAsync(self, fmt: str) -> None:
+        """Exportiert Revenue, laufende Kosten, Gehälter und Funk des laufenden Jahres"""
+        from datetime import datetime
+        self._start_export(list(EXPORT_DATASETS), fmt, datetime.now().year)
+
+    @Slot(str, str, int)
+    def exportDataset(self, dataset: str, fmt: str, year: int) -> None:
+        """Exportiert einen Datensatz (revenue, running_costs, salaries, funk) eines Jahres"""
+        self._start_export([dataset], fmt, year)
+
+    @Slot()
+    def cancelExport(self) -> None:
+        cancel = getattr(self, "_export_cancel", None)
+        if cancel is not None:
+            cancel.set()
+
+    def _start_export(self, datasets: List[str], fmt: str, year: int) -> None:
+        """Streamt die Datensätze nacheinander im Hintergrund-Thread in das Export-Verzeichnis"""
+        if self._export_cancel is not None:
+            self.exportFeedbackChanged.emit("error", "Es läuft bereits ein Export")
+            return
+        cancel = threading.Event()
+        self._export_cancel = cancel
         self._export_progress = 0
         self.dataChanged.emit()
-        
-        # Simuliere Export
-        QTimer.singleShot(2000, lambda: self._finish_export(fmt))
 
-    def _finish_export(self, fmt: str) -> None:
-        self._export_progress = 100
-        self.dataChanged.emit()
+        def export_task():
+            for i, dataset in enumerate(datasets):
+                path = os.path.join(self._export_dir, export_filename(self._export_pattern, dataset, year, fmt))
+
+                def on_progress(done, total, i=i):
+                    anteil = done / total if total else 1.0
+                    prozent = int((i + anteil) * 100 / len(datasets))
+                    if prozent != self._export_progress:
+                        self._export_progress = prozent
+                        self.dataChanged.emit()
+
+                job = {"id": self._next_job_id, "type": "export", "dataset": dataset, "format": fmt,
+                       "year": year, "path": path, "rows": 0, "status": "running"}
+                self._next_job_id += 1
+                self._recent_jobs.insert(0, job)
+                try:
+                    job["rows"] = export_dataset(os.path.join("SQL"), dataset, year, fmt, path,
+                                                 progress=on_progress, cancel=cancel)
+                    job["status"] = "done"
+                    self.exportFeedbackChanged.emit("success", f"✅ {dataset} {year}: {job['rows']} Zeilen → {path}")
+                except ExportCancelled:
+                    job["status"] = "cancelled"
+                    self.exportFeedbackChanged.emit("info", f"Export {dataset} {year} abgebrochen")
+                    break
+                except Exception as e:
+                    job["status"] = "error"
+                    print(f"❌ Export-Fehler ({dataset}): {e}")
+                    self.exportFeedbackChanged.emit("error", f"❌ Export {dataset} fehlgeschlagen: {e}")
+            else:
+                self._export_progress = 100
+            self._export_cancel = None
+            self.dataChanged.emit()
+
+        threading.Thread(target=export_task, daemon=True).start()
 
     @Slot(str, str, str)
     def loadData(self, timeRange: str, driver: str, platform: str) -> None:
-        self._is_loading = True
-        self.dataChanged.emit()
-        
-        # Simuliere asynchrones Laden
-        QTimer.singleShot(1500, lambda: self._finish_load(timeRange, driver, platform))
-
-    def _finish_load(self, timeRange: str, driver: str, platform: str) -> None:
-        self._is_loading = False
-        self._data_list = [
-            {"date": "2025-08-01", "platform": platform, "driver": driver, "earnings": 120.5, "status": "OK"},
-            {"date": "2025-08-02", "platform": platform, "driver": driver, "earnings": 98.7, "status": "OK"},
-        ]
-        self._status_message = f"Daten geladen: {timeRange}, {driver}, {platform}"
-        self.dataChanged.emit()
+        self._filter = replace(self._filter, time_range=timeRange, driver=driver, platform=platform)
+        self._reload_data()
 
     @Slot('QVariant')
     def addDroppedFiles(self, urls) -> None:
@@ -192,18 +293,8 @@ class DatenSeiteQMLV3(QObject):
         
         self.selectedFilesChanged.emit()
         
-        # Import-Typ erkennen und verarbeiten
-        import_type = self._detect_import_type()
-        print(f"Automatisch erkannt: {import_type}")
-        
-        if import_type == "Umsatz":
-            self._import_with_smart_import()
-        elif import_type == "Gehalt":
-            self._import_with_salary_tool()
-        elif import_type == "Funk":
-            self._import_with_funk_router()
-        else:
-            self.importFeedbackChanged.emit("error", f"Unbekannter Import-Typ: {import_type}")
+        # Alle Dateien vorab klassifizieren und parallel importieren
+        self._start_import_pipeline()
 
     def _extract_month_year_from_filename(self, filename: str) -> tuple[int, int] | None:
         """Extrahiert Monat und Jahr aus verschiedenen Dateinamen-Formaten"""
@@ -235,98 +326,103 @@ class DatenSeiteQMLV3(QObject):
         
         return None
 
-    def _detect_import_type(self) -> str:
-        """Erkennt den Import-Typ basierend auf den Dateinamen"""
-        for file_path in self._selected_files:
-            filename = os.path.basename(file_path).lower()
-            
-            # Taxi-Umsatz-Dateien
-            if "uportal_getumsatzliste" in filename:
-                return "Umsatz"
-            
-            # Gehaltsdateien (PDF mit Gehalts-Keywords oder Abrechnungen)
-            file_ext = Path(file_path).suffix.lower()
-            if file_ext == ".pdf" and any(keyword in filename for keyword in ["gehalt", "salary", "lohn", "abrechnung", "abrechnungen"]):
-                return "Gehalt"
-            
-            # Funk-Dateien (PDF oder CSV mit Funk-Keywords)
-            if any(keyword in filename for keyword in ["funk", "radio", "dispatch", "31300", "40100", "arf", "fl", "rechnung"]):
-                return "Funk"
-            
-            # Uber/Bolt Dateien
-            if any(keyword in filename for keyword in ["uber", "bolt", "earnings", "driver_performance"]):
-                return "Umsatz"
-        
-        return "Unbekannt"
+    def _classify_files(self, file_paths: List[str]):
+        """Klassifiziert alle Dateien vorab: (Pipeline-Tasks, Taxi-Umsatzlisten ohne Quelle, unbekannte Dateien)"""
+        tasks: List[ImportTask] = []
+        needs_platform: List[str] = []
+        unknown: List[str] = []
+        for file_path in file_paths:
+            filename = os.path.basename(file_path)
+            classification = classify_file(file_path)
+            import_type = classification.kind
+            print(f"   🔎 {filename}: {import_type} ({classification.source})")
+            
+            if import_type == UMSATZ:
+                platform = self._platform_choices.pop(file_path, None) or classification.platform
+                if platform and SMART_IMPORT_AVAILABLE:
+                    tasks.append(ImportTask(file_path, UMSATZ, platform=platform))
+                elif (TAXI_UMSATZLISTE in filename.lower() or classification.source == "spalten") and SMART_IMPORT_AVAILABLE:
+                    # Taxi-Umsatzliste, deren Quelle weder Name noch Spalten eindeutig zeigen
+                    needs_platform.append(file_path)
+                else:
+                    unknown.append(file_path)
+            elif import_type == GEHALT:
+                tasks.append(ImportTask(file_path, GEHALT))
+            elif import_type == FUNK:
+                tasks.append(ImportTask(file_path, FUNK, month_year=self._extract_month_year_from_filename(filename)))
+            else:
+                unknown.append(file_path)
+        return tasks, needs_platform, unknown
 
-    def _import_with_smart_import(self) -> None:
-        """Import mit smart_import.py"""
+    def _remove_selected_file(self, file_path: str) -> None:
+        if file_path in self._selected_files:
+            self._selected_files.remove(file_path)
+            self.selectedFilesChanged.emit()
+
+    def _set_import_progress(self, value: int) -> None:
+        self._import_progress = value
+        self.dataChanged.emit()
+
+    def _start_import_pipeline(self) -> None:
+        """Startet die Import-Pipeline für alle ausgewählten Dateien im Hintergrund-Thread"""
         def import_task():
             try:
-                for file_path in self._selected_files[:]:  # Kopie der Liste
-                    filename = os.path.basename(file_path)
-                    
-                    # Prüfe auf Taxi-Umsatz-Dateien
-                    if "uportal_getumsatzliste" in filename.lower():
-                        print(f"   ⏳ Warte auf Plattform-Auswahl für {filename}...")
-                        
-                        # Plattform-Auswahl anfordern
-                        self._pending_platform_selection = {
-                            'file_path': file_path,
-                            'filename': filename
-                        }
-                        self.platformSelectionRequested.emit(filename, "40100,31300")
-                        return  # Pausiere Import bis Plattform ausgewählt
-                    
-                    # Normale Dateiverarbeitung
-                    self._process_single_file(file_path)
-                
-                # Import abgeschlossen
-                self.importFeedbackChanged.emit("success", "✅ Import abgeschlossen")
-                
+                self._run_import_pipeline()
             except Exception as e:
                 print(f"   ❌ Import-Fehler: {str(e)}")
                 import traceback
                 traceback.print_exc()
                 self.importFeedbackChanged.emit("error", f"❌ Import-Fehler: {str(e)}")
         
-        # Import in separatem Thread ausführen
         threading.Thread(target=import_task, daemon=True).start()
 
-    def _process_single_file(self, file_path: str, platform_choice: str = None) -> None:
-        """Verarbeitet eine einzelne Datei"""
-        try:
+    def _run_import_pipeline(self) -> None:
+        """Klassifiziert, importiert parallel (Prozess-Pool) und fragt danach fehlende Angaben ab"""
+        tasks, needs_platform, unknown = self._classify_files(self._selected_files[:])
+        
+        for file_path in unknown:
+            self.importFeedbackChanged.emit("error", f"Unbekannter Import-Typ: {os.path.basename(file_path)}")
+            self._remove_selected_file(file_path)
+        
+        def on_progress(result, done, total):
+            if not result.needs_month_year:
+                self.importFeedbackChanged.emit("success" if result.success else "error", result.message)
+                self._remove_selected_file(result.task.path)
+            self._set_import_progress(int(done * 100 / total))
+        
+        self._set_import_progress(0)
+        results = run_pipeline(tasks, on_progress)
+        
+        # Funk-Rechnungen ohne Monat/Jahr im Dateinamen: Auswahl im Dialog (eine nach der anderen)
+        waiting = [result for result in results if result.needs_month_year]
+        if waiting:
+            result = waiting[0]
+            print(f"   ⏳ Warte auf Monat/Jahr-Auswahl für {result.task.filename}...")
+            from datetime import datetime
+            now = datetime.now()
+            self._pending_month_year_selection = {
+                'file_path': result.task.path,
+                'filename': result.task.filename,
+                'entries': result.entries
+            }
+            self._remove_selected_file(result.task.path)
+            self.monthYearSelectionRequested.emit(result.task.filename, f"{now.month:02d}/{now.year}")
+            return  # Pausiere Import bis Monat/Jahr ausgewählt
+        
+        # Taxi-Umsatzlisten: Quelle (40100/31300) wählen lassen
+        if needs_platform:
+            file_path = needs_platform[0]
             filename = os.path.basename(file_path)
-            
-            if SMART_IMPORT_AVAILABLE and verarbeite_datei:
-                # Echten Import verwenden
-                print(f"   🔄 Starte echten Import für: {filename}")
-                print(f"   📁 Dateipfad: {file_path}")
-                print(f"   🎯 Plattform: {platform_choice if platform_choice else 'Auto-Erkennung'}")
-                
-                # Echten Import ausführen
-                verarbeite_datei(file_path, platform_choice)
-                
-                print(f"   ✅ Import erfolgreich abgeschlossen: {filename}")
-                self.importFeedbackChanged.emit("success", f"✅ {filename} erfolgreich importiert")
-            else:
-                # Fallback: Simuliere Import
-                print(f"   ⚠️ Verwende Stub-Import für: {filename}")
-                if platform_choice:
-                    self.importFeedbackChanged.emit("success", f"✅ {platform_choice} Daten importiert")
-                else:
-                    self.importFeedbackChanged.emit("success", f"✅ Umsatz-Daten importiert")
-            
-            # Datei aus der Liste entfernen, um doppelte Verarbeitung zu vermeiden
-            if file_path in self._selected_files:
-                self._selected_files.remove(file_path)
-                print(f"   📝 Datei aus Liste entfernt: {filename}")
-                                
-        except Exception as e:
-            print(f"   ❌ Fehler beim Import von {filename}: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            self.importFeedbackChanged.emit("error", f"❌ Fehler bei {filename}: {str(e)}")
+            print(f"   ⏳ Warte auf Plattform-Auswahl für {filename}...")
+            self._pending_platform_selection = {
+                'file_path': file_path,
+                'filename': filename
+            }
+            self.platformSelectionRequested.emit(filename, "40100,31300")
+            return  # Pausiere Import bis Plattform ausgewählt
+        
+        if tasks:
+            self.importFeedbackChanged.emit("success", "✅ Import abgeschlossen")
 
     @Slot(str)
     def selectPlatform(self, platform: str) -> None:
@@ -337,8 +433,8 @@ class DatenSeiteQMLV3(QObject):
             
             print(f"   🎯 Plattform ausgewählt: {platform} für {filename}")
             
-            # Datei mit ausgewählter Plattform verarbeiten
-            self._process_single_file(file_path, platform)
+            # Datei läuft mit ausgewählter Plattform im nächsten Pipeline-Durchgang
+            self._platform_choices[file_path] = platform
             
             # Pending-Status zurücksetzen
             self._pending_platform_selection = None
@@ -385,129 +481,12 @@ class DatenSeiteQMLV3(QObject):
     def _continue_import_after_month_year_selection(self) -> None:
         """Setzt den Import nach Monat/Jahr-Auswahl fort"""
         if self._selected_files:
-            def continue_import_task():
-                try:
-                    for file_path in self._selected_files[:]:
-                        self._process_single_file(file_path)
-                    
-                    self.importFeedbackChanged.emit("success", "✅ Import abgeschlossen")
-                    
-                except Exception as e:
-                    self.importFeedbackChanged.emit("error", f"❌ Import-Fehler: {str(e)}")
-            
-            threading.Thread(target=continue_import_task, daemon=True).start()
+            self._start_import_pipeline()
 
     def _continue_import_after_platform_selection(self) -> None:
         """Setzt den Import nach Plattform-Auswahl fort"""
         if self._selected_files:
-            def continue_import_task():
-                try:
-                    for file_path in self._selected_files[:]:
-                        self._process_single_file(file_path)
-                    
-                    self.importFeedbackChanged.emit("success", "✅ Import abgeschlossen")
-                    
-                except Exception as e:
-                    self.importFeedbackChanged.emit("error", f"❌ Import-Fehler: {str(e)}")
-            
-            threading.Thread(target=continue_import_task, daemon=True).start()
-
-    def _import_with_salary_tool(self) -> None:
-        """Import mit salary_import_tool.py (1:1 aus Testdatei)"""
-        def import_task():
-            try:
-                for file_path in self._selected_files:
-                    filename = os.path.basename(file_path)
-                    print(f"   📊 Verarbeite Gehaltsdatei: {filename}")
-                    
-                    # Echten Gehaltsimport verwenden (1:1 aus Testdatei)
-                    try:
-                        from salary_import_tool import import_salary_pdf
-                        base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SQL")
-                        salaries_db = os.path.join(base_dir, "salaries.db")
-                        drivers_db = os.path.join(base_dir, "database.db")
-                        result = import_salary_pdf(file_path, salaries_db, drivers_db)
-                        
-                        if result["success"]:
-                            self.importFeedbackChanged.emit("success", f"✅ {filename} erfolgreich importiert: {result['imported_count']} Einträge")
-                            print(f"   ✅ {result['imported_count']} Gehaltsdatensätze importiert")
-                        else:
-                            error_msg = result.get('error', 'Unbekannter Fehler')
-                            self.importFeedbackChanged.emit("error", f"❌ Gehaltsimport-Fehler: {error_msg}")
-                            print(f"   ❌ Gehaltsimport-Fehler: {error_msg}")
-                    except Exception as import_error:
-                        print(f"   ⚠️ Fehler beim Gehaltsimport: {import_error}")
-                        import traceback
-                        traceback.print_exc()
-                        self.importFeedbackChanged.emit("error", f"❌ Gehaltsimport-Fehler: {str(import_error)}")
-                
-                self.importFeedbackChanged.emit("success", "✅ Gehaltsimport abgeschlossen")
-                
-            except Exception as e:
-                self.importFeedbackChanged.emit("error", f"❌ Gehaltsimport-Fehler: {str(e)}")
-        
-        threading.Thread(target=import_task, daemon=True).start()
-
-    def _import_with_funk_router(self) -> None:
-        """Import mit Scanner.py (1:1 aus der alten Version - auslesen, parsen, importieren)"""
-        def import_task():
-            try:
-                for file_path in self._selected_files:
-                    filename = os.path.basename(file_path)
-                    print(f"   📻 Verarbeite Funk-Datei: {filename}")
-                    
-                    # Echten Funk-Import verwenden (1:1 aus der alten Version)
-                    try:
-                        # Import Scanner.py für echte PDF-Verarbeitung
-                        sys.path.insert(0, str(Path(__file__).parent / "SQL"))
-                        from Scanner import process_funk_invoice, save_to_funk_db
-                        
-                        print(f"   🔄 Starte echte PDF-Verarbeitung für: {filename}")
-                        print(f"   📁 Dateipfad: {file_path}")
-                        
-                        # PDF auslesen, parsen und importieren (1:1 aus der alten Version)
-                        entries = process_funk_invoice(Path(file_path), trace=True)
-                        
-                        if entries:
-                            # Monat/Jahr aus Dateiname extrahieren (verbesserte Erkennung)
-                            month_year = self._extract_month_year_from_filename(filename)
-                            if month_year:
-                                month, year = month_year
-                                save_to_funk_db(entries, month, year, trace=True)
-                                self.importFeedbackChanged.emit("success", f"✅ {filename} erfolgreich importiert: {len(entries)} Einträge")
-                                print(f"   ✅ {len(entries)} Funk-Einträge importiert")
-                            else:
-                                # Dialog für Monat/Jahr-Auswahl anfordern
-                                print(f"   ⏳ Warte auf Monat/Jahr-Auswahl für {filename}...")
-                                
-                                # Vorschlag: Aktuelles Datum
-                                from datetime import datetime
-                                now = datetime.now()
-                                suggested_date = f"{now.month:02d}/{now.year}"
-                                
-                                # Monat/Jahr-Auswahl anfordern
-                                self._pending_month_year_selection = {
-                                    'file_path': file_path,
-                                    'filename': filename,
-                                    'entries': entries
-                                }
-                                self.monthYearSelectionRequested.emit(filename, suggested_date)
-                                return  # Pausiere Import bis Monat/Jahr ausgewählt
-                        else:
-                            self.importFeedbackChanged.emit("error", f"❌ Keine Einträge in PDF gefunden: {filename}")
-                            
-                    except Exception as import_error:
-                        print(f"   ⚠️ Fehler beim Funk-Import: {import_error}")
-                        import traceback
-                        traceback.print_exc()
-                        self.importFeedbackChanged.emit("error", f"❌ Funk-Import-Fehler: {str(import_error)}")
-                
-                self.importFeedbackChanged.emit("success", "✅ Funk-Import abgeschlossen")
-                
-            except Exception as e:
-                self.importFeedbackChanged.emit("error", f"❌ Funk-Import-Fehler: {str(e)}")
-        
-        threading.Thread(target=import_task, daemon=True).start()
+            self._start_import_pipeline()
 
     # Zusätzliche Methoden für Kompatibilität
     @Slot()
@@ -528,7 +507,7 @@ class DatenSeiteQMLV3(QObject):
 
     def cleanup(self):
         """Cleanup-Methode"""
-        pass
+        self.cancelExport()
 
     def __del__(self):
         """Destruktor"""
@@ -6,6 +6,8 @@ from contextlib import contextmanager
 from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 
+from connection_manager import connect, get_connection_manager
+
 # Logger für bessere Fehlerbehandlung
 logger = logging.getLogger(__name__)
 
@@ -13,43 +15,10 @@ class DatabaseError(Exception):
     """Custom exception für Datenbankfehler"""
     pass
 
-class DatabaseConnectionPool:
-    """Connection Pool für bessere Performance und Thread-Safety"""
-    
-    def __init__(self, db_path: str, max_connections: int = 10):
-        self.db_path = db_path
-        self.max_connections = max_connections
-        self._connections = []
-        self._lock = threading.Lock()
-        self._active_connections = 0
-        
-    def get_connection(self) -> sqlite3.Connection:
-        """Thread-safe Connection aus dem Pool holen"""
-        with self._lock:
-            if self._connections:
-                return self._connections.pop()
-            elif self._active_connections < self.max_connections:
-                self._active_connections += 1
-                conn = sqlite3.connect(self.db_path)
-                conn.row_factory = sqlite3.Row  # Named columns
-                return conn
-            else:
-                raise RuntimeError("Keine verfügbaren Datenbankverbindungen")
-    
-    def return_connection(self, conn: sqlite3.Connection):
-        """Connection zurück in den Pool geben"""
-        with self._lock:
-            if self._active_connections > 0:
-                self._active_connections -= 1
-                if len(self._connections) < self.max_connections:
-                    self._connections.append(conn)
-                else:
-                    conn.close()
-
 class DBManager:
     def __init__(self, db_path="SQL/database.db"):
         self.db_path = db_path
-        self._pool = DatabaseConnectionPool(db_path)
+        self._connections = get_connection_manager()
         self._setup_logging()
         # Initialisiere Tabellen beim Start
         self.initialize_database_tables()
@@ -222,7 +191,7 @@ class DBManager:
         """Context Manager für sichere Datenbankverbindungen"""
         conn = None
         try:
-            conn = self._pool.get_connection()
+            conn = self._connections.acquire(self.db_path, row_factory=sqlite3.Row)  # Named columns
             yield conn
         except sqlite3.Error as e:
             logger.error(f"Database error: {e}")
@@ -242,7 +211,7 @@ class DBManager:
                     logger.error(f"Commit error: {e}")
                     conn.rollback()
                 finally:
-                    self._pool.return_connection(conn)
+                    self._connections.release(conn)
     
     def _handle_database_error(self, operation: str, error: Exception) -> None:
         """Zentrale Fehlerbehandlung für alle DB-Operationen"""
@@ -716,7 +685,7 @@ class DBManager:
         """Prüft ob abhängige Daten für ein Fahrzeug existieren"""
         try:
             # Prüfen in revenue.db
-            revenue_conn = sqlite3.connect("SQL/revenue.db")
+            revenue_conn = connect("SQL/revenue.db")
             revenue_cursor = revenue_conn.cursor()
             revenue_cursor.execute("""
                 SELECT name FROM sqlite_master 
@@ -730,7 +699,7 @@ class DBManager:
             revenue_conn.close()
             
             # Prüfen in running_costs.db
-            running_costs_conn = sqlite3.connect("SQL/running_costs.db")
+            running_costs_conn = connect("SQL/running_costs.db")
             running_costs_cursor = running_costs_conn.cursor()
             running_costs_cursor.execute("""
                 SELECT name FROM sqlite_master 
@@ -0,0 +1,198 @@
+"""
+Persistenter Fahrernamen-Index für Uber/Bolt-Wochenberichte.
+
+Beim Import werden die Fahrernamen jeder report_KW-Tabelle normalisiert und
+als invertierter Index (Tokens, 'el'-Varianten, Trigramme) in derselben
+SQLite-Datenbank abgelegt. Die Auswertung kann dadurch Kandidaten über den
+Index bestimmen und muss nur noch die passende Zeile laden statt der ganzen
+Wochentabelle.
+"""
+
+import logging
+import re
+import sqlite3
+from typing import Dict, List, Tuple
+
+from fuzzy_matcher import clean_name, extend_el
+
+logger = logging.getLogger(__name__)
+
+# Namensspalten je Plattform (Tabellen aus SQL/smart_import.py)
+PLATFORM_NAME_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "uber": ("first_name", "last_name"),
+    "bolt": ("driver_name",),
+}
+
+INDEX_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS driver_name_index (
+        tabelle TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        name_clean TEXT NOT NULL,
+        PRIMARY KEY (tabelle, row_id)
+    );
+    CREATE TABLE IF NOT EXISTS driver_name_postings (
+        tabelle TEXT NOT NULL,
+        key TEXT NOT NULL,
+        row_id INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_driver_name_postings
+        ON driver_name_postings (tabelle, key);
+"""
+
+_TABLE_PATTERN = re.compile(r"^report_KW\d{1,2}$")
+
+
+def trigrams(name_clean: str) -> List[str]:
+    """Zeichen-Trigramme eines normalisierten Namens (Leerzeichen als Grenze)."""
+    padded = f" {name_clean} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def name_keys(name_clean: str) -> Tuple[List[str], List[str]]:
+    """Liefert (Token-Schlüssel, Trigramm-Schlüssel) für den invertierten Index."""
+    tokens = sorted(set(extend_el(name_clean.split())))
+    token_keys = [f"t:{t}" for t in tokens]
+    gram_keys = [f"g:{g}" for g in trigrams(name_clean)]
+    return token_keys, gram_keys
+
+
+def _is_report_table(tabelle: str) -> bool:
+    return bool(_TABLE_PATTERN.match(tabelle or ""))
+
+
+def _build_name(platform: str, values: Tuple) -> str:
+    if platform == "uber":
+        first, last = values
+        return clean_name(f"{first or ''} {last or ''}")
+    return clean_name(values[0] or "")
+
+
+class DriverNameIndex:
+    """Invertierter Namensindex innerhalb einer Plattform-Datenbank (uber/bolt)."""
+
+    def __init__(self, conn: sqlite3.Connection, platform: str):
+        platform = platform.lower()
+        if platform not in PLATFORM_NAME_COLUMNS:
+            raise ValueError(f"Plattform ohne Namensindex: {platform}")
+        self.conn = conn
+        self.platform = platform
+        self.name_columns = PLATFORM_NAME_COLUMNS[platform]
+
+    def ensure_schema(self):
+        """Legt Index-Tabellen an, falls nicht vorhanden.
+
+        Bewusst ohne executescript(), damit eine offene Import-Transaktion
+        nicht vorzeitig committet wird.
+        """
+        for statement in INDEX_SCHEMA.split(";"):
+            if statement.strip():
+                self.conn.execute(statement)
+
+    def _table_exists(self, tabelle: str) -> bool:
+        cursor = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (tabelle,)
+        )
+        return cursor.fetchone() is not None
+
+    def update_table(self, tabelle: str) -> int:
+        """Indexiert alle noch nicht erfassten Zeilen einer report_KW-Tabelle.
+
+        Wird nach jedem Import aufgerufen; bereits indexierte Zeilen werden
+        übersprungen. Gibt die Anzahl neu indexierter Zeilen zurück.
+        """
+        if not _is_report_table(tabelle) or not self._table_exists(tabelle):
+            return 0
+        self.ensure_schema()
+
+        cols = ", ".join(self.name_columns)
+        rows = self.conn.execute(
+            f"SELECT rowid, {cols} FROM {tabelle} "
+            f"WHERE rowid NOT IN (SELECT row_id FROM driver_name_index WHERE tabelle = ?)",
+            (tabelle,),
+        ).fetchall()
+        if not rows:
+            return 0
+
+        index_rows = []
+        posting_rows = []
+        for row in rows:
+            row_id = row[0]
+            name_clean = _build_name(self.platform, tuple(row[1:]))
+            index_rows.append((tabelle, row_id, name_clean))
+            token_keys, gram_keys = name_keys(name_clean)
+            posting_rows.extend((tabelle, key, row_id) for key in token_keys + gram_keys)
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO driver_name_index (tabelle, row_id, name_clean) VALUES (?, ?, ?)",
+            index_rows,
+        )
+        self.conn.executemany(
+            "INSERT INTO driver_name_postings (tabelle, key, row_id) VALUES (?, ?, ?)",
+            posting_rows,
+        )
+        logger.info(f"Namensindex {self.platform}/{tabelle}: {len(index_rows)} Zeilen indexiert")
+        return len(index_rows)
+
+    def is_indexed(self, tabelle: str) -> bool:
+        """Prüft, ob für die Tabelle bereits Indexeinträge existieren."""
+        try:
+            cursor = self.conn.execute(
+                "SELECT 1 FROM driver_name_index WHERE tabelle = ? LIMIT 1", (tabelle,)
+            )
+            return cursor.fetchone() is not None
+        except sqlite3.OperationalError:
+            return False
+
+    def candidates(self, tabelle: str, label: str, limit: int = 200) -> List[Tuple[int, str]]:
+        """Liefert Kandidaten (row_id, name_clean) für einen Fahrernamen.
+
+        Token- (inkl. 'el'-Varianten) und Trigramm-Treffer werden immer
+        gemeinsam gesucht und nach Anzahl gemeinsamer Schlüssel sortiert, bis
+        höchstens ``limit`` Kandidaten. So bleibt ein Fahrer mit vertipptem
+        Namen Kandidat, auch wenn ein anderer Fahrer den Vornamen teilt.
+        Nicht indexierte Tabellen werden dabei einmalig nachindexiert.
+        """
+        if not _is_report_table(tabelle) or not self._table_exists(tabelle):
+            return []
+        if not self.is_indexed(tabelle):
+            self.update_table(tabelle)
+            self.conn.commit()
+
+        token_keys, gram_keys = name_keys(clean_name(label))
+        keys = token_keys + gram_keys
+        if not keys:
+            return []
+        placeholders = ",".join("?" for _ in keys)
+        rows = self.conn.execute(
+            f"""
+            SELECT i.row_id, i.name_clean
+            FROM driver_name_postings p
+            JOIN driver_name_index i ON i.tabelle = p.tabelle AND i.row_id = p.row_id
+            WHERE p.tabelle = ? AND p.key IN ({placeholders})
+            GROUP BY i.row_id, i.name_clean
+            ORDER BY COUNT(*) DESC, i.row_id
+            LIMIT ?
+            """,
+            [tabelle, *keys, limit],
+        ).fetchall()
+        return [(int(r[0]), r[1]) for r in rows]
+
+    def drop_table(self, tabelle: str):
+        """Entfernt alle Indexeinträge einer Tabelle (z.B. nach Löschen der Woche)."""
+        try:
+            self.conn.execute("DELETE FROM driver_name_postings WHERE tabelle = ?", (tabelle,))
+            self.conn.execute("DELETE FROM driver_name_index WHERE tabelle = ?", (tabelle,))
+        except sqlite3.OperationalError:
+            pass
+
+
+def index_report_table(conn: sqlite3.Connection, platform: str, tabelle: str) -> int:
+    """Import-Hook: aktualisiert den Namensindex, falls die Plattform einen hat."""
+    if platform.lower() not in PLATFORM_NAME_COLUMNS:
+        return 0
+    try:
+        return DriverNameIndex(conn, platform).update_table(tabelle)
+    except Exception as e:
+        print(f"⚠️ Fehler beim Aktualisieren des Namensindex: {e}")
+        return 0
+
@@ -3,11 +3,15 @@ import sqlite3
 import os
 from generic_wizard import GenericWizard
 from db_manager import DBManager, DatabaseError
+from connection_manager import connect
+from quick_billing import QuickBillingEngine, format_summary
+from vehicle_ledger import REVENUE, RUNNING_COSTS, ensure_weekly_summary, summary_weeks, update_weekly_summary, week_summary
 import difflib
 from datetime import datetime
 import logging
 import time
 from typing import Optional, Dict, Any, List
+import threading
 from threading import Timer
 
 # Logger für bessere Fehlerbehandlung
@@ -49,6 +53,9 @@ class FahrzeugSeiteQMLV2(QObject):
                 # Expenses speichern (Tank, Garage, weitere Expenses)
                 self._save_expenses_entries(license_plate, week, data)
 
+                # Wochensumme nachführen
+                self._update_weekly_summary(license_plate, week)
+
             self.setStatusMessage(f"Ergebnisse gespeichert für {len(week_data)} Kalenderwochen")
 
             # Variante A: UI-Refresh der Kalenderwochenansicht, falls aktiv
@@ -61,89 +68,100 @@ class FahrzeugSeiteQMLV2(QObject):
         except Exception as e:
             self._handle_error("Quick-Results speichern", e)
 
-    def _save_revenue_entry(self, license_plate: str, driver: str, week: int, data: Dict[str, Any]):
+    def _update_weekly_summary(self, license_plate: str, week: int):
+        # Schlägt das fehl, bleibt die Woche in weekly_summary_stale vermerkt und wird beim nächsten Lesen nachgerechnet
         try:
-            conn = sqlite3.connect("SQL/revenue.db")
-            cursor = conn.cursor()
-            # Tabelle sicherstellen
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS [{}] (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cw INTEGER,
-                    deal TEXT,
-                    driver TEXT,
-                    total REAL,
-                    taxed REAL,
-                    income REAL,
-                    timestamp TEXT
-                )
-            """.format(license_plate))
-
-            # Vorhandene Einträge für (cw, driver) löschen (Upsert-Logik)
-            cursor.execute("DELETE FROM [{}] WHERE cw = ? AND driver = ?".format(license_plate), (week, driver))
+            update_weekly_summary(license_plate, int(week))
+        except Exception as e:
+            logger.warning(f"Wochensumme für {license_plate} KW {week} nicht aktualisiert: {e}")
 
-            total = float(data.get('umsatz') or 0)
-            taxed = float(data.get('credit_card') or 0)
-            income = float(data.get('income') or 0)
-            from datetime import datetime
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cursor.execute("""
-                INSERT INTO [{}] (cw, deal, driver, total, taxed, income, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """.format(license_plate), (week, 'Quick', driver, total, taxed, income, ts))
-            conn.commit()
-            conn.close()
+    def _save_revenue_entry(self, license_plate: str, driver: str, week: int, data: Dict[str, Any]):
+        try:
+            conn = connect("SQL/revenue.db")
+            try:
+                cursor = conn.cursor()
+                # Tabelle sicherstellen
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS [{}] (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        cw INTEGER,
+                        deal TEXT,
+                        driver TEXT,
+                        total REAL,
+                        taxed REAL,
+                        income REAL,
+                        timestamp TEXT
+                    )
+                """.format(license_plate))
+
+                # Vorhandene Einträge für (cw, driver) löschen (Upsert-Logik)
+                cursor.execute("DELETE FROM [{}] WHERE cw = ? AND driver = ?".format(license_plate), (week, driver))
+
+                total = float(data.get('umsatz') or 0)
+                taxed = float(data.get('credit_card') or 0)
+                income = float(data.get('income') or 0)
+                from datetime import datetime
+                ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                cursor.execute("""
+                    INSERT INTO [{}] (cw, deal, driver, total, taxed, income, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """.format(license_plate), (week, 'Quick', driver, total, taxed, income, ts))
+                conn.commit()
+            finally:
+                conn.close()
         except Exception as e:
             print(f"Fehler beim Speichern Revenue (KW {week}): {e}")
 
     def _save_expenses_entries(self, license_plate: str, week: int, data: Dict[str, Any]):
         try:
-            conn = sqlite3.connect("SQL/running_costs.db")
-            cursor = conn.cursor()
-            # Tabelle sicherstellen
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS [{}] (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cw INTEGER,
-                    amount REAL,
-                    category TEXT,
-                    details TEXT,
-                    timestamp TEXT
-                )
-            """.format(license_plate))
-
-            # Bestehende Einträge für die Woche löschen (wir speichern alles frisch)
-            cursor.execute("DELETE FROM [{}] WHERE cw = ?".format(license_plate), (week,))
-
-            from datetime import datetime
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            # Tank als Expense (Kategorie Gas) speichern, falls vorhanden
-            tank_amount = float(data.get('tank') or 0)
-            if tank_amount:
+            conn = connect("SQL/running_costs.db")
+            try:
+                cursor = conn.cursor()
+                # Tabelle sicherstellen
                 cursor.execute("""
-                    INSERT INTO [{}] (cw, amount, category, details, timestamp)
-                    VALUES (?, ?, ?, ?, ?)
-                """.format(license_plate), (week, tank_amount, 'Gas', 'QuickSave', ts))
+                    CREATE TABLE IF NOT EXISTS [{}] (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        cw INTEGER,
+                        amount REAL,
+                        category TEXT,
+                        details TEXT,
+                        timestamp TEXT
+                    )
+                """.format(license_plate))
+
+                # Bestehende Einträge für die Woche löschen (wir speichern alles frisch)
+                cursor.execute("DELETE FROM [{}] WHERE cw = ?".format(license_plate), (week,))
+
+                from datetime import datetime
+                ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+                # Tank als Expense (Kategorie Gas) speichern, falls vorhanden
+                tank_amount = float(data.get('tank') or 0)
+                if tank_amount:
+                    cursor.execute("""
+                        INSERT INTO [{}] (cw, amount, category, details, timestamp)
+                        VALUES (?, ?, ?, ?, ?)
+                    """.format(license_plate), (week, tank_amount, 'Gas', 'QuickSave', ts))
 
-            # Garage als Expense speichern
-            garage_amount = float(data.get('garage') or 0)
-            if garage_amount:
-                cursor.execute("""
-                    INSERT INTO [{}] (cw, amount, category, details, timestamp)
-                    VALUES (?, ?, ?, ?, ?)
-                """.format(license_plate), (week, garage_amount, 'Parking', 'QuickSave', ts))
+                # Garage als Expense speichern
+                garage_amount = float(data.get('garage') or 0)
+                if garage_amount:
+                    cursor.execute("""
+                        INSERT INTO [{}] (cw, amount, category, details, timestamp)
+                        VALUES (?, ?, ?, ?, ?)
+                    """.format(license_plate), (week, garage_amount, 'Parking', 'QuickSave', ts))
 
-            # Weitere Expenses (falls vorhanden)
-            expense_amount = float(data.get('expense') or 0)
-            if expense_amount:
-                cursor.execute("""
-                    INSERT INTO [{}] (cw, amount, category, details, timestamp)
-                    VALUES (?, ?, ?, ?, ?)
-                """.format(license_plate), (week, expense_amount, 'Expense', 'QuickSave', ts))
+                # Weitere Expenses (falls vorhanden)
+                expense_amount = float(data.get('expense') or 0)
+                if expense_amount:
+                    cursor.execute("""
+                        INSERT INTO [{}] (cw, amount, category, details, timestamp)
+                        VALUES (?, ?, ?, ?, ?)
+                    """.format(license_plate), (week, expense_amount, 'Expense', 'QuickSave', ts))
 
-            conn.commit()
-            conn.close()
+                conn.commit()
+            finally:
+                conn.close()
         except Exception as e:
             print(f"Fehler beim Speichern Expenses (KW {week}): {e}")
 
@@ -907,7 +925,7 @@ class FahrzeugSeiteQMLV2(QObject):
             current_year = current_date.year
             
             # Alle Fahrzeuge laden
-            conn = sqlite3.connect("SQL/database.db")
+            conn = connect("SQL/database.db")
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT license_plate, rfrnc, model, year, insurance, credit,
@@ -919,9 +937,18 @@ class FahrzeugSeiteQMLV2(QObject):
             """)
             vehicles = cursor.fetchall()
             
-            # Revenue-Datenbank prüfen
-            revenue_conn = sqlite3.connect("SQL/revenue.db")
-            revenue_cursor = revenue_conn.cursor()
+            # Wochen mit Daten aus den materialisierten Wochensummen (eine Abfrage)
+            weeks_by_plate = {}
+            revenue_conn = connect("SQL/revenue.db")
+            running_costs_conn = connect("SQL/running_costs.db")
+            try:
+                ensure_weekly_summary(revenue_conn, running_costs_conn)
+                weeks_by_plate = summary_weeks(revenue_conn, current_year, current_week)
+            except Exception as e:
+                print(f"Fehler beim Lesen der Wochensummen: {e}")
+            finally:
+                revenue_conn.close()
+                running_costs_conn.close()
             
             self._fahrzeug_list = []
             
@@ -941,62 +968,7 @@ class FahrzeugSeiteQMLV2(QObject):
                 
                 # Kalenderwochen für das aktuelle Jahr generieren (nur bis zur aktuellen Woche)
                 weeks = []
-                
-                # Prüfen ob Fahrzeug-Tabellen in BEIDEN Datenbanken existieren
-                try:
-                    # Revenue-Datenbank prüfen
-                    revenue_cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name=?
-                    """, (fahrzeug["kennzeichen"],))
-                    revenue_table_exists = revenue_cursor.fetchone() is not None
-                    
-                    # Running-Costs-Datenbank prüfen
-                    running_costs_conn = sqlite3.connect("SQL/running_costs.db")
-                    running_costs_cursor = running_costs_conn.cursor()
-                    running_costs_cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name=?
-                    """, (fahrzeug["kennzeichen"],))
-                    running_costs_table_exists = running_costs_cursor.fetchone() is not None
-                    
-                    # Wochen mit Daten aus BEIDEN Datenbanken sammeln
-                    weeks_with_data = set()
-                    
-                    # Revenue-Daten prüfen
-                    if revenue_table_exists:
-                        revenue_cursor.execute("""
-                            SELECT cw FROM [{}] 
-                            WHERE cw BETWEEN 1 AND ?
-                        """.format(fahrzeug["kennzeichen"]), (current_week,))
-                        revenue_weeks = {row[0] for row in revenue_cursor.fetchall()}
-                        weeks_with_data.update(revenue_weeks)
-                    
-                    # Running-Costs-Daten prüfen
-                    if running_costs_table_exists:
-                        running_costs_cursor.execute("""
-                            SELECT cw FROM [{}] 
-                            WHERE cw BETWEEN 1 AND ?
-                        """.format(fahrzeug["kennzeichen"]), (current_week,))
-                        running_costs_weeks = {row[0] for row in running_costs_cursor.fetchall()}
-                        weeks_with_data.update(running_costs_weeks)
-                    
-                    existing_weeks = weeks_with_data
-                    
-                    # Nur bei W135CTX ausgeben für Debug
-                    if fahrzeug['kennzeichen'] == 'W135CTX':
-                        print(f"Fahrzeug {fahrzeug['kennzeichen']}: {len(existing_weeks)} Wochen mit Daten gefunden")
-                        print(f"  - Revenue Wochen: {revenue_weeks if revenue_table_exists else 'Keine Tabelle'}")
-                        print(f"  - Running-Costs Wochen: {running_costs_weeks if running_costs_table_exists else 'Keine Tabelle'}")
-                    
-                    # Running-Costs-Verbindung schließen
-                    running_costs_conn.close()
-                        
-                except Exception as e:
-                    # Nur bei W135CTX ausgeben für Debug
-                    if fahrzeug['kennzeichen'] == 'W135CTX':
-                        print(f"Fehler bei Fahrzeug {fahrzeug['kennzeichen']}: {e}")
-                    existing_weeks = set()
+                existing_weeks = weeks_by_plate.get(fahrzeug["kennzeichen"], set())
                 
                 # Wochen generieren
                 for week in range(1, current_week + 1):
@@ -1022,7 +994,6 @@ class FahrzeugSeiteQMLV2(QObject):
         finally:
             try:
                 conn.close()
-                revenue_conn.close()
             except:
                 pass
 
@@ -1034,7 +1005,7 @@ class FahrzeugSeiteQMLV2(QObject):
         
         try:
             # Daten aus revenue.db laden
-            revenue_conn = sqlite3.connect("SQL/revenue.db")
+            revenue_conn = connect("SQL/revenue.db")
             revenue_cursor = revenue_conn.cursor()
             
             # Prüfen ob Tabelle existiert
@@ -1069,7 +1040,7 @@ class FahrzeugSeiteQMLV2(QObject):
                 formatted_revenue = []
             
             # Daten aus running_costs.db laden
-            running_costs_conn = sqlite3.connect("SQL/running_costs.db")
+            running_costs_conn = connect("SQL/running_costs.db")
             running_costs_cursor = running_costs_conn.cursor()
             
             # Prüfen ob Tabelle existiert
@@ -1134,7 +1105,7 @@ class FahrzeugSeiteQMLV2(QObject):
             running_costs_data = []
             
             # Revenue-Datenbank prüfen
-            revenue_conn = sqlite3.connect("SQL/revenue.db")
+            revenue_conn = connect("SQL/revenue.db")
             revenue_cursor = revenue_conn.cursor()
             revenue_cursor.execute("""
                 SELECT name FROM sqlite_master 
@@ -1150,7 +1121,7 @@ class FahrzeugSeiteQMLV2(QObject):
                 revenue_data = revenue_cursor.fetchall()
             
             # Running-Costs-Datenbank prüfen
-            running_costs_conn = sqlite3.connect("SQL/running_costs.db")
+            running_costs_conn = connect("SQL/running_costs.db")
             running_costs_cursor = running_costs_conn.cursor()
             running_costs_cursor.execute("""
                 SELECT name FROM sqlite_master 
@@ -1218,7 +1189,7 @@ class FahrzeugSeiteQMLV2(QObject):
             
             # In revenue.db speichern
             try:
-                revenue_conn = sqlite3.connect("SQL/revenue.db")
+                revenue_conn = connect("SQL/revenue.db")
                 revenue_cursor = revenue_conn.cursor()
                 
                 # Prüfen ob Tabelle existiert, sonst erstellen
@@ -1477,7 +1448,7 @@ class FahrzeugSeiteQMLV2(QObject):
                 entry_data = entry_data.toVariant()
             
             # Verbindung zur revenue.db
-            conn = sqlite3.connect("SQL/revenue.db")
+            conn = connect("SQL/revenue.db")
             cursor = conn.cursor()
             
             # Prüfen ob Tabelle existiert
@@ -1504,11 +1475,12 @@ class FahrzeugSeiteQMLV2(QObject):
                 deleted_rows = cursor.rowcount
                 
                 if deleted_rows > 0:
+                    self._update_weekly_summary(license_plate, week)
                     self.setStatusMessage(f"Revenue-Eintrag erfolgreich gelöscht")
                     print(f"Revenue-Eintrag gelöscht: {deleted_rows} Zeilen betroffen")
                     
                     # Prüfen ob Running-Costs-Einträge für diese Woche existieren
-                    running_costs_conn = sqlite3.connect("SQL/running_costs.db")
+                    running_costs_conn = connect("SQL/running_costs.db")
                     running_costs_cursor = running_costs_conn.cursor()
                     
                     # Prüfen ob Running-Costs-Tabelle existiert
@@ -1575,7 +1547,7 @@ class FahrzeugSeiteQMLV2(QObject):
                 entry_data = entry_data.toVariant()
             
             # Verbindung zur running_costs.db
-            conn = sqlite3.connect("SQL/running_costs.db")
+            conn = connect("SQL/running_costs.db")
             cursor = conn.cursor()
             
             # Prüfen ob Tabelle existiert
@@ -1601,6 +1573,7 @@ class FahrzeugSeiteQMLV2(QObject):
                 deleted_rows = cursor.rowcount
                 
                 if deleted_rows > 0:
+                    self._update_weekly_summary(license_plate, week)
                     self.setStatusMessage(f"Running-Costs-Eintrag erfolgreich gelöscht")
                     print(f"Running-Costs-Eintrag gelöscht: {deleted_rows} Zeilen betroffen")
                     
@@ -1638,7 +1611,7 @@ class FahrzeugSeiteQMLV2(QObject):
             self.setStatusMessage(f"Running-Costs-Einträge werden gelöscht...")
             
             # Verbindung zur running_costs.db
-            conn = sqlite3.connect("SQL/running_costs.db")
+            conn = connect("SQL/running_costs.db")
             cursor = conn.cursor()
             
             # Prüfen ob Tabelle existiert
@@ -1658,6 +1631,7 @@ class FahrzeugSeiteQMLV2(QObject):
                 deleted_rows = cursor.rowcount
                 
                 if deleted_rows > 0:
+                    self._update_weekly_summary(license_plate, week)
                     self.setStatusMessage(f"{deleted_rows} Running-Costs-Einträge erfolgreich gelöscht")
                     print(f"Running-Costs-Einträge gelöscht: {deleted_rows} Zeilen betroffen")
                 else:
@@ -1702,7 +1676,7 @@ class FahrzeugSeiteQMLV2(QObject):
         """Gibt eine Liste aller aktiven Fahrer aus der drivers-Tabelle zurück"""
         try:
             # Verbindung zur database.db
-            conn = sqlite3.connect("SQL/database.db")
+            conn = connect("SQL/database.db")
             cursor = conn.cursor()
             
             # Nur aktive Fahrer aus der drivers-Tabelle laden
@@ -1736,115 +1710,48 @@ class FahrzeugSeiteQMLV2(QObject):
 
     @Slot(str, str, str, float, float, float)
     def runQuickSchnellabrechnung(self, license_plate: str, driver: str, kalenderwochen: str, tank_percent: float, einsteiger_percent: float, expense_euro: float):
-        """Startet die Schnellabrechnung mit dem test_schnellabrechnung.py Skript"""
-        try:
-            import subprocess, sys, os
-            self.setStatusMessage("Schnellabrechnung wird ausgeführt...")
-            
-            # Verfügbare Daten in der Datenbank prüfen
-            available_weeks = self._get_available_weeks(license_plate)
-            print(f"DEBUG: Verfügbare Wochen für {license_plate}: {available_weeks}")
-            
-            # Wenn keine Daten für das aktuelle Fahrzeug vorhanden sind, suche nach einem Fahrzeug mit Daten
-            if not available_weeks:
-                print(f"DEBUG: Keine Daten für {license_plate} gefunden, suche nach Fahrzeug mit Daten...")
-                available_license_plate = self._find_vehicle_with_data()
-                if available_license_plate:
-                    print(f"DEBUG: Verwende Fahrzeug mit Daten: {available_license_plate}")
-                    license_plate = available_license_plate
-                    available_weeks = self._get_available_weeks(license_plate)
-                    print(f"DEBUG: Verfügbare Wochen für {license_plate}: {available_weeks}")
-            
-            # Nur verfügbare Wochen verwenden
-            requested_weeks = [kw.strip() for kw in kalenderwochen.split(',') if kw.strip()]
-            available_requested_weeks = [week for week in requested_weeks if week in available_weeks]
-            
-            if not available_requested_weeks:
-                print(f"DEBUG: Keine Daten für angeforderte Wochen {requested_weeks} gefunden")
-                print(f"DEBUG: Verwende verfügbare Wochen: {available_weeks}")
-                available_requested_weeks = available_weeks  # Alle verfügbaren Wochen verwenden
-            
-            # Konfigurationsdatei erstellen/aktualisieren
-            config_content = f"""[Test]
-fahrer = {driver}
-fahrzeug = {license_plate}
-kalenderwochen = {','.join(available_requested_weeks)}
-tank_prozent = {tank_percent}
-einsteiger_prozent = {einsteiger_percent}
-expense_fix = {expense_euro}
-
-[Deals]
-p_deal_pauschale = 650.0
-p_deal_umsatzgrenze = 1200.0
-p_deal_bonus_prozent = 0.1
-percent_deal_anteil = 0.5
-percent_deal_einsteiger_faktor = 0.5
-custom_deal_anteil = 0.6
-
-[Garage]
-monatliche_garage = 80.0
-garage_faktor = 0.5
-max_montage_pro_monat = 5
-
-[Umsatz]
-max_umsatz_pro_fahrt = 250
-min_umsatz_pro_fahrt = -250
-umsatz_filter_aktiv = true
-
-[Fuzzy_Matching]
-min_match_score = 50
-max_distance = 3
-arabic_name_bonus = 20
-
-[Security]
-sql_injection_protection = true
-input_validation = true
-max_kalenderwochen = 52
-max_fahrer_name_length = 100
-max_fahrzeug_name_length = 50
-"""
-            
-            # Konfigurationsdatei speichern
-            config_file = "test_config.ini"
-            with open(config_file, 'w', encoding='utf-8') as f:
-                f.write(config_content)
-            
-            print(f"DEBUG: Konfigurationsdatei erstellt: {config_file}")
-            print(f"DEBUG: Datei existiert: {os.path.exists(config_file)}")
-            print(f"DEBUG: Dateigröße: {os.path.getsize(config_file)} Bytes")
-            
-            # Schnellabrechnung-Skript ausführen
-            cmd = [sys.executable, 'test_schnellabrechnung.py']
-            print(f"DEBUG: Führe aus: {' '.join(cmd)}")
-            print(f"DEBUG: Konfiguration: {config_content}")
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)  # 5 Minuten Timeout
-            
-            # Ausgabe formatieren
-            output = result.stdout or ''
-            if result.stderr:
-                output += '\n' + result.stderr
-            
-            print(f"DEBUG: Return Code: {result.returncode}")
-            print(f"DEBUG: STDOUT Länge: {len(result.stdout or '')}")
-            print(f"DEBUG: STDERR Länge: {len(result.stderr or '')}")
-            print(f"DEBUG: Erste 200 Zeichen STDOUT: {result.stdout[:200] if result.stdout else 'LEER'}")
-            
-            # Ergebnis formatieren für bessere Darstellung
-            formatted_output = self._format_schnellabrechnung_output(output)
-            
-            print(f"DEBUG: Sende Ergebnis an QML: {len(formatted_output)} Zeichen")
-            self.quickResultReady.emit(formatted_output)
-            self.setStatusMessage(f"Schnellabrechnung abgeschlossen - {len(formatted_output)} Zeichen gesendet")
-            
-        except subprocess.TimeoutExpired:
-            msg = "Schnellabrechnung wurde nach 5 Minuten abgebrochen"
-            self.setStatusMessage(msg)
-            self.quickResultReady.emit(msg)
-        except Exception as e:
-            msg = f"Fehler bei Schnellabrechnung: {e}"
-            self.setStatusMessage(msg)
-            self.quickResultReady.emit(msg)
+        """Startet die Schnellabrechnung im Hintergrund-Thread (In-Process-Engine, kein Subprozess)"""
+        self.setStatusMessage("Schnellabrechnung wird ausgeführt...")
+        
+        def quick_billing_task():
+            try:
+                plate = license_plate
+                # Verfügbare Daten in der Datenbank prüfen
+                available_weeks = self._get_available_weeks(plate)
+                print(f"DEBUG: Verfügbare Wochen für {plate}: {available_weeks}")
+                
+                # Wenn keine Daten für das aktuelle Fahrzeug vorhanden sind, suche nach einem Fahrzeug mit Daten
+                if not available_weeks:
+                    print(f"DEBUG: Keine Daten für {plate} gefunden, suche nach Fahrzeug mit Daten...")
+                    available_license_plate = self._find_vehicle_with_data()
+                    if available_license_plate:
+                        print(f"DEBUG: Verwende Fahrzeug mit Daten: {available_license_plate}")
+                        plate = available_license_plate
+                        available_weeks = self._get_available_weeks(plate)
+                
+                # Nur verfügbare Wochen verwenden
+                requested_weeks = [kw.strip().upper().replace("KW", "") for kw in kalenderwochen.split(',') if kw.strip()]
+                available_requested_weeks = [week for week in requested_weeks if week in available_weeks]
+                if not available_requested_weeks:
+                    print(f"DEBUG: Keine Daten für angeforderte Wochen {requested_weeks} gefunden")
+                    available_requested_weeks = available_weeks  # Alle verfügbaren Wochen verwenden
+                
+                result = QuickBillingEngine().run(
+                    plate, driver, available_requested_weeks,
+                    float(tank_percent), float(einsteiger_percent), float(expense_euro)
+                )
+                
+                # Textformat wie bisher (wird im QML-Overlay geparst)
+                formatted_output = self._format_schnellabrechnung_output(format_summary(result))
+                self.quickResultReady.emit(formatted_output)
+                self.setStatusMessage(f"Schnellabrechnung abgeschlossen - {len(result.weeks)} Wochen berechnet")
+                
+            except Exception as e:
+                msg = f"Fehler bei Schnellabrechnung: {e}"
+                self.setStatusMessage(msg)
+                self.quickResultReady.emit(msg)
+        
+        threading.Thread(target=quick_billing_task, daemon=True).start()
     
     def _find_vehicle_with_data(self) -> str:
         """Findet ein Fahrzeug mit verfügbaren Daten (wie test_schnellabrechnung.py)"""
@@ -1855,28 +1762,29 @@ max_fahrzeug_name_length = 50
             db_path_40100 = os.path.abspath(os.path.join("SQL", "40100.sqlite"))
             if os.path.exists(db_path_40100):
                 try:
-                    conn = sqlite3.connect(db_path_40100)
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name LIKE 'report_KW%'
-                        ORDER BY name
-                    """)
-                    tables_40100 = [row[0] for row in cursor.fetchall()]
-                    print(f"DEBUG: 40100-Tabellen gefunden: {tables_40100}")
-                    
-                    # Prüfe ob Daten in den Tabellen vorhanden sind
-                    for table in tables_40100[:3]:  # Nur erste 3 Tabellen prüfen
-                        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                        count = cursor.fetchone()[0]
-                        if count > 0:
-                            print(f"DEBUG: Daten in {table}: {count} Datensätze")
-                            # Extrahiere Fahrzeug aus den Daten
-                            cursor.execute(f"SELECT DISTINCT Fahrzeug FROM {table} LIMIT 5")
-                            vehicles = [row[0] for row in cursor.fetchall() if row[0]]
-                            available_vehicles.extend(vehicles)
+                    conn = connect(db_path_40100)
+                    try:
+                        cursor = conn.cursor()
+                        cursor.execute("""
+                            SELECT name FROM sqlite_master 
+                            WHERE type='table' AND name LIKE 'report_KW%'
+                            ORDER BY name
+                        """)
+                        tables_40100 = [row[0] for row in cursor.fetchall()]
+                        print(f"DEBUG: 40100-Tabellen gefunden: {tables_40100}")
                     
-                    conn.close()
+                        # Prüfe ob Daten in den Tabellen vorhanden sind
+                        for table in tables_40100[:3]:  # Nur erste 3 Tabellen prüfen
+                            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                            count = cursor.fetchone()[0]
+                            if count > 0:
+                                print(f"DEBUG: Daten in {table}: {count} Datensätze")
+                                # Extrahiere Fahrzeug aus den Daten
+                                cursor.execute(f"SELECT DISTINCT Fahrzeug FROM {table} LIMIT 5")
+                                vehicles = [row[0] for row in cursor.fetchall() if row[0]]
+                                available_vehicles.extend(vehicles)
+                    finally:
+                        conn.close()
                 except Exception as e:
                     print(f"DEBUG: Fehler bei 40100: {e}")
             
@@ -1884,28 +1792,29 @@ max_fahrzeug_name_length = 50
             db_path_31300 = os.path.abspath(os.path.join("SQL", "31300.sqlite"))
             if os.path.exists(db_path_31300):
                 try:
-                    conn = sqlite3.connect(db_path_31300)
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name LIKE 'report_KW%'
-                        ORDER BY name
-                    """)
-                    tables_31300 = [row[0] for row in cursor.fetchall()]
-                    print(f"DEBUG: 31300-Tabellen gefunden: {tables_31300}")
-                    
-                    # Prüfe ob Daten in den Tabellen vorhanden sind
-                    for table in tables_31300[:3]:  # Nur erste 3 Tabellen prüfen
-                        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                        count = cursor.fetchone()[0]
-                        if count > 0:
-                            print(f"DEBUG: Daten in {table}: {count} Datensätze")
-                            # Extrahiere Fahrzeug aus den Daten
-                            cursor.execute(f"SELECT DISTINCT Fahrzeug FROM {table} LIMIT 5")
-                            vehicles = [row[0] for row in cursor.fetchall() if row[0]]
-                            available_vehicles.extend(vehicles)
+                    conn = connect(db_path_31300)
+                    try:
+                        cursor = conn.cursor()
+                        cursor.execute("""
+                            SELECT name FROM sqlite_master 
+                            WHERE type='table' AND name LIKE 'report_KW%'
+                            ORDER BY name
+                        """)
+                        tables_31300 = [row[0] for row in cursor.fetchall()]
+                        print(f"DEBUG: 31300-Tabellen gefunden: {tables_31300}")
                     
-                    conn.close()
+                        # Prüfe ob Daten in den Tabellen vorhanden sind
+                        for table in tables_31300[:3]:  # Nur erste 3 Tabellen prüfen
+                            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                            count = cursor.fetchone()[0]
+                            if count > 0:
+                                print(f"DEBUG: Daten in {table}: {count} Datensätze")
+                                # Extrahiere Fahrzeug aus den Daten
+                                cursor.execute(f"SELECT DISTINCT Fahrzeug FROM {table} LIMIT 5")
+                                vehicles = [row[0] for row in cursor.fetchall() if row[0]]
+                                available_vehicles.extend(vehicles)
+                    finally:
+                        conn.close()
                 except Exception as e:
                     print(f"DEBUG: Fehler bei 31300: {e}")
             
@@ -1913,26 +1822,27 @@ max_fahrzeug_name_length = 50
             db_path_uber = os.path.abspath(os.path.join("SQL", "uber.sqlite"))
             if os.path.exists(db_path_uber):
                 try:
-                    conn = sqlite3.connect(db_path_uber)
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name LIKE 'report_KW%'
-                        ORDER BY name
-                    """)
-                    tables_uber = [row[0] for row in cursor.fetchall()]
-                    print(f"DEBUG: Uber-Tabellen gefunden: {tables_uber}")
-                    
-                    # Prüfe ob Daten in den Tabellen vorhanden sind
-                    for table in tables_uber[:3]:  # Nur erste 3 Tabellen prüfen
-                        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                        count = cursor.fetchone()[0]
-                        if count > 0:
-                            print(f"DEBUG: Daten in {table}: {count} Datensätze")
-                            # Für Uber verwenden wir einen Standard-Fahrzeugnamen
-                            available_vehicles.append("W135CTX")  # Standard-Fahrzeug
+                    conn = connect(db_path_uber)
+                    try:
+                        cursor = conn.cursor()
+                        cursor.execute("""
+                            SELECT name FROM sqlite_master 
+                            WHERE type='table' AND name LIKE 'report_KW%'
+                            ORDER BY name
+                        """)
+                        tables_uber = [row[0] for row in cursor.fetchall()]
+                        print(f"DEBUG: Uber-Tabellen gefunden: {tables_uber}")
                     
-                    conn.close()
+                        # Prüfe ob Daten in den Tabellen vorhanden sind
+                        for table in tables_uber[:3]:  # Nur erste 3 Tabellen prüfen
+                            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                            count = cursor.fetchone()[0]
+                            if count > 0:
+                                print(f"DEBUG: Daten in {table}: {count} Datensätze")
+                                # Für Uber verwenden wir einen Standard-Fahrzeugnamen
+                                available_vehicles.append("W135CTX")  # Standard-Fahrzeug
+                    finally:
+                        conn.close()
                 except Exception as e:
                     print(f"DEBUG: Fehler bei Uber: {e}")
             
@@ -1940,26 +1850,27 @@ max_fahrzeug_name_length = 50
             db_path_bolt = os.path.abspath(os.path.join("SQL", "bolt.sqlite"))
             if os.path.exists(db_path_bolt):
                 try:
-                    conn = sqlite3.connect(db_path_bolt)
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name LIKE 'report_KW%'
-                        ORDER BY name
-                    """)
-                    tables_bolt = [row[0] for row in cursor.fetchall()]
-                    print(f"DEBUG: Bolt-Tabellen gefunden: {tables_bolt}")
-                    
-                    # Prüfe ob Daten in den Tabellen vorhanden sind
-                    for table in tables_bolt[:3]:  # Nur erste 3 Tabellen prüfen
-                        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                        count = cursor.fetchone()[0]
-                        if count > 0:
-                            print(f"DEBUG: Daten in {table}: {count} Datensätze")
-                            # Für Bolt verwenden wir einen Standard-Fahrzeugnamen
-                            available_vehicles.append("W135CTX")  # Standard-Fahrzeug
+                    conn = connect(db_path_bolt)
+                    try:
+                        cursor = conn.cursor()
+                        cursor.execute("""
+                            SELECT name FROM sqlite_master 
+                            WHERE type='table' AND name LIKE 'report_KW%'
+                            ORDER BY name
+                        """)
+                        tables_bolt = [row[0] for row in cursor.fetchall()]
+                        print(f"DEBUG: Bolt-Tabellen gefunden: {tables_bolt}")
                     
-                    conn.close()
+                        # Prüfe ob Daten in den Tabellen vorhanden sind
+                        for table in tables_bolt[:3]:  # Nur erste 3 Tabellen prüfen
+                            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                            count = cursor.fetchone()[0]
+                            if count > 0:
+                                print(f"DEBUG: Daten in {table}: {count} Datensätze")
+                                # Für Bolt verwenden wir einen Standard-Fahrzeugnamen
+                                available_vehicles.append("W135CTX")  # Standard-Fahrzeug
+                    finally:
+                        conn.close()
                 except Exception as e:
                     print(f"DEBUG: Fehler bei Bolt: {e}")
             
@@ -1991,24 +1902,25 @@ max_fahrzeug_name_length = 50
             db_path_40100 = os.path.abspath(os.path.join("SQL", "40100.sqlite"))
             if os.path.exists(db_path_40100):
                 try:
-                    conn = sqlite3.connect(db_path_40100)
-                    cursor = conn.cursor()
-                    
-                    # Alle report_KW Tabellen finden
-                    cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name LIKE 'report_KW%'
-                        ORDER BY name
-                    """)
-                    tables = [row[0] for row in cursor.fetchall()]
+                    conn = connect(db_path_40100)
+                    try:
+                        cursor = conn.cursor()
                     
-                    for table in tables:
-                        # Extrahiere KW aus Tabellennamen (z.B. report_KW31 -> 31)
-                        kw_match = table.replace("report_KW", "")
-                        if kw_match.isdigit():
-                            available_weeks.append(kw_match)
+                        # Alle report_KW Tabellen finden
+                        cursor.execute("""
+                            SELECT name FROM sqlite_master 
+                            WHERE type='table' AND name LIKE 'report_KW%'
+                            ORDER BY name
+                        """)
+                        tables = [row[0] for row in cursor.fetchall()]
                     
-                    conn.close()
+                        for table in tables:
+                            # Extrahiere KW aus Tabellennamen (z.B. report_KW31 -> 31)
+                            kw_match = table.replace("report_KW", "")
+                            if kw_match.isdigit():
+                                available_weeks.append(kw_match)
+                    finally:
+                        conn.close()
                 except Exception as e:
                     print(f"DEBUG: Fehler bei 40100 Wochen: {e}")
             
@@ -2016,24 +1928,25 @@ max_fahrzeug_name_length = 50
             db_path_31300 = os.path.abspath(os.path.join("SQL", "31300.sqlite"))
             if os.path.exists(db_path_31300):
                 try:
-                    conn = sqlite3.connect(db_path_31300)
-                    cursor = conn.cursor()
-                    
-                    # Alle report_KW Tabellen finden
-                    cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name LIKE 'report_KW%'
-                        ORDER BY name
-                    """)
-                    tables = [row[0] for row in cursor.fetchall()]
+                    conn = connect(db_path_31300)
+                    try:
+                        cursor = conn.cursor()
                     
-                    for table in tables:
-                        # Extrahiere KW aus Tabellennamen (z.B. report_KW31 -> 31)
-                        kw_match = table.replace("report_KW", "")
-                        if kw_match.isdigit():
-                            available_weeks.append(kw_match)
+                        # Alle report_KW Tabellen finden
+                        cursor.execute("""
+                            SELECT name FROM sqlite_master 
+                            WHERE type='table' AND name LIKE 'report_KW%'
+                            ORDER BY name
+                        """)
+                        tables = [row[0] for row in cursor.fetchall()]
                     
-                    conn.close()
+                        for table in tables:
+                            # Extrahiere KW aus Tabellennamen (z.B. report_KW31 -> 31)
+                            kw_match = table.replace("report_KW", "")
+                            if kw_match.isdigit():
+                                available_weeks.append(kw_match)
+                    finally:
+                        conn.close()
                 except Exception as e:
                     print(f"DEBUG: Fehler bei 31300 Wochen: {e}")
             
@@ -2041,24 +1954,25 @@ max_fahrzeug_name_length = 50
             db_path_uber = os.path.abspath(os.path.join("SQL", "uber.sqlite"))
             if os.path.exists(db_path_uber):
                 try:
-                    conn = sqlite3.connect(db_path_uber)
-                    cursor = conn.cursor()
-                    
-                    # Alle report_KW Tabellen finden
-                    cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name LIKE 'report_KW%'
-                        ORDER BY name
-                    """)
-                    tables = [row[0] for row in cursor.fetchall()]
+                    conn = connect(db_path_uber)
+                    try:
+                        cursor = conn.cursor()
                     
-                    for table in tables:
-                        # Extrahiere KW aus Tabellennamen (z.B. report_KW31 -> 31)
-                        kw_match = table.replace("report_KW", "")
-                        if kw_match.isdigit():
-                            available_weeks.append(kw_match)
+                        # Alle report_KW Tabellen finden
+                        cursor.execute("""
+                            SELECT name FROM sqlite_master 
+                            WHERE type='table' AND name LIKE 'report_KW%'
+                            ORDER BY name
+                        """)
+                        tables = [row[0] for row in cursor.fetchall()]
                     
-                    conn.close()
+                        for table in tables:
+                            # Extrahiere KW aus Tabellennamen (z.B. report_KW31 -> 31)
+                            kw_match = table.replace("report_KW", "")
+                            if kw_match.isdigit():
+                                available_weeks.append(kw_match)
+                    finally:
+                        conn.close()
                 except Exception as e:
                     print(f"DEBUG: Fehler bei Uber Wochen: {e}")
             
@@ -2066,24 +1980,25 @@ max_fahrzeug_name_length = 50
             db_path_bolt = os.path.abspath(os.path.join("SQL", "bolt.sqlite"))
             if os.path.exists(db_path_bolt):
                 try:
-                    conn = sqlite3.connect(db_path_bolt)
-                    cursor = conn.cursor()
-                    
-                    # Alle report_KW Tabellen finden
-                    cursor.execute("""
-                        SELECT name FROM sqlite_master 
-                        WHERE type='table' AND name LIKE 'report_KW%'
-                        ORDER BY name
-                    """)
-                    tables = [row[0] for row in cursor.fetchall()]
+                    conn = connect(db_path_bolt)
+                    try:
+                        cursor = conn.cursor()
                     
-                    for table in tables:
-                        # Extrahiere KW aus Tabellennamen (z.B. report_KW31 -> 31)
-                        kw_match = table.replace("report_KW", "")
-                        if kw_match.isdigit():
-                            available_weeks.append(kw_match)
+                        # Alle report_KW Tabellen finden
+                        cursor.execute("""
+                            SELECT name FROM sqlite_master 
+                            WHERE type='table' AND name LIKE 'report_KW%'
+                            ORDER BY name
+                        """)
+                        tables = [row[0] for row in cursor.fetchall()]
                     
-                    conn.close()
+                        for table in tables:
+                            # Extrahiere KW aus Tabellennamen (z.B. report_KW31 -> 31)
+                            kw_match = table.replace("report_KW", "")
+                            if kw_match.isdigit():
+                                available_weeks.append(kw_match)
+                    finally:
+                        conn.close()
                 except Exception as e:
                     print(f"DEBUG: Fehler bei Bolt Wochen: {e}")
             
@@ -2119,15 +2034,23 @@ max_fahrzeug_name_length = 50
             return output 
 
     @Slot(str, str, int, int, float, float, float)
-    def runQuickWeekData(self, license_plate: str, driver: str, week_from: int, week_to: int, tank_percent: float, starter_percent: float, expense: float):
-        """Lädt Kalenderwochen-Daten und sendet sie an das QML-Overlay"""
+    @Slot(str, str, int, int, float, float, float, int)
+    def runQuickWeekData(self, license_plate: str, driver: str, week_from: int, week_to: int, tank_percent: float, starter_percent: float, expense: float, year: int = 0):
+        """Lädt Kalenderwochen-Daten und sendet sie an das QML-Overlay (Jahr der Kalenderansicht, sonst aktuelles Jahr)"""
+        year = year or datetime.now().year
+        revenue_conn = running_costs_conn = None
         try:
             self.setStatusMessage(f"Lade Daten für KW {week_from}-{week_to}...")
             
+            # Datenbanken einmal für den ganzen KW-Bereich öffnen
+            revenue_conn = connect("SQL/revenue.db")
+            running_costs_conn = connect("SQL/running_costs.db")
+            ensure_weekly_summary(revenue_conn, running_costs_conn)
+            
             # Daten für alle Kalenderwochen laden
             week_data = []
             for week in range(week_from, week_to + 1):
-                week_info = self._load_week_data(license_plate, week, driver)
+                week_info = self._load_week_data(revenue_conn, running_costs_conn, license_plate, week, driver, year)
                 week_data.append(week_info)
             
             # Ergebnis formatieren
@@ -2141,9 +2064,14 @@ max_fahrzeug_name_length = 50
             error_msg = f"Fehler beim Laden der Kalenderwochen-Daten: {e}"
             self.setStatusMessage(error_msg)
             self.quickResultReady.emit(error_msg)
+        finally:
+            for conn in (revenue_conn, running_costs_conn):
+                if conn is not None:
+                    conn.close()
     
-    def _load_week_data(self, license_plate: str, week: int, driver: str) -> dict:
-        """Lädt Daten für eine einzelne Kalenderwoche"""
+    def _load_week_data(self, revenue_conn, running_costs_conn, license_plate: str, week: int, driver: str,
+                        year: int) -> dict:
+        """Lädt Daten für eine einzelne Kalenderwoche des angegebenen Jahres (offene Verbindungen von runQuickWeekData)"""
         week_data = {
             "week": week,
             "revenue": 0.0,
@@ -2153,81 +2081,41 @@ max_fahrzeug_name_length = 50
         }
         
         try:
-            # Revenue-Daten laden
-            revenue_conn = sqlite3.connect("SQL/revenue.db")
-            revenue_cursor = revenue_conn.cursor()
-            
-            # Prüfen ob Tabelle existiert
-            revenue_cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name=?
-            """, (license_plate,))
-            
-            if revenue_cursor.fetchone():
-                # Revenue-Daten für diese Woche laden
-                revenue_cursor.execute("""
-                    SELECT deal, driver, total, taxed, income, timestamp 
-                    FROM [{}] 
-                    WHERE cw = ?
-                    ORDER BY timestamp
-                """.format(license_plate), (week,))
-                
-                revenue_entries = revenue_cursor.fetchall()
-                for entry in revenue_entries:
-                    deal, entry_driver, total, taxed, income, timestamp = entry
-                    if entry_driver == driver:  # Nur Daten für den ausgewählten Fahrer
-                        week_data["revenue"] += float(total or 0)
-                        week_data["entries"].append({
-                            "type": "revenue",
-                            "deal": deal,
-                            "total": float(total or 0),
-                            "taxed": float(taxed or 0),
-                            "income": float(income or 0),
-                            "timestamp": timestamp
-                        })
-            
-            # Running-Costs-Daten laden
-            running_costs_conn = sqlite3.connect("SQL/running_costs.db")
-            running_costs_cursor = running_costs_conn.cursor()
-            
-            # Prüfen ob Tabelle existiert
-            running_costs_cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name=?
-            """, (license_plate,))
-            
-            if running_costs_cursor.fetchone():
-                # Running-Costs-Daten für diese Woche laden
-                running_costs_cursor.execute("""
-                    SELECT category, amount, timestamp 
-                    FROM [{}] 
-                    WHERE cw = ?
-                    ORDER BY timestamp
-                """.format(license_plate), (week,))
-                
-                running_costs_entries = running_costs_cursor.fetchall()
-                for entry in running_costs_entries:
-                    category, amount, timestamp = entry
-                    week_data["running_costs"] += float(amount or 0)
-                    week_data["entries"].append({
-                        "type": "running_costs",
-                        "category": category,
-                        "amount": float(amount or 0),
-                        "description": category,  # Verwende category als description
-                        "timestamp": timestamp
-                    })
-            
-            # Netto-Einkommen berechnen
-            week_data["net_income"] = week_data["revenue"] - week_data["running_costs"]
+            # Summen aus weekly_summary (Kosten gelten für das Fahrzeug, nicht je Fahrer)
+            week_data.update(week_summary(revenue_conn, license_plate, year, week, driver))
+            
+            # Einzelposten für die Detailanzeige über den (license_plate, year, cw)-Index
+            entries_cursor = revenue_conn.cursor()
+            entries_cursor.row_factory = sqlite3.Row
+            for entry in entries_cursor.execute(f"""
+                SELECT deal, total, taxed, income, timestamp FROM {REVENUE}
+                WHERE license_plate = ? AND year = ? AND cw = ? AND driver = ?
+                ORDER BY timestamp
+            """, (license_plate, year, week, driver)):
+                week_data["entries"].append({
+                    "type": "revenue",
+                    "deal": entry["deal"],
+                    "total": float(entry["total"] or 0),
+                    "taxed": float(entry["taxed"] or 0),
+                    "income": float(entry["income"] or 0),
+                    "timestamp": entry["timestamp"]
+                })
+            
+            for category, amount, timestamp in running_costs_conn.execute(f"""
+                SELECT category, amount, timestamp FROM {RUNNING_COSTS}
+                WHERE license_plate = ? AND year = ? AND cw = ?
+                ORDER BY timestamp
+            """, (license_plate, year, week)):
+                week_data["entries"].append({
+                    "type": "running_costs",
+                    "category": category,
+                    "amount": float(amount or 0),
+                    "description": category,  # Verwende category als description
+                    "timestamp": timestamp
+                })
             
         except Exception as e:
             print(f"Fehler beim Laden der Daten für KW {week}: {e}")
-        finally:
-            try:
-                revenue_conn.close()
-                running_costs_conn.close()
-            except:
-                pass
         
         return week_data
     
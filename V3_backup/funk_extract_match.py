@@ -21,12 +21,13 @@ Hinweis: Dieses Tool schreibt NICHT in Datenbanken; es dient rein zum Auslesen &
 import argparse
 import os
 import re
-import sqlite3
 import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from connection_manager import connect
+
 try:
     from pdf2image import convert_from_path
     import pytesseract
@@ -45,22 +46,55 @@ if _CFG_TESS and os.path.exists(_CFG_TESS):
 
 POPPLER_PATH = _CFG_POPPLER if (_CFG_POPPLER and os.path.exists(_CFG_POPPLER)) else None
 
+try:
+    from ocr_cache import file_sha256, get_ocr_cache
+except Exception:
+    file_sha256 = None
+    get_ocr_cache = None
+
+OCR_DPI = 300
+OCR_PSM_MODES = (6, 11, 8)
+OCR_CACHE_CONFIG = f"funk --oem 3 -l deu --psm {'/'.join(map(str, OCR_PSM_MODES))}"
+
 
 # -------------------- OCR & Erkennung --------------------
 
+def ocr_image_text(img) -> str:
+    # Mehrere PSM-Modi versuchen
+    for psm in OCR_PSM_MODES:
+        try:
+            txt = pytesseract.image_to_string(img, lang='deu', config=f'--psm {psm} --oem 3')
+            if txt and txt.strip():
+                return txt
+        except Exception:
+            continue
+    return ""
+
+
 def ocr_pdf_text(pdf_path: Path, max_pages: int = 3) -> str:
-    images = convert_from_path(str(pdf_path), dpi=300, poppler_path=POPPLER_PATH)
+    cache = get_ocr_cache() if get_ocr_cache is not None else None
+    try:
+        digest = file_sha256(pdf_path) if cache is not None else None
+    except OSError:
+        digest = None
+    if digest is None:
+        images = convert_from_path(str(pdf_path), dpi=OCR_DPI, poppler_path=POPPLER_PATH, last_page=max_pages)
+        return "\n".join(t for t in (ocr_image_text(img) for img in images[: max_pages]) if t)
+
+    # Seitenweise: nur Seiten ohne Cache-Eintrag rastern
     texts: List[str] = []
-    for img in images[: max_pages]:
-        # Mehrere PSM-Modi versuchen
-        for psm in (6, 11, 8):
-            try:
-                txt = pytesseract.image_to_string(img, lang='deu', config=f'--psm {psm} --oem 3')
-                if txt and txt.strip():
-                    texts.append(txt)
-                    break
-            except Exception:
-                continue
+    for page in range(1, max_pages + 1):
+        txt = cache.get(digest, page, OCR_DPI, OCR_CACHE_CONFIG)
+        if txt is None:
+            images = convert_from_path(str(pdf_path), dpi=OCR_DPI, poppler_path=POPPLER_PATH,
+                                       first_page=page, last_page=page)
+            if not images:
+                break   # PDF hat weniger Seiten
+            txt = ocr_image_text(images[0])
+            if txt.strip():
+                cache.put(digest, page, OCR_DPI, OCR_CACHE_CONFIG, txt)
+        if txt:
+            texts.append(txt)
     return "\n".join(texts)
 
 
@@ -113,7 +147,7 @@ def parse_amounts(text: str) -> Tuple[Optional[float], Optional[float]]:
 # -------------------- Fahrzeug-Matching --------------------
 
 def load_license_plates(vehicles_db: Path) -> List[str]:
-    conn = sqlite3.connect(str(vehicles_db))
+    conn = connect(vehicles_db)
     try:
         cur = conn.cursor()
         cur.execute("SELECT license_plate FROM vehicles")
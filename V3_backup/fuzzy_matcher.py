@@ -0,0 +1,259 @@
+"""
+Gemeinsamer, vektorisierter Fuzzy-Matcher für Fahrernamen.
+
+Ersetzt die bisher mehrfach kopierten Scoring-Funktionen (Abrechnung,
+Gehaltsimport, CSV-Import). Alle Suchnamen werden in einem Schritt gegen alle
+Zielnamen bewertet (N×M-Matrizen mit NumPy):
+- Token-Inzidenzmatrizen für Dice/Jaccard/Coverage
+- vektorisierte Levenshtein-Distanz über alle Ziele gleichzeitig
+- Reihenfolge-, Präfix- und 'el'-Boni wie im ursprünglichen Scoring
+
+Der Score entspricht 1:1 dem bisherigen fuzzy_match_score:
+(0.55·Dice + 0.20·Coverage + 0.10·Jaccard + 0.15·Distanz)·100 + Boni.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Schwellen aus dem Umsatzmatching
+MIN_SCORE = 65.0
+MIN_COVERAGE = 0.5
+MIN_ORDER = 1
+MAX_DISTANCE = 3
+
+
+def clean_name(name, ocr_correction: bool = False) -> str:
+    """Normalisiert Namen für robustes Matching.
+    - Kleinbuchstaben, Mehrfach-Leerzeichen → ein Leerzeichen
+    - Bindestriche/Unterstriche → Leerzeichen
+    - 'al' Präfix → 'el' (häufige Variante)
+    - Trimmt führende/trailing Spaces
+    Mit ocr_correction (Gehalts-PDFs) zusätzlich: Nicht-Buchstaben entfernen
+    und 'ei' als separates Token als 'el' interpretieren.
+    """
+    s = str(name).lower()
+    s = s.replace("-", " ").replace("_", " ")
+    if ocr_correction:
+        s = re.sub(r"[^a-zäöüß\s]", " ", s)
+    s = re.sub(r"\s+", " ", s)
+    s = re.sub(r"\bal\s+", "el ", s)
+    if ocr_correction:
+        s = re.sub(r"\bei\b", "el", s)
+    return s.strip()
+
+
+def extend_el(tokens: List[str], merge_pairs: bool = False) -> List[str]:
+    """Ergänzt 'el <name>' um 'el<name>'; optional paarweise Zusammenziehungen
+    benachbarter Tokens zur Erkennung von Splits ("ah"+"madeey"→"ahmadeey")."""
+    ext = tokens.copy()
+    for i, token in enumerate(tokens):
+        if token == 'el' and i + 1 < len(tokens):
+            ext.append('el' + tokens[i + 1])
+    if merge_pairs:
+        for i in range(len(tokens) - 1):
+            ext.append(tokens[i] + tokens[i + 1])
+    return ext
+
+
+def levenshtein_matrix(searches: Sequence[str], targets: Sequence[str]) -> np.ndarray:
+    """Levenshtein-Distanzen aller Suchnamen gegen alle Ziele (N×M).
+
+    Pro Suchname wird die DP-Tabelle zeilenweise für alle Ziele gleichzeitig
+    berechnet; die Einfüge-Abhängigkeit innerhalb einer Zeile wird über
+    minimum.accumulate aufgelöst.
+    """
+    n, m = len(searches), len(targets)
+    result = np.zeros((n, m), dtype=np.int32)
+    if n == 0 or m == 0:
+        return result
+
+    lengths = np.array([len(t) for t in targets], dtype=np.int32)
+    max_len = int(lengths.max()) if m else 0
+    # Ziele als Codepoint-Matrix, Padding mit -1 (matcht kein Zeichen)
+    codes = np.full((m, max_len), -1, dtype=np.int32)
+    for j, t in enumerate(targets):
+        if t:
+            codes[j, :len(t)] = [ord(c) for c in t]
+
+    cols = np.arange(max_len + 1, dtype=np.int32)
+    rows = np.arange(m)
+    for i, s in enumerate(searches):
+        prev = np.tile(cols, (m, 1))
+        for k, ch in enumerate(s):
+            substitution = prev[:, :-1] + (codes != ord(ch))
+            deletion = prev[:, 1:] + 1
+            cur = np.empty_like(prev)
+            cur[:, 0] = k + 1
+            cur[:, 1:] = np.minimum(substitution, deletion)
+            # Einfügen: cur[j] = min_k<=j (cur[k] + j - k)
+            cur = np.minimum.accumulate(cur - cols, axis=1) + cols
+            prev = cur
+        result[i] = prev[rows, lengths]
+    return result
+
+
+@dataclass
+class MatchResult:
+    """Bester Kandidat für einen Suchnamen."""
+    index: int
+    target: str
+    score: float
+    coverage: float
+    order: int
+    accepted: bool
+
+
+class BatchFuzzyMatcher:
+    """Bewertet viele Suchnamen gegen eine feste Zielliste in einem Durchlauf.
+
+    Die Zielseite (Tokens, Inzidenzmatrizen) wird einmal vorbereitet und kann
+    für beliebig viele Batches wiederverwendet werden.
+    """
+
+    def __init__(self, targets: Sequence[str], ocr_correction: bool = False,
+                 merge_pairs: bool = False, max_distance: int = MAX_DISTANCE):
+        self.ocr_correction = ocr_correction
+        self.merge_pairs = merge_pairs
+        self.max_distance = max_distance
+        self.targets = list(targets)
+        self.targets_clean = [clean_name(t, ocr_correction) for t in self.targets]
+        self._target_tokens = [t.split() for t in self.targets_clean]
+        self._target_ext = [set(extend_el(t, merge_pairs)) for t in self._target_tokens]
+
+    # --- Hilfsfunktionen für Inzidenzmatrizen ---
+    @staticmethod
+    def _vocabulary(*token_lists) -> Dict[str, int]:
+        vocab: Dict[str, int] = {}
+        for token_list in token_lists:
+            for tokens in token_list:
+                for t in tokens:
+                    if t not in vocab:
+                        vocab[t] = len(vocab)
+        return vocab
+
+    @staticmethod
+    def _incidence(token_sets, vocab: Dict[str, int]) -> np.ndarray:
+        mat = np.zeros((len(token_sets), max(1, len(vocab))), dtype=np.float64)
+        for i, tokens in enumerate(token_sets):
+            for t in tokens:
+                mat[i, vocab[t]] = 1.0
+        return mat
+
+    @staticmethod
+    def _first_last_ids(token_lists, vocab: Dict[str, int]):
+        first = np.array([vocab[t[0]] if t else -1 for t in token_lists], dtype=np.int64)
+        last = np.array([vocab[t[-1]] if t else -1 for t in token_lists], dtype=np.int64)
+        return first, last
+
+    def score(self, searches: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Berechnet Score-, Coverage- und Order-Matrizen (je N×M).
+
+        Die Suchnamen werden wie die Ziele normalisiert; Ergebnis enthält
+        zusätzlich 'search_clean' (Liste) für die Akzeptanzprüfung.
+        """
+        search_clean = [clean_name(s, self.ocr_correction) for s in searches]
+        search_tokens = [s.split() for s in search_clean]
+        search_ext = [set(extend_el(t, self.merge_pairs)) for t in search_tokens]
+        n, m = len(search_clean), len(self.targets_clean)
+        if n == 0 or m == 0:
+            empty = np.zeros((n, m), dtype=np.float64)
+            return {"score": empty, "coverage": empty.copy(), "order": empty.astype(np.int32),
+                    "search_clean": search_clean}
+
+        # Dice/Jaccard/Coverage über erweiterte Token-Mengen
+        vocab_ext = self._vocabulary(search_ext, self._target_ext)
+        s_ext = self._incidence(search_ext, vocab_ext)
+        t_ext = self._incidence(self._target_ext, vocab_ext)
+        inter = s_ext @ t_ext.T
+        size_s = s_ext.sum(axis=1)[:, None]
+        size_t = t_ext.sum(axis=1)[None, :]
+        union = size_s + size_t - inter
+        dice = (2 * inter) / np.maximum(1, size_s + size_t)
+        jaccard = inter / np.maximum(1, union)
+        coverage_ext = inter / np.maximum(1, size_s)
+
+        # Reihenfolge-Bonus (erstes/letztes Token identisch)
+        vocab_plain = self._vocabulary(search_tokens, self._target_tokens)
+        s_first, s_last = self._first_last_ids(search_tokens, vocab_plain)
+        t_first, t_last = self._first_last_ids(self._target_tokens, vocab_plain)
+        first_eq = (s_first[:, None] == t_first[None, :]) & (s_first[:, None] >= 0)
+        last_eq = (s_last[:, None] == t_last[None, :]) & (s_last[:, None] >= 0)
+        order_bonus = 8.0 * first_eq + 8.0 * last_eq
+
+        # Präfix-Bonus: je Such-Token mit Präfix-Beziehung zu einem Ziel-Token +2 (max. 8)
+        plain_words = list(vocab_plain)
+        prefix_rel = np.array(
+            [[a.startswith(b) or b.startswith(a) for b in plain_words] for a in plain_words],
+            dtype=np.float64,
+        )
+        s_count = np.zeros((n, len(plain_words)), dtype=np.float64)
+        for i, tokens in enumerate(search_tokens):
+            for t in tokens:
+                s_count[i, vocab_plain[t]] += 1.0
+        t_plain = self._incidence([set(t) for t in self._target_tokens], vocab_plain)
+        reachable = (prefix_rel @ t_plain.T) > 0
+        prefix_bonus = np.minimum(2.0 * (s_count @ reachable.astype(np.float64)), 8.0)
+
+        # Arabischer Namens-Bonus ('el'-Präfix auf beiden Seiten)
+        s_el = np.array([any(t.startswith('el') for t in tokens) for tokens in search_tokens])
+        t_el = np.array([any(t.startswith('el') for t in tokens) for tokens in self._target_tokens])
+        arabic_bonus = 20.0 * (s_el[:, None] & t_el[None, :])
+
+        # Distanz-Anteil
+        distance = levenshtein_matrix(search_clean, self.targets_clean)
+        len_s = np.array([len(s) for s in search_clean])[:, None]
+        len_t = np.array([len(t) for t in self.targets_clean])[None, :]
+        max_len = np.maximum(len_s, len_t)
+        norm_dist = np.where(max_len > 0, distance / np.maximum(1, max_len), 1.0)
+        distance_score = np.maximum(0.0, 100.0 - norm_dist * 100.0) / 100.0
+
+        base = (0.55 * dice + 0.20 * coverage_ext + 0.10 * jaccard + 0.15 * distance_score) * 100.0
+        score = np.clip(base + order_bonus + prefix_bonus + arabic_bonus, 0.0, 100.0)
+
+        # Sonderfälle wie im Einzel-Scoring
+        score = np.where((inter == 0) & (distance > self.max_distance), 0.0, score)
+        empty = (len_s == 0) | (len_t == 0)
+        score = np.where(empty, 0.0, score)
+        equal = np.array(search_clean, dtype=object)[:, None] == np.array(self.targets_clean, dtype=object)[None, :]
+        score = np.where(equal & ~empty, 100.0, score)
+
+        # Akzeptanzkriterien: Coverage über einfache Tokens, Order 0..2
+        s_plain = self._incidence([set(t) for t in search_tokens], vocab_plain)
+        coverage = (s_plain @ t_plain.T) / np.maximum(1, s_plain.sum(axis=1))[:, None]
+        order = first_eq.astype(np.int32) + last_eq.astype(np.int32)
+
+        return {"score": score, "coverage": coverage, "order": order, "search_clean": search_clean}
+
+    def best_matches(self, searches: Sequence[str], min_score: float = MIN_SCORE,
+                     min_coverage: float = MIN_COVERAGE, min_order: int = MIN_ORDER) -> List[Optional[MatchResult]]:
+        """Top-Kandidat je Suchname (Rang: Score, Coverage, Order).
+
+        accepted ist True, wenn Score ≥ min_score, Coverage ≥ min_coverage und
+        Order ≥ min_order (oder der Suchname im Zielnamen enthalten ist).
+        """
+        mats = self.score(searches)
+        results: List[Optional[MatchResult]] = []
+        if not self.targets_clean:
+            return [None for _ in searches]
+        score, coverage, order = mats["score"], mats["coverage"], mats["order"]
+        for i, label in enumerate(mats["search_clean"]):
+            # lexikographische Sortierung: Score > Coverage > Order (stabil, erster gewinnt)
+            j = int(np.lexsort((-order[i], -coverage[i], -score[i]))[0])
+            target_clean = self.targets_clean[j]
+            accepted = bool(
+                score[i, j] >= min_score
+                and coverage[i, j] >= min_coverage
+                and (order[i, j] >= min_order or (label and label in target_clean))
+            )
+            results.append(MatchResult(
+                index=j,
+                target=self.targets[j],
+                score=float(score[i, j]),
+                coverage=float(coverage[i, j]),
+                order=int(order[i, j]),
+                accepted=accepted,
+            ))
+        return results
@@ -0,0 +1,200 @@
+"""
+Inhaltsbasierte Klassifikation der Import-Dateien der Datenseite.
+
+Jede gedroppte Datei wird einzeln eingeordnet (Umsatz je Plattform, Gehalt,
+Funk). Gelesen wird nur der Dateianfang:
+
+- CSV: Kopfzeile → smart_import.erkenne_plattform_aus_spalten (unterscheidet
+  auch 40100 und 31300 an den Spalten; ist das nicht eindeutig, bleibt die
+  Quelle offen und wird auf der Datenseite abgefragt).
+- PDF: Text der ersten Seite (pdfplumber) → Schlüsselwörter für Gehalt
+  bzw. Funk. Gescannte PDFs ohne Textebene fallen auf den Dateinamen zurück.
+
+Inhaltsbasierte Ergebnisse werden je Inhalt (SHA-256 über Größe und
+Dateianfang) gecacht; bei erneutem Drop derselben Datei wird nur der
+Dateianfang gelesen, die PDF-Seite nicht erneut ausgewertet.
+
+    klassifikation = classify_file("Uber_KW31.csv")
+    klassifikation.kind, klassifikation.platform   # ('Umsatz', 'uber')
+"""
+
+import csv
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import List, Optional
+
+from import_pipeline import FUNK, GEHALT, UMSATZ
+
+# smart_import liegt im SQL-Ordner
+sql_path = Path(__file__).parent / "SQL"
+if str(sql_path) not in sys.path:
+    sys.path.insert(0, str(sql_path))
+try:
+    from smart_import import (TAXI_UMSATZLISTE, erkenne_plattform_aus_dateiname, erkenne_plattform_aus_spalten,
+                              ist_taxi_umsatzliste)
+except ImportError:
+    TAXI_UMSATZLISTE = "uportal_getumsatzliste"
+    erkenne_plattform_aus_dateiname = None
+    erkenne_plattform_aus_spalten = None
+    ist_taxi_umsatzliste = None
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+UNBEKANNT = "Unbekannt"
+
+HEADER_BYTES = 64 * 1024
+MIN_PDF_SCORE = 2
+CACHE_SIZE = 512
+
+# Schlüsselwörter im Text der ersten PDF-Seite
+PDF_SIGNATURES = {
+    GEHALT: ("dienstnehmer", "dn-nr", "zahlbetrag", "lohnzettel", "lohn/gehalt", "sv-beitrag",
+             "lohnsteuer", "abrechnungsbeleg"),
+    FUNK: ("taxi4me", "funk", "flughafen", "unternehmer2.4", "auswertungen", "40100", "4010", "31300",
+           "rechnungsnummer", "rechnungsdatum", "vermittlung"),
+}
+
+# Fallback für Dateien ohne lesbaren Inhalt (bisherige Dateinamen-Regeln)
+GEHALT_NAMEN = ("gehalt", "salary", "lohn", "abrechnung", "abrechnungen")
+FUNK_NAMEN = ("funk", "radio", "dispatch", "31300", "40100", "arf", "fl", "rechnung")
+UMSATZ_NAMEN = ("uber", "bolt", "earnings", "driver_performance")
+
+
+@dataclass(frozen=True)
+class Classification:
+    """Einordnung einer Datei; platform nur bei Umsatz (None → Quelle muss gewählt werden)."""
+    kind: str
+    platform: Optional[str] = None
+    source: str = "dateiname"          # 'spalten', 'pdf-text' oder 'dateiname'
+    score: int = 0
+
+
+_cache: "OrderedDict[str, Classification]" = OrderedDict()
+_cache_lock = Lock()
+
+
+def _content_key(size: int, head: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(str(size).encode())
+    digest.update(head)
+    return digest.hexdigest()
+
+
+def _decode(head: bytes) -> str:
+    for encoding in ("utf-8-sig", "latin-1"):
+        try:
+            return head.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return ""
+
+
+def csv_header(head: bytes) -> List[str]:
+    """Spaltennamen aus dem Dateianfang (Trennzeichen ; oder , wie in smart_import)."""
+    text = _decode(head)
+    first_line = text.splitlines()[0] if text else ""
+    sep = ";" if first_line.count(";") > first_line.count(",") else ","
+    try:
+        return [col.strip() for col in next(csv.reader([first_line], delimiter=sep))]
+    except StopIteration:
+        return []
+
+
+def _classify_csv(head: bytes, filename: str) -> Optional[Classification]:
+    if erkenne_plattform_aus_spalten is None:
+        return None
+    columns = csv_header(head)
+    platform = erkenne_plattform_aus_spalten(columns) if columns else None
+    if platform is None:
+        if columns and ist_taxi_umsatzliste(columns):
+            # Taxi-Umsatzliste ohne eindeutige Quelle (40100/31300): Quelle wird abgefragt
+            return Classification(UMSATZ, None, "spalten", len(columns))
+        return None
+    return Classification(UMSATZ, platform, "spalten", len(columns))
+
+
+def first_page_text(path: str) -> str:
+    """Text der ersten PDF-Seite; leer bei gescannten PDFs oder ohne pdfplumber."""
+    if pdfplumber is None:
+        return ""
+    try:
+        with pdfplumber.open(path) as pdf:
+            if not pdf.pages:
+                return ""
+            return pdf.pages[0].extract_text() or ""
+    except Exception as e:
+        print(f"   ⚠️ PDF-Text nicht lesbar ({os.path.basename(path)}): {e}")
+        return ""
+
+
+def score_pdf_text(text: str) -> Optional[Classification]:
+    """Bestes Schlüsselwort-Profil (Gehalt/Funk) für den Seitentext; None unter MIN_PDF_SCORE."""
+    lowered = text.lower()
+    scores = {kind: sum(1 for keyword in keywords if keyword in lowered) for kind, keywords in PDF_SIGNATURES.items()}
+    kind = max(scores, key=scores.get)
+    if scores[kind] < MIN_PDF_SCORE or list(scores.values()).count(scores[kind]) > 1:
+        return None
+    return Classification(kind, None, "pdf-text", scores[kind])
+
+
+def classify_by_filename(filename: str) -> Classification:
+    """Dateinamen-Regeln als Rückfall, wenn der Inhalt nichts hergibt."""
+    name = filename.lower()
+    if TAXI_UMSATZLISTE in name:
+        platform = erkenne_plattform_aus_dateiname(filename) if erkenne_plattform_aus_dateiname else None
+        return Classification(UMSATZ, platform)
+    if name.endswith(".pdf") and any(keyword in name for keyword in GEHALT_NAMEN):
+        return Classification(GEHALT)
+    if any(keyword in name for keyword in FUNK_NAMEN):
+        return Classification(FUNK)
+    if any(keyword in name for keyword in UMSATZ_NAMEN):
+        platform = erkenne_plattform_aus_dateiname(filename) if erkenne_plattform_aus_dateiname else None
+        return Classification(UMSATZ, platform)
+    return Classification(UNBEKANNT)
+
+
+def classify_file(path: str) -> Classification:
+    """Ordnet eine Datei anhand ihres Inhalts ein (Ergebnis je Inhalt gecacht)."""
+    filename = os.path.basename(path)
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            head = f.read(HEADER_BYTES)
+    except OSError as e:
+        print(f"   ⚠️ Datei nicht lesbar ({filename}): {e}")
+        return classify_by_filename(filename)
+
+    key = _content_key(size, head)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    result = None
+    if head.startswith(b"%PDF"):
+        result = score_pdf_text(first_page_text(path))
+    elif b"\x00" not in head[:1024]:
+        result = _classify_csv(head, filename)
+    if result is None:
+        # Hängt am Dateinamen, nicht am Inhalt – daher nicht cachen
+        return classify_by_filename(filename)
+
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
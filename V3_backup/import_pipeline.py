@@ -0,0 +1,196 @@
+"""
+Parallele Import-Pipeline für mehrere Dateien (Drag & Drop der Datenseite).
+
+Alle Dateien werden vorab klassifiziert (Umsatz, Gehalt, Funk) und in einem
+Prozess-Pool verarbeitet:
+
+- Gehalt/Funk: Text/OCR läuft parallel im Pool, geschrieben wird danach
+  im Pipeline-Thread (salaries.db/database.db bzw. funk.db). Im Pool liest
+  die Gehalts-OCR seitenweise im Worker (kein verschachtelter OCR-Pool).
+- Umsatz: Der Streaming-Import von smart_import läuft im Pool, aber je
+  Ziel-Datenbank (uber, bolt, 40100, 31300) immer nur eine Datei gleichzeitig.
+
+Damit gibt es pro Datenbank höchstens einen Schreiber. Fortschritt wird je
+Datei über einen Callback gemeldet.
+
+    tasks = [ImportTask(path, UMSATZ, platform="uber"), ImportTask(pdf, GEHALT)]
+    results = run_pipeline(tasks, on_progress=lambda result, done, total: ...)
+"""
+
+import os
+import sys
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).parent
+SQL_DIR = BASE_DIR / "SQL"
+
+# smart_import und Scanner liegen im SQL-Ordner (auch in den Pool-Prozessen benötigt)
+if str(SQL_DIR) not in sys.path:
+    sys.path.insert(0, str(SQL_DIR))
+
+UMSATZ = "Umsatz"
+GEHALT = "Gehalt"
+FUNK = "Funk"
+
+# Ziel-Datenbanken der Umsatz-Plattformen (wie smart_import.PLATTFORM_DATENBANKEN)
+UMSATZ_DATENBANKEN = {
+    "uber": "uber.sqlite",
+    "bolt": "bolt.sqlite",
+    "40100": "40100.sqlite",
+    "31300": "31300.sqlite",
+}
+
+
+@dataclass
+class ImportTask:
+    """Eine klassifizierte Datei der Pipeline."""
+    path: str
+    kind: str
+    platform: Optional[str] = None                 # nur Umsatz
+    month_year: Optional[Tuple[int, int]] = None   # nur Funk (None → Auswahl im Dialog)
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def target_db(self) -> str:
+        """Datenbank, in die geschrieben wird (Schlüssel für die Serialisierung)."""
+        if self.kind == UMSATZ:
+            return UMSATZ_DATENBANKEN.get(self.platform, self.platform or "")
+        if self.kind == GEHALT:
+            return "salaries.db"
+        return "funk.db"
+
+
+@dataclass
+class ImportResult:
+    """Ergebnis einer Datei; needs_month_year=True: Funk-Einträge warten auf Monat/Jahr."""
+    task: ImportTask
+    success: bool
+    message: str
+    count: int = 0
+    needs_month_year: bool = False
+    entries: List[dict] = field(default_factory=list)
+
+
+# --- Arbeit in den Pool-Prozessen (Modulfunktionen, damit sie pickle-bar sind) ---
+def _run_umsatz(path: str, platform: str) -> Optional[int]:
+    from smart_import import verarbeite_datei
+    return verarbeite_datei(path, platform)
+
+
+def _parse_gehalt(path: str, ocr_workers: Optional[int] = 1) -> dict:
+    from salary_import_tool import create_import_tool
+    return create_import_tool(ocr_workers=ocr_workers).extract_payroll(Path(path))
+
+
+def _parse_funk(path: str) -> List[dict]:
+    from Scanner import process_funk_invoice
+    return process_funk_invoice(Path(path), trace=True)
+
+
+def _work(task: ImportTask, ocr_workers: Optional[int] = 1):
+    """Eine Datei verarbeiten; in Pool-Prozessen OCR ohne eigenen Pool (ocr_workers=1)."""
+    if task.kind == UMSATZ:
+        return _run_umsatz(task.path, task.platform)
+    if task.kind == GEHALT:
+        return _parse_gehalt(task.path, ocr_workers)
+    return _parse_funk(task.path)
+
+
+# --- Schreiben im Pipeline-Thread ---
+def _complete(task: ImportTask, value) -> ImportResult:
+    """Wertet das Pool-Ergebnis aus und schreibt Gehalt/Funk in die Datenbank."""
+    if task.kind == UMSATZ:
+        if value is None:
+            return ImportResult(task, False, f"❌ Fehler bei {task.filename}")
+        return ImportResult(task, True, f"✅ {task.filename} erfolgreich importiert: {value} neue Zeilen", value)
+
+    if task.kind == GEHALT:
+        if not value.get("success"):
+            return ImportResult(task, False, f"❌ Gehaltsimport-Fehler: {value.get('error', 'Unbekannter Fehler')}")
+        from salary_import_tool import create_import_tool
+        saved = create_import_tool().save_extracted(value)
+        return ImportResult(task, True, f"✅ {task.filename} erfolgreich importiert: {saved['imported_count']} Einträge",
+                            saved["imported_count"])
+
+    if not value:
+        return ImportResult(task, False, f"❌ Keine Einträge in PDF gefunden: {task.filename}")
+    if task.month_year is None:
+        return ImportResult(task, False, f"⏳ Monat/Jahr für {task.filename} erforderlich",
+                            needs_month_year=True, entries=value)
+    from Scanner import save_to_funk_db
+    month, year = task.month_year
+    save_to_funk_db(value, month, year, trace=True)
+    return ImportResult(task, True, f"✅ {task.filename} erfolgreich importiert: {len(value)} Einträge", len(value))
+
+
+def _safe_complete(task: ImportTask, compute: Callable[[], object]) -> ImportResult:
+    try:
+        return _complete(task, compute())
+    except Exception as e:
+        print(f"   ❌ Fehler bei {task.filename}: {e}")
+        return ImportResult(task, False, f"❌ Fehler bei {task.filename}: {e}")
+
+
+def run_pipeline(tasks: List[ImportTask],
+                 on_progress: Optional[Callable[[ImportResult, int, int], None]] = None,
+                 max_workers: Optional[int] = None) -> List[ImportResult]:
+    """Verarbeitet alle Tasks; Ergebnisse in Abschlussreihenfolge, on_progress nach jeder Datei."""
+    tasks = list(tasks)
+    total = len(tasks)
+    results: List[ImportResult] = []
+
+    def report(result: ImportResult):
+        results.append(result)
+        if on_progress is not None:
+            on_progress(result, len(results), total)
+
+    if not tasks:
+        return results
+
+    workers = max_workers or min(total, os.cpu_count() or 1)
+    if workers <= 1 or total == 1:
+        # Kein Pipeline-Pool: die Gehalts-OCR darf selbst alle Kerne nutzen
+        for task in tasks:
+            report(_safe_complete(task, lambda t=task: _work(t, None)))
+        return results
+
+    # Umsatz-Dateien je Ziel-Datenbank in eine Warteschlange, Gehalt/Funk sofort in den Pool
+    umsatz_queues: Dict[str, deque] = defaultdict(deque)
+    sofort: List[ImportTask] = []
+    for task in tasks:
+        if task.kind == UMSATZ:
+            umsatz_queues[task.target_db].append(task)
+        else:
+            sofort.append(task)
+
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    except Exception as e:
+        print(f"⚠️ Prozess-Pool nicht verfügbar, importiere sequenziell: {e}")
+        for task in tasks:
+            report(_safe_complete(task, lambda t=task: _work(t, None)))
+        return results
+
+    with pool:
+        pending = {pool.submit(_work, task): task for task in sofort}
+        for queue in umsatz_queues.values():
+            task = queue.popleft()
+            pending[pool.submit(_work, task)] = task
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = pending.pop(future)
+                report(_safe_complete(task, future.result))
+                queue = umsatz_queues.get(task.target_db) if task.kind == UMSATZ else None
+                if queue:
+                    nxt = queue.popleft()
+                    pending[pool.submit(_work, nxt)] = nxt
+    return results
@@ -2,6 +2,7 @@ from PySide6.QtCore import QObject, Slot, Signal, Property, QTimer
 import sqlite3
 from generic_wizard import GenericWizard
 from db_manager import DBManager, DatabaseError
+from connection_manager import connect
 import difflib
 from datetime import datetime
 import logging
@@ -87,11 +88,6 @@ class MitarbeiterSeiteQMLV3(QObject):
         self._lazy_loading_enabled = True
         self._lazy_loading_threshold = 100  # Anzahl Einträge für Lazy Loading
         
-        # Connection Pool für Datenbankverbindungen
-        self._connection_pool = {}
-        self._max_connections = 5
-        self._connection_timeout = 30
-        
         # Performance-Monitoring
         self._performance_stats = {
             'queries_executed': 0,
@@ -956,7 +952,7 @@ class MitarbeiterSeiteQMLV3(QObject):
             
             if missing_names:
                 try:
-                    conn = sqlite3.connect("SQL/database.db")
+                    conn = connect("SQL/database.db")
                     cursor = conn.cursor()
                     
                     # Batch-Query für alle fehlenden Namen
@@ -1421,29 +1417,31 @@ class MitarbeiterSeiteQMLV3(QObject):
                     pass
                 
                 # Speichere in deals-Tabelle
-                conn = sqlite3.connect("SQL/database.db")
-                cursor = conn.cursor()
+                conn = connect("SQL/database.db")
+                try:
+                    cursor = conn.cursor()
                 
-                # Prüfe ob Eintrag bereits existiert
-                cursor.execute("SELECT id FROM deals WHERE name = ?", (fahrer_name,))
-                existing = cursor.fetchone()
+                    # Prüfe ob Eintrag bereits existiert
+                    cursor.execute("SELECT id FROM deals WHERE name = ?", (fahrer_name,))
+                    existing = cursor.fetchone()
                 
-                if existing:
-                    # Update bestehenden Eintrag
-                    cursor.execute("""
-                        UPDATE deals 
-                        SET deal = ?, pauschale = ?, umsatzgrenze = ?, garage = ?
-                        WHERE name = ?
-                    """, (deal_type, pauschale, umsatzgrenze, garage, fahrer_name))
-                else:
-                    # Erstelle neuen Eintrag
-                    cursor.execute("""
-                        INSERT INTO deals (name, deal, pauschale, umsatzgrenze, garage)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (fahrer_name, deal_type, pauschale, umsatzgrenze, garage))
+                    if existing:
+                        # Update bestehenden Eintrag
+                        cursor.execute("""
+                            UPDATE deals 
+                            SET deal = ?, pauschale = ?, umsatzgrenze = ?, garage = ?
+                            WHERE name = ?
+                        """, (deal_type, pauschale, umsatzgrenze, garage, fahrer_name))
+                    else:
+                        # Erstelle neuen Eintrag
+                        cursor.execute("""
+                            INSERT INTO deals (name, deal, pauschale, umsatzgrenze, garage)
+                            VALUES (?, ?, ?, ?, ?)
+                        """, (fahrer_name, deal_type, pauschale, umsatzgrenze, garage))
                 
-                conn.commit()
-                conn.close()
+                    conn.commit()
+                finally:
+                    conn.close()
                 print("Deals-Daten erfolgreich gespeichert.")
                 
             except Exception as e:
@@ -1458,7 +1456,7 @@ class MitarbeiterSeiteQMLV3(QObject):
             # Lade bestehende Deals-Daten für den Mitarbeiter
             fahrer_name = name_liste[index]
             try:
-                conn = sqlite3.connect("SQL/database.db")
+                conn = connect("SQL/database.db")
                 cursor = conn.cursor()
                 cursor.execute("SELECT deal, pauschale, umsatzgrenze, garage FROM deals WHERE name = ?", (fahrer_name,))
                 row = cursor.fetchone()
@@ -2313,43 +2311,8 @@ class MitarbeiterSeiteQMLV3(QObject):
             logger.error(f"Fehler beim Memory-Cleanup: {e}")
 
     def _get_connection(self, db_path: str = "SQL/database.db"):
-        """Thread-sichere Datenbankverbindung aus dem Pool"""
-        try:
-            if db_path not in self._connection_pool:
-                self._connection_pool[db_path] = []
-            
-            # Verfügbare Verbindung suchen
-            for conn in self._connection_pool[db_path]:
-                try:
-                    # Verbindung testen
-                    conn.execute("SELECT 1")
-                    return conn
-                except:
-                    # Verbindung ist ungültig, entfernen
-                    self._connection_pool[db_path].remove(conn)
-                    try:
-                        conn.close()
-                    except:
-                        pass
-            
-            # Neue Verbindung erstellen
-            if len(self._connection_pool[db_path]) < self._max_connections:
-                conn = sqlite3.connect(db_path, timeout=self._connection_timeout)
-                conn.execute("PRAGMA foreign_keys = ON")
-                conn.execute("PRAGMA journal_mode = WAL")
-                conn.execute("PRAGMA synchronous = NORMAL")
-                conn.execute("PRAGMA cache_size = 10000")
-                conn.execute("PRAGMA temp_store = MEMORY")
-                self._connection_pool[db_path].append(conn)
-                return conn
-            else:
-                # Fallback: Neue Verbindung ohne Pool
-                return sqlite3.connect(db_path, timeout=self._connection_timeout)
-                
-        except Exception as e:
-            logger.error(f"Fehler beim Verbindungsaufbau: {e}")
-            # Fallback
-            return sqlite3.connect(db_path, timeout=self._connection_timeout)
+        """Gemeinsame Verbindung des Threads aus dem ConnectionManager (mit close() zurückgeben)"""
+        return connect(db_path)
 
     def _execute_query_with_cache(self, query: str, params: tuple = (), cache_key: str = None):
         """Führt Query mit Cache aus"""
@@ -2370,9 +2333,10 @@ class MitarbeiterSeiteQMLV3(QObject):
             
             # Query ausführen
             conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            result = cursor.fetchall()
+            try:
+                result = conn.execute(query, params).fetchall()
+            finally:
+                conn.close()
             
             # Performance-Statistiken aktualisieren
             query_time = time.time() - start_time
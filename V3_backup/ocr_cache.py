@@ -0,0 +1,146 @@
+"""
+Gemeinsamer Cache für OCR-Seitentexte der PDF-Importe.
+
+Scanner (Gehalt/Funk), SalaryImportTool und funk_extract_match rastern und
+lesen dieselben Rechnungen beim erneuten Import (z.B. nach einer
+korrigierten Zuordnung) immer wieder per Tesseract. Der Cache merkt sich den
+Text je Seite in SQL/ocr_cache.db:
+
+- Schlüssel: SHA-256 des PDF-Inhalts, Seite, DPI und OCR-Konfiguration
+  (Umbenennen/Verschieben trifft den Cache, eine andere Konfiguration nicht).
+- Text zlib-komprimiert; überschreitet die Datei MAX_BYTES, werden die am
+  längsten nicht genutzten Seiten entfernt.
+- Fehler des Caches brechen die OCR nie ab, es wird dann einfach neu gelesen.
+
+    digest = file_sha256(pdf_path)
+    text = get_ocr_cache().page_text(digest, 1, 300, "deu --psm 6",
+                                     lambda: pytesseract.image_to_string(...))
+"""
+
+import hashlib
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from connection_manager import connection
+
+DEFAULT_DB = Path(__file__).parent / "SQL" / "ocr_cache.db"
+MAX_BYTES = 256 * 1024 * 1024
+HASH_CHUNK = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_pages (
+    sha256 TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    dpi INTEGER NOT NULL,
+    config TEXT NOT NULL,
+    text BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (sha256, page, dpi, config)
+)
+"""
+
+
+def file_sha256(path) -> str:
+    """SHA-256 des Dateiinhalts (blockweise gelesen)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OcrCache:
+    """Seitentexte je (SHA-256, Seite, DPI, Konfiguration) mit LRU-Verdrängung nach Größe."""
+
+    def __init__(self, db_path=DEFAULT_DB, max_bytes: int = MAX_BYTES):
+        self.db_path = str(db_path)
+        self.max_bytes = max_bytes
+        self._ready = False
+        self._lock = Lock()
+
+    def _connection(self):
+        if not self._ready:
+            with self._lock, connection(self.db_path) as conn:
+                conn.execute(_SCHEMA)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_pages_last_used ON ocr_pages(last_used)")
+                conn.commit()
+                self._ready = True
+        return connection(self.db_path)
+
+    def get(self, digest: str, page: int, dpi: int, config: str) -> Optional[str]:
+        key = (digest, int(page), int(dpi), config)
+        try:
+            with self._connection() as conn:
+                row = conn.execute("SELECT text FROM ocr_pages WHERE sha256 = ? AND page = ? AND dpi = ? AND config = ?",
+                                   key).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE ocr_pages SET last_used = ? WHERE sha256 = ? AND page = ? AND dpi = ? AND config = ?",
+                             (time.time(),) + key)
+                conn.commit()
+            return zlib.decompress(row[0]).decode("utf-8")
+        except (sqlite3.Error, zlib.error) as e:
+            print(f"⚠️ OCR-Cache nicht lesbar: {e}")
+            return None
+
+    def put(self, digest: str, page: int, dpi: int, config: str, text: str) -> None:
+        data = zlib.compress((text or "").encode("utf-8"), 6)
+        try:
+            with self._connection() as conn:
+                conn.execute("INSERT OR REPLACE INTO ocr_pages (sha256, page, dpi, config, text, size, last_used) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (digest, int(page), int(dpi), config, data, len(data), time.time()))
+                self._evict(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ OCR-Cache nicht beschreibbar: {e}")
+
+    def _evict(self, conn) -> None:
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_pages").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for row in conn.execute("SELECT sha256, page, dpi, config, size FROM ocr_pages ORDER BY last_used"):
+            victims.append(row[:4])
+            excess -= row[4]
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM ocr_pages WHERE sha256 = ? AND page = ? AND dpi = ? AND config = ?", victims)
+
+    def page_text(self, digest: str, page: int, dpi: int, config: str, compute: Callable[[], str]) -> str:
+        """Text aus dem Cache oder per compute() gelesen und gespeichert."""
+        text = self.get(digest, page, dpi, config)
+        if text is None:
+            text = compute()
+            # Leere Ergebnisse (OCR-Fehler) nicht festschreiben
+            if text and text.strip():
+                self.put(digest, page, dpi, config, text)
+        return text
+
+    def stats(self) -> Dict[str, int]:
+        with self._connection() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_pages").fetchone()
+        return {"entries": entries, "bytes": size}
+
+    def clear(self) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM ocr_pages")
+            conn.commit()
+
+
+_default_cache: Optional[OcrCache] = None
+_default_lock = Lock()
+
+
+def get_ocr_cache() -> OcrCache:
+    """Prozessweiter Cache in SQL/ocr_cache.db."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = OcrCache()
+        return _default_cache
@@ -0,0 +1,362 @@
+"""
+Jahresfähige Wochenberichte je Plattform.
+
+Statt einer Tabelle pro Kalenderwoche (report_KW31, report_KW32, ...) ohne
+Jahresbezug hält jede Plattform-Datenbank (uber, bolt, 40100, 31300) genau
+eine Tabelle 'reports', die über (year, kw) indiziert ist. Die Wochenliste
+kommt damit aus einem Index statt aus sqlite_master.
+
+Migration bestehender report_KW-Tabellen:
+    python platform_reports.py --jahr 2025
+
+smart_import schreibt jede Woche weiterhin auch nach report_KW{kw}, dort mit
+dem Jahr der Datei in der Spalte year, und spiegelt die neuen Zeilen nach
+'reports'. Zeilen ohne Jahr (Altbestand vor der Umstellung) übernimmt nur die
+Migration, mit dem ausdrücklich angegebenen Jahr, nie mit dem Jahr einer
+gerade importierten Datei. Tabellen ohne solche Zeilen stehen in
+reports_migrated und werden nicht erneut kopiert. Noch nicht migrierte
+Wochentabellen liefert legacy_week_tables, ihre Zeilen ohne Jahr
+legacy_rows_filter, jeweils für lesende Aufrufer.
+
+Betragsspalten (REAL) werden beim Import einmalig in Zahlen gewandelt. Ältere
+Wochentabellen, in denen Beträge noch als Text ('12,50') stehen, bringt
+normalize_numeric_columns auf REAL; die Migration erledigt das mit. Lesende
+Aufrufer ändern die Tabellen nicht, sondern summieren über amount_sql.
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+REPORT_TABLE = "reports"
+
+PLATFORM_DB_FILES: Dict[str, str] = {
+    "uber": "uber.sqlite",
+    "bolt": "bolt.sqlite",
+    "40100": "40100.sqlite",
+    "31300": "31300.sqlite",
+}
+
+# Spalten je Plattform (wie in SQL/smart_import.erstelle_tabelle)
+PLATFORM_COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    "uber": [
+        ("first_name", "TEXT"), ("last_name", "TEXT"), ("gross_total", "REAL"),
+        ("gross_per_hour", "REAL"), ("cash_collected", "REAL"), ("hours_online", "REAL"),
+        ("drive_time", "REAL"), ("total_trips", "INTEGER"), ("acceptance_rate", "REAL"),
+        ("driver_name", "TEXT"), ("driver_rating", "REAL"),
+    ],
+    "bolt": [
+        ("driver_name", "TEXT"), ("gross_total", "REAL"), ("net_earnings", "REAL"),
+        ("gross_per_hour", "REAL"), ("net_per_hour", "REAL"), ("rider_tips", "REAL"),
+        ("cash_collected", "REAL"), ("total_trips", "INTEGER"), ("hours_online", "REAL"),
+        ("acceptance_rate", "REAL"), ("driver_rating", "REAL"),
+    ],
+    "40100": [
+        ("Fahrzeug", "TEXT"), ("Fahrer", "TEXT"), ("Fahrername", "TEXT"), ("Abschluss", "TEXT"),
+        ("Buchungsart", "TEXT"), ("Zahlungsmittel", "TEXT"), ("Belegtext", "TEXT"),
+        ("Fahrtkosten", "REAL"), ("Trinkgeld", "REAL"), ("Umsatz", "REAL"), ("Bargeld", "REAL"),
+        ("Auftragsart", "TEXT"), ("Status", "TEXT"),
+    ],
+    "31300": [
+        ("Fahrzeug", "TEXT"), ("Fahrer", "TEXT"), ("Fahrername", "TEXT"), ("Abschluss", "TEXT"),
+        ("Beleg", "TEXT"), ("Zeitpunkt", "TEXT"), ("Leistung", "TEXT"), ("Tour", "TEXT"),
+        ("Buchungsart", "TEXT"), ("Zahlungsmittel", "TEXT"), ("Belegtext", "TEXT"),
+        ("Gesamt", "REAL"), ("Kst", "TEXT"), ("10%", "REAL"), ("20%", "REAL"),
+        ("Fahrtkosten", "REAL"), ("Trinkgeld", "REAL"), ("Auftragsart", "TEXT"),
+        ("Status", "TEXT"), ("Bemerkung", "TEXT"),
+    ],
+}
+
+# Zusätzliche Indizes für typische Abfragen der Abrechnung
+PLATFORM_INDEXES: Dict[str, List[Tuple[str, str]]] = {
+    "uber": [("idx_reports_name", "year, kw, last_name, first_name")],
+    "bolt": [("idx_reports_name", "year, kw, driver_name")],
+    "40100": [("idx_reports_fahrzeug", "year, kw, Fahrzeug")],
+    "31300": [("idx_reports_fahrzeug", "year, kw, Fahrzeug")],
+}
+
+# Leere bzw. von pandas als Text geschriebene Fehlwerte
+_EMPTY_VALUES = ("", "nan", "None")
+
+_LEGACY_TABLE = re.compile(r"^report_KW(\d{1,2})$")
+
+
+def _quote(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+def ensure_reports_table(conn: sqlite3.Connection, platform: str):
+    """Legt die Jahres-/Wochentabelle samt Indizes an (idempotent)."""
+    columns = PLATFORM_COLUMNS[platform]
+    column_sql = ",\n".join(f"    {_quote(name)} {sql_type}" for name, sql_type in columns)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {REPORT_TABLE} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+        {column_sql},
+            week TEXT,
+            year INTEGER NOT NULL,
+            kw INTEGER NOT NULL CHECK (kw BETWEEN 1 AND 53)
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_reports_year_kw ON {REPORT_TABLE} (year, kw)")
+    for index_name, index_cols in PLATFORM_INDEXES.get(platform, []):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {REPORT_TABLE} ({index_cols})")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reports_migrated (
+            tabelle TEXT PRIMARY KEY,
+            year INTEGER NOT NULL,
+            rows INTEGER NOT NULL,
+            migrated_at TEXT NOT NULL
+        )
+    """)
+
+
+def insert_report_rows(conn: sqlite3.Connection, platform: str, df, year: int, kw: int) -> int:
+    """Schreibt importierte Zeilen (DataFrame) mit Jahr/KW in die Plattform-Tabelle."""
+    if df is None or df.empty:
+        return 0
+    ensure_reports_table(conn, platform)
+    known = {name for name, _ in PLATFORM_COLUMNS[platform]} | {"week"}
+    rows = df[[c for c in df.columns if c in known]].copy()
+    rows["year"] = int(year)
+    rows["kw"] = int(kw)
+    rows.to_sql(REPORT_TABLE, conn, if_exists="append", index=False)
+    return len(rows)
+
+
+def numeric_columns(platform: str) -> List[str]:
+    """Betrags-/Zahlspalten (REAL) einer Plattform."""
+    return [name for name, sql_type in PLATFORM_COLUMNS.get(platform, []) if sql_type == "REAL"]
+
+
+def _has_text_affinity(declared: str) -> bool:
+    declared = (declared or "").upper()
+    return "INT" not in declared and any(t in declared for t in ("CHAR", "CLOB", "TEXT"))
+
+
+def _parsed_amount(column_sql: str) -> str:
+    """SQL-Ausdruck: Komma-Dezimaltext → REAL, auf Cent gerundet (leer → NULL)."""
+    return (f"CASE WHEN TRIM({column_sql}) IN ({', '.join(repr(v) for v in _EMPTY_VALUES)}) THEN NULL "
+            f"ELSE ROUND(CAST(REPLACE(REPLACE(TRIM({column_sql}), ' ', ''), ',', '.') AS REAL), 2) END")
+
+
+def amount_sql(column_sql: str) -> str:
+    """SQL-Ausdruck für lesende Abfragen: Betrag als REAL, auch wenn er noch als Text steht."""
+    return f"(CASE WHEN typeof({column_sql}) = 'text' THEN {_parsed_amount(column_sql)} ELSE {column_sql} END)"
+
+
+def normalize_numeric_columns(conn: sqlite3.Connection, table: str, columns: List[str]) -> int:
+    """Wandelt als Text gespeicherte Beträge einer Tabelle einmalig in REAL.
+
+    Spalten mit TEXT-Affinität (z.B. von Hand oder per to_sql angelegt) werden
+    durch eine REAL-Spalte gleichen Namens ersetzt, sonst genügt ein UPDATE der
+    Text-Werte. Ein vorhandener import_key (smart_import) wurde aus den Textwerten
+    gebildet und wird verworfen; smart_import baut ihn beim nächsten Import neu auf.
+    Nicht committet. Rückgabe: Anzahl umgewandelter Werte.
+    """
+    declared = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")}
+    converted = 0
+    for column in [c for c in columns if c in declared]:
+        col_sql = _quote(column)
+        count = conn.execute(
+            f"SELECT COUNT(*) FROM {_quote(table)} WHERE typeof({col_sql}) = 'text'"
+        ).fetchone()[0]
+        if not _has_text_affinity(declared[column]):
+            if count:
+                conn.execute(f"UPDATE {_quote(table)} SET {col_sql} = {_parsed_amount(col_sql)} "
+                             f"WHERE typeof({col_sql}) = 'text'")
+            converted += count
+            continue
+
+        # TEXT-Affinität: Werte würden beim Speichern wieder zu Text → Spalte ersetzen
+        tmp_sql = _quote(column + "__real")
+        conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {tmp_sql} REAL")
+        conn.execute(f"UPDATE {_quote(table)} SET {tmp_sql} = CASE WHEN typeof({col_sql}) = 'text' "
+                     f"THEN {_parsed_amount(col_sql)} ELSE {col_sql} END")
+        conn.execute(f"ALTER TABLE {_quote(table)} DROP COLUMN {col_sql}")
+        conn.execute(f"ALTER TABLE {_quote(table)} RENAME COLUMN {tmp_sql} TO {col_sql}")
+        converted += count
+    if converted and "import_key" in declared:
+        conn.execute(f"DROP INDEX IF EXISTS {_quote('idx_' + table + '_import_key')}")
+        conn.execute(f"UPDATE {_quote(table)} SET import_key = NULL")
+    if converted:
+        logger.info("%s: %d Textbeträge in REAL umgewandelt", table, converted)
+    return converted
+
+
+def list_weeks(conn: sqlite3.Connection, year: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Verfügbare (Jahr, KW)-Paare, neueste zuerst – über idx_reports_year_kw."""
+    try:
+        if year is None:
+            cursor = conn.execute(
+                f"SELECT DISTINCT year, kw FROM {REPORT_TABLE} ORDER BY year DESC, kw DESC"
+            )
+        else:
+            cursor = conn.execute(
+                f"SELECT DISTINCT year, kw FROM {REPORT_TABLE} WHERE year = ? ORDER BY kw DESC",
+                (int(year),),
+            )
+        return [(int(r[0]), int(r[1])) for r in cursor.fetchall()]
+    except sqlite3.OperationalError:
+        # Tabelle noch nicht angelegt (kein Import, keine Migration)
+        return []
+
+
+def _legacy_tables(conn: sqlite3.Connection) -> List[Tuple[str, int]]:
+    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'report_KW%'")
+    tables = []
+    for (name,) in cursor.fetchall():
+        match = _LEGACY_TABLE.match(name)
+        if match:
+            tables.append((name, int(match.group(1))))
+    return sorted(tables, key=lambda t: t[1])
+
+
+def _migrated_tables(conn: sqlite3.Connection) -> Set[str]:
+    try:
+        return {row[0] for row in conn.execute("SELECT tabelle FROM reports_migrated")}
+    except sqlite3.OperationalError:
+        return set()
+
+
+def legacy_week_tables(conn: sqlite3.Connection) -> Dict[int, str]:
+    """Noch nicht nach 'reports' übernommene report_KW-Tabellen (KW → Tabelle), nur lesend."""
+    done = _migrated_tables(conn)
+    return {kw: tabelle for tabelle, kw in _legacy_tables(conn) if tabelle not in done}
+
+
+def _table_columns(conn: sqlite3.Connection, tabelle: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(tabelle)})")]
+
+
+def legacy_rows_filter(conn: sqlite3.Connection, tabelle: str) -> str:
+    """SQL-Bedingung für die Zeilen einer report_KW-Tabelle, die noch nicht in 'reports' stehen.
+
+    Vom Import geschriebene Zeilen tragen ein Jahr und sind bereits gespiegelt.
+    """
+    return "year IS NULL" if "year" in _table_columns(conn, tabelle) else "1"
+
+
+def _record_migrated(conn: sqlite3.Connection, tabelle: str, year: int, rows: int):
+    conn.execute(
+        "INSERT INTO reports_migrated (tabelle, year, rows, migrated_at) VALUES (?, ?, ?, ?)",
+        (tabelle, int(year), rows, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+    )
+
+
+def record_imported_table(conn: sqlite3.Connection, platform: str, tabelle: str, year: int) -> bool:
+    """Vermerkt eine vom Import beschriebene Wochentabelle, wenn sie keine Zeilen ohne Jahr hat.
+
+    Alle Zeilen stehen dann bereits in 'reports'; die Migration überspringt die
+    Tabelle. Nicht committet. Rückgabe: True, wenn die Tabelle (jetzt) vermerkt ist.
+    """
+    ensure_reports_table(conn, platform)
+    if tabelle in _migrated_tables(conn):
+        return True
+    if conn.execute(f"SELECT 1 FROM {_quote(tabelle)} WHERE {legacy_rows_filter(conn, tabelle)} LIMIT 1").fetchone():
+        return False
+    _record_migrated(conn, tabelle, year, 0)
+    return True
+
+
+def migrate_legacy_table(conn: sqlite3.Connection, platform: str, tabelle: str, kw: int, year: int) -> Optional[int]:
+    """Überträgt die Zeilen ohne Jahr einer report_KW-Tabelle mit dem angegebenen Jahr nach 'reports'.
+
+    Die Zeilen erhalten das Jahr auch in der Wochentabelle. Zeilen, die ein
+    Import desselben Jahres bereits enthält (gleicher import_key), werden
+    verworfen statt doppelt übernommen. Danach steht die Tabelle in
+    reports_migrated; bereits vermerkte Tabellen werden übersprungen (Rückgabe
+    None). Nicht committet.
+    """
+    ensure_reports_table(conn, platform)
+    if tabelle in _migrated_tables(conn):
+        return None
+    target_cols = {name for name, _ in PLATFORM_COLUMNS[platform]} | {"week"}
+    normalize_numeric_columns(conn, tabelle, numeric_columns(platform))
+    source_cols = _table_columns(conn, tabelle)
+    if "year" not in source_cols:
+        conn.execute(f"ALTER TABLE {_quote(tabelle)} ADD COLUMN year INTEGER")
+    if "import_key" in source_cols:
+        conn.execute(f"""
+            DELETE FROM {_quote(tabelle)} WHERE year IS NULL AND import_key IS NOT NULL AND EXISTS (
+                SELECT 1 FROM {_quote(tabelle)} AS importiert
+                WHERE importiert.year = ? AND importiert.week IS {_quote(tabelle)}.week
+                  AND importiert.import_key = {_quote(tabelle)}.import_key
+            )
+        """, (int(year),))
+    cols = [c for c in source_cols if c in target_cols]
+    rows = 0
+    if cols:
+        col_sql = ", ".join(_quote(c) for c in cols)
+        rows = conn.execute(
+            f"INSERT INTO {REPORT_TABLE} ({col_sql}, year, kw) "
+            f"SELECT {col_sql}, ?, ? FROM {_quote(tabelle)} WHERE year IS NULL",
+            (int(year), int(kw)),
+        ).rowcount
+    conn.execute(f"UPDATE {_quote(tabelle)} SET year = ? WHERE year IS NULL", (int(year),))
+    _record_migrated(conn, tabelle, year, rows)
+    return rows
+
+
+def migrate_legacy_tables(conn: sqlite3.Connection, platform: str, year: int) -> Dict[str, int]:
+    """Überträgt alle report_KW-Tabellen einmalig in 'reports' (Jahr der Zeilen ohne Jahr wird vorgegeben).
+
+    Bereits migrierte Tabellen (auch die von smart_import beschriebenen) werden über
+    reports_migrated übersprungen. Die Alt-Tabellen bleiben erhalten; bei den
+    Taxi-Plattformen erhalten sie die Spalte fahrzeug_nummer (taxi_totals), damit
+    die Abrechnung sie nur noch lesen muss.
+    """
+    from taxi_totals import AMOUNT_COLUMN, ensure_vehicle_digits  # lokal: taxi_totals importiert dieses Modul
+
+    ensure_reports_table(conn, platform)
+    migrated: Dict[str, int] = {}
+    for tabelle, kw in _legacy_tables(conn):
+        rows = migrate_legacy_table(conn, platform, tabelle, kw, year)
+        if rows is not None:
+            migrated[tabelle] = rows
+        if platform in AMOUNT_COLUMN:
+            ensure_vehicle_digits(conn, tabelle)
+    conn.commit()
+    return migrated
+
+
+def migrate_all(sql_dir: Path, year: int) -> Dict[str, Dict[str, int]]:
+    """Migriert alle vorhandenen Plattform-Datenbanken im SQL-Ordner."""
+    result: Dict[str, Dict[str, int]] = {}
+    for platform, db_file in PLATFORM_DB_FILES.items():
+        db_path = Path(sql_dir) / db_file
+        if not db_path.exists():
+            print(f"ℹ️ {db_file} nicht vorhanden – übersprungen")
+            continue
+        conn = sqlite3.connect(db_path)
+        try:
+            result[platform] = migrate_legacy_tables(conn, platform, year)
+            rows = sum(result[platform].values())
+            print(f"✅ {platform}: {len(result[platform])} Tabellen, {rows} Zeilen nach '{REPORT_TABLE}' migriert")
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Fehler bei der Migration von {db_file}: {e}")
+        finally:
+            conn.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migriert report_KW-Tabellen in jahresfähige Plattform-Tabellen")
+    parser.add_argument("--jahr", type=int, default=datetime.now().year,
+                        help="Jahr, dem die bestehenden report_KW-Tabellen zugeordnet werden")
+    parser.add_argument("--sql-dir", default=str(Path(__file__).parent / "SQL"))
+    args = parser.parse_args()
+
+    print(f"🚀 Migration der Wochenberichte (Jahr {args.jahr})")
+    migrate_all(Path(args.sql_dir), args.jahr)
+
+
+if __name__ == "__main__":
+    main()
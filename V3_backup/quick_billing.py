@@ -0,0 +1,726 @@
+"""
+Schnellabrechnung als importierbare Engine.
+
+Ersetzt den Umweg über test_config.ini + subprocess (test_schnellabrechnung.py):
+Die Berechnung läuft im Prozess, liefert strukturierte Ergebnisse und öffnet
+jede Plattform-Datenbank nur einmal pro Lauf.
+
+Die Rechenlogik entspricht SchnellabrechnungTester (Plattformsummen auf Cent
+gerundet, HeadCard-/Credit-Card-Werte, Anteil/Income/Abrechnungsergebnis je
+Deal-Typ).
+
+    engine = QuickBillingEngine()
+    result = engine.run("W135CTX", "Max Muster", ["30", "31"], 0.13, 0.20, 0.0)
+    print(format_summary(result))
+
+Sammelabrechnung (mehrere Fahrzeuge/Fahrer): alle benötigten Wochen werden je
+Datenbank in einem Durchgang gelesen (Taxi je Fahrzeugnummer, Uber/Bolt nur
+die Namens- und Betragsspalten, je Fahrer zugeordnet), die Jobs laufen in
+einem Prozess-Pool.
+
+    jobs = [BillingJob("W135CTX", "Max Muster", 30, 34), ...]
+    results = engine.run_batch(jobs, 0.13, 0.20, 0.0)
+    export_csv(results, "schnellabrechnung.csv")
+
+Monatsabschluss für die ganze Flotte (alle Fahrzeuge mit Stammfahrer):
+    python quick_billing.py --von 30 --bis 34 --export schnellabrechnung.pdf
+"""
+
+import argparse
+import calendar
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from connection_manager import connect
+from fuzzy_matcher import MAX_DISTANCE, MIN_SCORE, BatchFuzzyMatcher, clean_name
+from taxi_totals import TaxiTotals, load_taxi_totals, vehicle_digits
+
+# Plattform-Datenbanken im SQL-Ordner
+PLATFORM_DB_FILES: Dict[str, str] = {
+    "40100": "40100.sqlite",
+    "31300": "31300.sqlite",
+    "Uber": "uber.sqlite",
+    "Bolt": "bolt.sqlite",
+}
+
+GARAGE_FAKTOR = 0.5
+P_DEAL_BONUS_PROZENT = 0.1
+DEFAULT_PAUSCHALE = 500.0
+DEFAULT_UMSATZGRENZE = 1200.0
+
+# Unterhalb dieser Jobzahl lohnt sich der Start eines Prozess-Pools nicht
+MIN_JOBS_FOR_POOL = 4
+
+TAXI_PLATFORMS = ("40100", "31300")
+
+# Von der Abrechnung benötigte Spalten der Uber/Bolt-Wochentabellen
+RIDE_HAILING_COLUMNS: Dict[str, tuple] = {
+    "Uber": ("first_name", "last_name", "gross_total", "cash_collected", "tips"),
+    "Bolt": ("driver_name", "net_earnings", "rider_tips", "cash_collected"),
+}
+
+# Spalten der kombinierten Ergebnistabelle (Sammelabrechnung, CSV/PDF)
+BATCH_COLUMNS = [
+    "Fahrzeug", "Fahrer", "KW", "Deal", "Umsatz", "Credit Card", "Anteil", "Tank",
+    "Einsteiger", "Garage", "Ausgaben", "Income", "Abrechnungsergebnis",
+]
+
+
+@dataclass
+class DealInfo:
+    """Deal-Konfiguration eines Fahrers aus database.db (Tabelle deals)."""
+    deal: Optional[str] = None
+    garage: float = 0.0
+    pauschale: float = DEFAULT_PAUSCHALE
+    umsatzgrenze: float = DEFAULT_UMSATZGRENZE
+
+
+@dataclass
+class PlatformWeek:
+    """Wochensummen einer Plattform (auf Cent gerundet)."""
+    label: str
+    umsatz: float
+    bargeld: float
+    trinkgeld: float = 0.0
+    # Trinkgeld zählt für HeadCard/Credit Card (bei Uber bisher nicht)
+    trinkgeld_in_headcard: bool = True
+
+
+@dataclass
+class WeekResult:
+    """Ergebnis der Schnellabrechnung für eine Kalenderwoche."""
+    kalenderwoche: str
+    umsatz: float
+    credit_card: float
+    anteil: float
+    tank: float
+    einsteiger: float
+    garage: float
+    expense: float
+    income: float
+    abrechnungsergebnis: float
+    deal_typ: Optional[str]
+    headcard_umsatz: float = 0.0
+    headcard_bargeld: float = 0.0
+    headcard_trinkgeld: float = 0.0
+    platforms: List[PlatformWeek] = field(default_factory=list)
+
+
+@dataclass
+class QuickBillingResult:
+    """Gesamtergebnis eines Laufs (Fahrzeug, Fahrer, mehrere Wochen)."""
+    fahrzeug: str
+    fahrer: str
+    deal: DealInfo
+    weeks: List[WeekResult] = field(default_factory=list)
+    fehler: Optional[str] = None  # ungültiger Job der Sammelabrechnung (z.B. KW außerhalb 1..53)
+
+    @property
+    def total_umsatz(self) -> float:
+        return sum(w.umsatz for w in self.weeks)
+
+    @property
+    def total_ergebnis(self) -> float:
+        return sum(w.abrechnungsergebnis for w in self.weeks)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class BillingJob:
+    """Ein Auftrag der Sammelabrechnung: Fahrzeug, Fahrer und KW-Bereich (inklusive)."""
+    fahrzeug: str
+    fahrer: str
+    week_from: int
+    week_to: int
+
+    @property
+    def weeks(self) -> List[int]:
+        return list(range(kw_number(self.week_from), kw_number(self.week_to) + 1))
+
+
+def kw_number(kw) -> int:
+    """'KW31', '31' oder 31 → 31 (nur 1..53, wie die Wochen der Plattform-Reports)."""
+    value = int(str(kw).upper().replace("KW", "").strip())
+    if not 1 <= value <= 53:
+        raise ValueError(f"Ungültige Kalenderwoche: {kw}")
+    return value
+
+
+def _anzahl_montage(kw: int, jahr: Optional[int] = None) -> int:
+    jahr = jahr or datetime.now().year
+    erster_tag_kw = datetime.strptime(f'{jahr}-W{kw}-1', "%Y-W%W-%w")
+    monat = erster_tag_kw.month
+    cal = calendar.Calendar(firstweekday=0)
+    # KW53 kann im Januar des Folgejahres beginnen
+    return len([d for d in cal.itermonthdates(erster_tag_kw.year, monat) if d.weekday() == 0 and d.month == monat])
+
+
+def calculate_garage_abzug(garage: float, kw: int, jahr: Optional[int] = None) -> float:
+    """Monatliche Garage ÷ Montage im Monat der KW × Garage-Faktor."""
+    if not garage or garage <= 0:
+        return 0.0
+    montage = _anzahl_montage(kw, jahr)
+    if montage <= 0:
+        return 0.0
+    return (garage / montage) * GARAGE_FAKTOR
+
+
+def calculate_auto_fill(total_umsatz: float, deal_typ: Optional[str], tank_prozent: float,
+                        einsteiger_prozent: float):
+    """Tank- und Einsteiger-Werte als Anteil vom Umsatz (P-Deal ohne Einsteiger)."""
+    if deal_typ == "P":
+        return total_umsatz * tank_prozent, 0.0
+    if deal_typ in ("%", "C"):
+        return total_umsatz * tank_prozent, total_umsatz * einsteiger_prozent
+    return total_umsatz * 0.15, total_umsatz * 0.25
+
+
+def calculate_anteil(total_umsatz: float, deal_typ: Optional[str], pauschale: float, umsatzgrenze: float,
+                     einsteiger_prozent: float = 0.0) -> float:
+    if deal_typ == "P":
+        result = pauschale
+        if total_umsatz > umsatzgrenze:
+            result += (total_umsatz - umsatzgrenze) * P_DEAL_BONUS_PROZENT
+        return result
+    if deal_typ == "%":
+        einsteiger_input = total_umsatz * einsteiger_prozent
+        return total_umsatz * 0.5 + einsteiger_input * 0.5
+    if deal_typ == "C":
+        return total_umsatz * 0.6
+    return total_umsatz * 0.5
+
+
+def calculate_income(anteil: float, tank_value: float, expense_fix: float, garage_abzug: float,
+                     deal_typ: Optional[str]) -> float:
+    # Nur bei %-Deals wird die Hälfte des Tanks abgezogen
+    tank_abzug = tank_value * 0.5 if deal_typ == "%" else 0.0
+    return anteil - tank_abzug - garage_abzug - expense_fix
+
+
+def calculate_abrechnungsergebnis(credit_card: float, income: float, deal_typ: Optional[str],
+                                  headcard_trinkgeld: float = 0.0) -> float:
+    result = credit_card - income
+    if deal_typ == "%":
+        result += headcard_trinkgeld
+    return result
+
+
+def calculate_week(kalenderwoche: str, platforms: Sequence[PlatformWeek], deal: DealInfo,
+                   tank_prozent: float, einsteiger_prozent: float, expense_fix: float,
+                   jahr: Optional[int] = None) -> WeekResult:
+    """Reine Berechnung einer Woche aus den Plattformsummen (ohne Datenbankzugriff)."""
+    total_umsatz = sum(p.umsatz for p in platforms)
+    headcard_umsatz = total_umsatz
+    headcard_trinkgeld = sum(p.trinkgeld for p in platforms if p.trinkgeld_in_headcard)
+    headcard_bargeld = sum(p.bargeld for p in platforms)
+    credit_card = (headcard_umsatz + headcard_trinkgeld) - headcard_bargeld
+
+    tank_value, einsteiger_value = calculate_auto_fill(total_umsatz, deal.deal, tank_prozent, einsteiger_prozent)
+    garage_abzug = calculate_garage_abzug(deal.garage, kw_number(kalenderwoche), jahr)
+    anteil = calculate_anteil(total_umsatz, deal.deal, deal.pauschale, deal.umsatzgrenze, einsteiger_prozent)
+    income = calculate_income(anteil, tank_value, expense_fix, garage_abzug, deal.deal)
+    ergebnis = calculate_abrechnungsergebnis(credit_card, income, deal.deal, headcard_trinkgeld)
+
+    return WeekResult(
+        kalenderwoche=str(kalenderwoche),
+        umsatz=total_umsatz,
+        credit_card=credit_card,
+        anteil=anteil,
+        tank=tank_value,
+        einsteiger=einsteiger_value,
+        garage=garage_abzug,
+        expense=expense_fix,
+        income=income,
+        abrechnungsergebnis=ergebnis,
+        deal_typ=deal.deal,
+        headcard_umsatz=headcard_umsatz,
+        headcard_bargeld=headcard_bargeld,
+        headcard_trinkgeld=headcard_trinkgeld,
+        platforms=list(platforms),
+    )
+
+
+def _num(value) -> float:
+    """Zahl oder 0.0 (None/NaN/leer wie bei pandas-Summen)."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if np.isnan(value) else value
+
+
+def _cent(value) -> float:
+    return round(_num(value), 2)
+
+
+def _deal_from_row(row) -> DealInfo:
+    if not row:
+        return DealInfo()
+    return DealInfo(
+        deal=row[0],
+        garage=row[1] if row[1] is not None else 0.0,
+        pauschale=row[2] if row[2] is not None else DEFAULT_PAUSCHALE,
+        umsatzgrenze=row[3] if row[3] is not None else DEFAULT_UMSATZGRENZE,
+    )
+
+
+def taxi_week(totals: Optional[TaxiTotals]) -> Optional[PlatformWeek]:
+    """40100/31300-Wochensummen (taxi_totals) als PlatformWeek, wie auf der Abrechnungsseite."""
+    if totals is None:
+        return None
+    if totals.platform == "40100":
+        # 40100-Trinkgeld fließt (wie bisher) nicht in die HeadCard ein
+        return PlatformWeek("40100", _cent(totals.echter_umsatz), _cent(totals.bargeld))
+    return PlatformWeek("31300", _cent(totals.echter_umsatz), _cent(totals.bargeld), _cent(totals.trinkgeld))
+
+
+class QuickBillingEngine:
+    """Berechnet Schnellabrechnungen direkt aus den SQLite-Datenbanken."""
+
+    def __init__(self, sql_dir: str = "SQL", min_match_score: float = MIN_SCORE,
+                 max_distance: int = MAX_DISTANCE):
+        self.sql_dir = sql_dir
+        self.min_match_score = min_match_score
+        self.max_distance = max_distance
+
+    # --- Datenbankzugriff ---
+    def _connect(self, db_file: str) -> Optional[sqlite3.Connection]:
+        path = os.path.join(self.sql_dir, db_file)
+        if not os.path.exists(path):
+            return None
+        return connect(path)
+
+    @staticmethod
+    def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+        ).fetchone() is not None
+
+    def load_deal(self, fahrer: str) -> DealInfo:
+        """Deal, Garage, Pauschale und Umsatzgrenze des Fahrers (Standardwerte, falls keiner)."""
+        conn = self._connect("database.db")
+        if conn is None:
+            return DealInfo()
+        try:
+            row = conn.execute(
+                "SELECT deal, garage, pauschale, umsatzgrenze FROM deals WHERE name = ?", (fahrer,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ Deal für {fahrer} nicht lesbar: {e}")
+            row = None
+        finally:
+            conn.close()
+        return _deal_from_row(row)
+
+    def load_deals(self, fahrer_liste: Iterable[str]) -> Dict[str, DealInfo]:
+        """Deals mehrerer Fahrer in einer Abfrage (fehlende → Standardwerte)."""
+        namen = sorted(set(fahrer_liste))
+        deals = {name: DealInfo() for name in namen}
+        conn = self._connect("database.db") if namen else None
+        if conn is None:
+            return deals
+        try:
+            placeholders = ", ".join("?" for _ in namen)
+            for row in conn.execute(
+                f"SELECT name, deal, garage, pauschale, umsatzgrenze FROM deals WHERE name IN ({placeholders})",
+                namen,
+            ):
+                deals[row[0]] = _deal_from_row(row[1:])
+        except sqlite3.Error as e:
+            print(f"⚠️ Deals nicht lesbar: {e}")
+        finally:
+            conn.close()
+        return deals
+
+    def fleet_jobs(self, week_from, week_to) -> List[BillingJob]:
+        """Aufträge für alle aktiven Fahrzeuge mit Stammfahrer (vehicles in database.db)."""
+        conn = self._connect("database.db")
+        if conn is None:
+            return []
+        try:
+            rows = conn.execute(
+                "SELECT license_plate, stammfahrer FROM vehicles "
+                "WHERE COALESCE(status, 'Aktiv') = 'Aktiv' AND TRIM(COALESCE(stammfahrer, '')) != '' "
+                "ORDER BY license_plate"
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"⚠️ Fahrzeuge nicht lesbar: {e}")
+            rows = []
+        finally:
+            conn.close()
+        return [BillingJob(kennzeichen, fahrer.strip(), week_from, week_to) for kennzeichen, fahrer in rows]
+
+    @staticmethod
+    def _ride_hailing_frame(conn: sqlite3.Connection, platform: str, table: str) -> pd.DataFrame:
+        """Namens- und Betragsspalten einer Uber/Bolt-Wochentabelle (statt SELECT *)."""
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+        columns = [c for c in RIDE_HAILING_COLUMNS[platform] if c in existing]
+        if not columns:
+            return pd.DataFrame()
+        return pd.read_sql_query(f'SELECT {", ".join(columns)} FROM "{table}"', conn)
+
+    @staticmethod
+    def _ride_hailing_names(platform: str, df: pd.DataFrame) -> Optional[pd.Series]:
+        if platform == "Uber":
+            if "first_name" not in df.columns or "last_name" not in df.columns:
+                return None
+            return df["first_name"].fillna("") + " " + df["last_name"].fillna("")
+        if "driver_name" not in df.columns:
+            return None
+        return df["driver_name"].fillna("")
+
+    @staticmethod
+    def _ride_hailing_week(platform: str, row: pd.Series) -> PlatformWeek:
+        if platform == "Uber":
+            return PlatformWeek(
+                "Uber",
+                _cent(row.get("gross_total", 0)),
+                _cent(row.get("cash_collected", 0)),
+                _cent(row.get("tips", 0)),
+                trinkgeld_in_headcard=False,
+            )
+        net_earnings = _num(row.get("net_earnings", 0))
+        rider_tips = _num(row.get("rider_tips", 0))
+        return PlatformWeek("Bolt", _cent(net_earnings - rider_tips), _cent(row.get("cash_collected", 0)),
+                            _cent(rider_tips))
+
+    def summarize_drivers(self, platform: str, df: pd.DataFrame,
+                          fahrer_liste: Sequence[str]) -> Dict[str, Optional[PlatformWeek]]:
+        """Wochensummen je Fahrer: bester Namens-Score (erste Zeile bei Gleichstand), falls ≥ min_match_score.
+
+        Alle Fahrer werden in einer Score-Matrix gegen die Namen der Woche bewertet.
+        """
+        result: Dict[str, Optional[PlatformWeek]] = {fahrer: None for fahrer in fahrer_liste}
+        names = self._ride_hailing_names(platform, df)
+        if names is None or df.empty or not result:
+            return result
+        matcher = BatchFuzzyMatcher(names.tolist(), max_distance=self.max_distance)
+        scores = matcher.score([clean_name(fahrer) for fahrer in result])["score"]
+        for fahrer, row_scores in zip(list(result), scores):
+            best = int(np.argmax(row_scores))
+            if row_scores[best] >= self.min_match_score:
+                result[fahrer] = self._ride_hailing_week(platform, df.iloc[best])
+        return result
+
+    def _summarize_ride_hailing(self, platform: str, df: pd.DataFrame, fahrer: str) -> Optional[PlatformWeek]:
+        return self.summarize_drivers(platform, df, [fahrer])[fahrer]
+
+    def load_platforms(self, conns: Dict[str, sqlite3.Connection], fahrer: str, fahrzeug: str,
+                       kw: int) -> List[PlatformWeek]:
+        """Plattformsummen einer KW für Fahrzeug (Taxi) bzw. Fahrer (Uber/Bolt)."""
+        table = f"report_KW{kw}"
+        kennzeichen_nummer = vehicle_digits(fahrzeug)
+        platforms: List[PlatformWeek] = []
+        for platform, conn in conns.items():
+            if conn is None or not self._table_exists(conn, table):
+                continue
+            try:
+                if platform in TAXI_PLATFORMS:
+                    summary = taxi_week(load_taxi_totals(conn, platform, table, kennzeichen_nummer))
+                else:
+                    df = self._ride_hailing_frame(conn, platform, table)
+                    summary = self._summarize_ride_hailing(platform, df, fahrer)
+            except Exception as e:
+                print(f"⚠️ {platform} KW{kw}: {e}")
+                continue
+            if summary is not None:
+                platforms.append(summary)
+        return platforms
+
+    def run(self, fahrzeug: str, fahrer: str, kalenderwochen: Sequence, tank_prozent: float,
+            einsteiger_prozent: float, expense_fix: float) -> QuickBillingResult:
+        """Schnellabrechnung für mehrere Wochen; Wochen ohne Plattformdaten entfallen."""
+        result = QuickBillingResult(fahrzeug=fahrzeug, fahrer=fahrer, deal=self.load_deal(fahrer))
+        conns = {platform: self._connect(db_file) for platform, db_file in PLATFORM_DB_FILES.items()}
+        try:
+            for kw in kalenderwochen:
+                platforms = self.load_platforms(conns, fahrer, fahrzeug, kw_number(kw))
+                if not platforms:
+                    continue
+                result.weeks.append(calculate_week(
+                    str(kw), platforms, result.deal, tank_prozent, einsteiger_prozent, expense_fix
+                ))
+        finally:
+            for conn in conns.values():
+                if conn is not None:
+                    conn.close()
+        return result
+
+    # --- Sammelabrechnung ---
+    def prefetch(self, jobs: Sequence[BillingJob]) -> Dict[int, Dict[str, object]]:
+        """Liest alle Wochen aller Jobs mit einer Verbindung je Plattform-Datenbank.
+
+        Taxi-Plattformen liefern je Fahrzeugnummer der Jobs die Wochensummen
+        (taxi_totals, exakt über fahrzeug_nummer; Kennzeichen ohne Ziffern
+        entfallen). Von Uber/Bolt werden nur Namens- und Betragsspalten gelesen
+        und einmal je Woche allen Fahrern der Jobs zugeordnet (Fuzzy-Match).
+        Ergebnis: {kw: {plattform: {nummer bzw. fahrer: PlatformWeek oder None}}}
+        in der Reihenfolge von PLATFORM_DB_FILES – klein genug für den Prozess-Pool.
+        """
+        weeks = sorted({kw for job in jobs for kw in job.weeks})
+        nummern = sorted({vehicle_digits(job.fahrzeug) for job in jobs} - {""})
+        fahrer_liste = sorted({job.fahrer for job in jobs})
+        frames: Dict[int, Dict[str, object]] = {kw: {} for kw in weeks}
+        for platform, db_file in PLATFORM_DB_FILES.items():
+            conn = self._connect(db_file)
+            if conn is None:
+                continue
+            try:
+                tables = {row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'report_KW%'"
+                )}
+                for kw in weeks:
+                    table = f"report_KW{kw}"
+                    if table not in tables:
+                        continue
+                    try:
+                        if platform in TAXI_PLATFORMS:
+                            data = {n: taxi_week(load_taxi_totals(conn, platform, table, n)) for n in nummern}
+                        else:
+                            data = self.summarize_drivers(platform, self._ride_hailing_frame(conn, platform, table),
+                                                          fahrer_liste)
+                    except Exception as e:
+                        print(f"⚠️ {platform} KW{kw}: {e}")
+                        continue
+                    frames[kw][platform] = data
+            finally:
+                conn.close()
+        return frames
+
+    def platforms_from_frames(self, frames: Dict[str, object], fahrer: str,
+                              fahrzeug: str) -> List[PlatformWeek]:
+        """Wie load_platforms, aber auf vorab geladenen Wochensummen (siehe prefetch)."""
+        kennzeichen_nummer = vehicle_digits(fahrzeug)
+        platforms: List[PlatformWeek] = []
+        for platform, data in frames.items():
+            summary = data.get(kennzeichen_nummer if platform in TAXI_PLATFORMS else fahrer)
+            if summary is not None:
+                platforms.append(summary)
+        return platforms
+
+    def run_job(self, job: BillingJob, deal: DealInfo, frames: Dict[int, Dict[str, object]],
+                tank_prozent: float, einsteiger_prozent: float, expense_fix: float) -> QuickBillingResult:
+        """Ein Job der Sammelabrechnung auf vorab geladenen Daten (ohne Datenbankzugriff)."""
+        result = QuickBillingResult(fahrzeug=job.fahrzeug, fahrer=job.fahrer, deal=deal)
+        for kw in job.weeks:
+            platforms = self.platforms_from_frames(frames.get(kw, {}), job.fahrer, job.fahrzeug)
+            if not platforms:
+                continue
+            result.weeks.append(calculate_week(
+                str(kw), platforms, deal, tank_prozent, einsteiger_prozent, expense_fix
+            ))
+        return result
+
+    def run_batch(self, jobs: Iterable[BillingJob], tank_prozent: float, einsteiger_prozent: float,
+                  expense_fix: float, max_workers: Optional[int] = None) -> List[QuickBillingResult]:
+        """Sammelabrechnung: ein Lesedurchgang je Datenbank, Berechnung im Prozess-Pool.
+
+        Die vorab geladenen Tabellen gehen einmal pro Worker (Initializer) in den
+        Pool, nicht einmal pro Job. Bei wenigen Jobs oder wenn der Pool nicht
+        startet, wird sequenziell gerechnet. Die Reihenfolge entspricht den Jobs;
+        ungültige Jobs (z.B. KW außerhalb 1..53) liefern ein leeres Ergebnis mit
+        fehler, ohne die übrigen Jobs abzubrechen.
+        """
+        jobs = list(jobs)
+        fehler: Dict[int, str] = {}
+        for index, job in enumerate(jobs):
+            try:
+                job.weeks
+            except ValueError as e:
+                print(f"⚠️ Auftrag {job.fahrzeug} / {job.fahrer} übersprungen: {e}")
+                fehler[index] = str(e)
+        results = iter(self._run_valid_jobs([job for index, job in enumerate(jobs) if index not in fehler],
+                                            tank_prozent, einsteiger_prozent, expense_fix, max_workers))
+        return [QuickBillingResult(fahrzeug=job.fahrzeug, fahrer=job.fahrer, deal=DealInfo(), fehler=fehler[index])
+                if index in fehler else next(results)
+                for index, job in enumerate(jobs)]
+
+    def _run_valid_jobs(self, jobs: List[BillingJob], tank_prozent: float, einsteiger_prozent: float,
+                        expense_fix: float, max_workers: Optional[int]) -> List[QuickBillingResult]:
+        if not jobs:
+            return []
+        frames = self.prefetch(jobs)
+        deals = self.load_deals(job.fahrer for job in jobs)
+        params = (tank_prozent, einsteiger_prozent, expense_fix)
+
+        workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+        if workers > 1 and len(jobs) >= MIN_JOBS_FOR_POOL:
+            try:
+                settings = {"sql_dir": self.sql_dir, "min_match_score": self.min_match_score,
+                            "max_distance": self.max_distance}
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                         initargs=(settings, frames, deals, params)) as pool:
+                    chunksize = max(1, len(jobs) // (workers * 4))
+                    return list(pool.map(_run_batch_job, jobs, chunksize=chunksize))
+            except Exception as e:
+                print(f"⚠️ Prozess-Pool nicht verfügbar, rechne sequenziell: {e}")
+
+        return [self.run_job(job, deals[job.fahrer], frames, *params) for job in jobs]
+
+
+# Zustand der Pool-Worker (einmal pro Prozess über den Initializer gesetzt)
+_BATCH_STATE: dict = {}
+
+
+def _init_batch_worker(settings: dict, frames, deals, params):
+    _BATCH_STATE.update(engine=QuickBillingEngine(**settings), frames=frames, deals=deals, params=params)
+
+
+def _run_batch_job(job: BillingJob) -> QuickBillingResult:
+    state = _BATCH_STATE
+    return state["engine"].run_job(job, state["deals"][job.fahrer], state["frames"], *state["params"])
+
+
+def results_to_rows(results: Sequence[QuickBillingResult]) -> List[dict]:
+    """Kombinierte Ergebnistabelle: eine Zeile je Fahrzeug/Fahrer/KW (Werte auf Cent)."""
+    rows = []
+    for result in results:
+        for week in result.weeks:
+            rows.append(dict(zip(BATCH_COLUMNS, [
+                result.fahrzeug, result.fahrer, week.kalenderwoche, week.deal_typ or "",
+                round(week.umsatz, 2), round(week.credit_card, 2), round(week.anteil, 2),
+                round(week.tank, 2), round(week.einsteiger, 2), round(week.garage, 2),
+                round(week.expense, 2), round(week.income, 2), round(week.abrechnungsergebnis, 2),
+            ])))
+    return rows
+
+
+def results_to_dataframe(results: Sequence[QuickBillingResult]) -> pd.DataFrame:
+    return pd.DataFrame(results_to_rows(results), columns=BATCH_COLUMNS)
+
+
+def export_csv(results: Sequence[QuickBillingResult], path: str) -> str:
+    """Schreibt die kombinierte Ergebnistabelle als CSV."""
+    results_to_dataframe(results).to_csv(path, index=False, encoding="utf-8")
+    return path
+
+
+def export_pdf(results: Sequence[QuickBillingResult], path: str, title: str = "Schnellabrechnung") -> str:
+    """Schreibt die kombinierte Ergebnistabelle als PDF (A4 quer, mit Gesamtzeile)."""
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+    except ImportError as e:
+        raise RuntimeError(f"PDF-Export benötigt reportlab: {e}") from e
+
+    rows = results_to_rows(results)
+    betrag_spalten = BATCH_COLUMNS[4:]
+    data = [BATCH_COLUMNS]
+    for row in rows:
+        data.append([row[c] if c not in betrag_spalten else f"{row[c]:.2f}" for c in BATCH_COLUMNS])
+    data.append(["GESAMT", "", "", ""] + [f"{sum(r[c] for r in rows):.2f}" for c in betrag_spalten])
+
+    table = Table(data, repeatRows=1)
+    table.setStyle(TableStyle([
+        ("FONTSIZE", (0, 0), (-1, -1), 7),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+        ("LINEABOVE", (0, -1), (-1, -1), 0.5, colors.black),
+        ("ALIGN", (4, 1), (-1, -1), "RIGHT"),
+        ("GRID", (0, 0), (-1, -2), 0.25, colors.grey),
+    ]))
+    doc = SimpleDocTemplate(path, pagesize=landscape(A4), title=title)
+    doc.build([Paragraph(title, getSampleStyleSheet()["Heading2"]), table])
+    return path
+
+
+def format_summary(result: QuickBillingResult) -> str:
+    """Textdarstellung im bisherigen Format der Test-Zusammenfassung (wird in QML geparst)."""
+    if result.fehler:
+        return f"⚠️ {result.fahrer} / {result.fahrzeug}: {result.fehler}"
+    if not result.weeks:
+        return f"⚠️ Keine Daten für {result.fahrer} / {result.fahrzeug} in den gewählten Kalenderwochen"
+
+    lines = [f"Fahrzeug: {result.fahrzeug}", f"Fahrer: {result.fahrer}", "", "TEST-ZUSAMMENFASSUNG", "=" * 60]
+    for week in result.weeks:
+        lines.extend([
+            f"{week.kalenderwoche}:",
+            f"  Umsatz: {week.umsatz:.2f}€",
+            f"  Credit Card: {week.credit_card:.2f}€",
+            f"  Anteil: {week.anteil:.2f}€",
+            f"  Tank: {week.tank:.2f}€",
+            f"  Einsteiger: {week.einsteiger:.2f}€",
+            f"  Garage: {week.garage:.2f}€",
+            f"  Ausgaben: {week.expense:.2f}€",
+            f"  Income: {week.income:.2f} EUR",
+            f"  Abrechnungsergebnis: {week.abrechnungsergebnis:.2f}€",
+            f"  Deal-Typ: {week.deal_typ}",
+            "",
+        ])
+    lines.extend([
+        "=" * 60,
+        "GESAMT:",
+        f"  Wochen: {len(result.weeks)}",
+        f"  Gesamtumsatz: {result.total_umsatz:.2f}€",
+        f"  Gesamtergebnis: {result.total_ergebnis:.2f}€",
+        f"  Durchschnitt pro Woche: {result.total_ergebnis / len(result.weeks):.2f}€",
+    ])
+    return "\n".join(lines)
+
+
+def _prozent(value: float) -> float:
+    """Prozentangabe wie im QML-Dialog: 10 → 0.10, 0.1 bleibt 0.1."""
+    return value / 100 if value > 1 else value
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Sammelabrechnung für alle aktiven Fahrzeuge mit Stammfahrer (CSV- oder PDF-Export)"
+    )
+    parser.add_argument("--von", required=True, help="erste Kalenderwoche (z.B. 30 oder KW30)")
+    parser.add_argument("--bis", help="letzte Kalenderwoche (Standard: --von)")
+    parser.add_argument("--tank", type=float, default=10.0, help="Tank in Prozent (Standard: 10)")
+    parser.add_argument("--einsteiger", type=float, default=5.0, help="Einsteiger in Prozent (Standard: 5)")
+    parser.add_argument("--ausgaben", type=float, default=0.0, help="Fixe Ausgaben je Woche in EUR")
+    parser.add_argument("--export", help="Zieldatei (.pdf oder .csv, Standard: schnellabrechnung_KW<von>-<bis>.csv)")
+    parser.add_argument("--sql-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "SQL"),
+                        help="SQL-Ordner mit database.db und den Plattform-Datenbanken")
+    parser.add_argument("--workers", type=int, help="Anzahl Prozesse (Standard: CPU-Kerne)")
+    args = parser.parse_args(argv)
+
+    try:
+        week_from = kw_number(args.von)
+        week_to = kw_number(args.bis or args.von)
+    except ValueError as e:
+        parser.error(str(e))
+
+    engine = QuickBillingEngine(sql_dir=args.sql_dir)
+    jobs = engine.fleet_jobs(week_from, week_to)
+    if not jobs:
+        print(f"⚠️ Keine aktiven Fahrzeuge mit Stammfahrer in {args.sql_dir}")
+        return 1
+
+    print(f"🚀 Sammelabrechnung KW{week_from}–KW{week_to} für {len(jobs)} Fahrzeuge")
+    results = engine.run_batch(jobs, _prozent(args.tank), _prozent(args.einsteiger), args.ausgaben,
+                               max_workers=args.workers)
+    for result in results:
+        if result.fehler or not result.weeks:
+            print(format_summary(result))
+
+    path = args.export or f"schnellabrechnung_KW{week_from}-{week_to}.csv"
+    try:
+        if path.lower().endswith(".pdf"):
+            export_pdf(results, path, title=f"Schnellabrechnung KW{week_from}–KW{week_to}")
+        else:
+            export_csv(results, path)
+    except Exception as e:
+        print(f"❌ Export fehlgeschlagen: {e}")
+        return 1
+    print(f"✅ {len(results)} Abrechnungen exportiert: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
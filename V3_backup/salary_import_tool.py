@@ -3,10 +3,11 @@ Optimiertes Gehalts-Import-Tool für das Dashboard
 Integration in die bestehende Dashboard-Struktur
 """
 
+import atexit
 import re
-import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import pdfplumber
 import pytesseract
 import sys
@@ -15,6 +16,10 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import os
+import numpy as np
+from connection_manager import connect
+from fuzzy_matcher import BatchFuzzyMatcher, MIN_COVERAGE, MIN_SCORE
+from ocr_cache import file_sha256, get_ocr_cache
 
 # Setze explizit den Pfad zur tesseract.exe
 pytesseract.pytesseract.tesseract_cmd = r"C:\Users\moahm\AppData\Local\Programs\Tesseract-OCR\tesseract.exe"
@@ -22,6 +27,66 @@ pytesseract.pytesseract.tesseract_cmd = r"C:\Users\moahm\AppData\Local\Programs\
 # Passe diesen Pfad ggf. an deine Poppler-Installation an
 POPPLER_PATH = r"C:\Users\moahm\AppData\Local\Programs\poppler-24.08.0\Library\bin"
 
+# OCR-Modi in Reihenfolge der Versuche (erster nicht-leerer Text gewinnt)
+OCR_PSM_MODES = [6, 11, 8, 13]
+OCR_DPI = 300
+# Schlüssel im OCR-Cache: ändern sich PSM-Modi oder Engine, wird neu gelesen
+OCR_CACHE_CONFIG = f"salary --oem 3 -l deu --psm {'/'.join(map(str, OCR_PSM_MODES))}"
+
+_ocr_logger = logging.getLogger(__name__)
+
+# Gemeinsamer Prozess-Pool für Seiten-OCR (lazy, wird für alle PDFs wiederverwendet)
+_OCR_POOL: Optional[ProcessPoolExecutor] = None
+_OCR_POOL_WORKERS = 0
+
+
+def ocr_image_text(image) -> str:
+    """Tesseract mit PSM-Fallbacks auf ein Seitenbild"""
+    for psm in OCR_PSM_MODES:
+        try:
+            text = pytesseract.image_to_string(image, lang='deu', config=f'--psm {psm} --oem 3')
+            if text.strip():
+                return text
+        except Exception as e:
+            _ocr_logger.warning(f"OCR-Fehler mit PSM {psm}: {e}")
+    return ""
+
+
+def ocr_pdf_page(pdf_path: str, page_number: int, dpi: int = OCR_DPI) -> Tuple[int, str]:
+    """Rastert genau eine Seite und liest sie per OCR (läuft in den Pool-Prozessen)
+
+    Fehler betreffen nur diese Seite: Warnung und leerer Text, die übrigen Seiten laufen weiter.
+    """
+    try:
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number,
+                                   poppler_path=POPPLER_PATH)
+        return page_number, ocr_image_text(images[0]) if images else ""
+    except Exception as e:
+        _ocr_logger.warning(f"Fehler bei OCR von Seite {page_number} ({os.path.basename(pdf_path)}): {e}")
+        return page_number, ""
+
+
+def _get_ocr_pool(workers: int) -> ProcessPoolExecutor:
+    global _OCR_POOL, _OCR_POOL_WORKERS
+    if _OCR_POOL is None or _OCR_POOL_WORKERS != workers:
+        shutdown_ocr_pool()
+        _OCR_POOL = ProcessPoolExecutor(max_workers=workers)
+        _OCR_POOL_WORKERS = workers
+    return _OCR_POOL
+
+
+def shutdown_ocr_pool():
+    """Beendet den gemeinsamen OCR-Pool (auch automatisch beim Programmende)"""
+    global _OCR_POOL, _OCR_POOL_WORKERS
+    if _OCR_POOL is not None:
+        _OCR_POOL.shutdown(wait=True)
+        _OCR_POOL = None
+        _OCR_POOL_WORKERS = 0
+
+
+atexit.register(shutdown_ocr_pool)
+
+
 @dataclass
 class PayrollEntry:
     """Datenklasse für Gehaltsabrechnungs-Einträge"""
@@ -67,13 +132,18 @@ class _ConsoleEncodingSafeFilter(logging.Filter):
 class SalaryImportTool:
     """Optimiertes Import-Tool für Gehaltsabrechnungen"""
     
-    def __init__(self, salaries_db_path: Path, drivers_db_path: Path):
+    def __init__(self, salaries_db_path: Path, drivers_db_path: Path, ocr_workers: Optional[int] = None):
         self.salaries_db_path = salaries_db_path
         self.drivers_db_path = drivers_db_path
+        # OCR-Prozesse (None = Anzahl CPU-Kerne, 1 = seitenweise im eigenen Prozess)
+        self.ocr_workers = ocr_workers or os.cpu_count() or 1
         # Map von normalisierten Token-Tuples -> (driver_id, kanonischer_name)
         self.driver_cache: Dict[tuple, tuple] = {}
         # Zusätzliche Map für schnellen Lookup: driver_id -> kanonischer_name
         self.driver_id_to_name: Dict[int, str] = {}
+        # Gemeinsamer Batch-Matcher (wird bei Änderungen am Fahrer-Cache neu aufgebaut)
+        self._name_matcher: Optional[BatchFuzzyMatcher] = None
+        self._matcher_driver_ids: List[int] = []
         
         # Logging für das Tool zuerst einrichten
         self.setup_logging()
@@ -122,24 +192,26 @@ class SalaryImportTool:
     def load_driver_cache(self):
         """Lädt alle Fahrer in den Cache für schnelleres Matching"""
         try:
-            conn = sqlite3.connect(str(self.drivers_db_path))
-            cursor = conn.cursor()
-            cursor.execute("SELECT driver_id, first_name, last_name FROM drivers")
-            drivers = cursor.fetchall()
+            conn = connect(self.drivers_db_path)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT driver_id, first_name, last_name FROM drivers")
+                drivers = cursor.fetchall()
             
-            # Cache zurücksetzen
-            self.driver_cache.clear()
-            self.driver_id_to_name.clear()
-
-            for driver_id, first_name, last_name in drivers:
-                # Kanonischer Name aus Stammdaten
-                canonical_name = f"{first_name or ''} {last_name or ''}".strip()
-                # Normalisierte Namen als Schlüssel
-                normalized_name = self.normalize_name(canonical_name)
-                self.driver_cache[tuple(normalized_name)] = (driver_id, canonical_name)
-                self.driver_id_to_name[int(driver_id)] = canonical_name
-                
-            conn.close()
+                # Cache zurücksetzen
+                self.driver_cache.clear()
+                self.driver_id_to_name.clear()
+                self._name_matcher = None
+
+                for driver_id, first_name, last_name in drivers:
+                    # Kanonischer Name aus Stammdaten
+                    canonical_name = f"{first_name or ''} {last_name or ''}".strip()
+                    # Normalisierte Namen als Schlüssel
+                    normalized_name = self.normalize_name(canonical_name)
+                    self.driver_cache[tuple(normalized_name)] = (driver_id, canonical_name)
+                    self.driver_id_to_name[int(driver_id)] = canonical_name
+            finally:
+                conn.close()
             self.logger.info(f"✅ {len(drivers)} Fahrer in Cache geladen")
         except Exception as e:
             self.logger.error(f"❌ Fehler beim Laden des Fahrer-Caches: {e}")
@@ -163,168 +235,154 @@ class SalaryImportTool:
                 variants.add('el' + tokens[i + 1])
         return variants
 
+    def _get_name_matcher(self) -> BatchFuzzyMatcher:
+        """Gemeinsamer Batch-Matcher über alle Stammdaten-Namen (lazy, wird bei Cache-Änderung neu gebaut)."""
+        if self._name_matcher is None:
+            self._matcher_driver_ids = list(self.driver_id_to_name.keys())
+            self._name_matcher = BatchFuzzyMatcher(
+                [self.driver_id_to_name[did] for did in self._matcher_driver_ids],
+                ocr_correction=True,
+                merge_pairs=True,
+            )
+        return self._name_matcher
+
     def match_driver_optimized(self, dienstnehmer: str) -> Tuple[Optional[int], Optional[str]]:
         """Fuzzy-Fahrermatching analog zum Umsatzmatching. Liefert (driver_id, kanonischer_name)."""
         if not dienstnehmer or not dienstnehmer.strip():
             return None, None
+        return self.match_drivers_batch([dienstnehmer])[0]
+
+    def match_drivers_batch(self, names: List[str]) -> List[Tuple[Optional[int], Optional[str]]]:
+        """Matcht alle Dienstnehmer-Namen in einem Schritt gegen die Fahrerliste (N×M-Scoring)."""
+        results: List[Tuple[Optional[int], Optional[str]]] = [(None, None)] * len(names)
+        if not names or not self.driver_id_to_name:
+            return results
+        matcher = self._get_name_matcher()
+        mats = matcher.score(names)
+        score, coverage = mats["score"], mats["coverage"]
+        cand_tokens_all = [t.split() for t in matcher.targets_clean]
+
+        for i, search_clean in enumerate(mats["search_clean"]):
+            search_tokens = search_clean.split()
+            if not search_tokens:
+                continue
 
-        def clean_name(name: str) -> str:
-            s = str(name).lower()
-            # Sonderfälle/Normalisierung
-            s = s.replace('-', ' ').replace('_', ' ')
-            # Nicht-Buchstaben entfernen
-            s = re.sub(r"[^a-zäöüß\s]", " ", s)
-            # Mehrfach-Leerzeichen reduzieren
-            s = re.sub(r"\s+", " ", s)
-            # arabische Präfixe normalisieren
-            s = re.sub(r"\bal\s+", "el ", s)
-            # OCR-Korrektur: 'ei' als separates Token als 'el' interpretieren
-            s = re.sub(r"\bei\b", "el", s)
-            return s.strip()
-
-        def levenshtein_distance(s1: str, s2: str) -> int:
-            if len(s1) < len(s2):
-                return levenshtein_distance(s2, s1)
-            if len(s2) == 0:
-                return len(s1)
-            previous_row = list(range(len(s2) + 1))
-            for i, c1 in enumerate(s1):
-                current_row = [i + 1]
-                for j, c2 in enumerate(s2):
-                    insertions = previous_row[j + 1] + 1
-                    deletions = current_row[j] + 1
-                    substitutions = previous_row[j] + (c1 != c2)
-                    current_row.append(min(insertions, deletions, substitutions))
-                previous_row = current_row
-            return previous_row[-1]
-
-        def fuzzy_match_score(search_name: str, target_name: str, max_distance: int = 3) -> float:
-            if not search_name or not target_name:
-                return 0.0
-            if search_name == target_name:
-                return 100.0
-            search_tokens = clean_name(search_name).split()
-            target_tokens = clean_name(target_name).split()
-            def extend_el(tokens):
-                ext = tokens.copy()
-                for i, token in enumerate(tokens):
-                    if token == 'el' and i + 1 < len(tokens):
-                        ext.append('el' + tokens[i + 1])
-                # Neu: Paarweise Merges zur Erkennung von Splits ("ah"+"madeey"→"ahmadeey")
-                for i in range(len(tokens) - 1):
-                    ext.append(tokens[i] + tokens[i + 1])
-                return ext
-            s_ext = extend_el(search_tokens)
-            t_ext = extend_el(target_tokens)
-            set_s, set_t = set(s_ext), set(t_ext)
-            inter = set_s & set_t
-            union = set_s | set_t
-            inter_size = len(inter)
-            if inter_size == 0 and levenshtein_distance(search_name, target_name) > max_distance:
-                return 0.0
-            dice = (2 * inter_size) / max(1, (len(set_s) + len(set_t)))
-            jaccard = inter_size / max(1, len(union))
-            coverage = inter_size / max(1, len(set_s))
-            order_bonus = 0.0
-            if search_tokens and target_tokens and search_tokens[0] == target_tokens[0]:
-                order_bonus += 8.0
-            if search_tokens and target_tokens and search_tokens[-1] == target_tokens[-1]:
-                order_bonus += 8.0
-            prefix_bonus = 0.0
-            for st in search_tokens:
-                if any(tt.startswith(st) or st.startswith(tt) for tt in target_tokens):
-                    prefix_bonus += 2.0
-            prefix_bonus = min(prefix_bonus, 8.0)
-            arabic_bonus = 0.0
-            if any(t == 'el' or t.startswith('el') for t in search_tokens) and any(t == 'el' or t.startswith('el') for t in target_tokens):
-                arabic_bonus = 20.0
-            dist = levenshtein_distance(search_name, target_name)
-            max_len = max(len(search_name), len(target_name))
-            norm_dist = (dist / max_len) if max_len else 1.0
-            distance_score = max(0.0, 100.0 - (norm_dist * 100.0)) / 100.0
-            base = (0.55 * dice + 0.20 * coverage + 0.10 * jaccard + 0.15 * distance_score) * 100.0
-            return float(max(0.0, min(100.0, base + order_bonus + prefix_bonus + arabic_bonus)))
-
-        search_clean = clean_name(dienstnehmer)
-        search_tokens = search_clean.split()
-        if not search_tokens:
-            return None, None
-
-        best = None  # (score, coverage, driver_id, canonical_name)
-        for driver_id, canonical_name in self.driver_id_to_name.items():
-            cand_clean = clean_name(canonical_name)
-            score = fuzzy_match_score(search_clean, cand_clean, max_distance=3)
-            cand_tokens = cand_clean.split()
-            inter = len(set(search_tokens) & set(cand_tokens))
-            coverage = inter / max(1, len(set(search_tokens)))
-            order_ok = False
-            if cand_tokens:
-                if search_tokens[0:1] == cand_tokens[0:1]:
-                    order_ok = True
-                if search_tokens[-1:] == cand_tokens[-1:]:
+            best = None  # (score, coverage, driver_id, canonical_name)
+            # Nur Kandidaten oberhalb der Score-Schwelle im Detail prüfen
+            for j in np.flatnonzero(score[i] >= MIN_SCORE):
+                cand_clean = matcher.targets_clean[j]
+                cand_tokens = cand_tokens_all[j]
+                cand_score = float(score[i, j])
+                cand_coverage = float(coverage[i, j])
+                order_ok = bool(cand_tokens) and (
+                    search_tokens[0:1] == cand_tokens[0:1] or search_tokens[-1:] == cand_tokens[-1:]
+                )
+                if search_clean and search_clean in cand_clean:
                     order_ok = True
-            if search_clean and search_clean in cand_clean:
-                order_ok = True
-            # Schwellen aus dem Umsatzmatching
-            order_ok_relaxed = (
-                order_ok
-                or sorted(search_tokens) == sorted(cand_tokens)
-                or (coverage >= 0.67 and len(search_tokens) >= 2)
-            )
-            # Zusätzliche Akzeptanz: Wenn genau eine benachbarte Token-Zusammenziehung der Such-Tokens
-            # eine tokenweise Übereinstimmung mit den Kandidaten ergibt (Reihenfolge egal)
-            merge_ok = False
-            merge_coverage_ok = False
-            if len(search_tokens) >= 2:
-                cand_set = set(cand_tokens)
-                for i in range(len(search_tokens) - 1):
-                    merged = search_tokens[:i] + [search_tokens[i] + search_tokens[i + 1]] + search_tokens[i + 2:]
-                    merged_set = set(merged)
-                    if merged_set == cand_set:
-                        merge_ok = True
-                        merge_coverage_ok = True
-                        break
-                    inter2 = len(merged_set & set(cand_tokens))
-                    cov2 = inter2 / max(1, len(merged_set))
-                    if cov2 >= 0.5:
-                        merge_coverage_ok = True
-                
-            if score >= 65 and ((coverage >= 0.5) or merge_coverage_ok) and (order_ok_relaxed or merge_ok):
-                if best is None or score > best[0] or (score == best[0] and coverage > best[1]):
-                    best = (score, coverage, driver_id, canonical_name)
-        if best is not None:
-            return best[2], best[3]
-        # Fallback: eindeutige Token-Set-Gleichheit (z. B. 'Ahmed Osama' ↔ 'Osama Ahmed')
-        search_tokens_set = set(search_tokens)
-        equal_set_candidates: List[Tuple[int, str]] = []
-        for driver_id, canonical_name in self.driver_id_to_name.items():
-            cand_tokens = clean_name(canonical_name).split()
-            if set(cand_tokens) == search_tokens_set and len(cand_tokens) == len(search_tokens):
-                equal_set_candidates.append((driver_id, canonical_name))
-        if len(equal_set_candidates) == 1:
-            did, cname = equal_set_candidates[0]
-            return did, cname
-        return None, None
+                # Schwellen aus dem Umsatzmatching
+                order_ok_relaxed = (
+                    order_ok
+                    or sorted(search_tokens) == sorted(cand_tokens)
+                    or (cand_coverage >= 0.67 and len(search_tokens) >= 2)
+                )
+                # Zusätzliche Akzeptanz: Wenn genau eine benachbarte Token-Zusammenziehung der Such-Tokens
+                # eine tokenweise Übereinstimmung mit den Kandidaten ergibt (Reihenfolge egal)
+                merge_ok = False
+                merge_coverage_ok = False
+                if len(search_tokens) >= 2:
+                    cand_set = set(cand_tokens)
+                    for k in range(len(search_tokens) - 1):
+                        merged = search_tokens[:k] + [search_tokens[k] + search_tokens[k + 1]] + search_tokens[k + 2:]
+                        merged_set = set(merged)
+                        if merged_set == cand_set:
+                            merge_ok = True
+                            merge_coverage_ok = True
+                            break
+                        cov2 = len(merged_set & cand_set) / max(1, len(merged_set))
+                        if cov2 >= MIN_COVERAGE:
+                            merge_coverage_ok = True
+
+                if (cand_coverage >= MIN_COVERAGE or merge_coverage_ok) and (order_ok_relaxed or merge_ok):
+                    if best is None or cand_score > best[0] or (cand_score == best[0] and cand_coverage > best[1]):
+                        driver_id = self._matcher_driver_ids[j]
+                        best = (cand_score, cand_coverage, driver_id, matcher.targets[j])
+            if best is not None:
+                results[i] = (best[2], best[3])
+                continue
+
+            # Fallback: eindeutige Token-Set-Gleichheit (z. B. 'Ahmed Osama' ↔ 'Osama Ahmed')
+            search_tokens_set = set(search_tokens)
+            equal_set_candidates = [
+                j for j, cand_tokens in enumerate(cand_tokens_all)
+                if set(cand_tokens) == search_tokens_set and len(cand_tokens) == len(search_tokens)
+            ]
+            if len(equal_set_candidates) == 1:
+                j = equal_set_candidates[0]
+                results[i] = (self._matcher_driver_ids[j], matcher.targets[j])
+        return results
     
     def extract_text_optimized(self, image) -> str:
-        """Optimierte Textextraktion mit Fallback-Strategien"""
-        # Erste OCR-Versuche mit verschiedenen PSM-Modi
-        psm_modes = [6, 11, 8, 13]  # Verschiedene OCR-Modi für bessere Ergebnisse
-        
-        for psm in psm_modes:
-            try:
-                text = pytesseract.image_to_string(
-                    image, 
-                    lang='deu', 
-                    config=f'--psm {psm} --oem 3'
-                )
+        """Optimierte Textextraktion mit Fallback-Strategien (verschiedene PSM-Modi)"""
+        return ocr_image_text(image)
+
+    def ocr_pages(self, pdf_path: Path, page_numbers: List[int]) -> Dict[int, str]:
+        """OCR nur für die angegebenen Seiten, jeweils eine Seite pro Worker gerastert.
+
+        Ergebnis in Seitenreihenfolge; pro Worker liegt höchstens ein Seitenbild im Speicher.
+        Ohne Pool (oder bei ocr_workers=1) wird Seite für Seite im eigenen Prozess gelesen.
+        Bereits gelesene Seiten derselben PDF kommen aus dem OCR-Cache.
+        """
+        page_numbers = sorted(set(page_numbers))
+        if not page_numbers:
+            return {}
+
+        texts: Dict[int, str] = {}
+        cache = get_ocr_cache()
+        try:
+            digest = file_sha256(pdf_path)
+        except OSError as e:
+            self.logger.warning(f"OCR-Cache nicht nutzbar: {e}")
+            digest = None
+        if digest:
+            for page_number in page_numbers:
+                text = cache.get(digest, page_number, OCR_DPI, OCR_CACHE_CONFIG)
+                if text is not None:
+                    texts[page_number] = text
+            if texts:
+                self.logger.info(f"💾 {len(texts)} Seite(n) aus dem OCR-Cache")
+            page_numbers = [p for p in page_numbers if p not in texts]
+        if not page_numbers:
+            return dict(sorted(texts.items()))
+
+        ocr_texts = self._ocr_uncached_pages(pdf_path, page_numbers)
+        if digest:
+            for page_number, text in ocr_texts.items():
                 if text.strip():
-                    return text
+                    cache.put(digest, page_number, OCR_DPI, OCR_CACHE_CONFIG, text)
+        texts.update(ocr_texts)
+        return dict(sorted(texts.items()))
+
+    def _ocr_uncached_pages(self, pdf_path: Path, page_numbers: List[int]) -> Dict[int, str]:
+        workers = min(self.ocr_workers, len(page_numbers))
+        self.logger.info(f"🔎 OCR für {len(page_numbers)} Seite(n) mit {workers} Prozess(en)")
+
+        if workers > 1:
+            try:
+                pool = _get_ocr_pool(self.ocr_workers)
+                results = pool.map(ocr_pdf_page, [str(pdf_path)] * len(page_numbers), page_numbers)
+                return dict(results)
             except Exception as e:
-                self.logger.warning(f"OCR-Fehler mit PSM {psm}: {e}")
-                continue
-        
-        return ""
+                self.logger.warning(f"OCR-Pool nicht verfügbar, OCR seitenweise im Prozess: {e}")
+                shutdown_ocr_pool()
+
+        return dict(ocr_pdf_page(str(pdf_path), page_number) for page_number in page_numbers)
+
+    def _pdf_page_count(self, pdf_path: Path) -> int:
+        try:
+            return int(pdfinfo_from_path(str(pdf_path), poppler_path=POPPLER_PATH)["Pages"])
+        except Exception as e:
+            self.logger.error(f"Seitenzahl nicht lesbar: {e}")
+            return 0
     
     def extract_payroll_data(self, text: str, page_number: int) -> List[PayrollEntry]:
         """Optimierte Extraktion von Gehaltsdaten mit verbesserten Regex-Mustern"""
@@ -408,8 +466,11 @@ class SalaryImportTool:
     
     def process_single_page(self, image, page_number: int) -> List[PayrollEntry]:
         """Verarbeitet eine einzelne PDF-Seite"""
+        return self.process_page_text(self.extract_text_optimized(image), page_number)
+
+    def process_page_text(self, text: str, page_number: int) -> List[PayrollEntry]:
+        """Extrahiert die Einträge aus dem OCR-Text einer Seite"""
         try:
-            text = self.extract_text_optimized(image)
             if not text.strip():
                 self.logger.warning(f"Kein Text auf Seite {page_number} extrahiert")
                 return []
@@ -548,6 +609,26 @@ class SalaryImportTool:
     
     def import_single_pdf(self, pdf_path: Path) -> Dict[str, any]:
         """Importiert eine einzelne PDF-Datei mit schnellem pdfplumber-first Ansatz und gibt Ergebnisse zurück"""
+        extracted = self.extract_payroll(pdf_path)
+        if not extracted["success"]:
+            return extracted
+        return self.save_extracted(extracted)
+
+    def save_extracted(self, extracted: Dict[str, any]) -> Dict[str, any]:
+        """Schreibt das Ergebnis von extract_payroll in salaries.db (Fahrerzuordnung inklusive)"""
+        all_entries = extracted["entries"]
+        result = self.save_to_database(all_entries, extracted["table_name"])
+        return {
+            "success": True,
+            "table_name": extracted["table_name"],
+            "imported_count": result,
+            "total_entries": len(all_entries),
+            "month": extracted["month"],
+            "year": extracted["year"]
+        }
+
+    def extract_payroll(self, pdf_path: Path) -> Dict[str, any]:
+        """Liest die Einträge einer Abrechnungs-PDF ohne Datenbank-Schreibzugriff (pdfplumber, OCR nur bei Bedarf)"""
         self.logger.info(f"🔍 Verarbeite Datei: {pdf_path}")
 
         match = re.search(r'Abrechnungen?\s+(\d{2})_(\d{4})', pdf_path.name, re.IGNORECASE)
@@ -574,23 +655,17 @@ class SalaryImportTool:
             if dnnr_p and not doc_dnnr_default:
                 doc_dnnr_default = dnnr_p
 
-        # 2) Bilder nur für Seiten ohne brauchbaren Text
-        images = []
-        try:
-            if any(not (plumber_texts.get(i, "").strip()) for i in range(1, (len(plumber_texts) or 0) + 1)):
-                images = convert_from_path(str(pdf_path), dpi=300, poppler_path=POPPLER_PATH)
-        except Exception as e:
-            # Fallback: komplette OCR
-            images = convert_from_path(str(pdf_path), dpi=300, poppler_path=POPPLER_PATH)
+        # 2) OCR nur für Seiten ohne brauchbaren Text (seitenparallel)
+        num_pages = len(plumber_texts)
+        ocr_texts = self.ocr_pages(
+            pdf_path, [i for i in range(1, num_pages + 1) if not plumber_texts.get(i, "").strip()]
+        )
 
         all_entries: List[PayrollEntry] = []
-        num_pages = max(len(plumber_texts), len(images)) or 0
         for i in range(1, num_pages + 1):
             text = plumber_texts.get(i, "")
-            if not text.strip() and images:
-                img = images[i - 1] if i - 1 < len(images) else None
-                if img is not None:
-                    text = self.extract_text_optimized(img)
+            if not text.strip():
+                text = ocr_texts.get(i, "")
             if not text.strip():
                 continue
 
@@ -660,23 +735,21 @@ class SalaryImportTool:
 
             all_entries.extend(entries)
 
-        # Falls der schnelle Pfad nichts geliefert hat: Fallback auf alten OCR-Flow
+        # Falls der schnelle Pfad nichts geliefert hat: Fallback auf OCR aller Seiten
         if not all_entries:
-            try:
-                images = convert_from_path(str(pdf_path), dpi=300, poppler_path=POPPLER_PATH)
-            except Exception as e:
-                self.logger.error(f"Fehler beim Konvertieren der PDF (Fallback): {e}")
-                return {"success": False, "error": f"PDF-Konvertierung fehlgeschlagen: {e}", "imported_count": 0}
-            for i, img in enumerate(images):
-                entries = self.process_single_page(img, i + 1)
-                all_entries.extend(entries)
+            page_count = self._pdf_page_count(pdf_path)
+            if not page_count:
+                return {"success": False, "error": "PDF-Konvertierung fehlgeschlagen", "imported_count": 0}
+            # Bereits per OCR gelesene Seiten nicht erneut rastern
+            missing = [i for i in range(1, page_count + 1) if i not in ocr_texts]
+            ocr_texts.update(self.ocr_pages(pdf_path, missing))
+            for i in range(1, page_count + 1):
+                all_entries.extend(self.process_page_text(ocr_texts.get(i, ""), i))
 
-        result = self.save_to_database(all_entries, table_name)
         return {
             "success": True,
             "table_name": table_name,
-            "imported_count": result,
-            "total_entries": len(all_entries),
+            "entries": all_entries,
             "month": month,
             "year": year
         }
@@ -685,61 +758,63 @@ class SalaryImportTool:
         """Erstellt einen neuen Fahrer in der drivers-Tabelle und gibt die driver_id zurück"""
         try:
             # Verbindung zur Fahrerdatenbank
-            conn = sqlite3.connect(str(self.drivers_db_path))
-            cursor = conn.cursor()
+            conn = connect(self.drivers_db_path)
+            try:
+                cursor = conn.cursor()
             
-            # Namen in Vor- und Nachname aufteilen (arabische Namen korrekt behandeln)
-            name_parts = dienstnehmer.strip().split()
-            if len(name_parts) >= 2:
-                # Bei arabischen Namen ist oft der letzte Teil der Vorname
-                # Prüfe auf arabische Präfixe wie "El-", "Al-", "Abd-", etc.
-                if any(part.startswith(('El-', 'Al-', 'Abd-', 'Abu-', 'Ibn-')) for part in name_parts):
-                    # Bei arabischen Namen: Letzter Teil = Vorname, Rest = Nachname
-                    first_name = name_parts[-1]
-                    last_name = ' '.join(name_parts[:-1])
+                # Namen in Vor- und Nachname aufteilen (arabische Namen korrekt behandeln)
+                name_parts = dienstnehmer.strip().split()
+                if len(name_parts) >= 2:
+                    # Bei arabischen Namen ist oft der letzte Teil der Vorname
+                    # Prüfe auf arabische Präfixe wie "El-", "Al-", "Abd-", etc.
+                    if any(part.startswith(('El-', 'Al-', 'Abd-', 'Abu-', 'Ibn-')) for part in name_parts):
+                        # Bei arabischen Namen: Letzter Teil = Vorname, Rest = Nachname
+                        first_name = name_parts[-1]
+                        last_name = ' '.join(name_parts[:-1])
+                    else:
+                        # Standard: Erster Teil = Vorname, Rest = Nachname
+                        first_name = name_parts[0]
+                        last_name = ' '.join(name_parts[1:])
                 else:
-                    # Standard: Erster Teil = Vorname, Rest = Nachname
-                    first_name = name_parts[0]
-                    last_name = ' '.join(name_parts[1:])
-            else:
-                first_name = dienstnehmer.strip()
-                last_name = ""
+                    first_name = dienstnehmer.strip()
+                    last_name = ""
             
-            # driver_id aus dn_nr ableiten (falls verfügbar)
-            driver_id = None
-            if dn_nr and dn_nr.strip().isdigit():
-                driver_id = int(dn_nr.strip())
+                # driver_id aus dn_nr ableiten (falls verfügbar)
+                driver_id = None
+                if dn_nr and dn_nr.strip().isdigit():
+                    driver_id = int(dn_nr.strip())
             
-            # Prüfen ob Fahrer mit dieser driver_id bereits existiert
-            if driver_id:
-                cursor.execute("SELECT driver_id FROM drivers WHERE driver_id = ?", (driver_id,))
-                if cursor.fetchone():
-                    self.logger.info(f"⚠️ Fahrer mit driver_id {driver_id} existiert bereits")
-                    conn.close()
-                    return driver_id
+                # Prüfen ob Fahrer mit dieser driver_id bereits existiert
+                if driver_id:
+                    cursor.execute("SELECT driver_id FROM drivers WHERE driver_id = ?", (driver_id,))
+                    if cursor.fetchone():
+                        self.logger.info(f"⚠️ Fahrer mit driver_id {driver_id} existiert bereits")
+                        return driver_id
             
-            # Neuen Fahrer einfügen
-            if driver_id:
-                # Mit spezifischer driver_id (aus dn_nr)
-                cursor.execute("""
-                    INSERT INTO drivers (driver_id, driver_license_number, first_name, last_name, status)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (driver_id, f"DN{dn_nr}", first_name, last_name, "active"))
-                new_driver_id = driver_id
-            else:
-                # Ohne spezifische driver_id (Auto-Increment)
-                cursor.execute("""
-                    INSERT INTO drivers (driver_license_number, first_name, last_name, status)
-                    VALUES (?, ?, ?, ?)
-                """, (f"DN_{first_name}_{last_name}", first_name, last_name, "active"))
-                new_driver_id = cursor.lastrowid
+                # Neuen Fahrer einfügen
+                if driver_id:
+                    # Mit spezifischer driver_id (aus dn_nr)
+                    cursor.execute("""
+                        INSERT INTO drivers (driver_id, driver_license_number, first_name, last_name, status)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, (driver_id, f"DN{dn_nr}", first_name, last_name, "active"))
+                    new_driver_id = driver_id
+                else:
+                    # Ohne spezifische driver_id (Auto-Increment)
+                    cursor.execute("""
+                        INSERT INTO drivers (driver_license_number, first_name, last_name, status)
+                        VALUES (?, ?, ?, ?)
+                    """, (f"DN_{first_name}_{last_name}", first_name, last_name, "active"))
+                    new_driver_id = cursor.lastrowid
             
-            conn.commit()
-            conn.close()
+                conn.commit()
+            finally:
+                conn.close()
             
             # Cache aktualisieren
             canonical_name = f"{first_name} {last_name}".strip()
             self.driver_id_to_name[new_driver_id] = canonical_name
+            self._name_matcher = None
             
             self.logger.info(f"🆕 Neuer Fahrer angelegt: {canonical_name} (ID: {new_driver_id}, DN-Nr: {dn_nr})")
             return new_driver_id
@@ -751,59 +826,67 @@ class SalaryImportTool:
     def save_to_database(self, entries: List[PayrollEntry], table_name: str) -> int:
         """Speichert Einträge in der Datenbank und legt neue Fahrer automatisch an"""
         try:
-            conn = sqlite3.connect(str(self.salaries_db_path))
-            cursor = conn.cursor()
+            conn = connect(self.salaries_db_path)
+            try:
+                cursor = conn.cursor()
             
-            # Tabelle anlegen
-            cursor.execute(f'''CREATE TABLE IF NOT EXISTS "{table_name}" (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                driver_id INTEGER,
-                dienstnehmer TEXT,
-                dn_nr TEXT,
-                brutto REAL,
-                zahlbetrag REAL,
-                page_number INTEGER,
-                confidence REAL,
-                import_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )''')
+                # Tabelle anlegen
+                cursor.execute(f'''CREATE TABLE IF NOT EXISTS "{table_name}" (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    driver_id INTEGER,
+                    dienstnehmer TEXT,
+                    dn_nr TEXT,
+                    brutto REAL,
+                    zahlbetrag REAL,
+                    page_number INTEGER,
+                    confidence REAL,
+                    import_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )''')
             
-            # Einträge einfügen
-            inserted_count = 0
-            new_drivers_created = 0
+                # Einträge einfügen
+                inserted_count = 0
+                new_drivers_created = 0
+                # Fuzzy-Matching für alle Einträge in einem Batch vorberechnen
+                batch_matches = self.match_drivers_batch([entry.dienstnehmer for entry in entries])
             
-            for entry in entries:
-                # 1) DN-Nr.-basierte Zuordnung (falls verfügbar)
-                matched_driver_id = None
-                matched_name = None
-                dn = str(entry.dn_nr or '').strip()
-                if dn.isdigit():
-                    dn_int = int(dn)
-                    if dn_int in self.driver_id_to_name:
-                        matched_driver_id = dn_int
-                        matched_name = self.driver_id_to_name[dn_int]
+                for idx, entry in enumerate(entries):
+                    # 1) DN-Nr.-basierte Zuordnung (falls verfügbar)
+                    matched_driver_id = None
+                    matched_name = None
+                    dn = str(entry.dn_nr or '').strip()
+                    if dn.isdigit():
+                        dn_int = int(dn)
+                        if dn_int in self.driver_id_to_name:
+                            matched_driver_id = dn_int
+                            matched_name = self.driver_id_to_name[dn_int]
                 
-                # 2) Fuzzy-Matching nur wenn noch nichts gefunden
-                if matched_driver_id is None:
-                    matched_driver_id, matched_name = self.match_driver_optimized(entry.dienstnehmer)
+                    # 2) Fuzzy-Matching nur wenn noch nichts gefunden
+                    # (nach neu angelegten Fahrern neu matchen, damit Dubletten erkannt werden)
+                    if matched_driver_id is None:
+                        if new_drivers_created:
+                            matched_driver_id, matched_name = self.match_driver_optimized(entry.dienstnehmer)
+                        else:
+                            matched_driver_id, matched_name = batch_matches[idx]
                 
-                # 3) Wenn kein Match gefunden, neuen Fahrer anlegen
-                if matched_driver_id is None and entry.dienstnehmer.strip():
-                    matched_driver_id = self.create_new_driver(entry.dienstnehmer, entry.dn_nr)
-                    if matched_driver_id:
-                        new_drivers_created += 1
-                        matched_name = entry.dienstnehmer
+                    # 3) Wenn kein Match gefunden, neuen Fahrer anlegen
+                    if matched_driver_id is None and entry.dienstnehmer.strip():
+                        matched_driver_id = self.create_new_driver(entry.dienstnehmer, entry.dn_nr)
+                        if matched_driver_id:
+                            new_drivers_created += 1
+                            matched_name = entry.dienstnehmer
                 
-                stored_dienstnehmer = matched_name if matched_name else entry.dienstnehmer
-
-                cursor.execute(f'''INSERT INTO "{table_name}" 
-                    (driver_id, dienstnehmer, dn_nr, brutto, zahlbetrag, page_number, confidence) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?)''',
-                    (matched_driver_id, stored_dienstnehmer, entry.dn_nr, entry.brutto,
-                     entry.zahlbetrag, entry.page_number, entry.confidence))
-                inserted_count += 1
+                    stored_dienstnehmer = matched_name if matched_name else entry.dienstnehmer
+
+                    cursor.execute(f'''INSERT INTO "{table_name}" 
+                        (driver_id, dienstnehmer, dn_nr, brutto, zahlbetrag, page_number, confidence) 
+                        VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                        (matched_driver_id, stored_dienstnehmer, entry.dn_nr, entry.brutto,
+                         entry.zahlbetrag, entry.page_number, entry.confidence))
+                    inserted_count += 1
             
-            conn.commit()
-            conn.close()
+                conn.commit()
+            finally:
+                conn.close()
             
             if new_drivers_created > 0:
                 self.logger.info(f"✅ {inserted_count} Einträge in Tabelle {table_name} gespeichert, {new_drivers_created} neue Fahrer angelegt")
@@ -818,21 +901,22 @@ class SalaryImportTool:
     def get_import_status(self) -> Dict[str, any]:
         """Gibt den aktuellen Import-Status zurück"""
         try:
-            conn = sqlite3.connect(str(self.salaries_db_path))
-            cursor = conn.cursor()
-            
-            # Alle Tabellen auflisten
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%_%'")
-            tables = cursor.fetchall()
+            conn = connect(self.salaries_db_path)
+            try:
+                cursor = conn.cursor()
             
-            # Statistiken für jede Tabelle
-            table_stats = {}
-            for (table_name,) in tables:
-                cursor.execute(f'SELECT COUNT(*) FROM "{table_name}"')
-                count = cursor.fetchone()[0]
-                table_stats[table_name] = count
+                # Alle Tabellen auflisten
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%_%'")
+                tables = cursor.fetchall()
             
-            conn.close()
+                # Statistiken für jede Tabelle
+                table_stats = {}
+                for (table_name,) in tables:
+                    cursor.execute(f'SELECT COUNT(*) FROM "{table_name}"')
+                    count = cursor.fetchone()[0]
+                    table_stats[table_name] = count
+            finally:
+                conn.close()
             
             return {
                 "total_tables": len(tables),
@@ -845,14 +929,15 @@ class SalaryImportTool:
             return {"error": str(e)}
 
 # Globale Funktionen für einfache Integration
-def create_import_tool(salaries_db_path: str = None, drivers_db_path: str = None) -> SalaryImportTool:
-    """Erstellt eine Instanz des Import-Tools mit Standard-Pfaden"""
+def create_import_tool(salaries_db_path: str = None, drivers_db_path: str = None,
+                       ocr_workers: Optional[int] = None) -> SalaryImportTool:
+    """Erstellt eine Instanz des Import-Tools mit Standard-Pfaden (ocr_workers wie SalaryImportTool)"""
     if salaries_db_path is None:
         salaries_db_path = Path(__file__).parent / "SQL" / "salaries.db"
     if drivers_db_path is None:
         drivers_db_path = Path(__file__).parent / "SQL" / "database.db"
     
-    return SalaryImportTool(Path(salaries_db_path), Path(drivers_db_path))
+    return SalaryImportTool(Path(salaries_db_path), Path(drivers_db_path), ocr_workers)
 
 def import_salary_pdf(pdf_path: str, salaries_db_path: str = None, drivers_db_path: str = None) -> Dict[str, any]:
     """Einfache Funktion zum Importieren einer einzelnen PDF"""
@@ -0,0 +1,169 @@
+"""
+Wochensummen der Taxi-Plattformen (40100, 31300) direkt aus SQLite.
+
+Die Abrechnung braucht je Fahrzeug und KW nur wenige Summen (gefilterter
+Umsatz, Trinkgeld, Bargeld). Statt alle Buchungen per
+'Fahrzeug LIKE %135%' (kein Index möglich) nach pandas zu laden, führt jede
+Wochentabelle die Spalte 'fahrzeug_nummer' (nur die Ziffern des Fahrzeugs)
+mit Index; die Summen entstehen in einer Aggregatabfrage:
+
+    totals = load_taxi_totals(conn, "40100", "report_KW31", vehicle_digits("W135CTX"))
+    totals.echter_umsatz, totals.restbetrag
+
+Die Einzelbuchungen werden nur noch für die Detailansicht geladen
+(load_taxi_rows).
+
+Die Spalte wird beim Import (smart_import) bzw. bei der Migration
+(platform_reports) angelegt und gefüllt. Die Lesefunktionen ändern das Schema
+nie; fehlt die Spalte noch, filtern sie über vehicle_digits(Fahrzeug) (ohne
+Index, aber mit demselben Ergebnis).
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pandas as pd
+
+from platform_reports import amount_sql
+
+VEHICLE_DIGITS_COLUMN = "fahrzeug_nummer"
+
+# Filter für Einzelumsätze wie in der Abrechnung
+MAX_UMSATZ_PRO_FAHRT = 250
+MIN_UMSATZ_PRO_FAHRT = -250
+
+# Betragsspalte je Plattform
+AMOUNT_COLUMN = {
+    "40100": "Umsatz",
+    "31300": "Gesamt",
+}
+
+
+def vehicle_digits(value) -> str:
+    """Ziffern eines Kennzeichens bzw. Fahrzeugfelds ('W135CTX' → '135')."""
+    return "".join(ch for ch in str(value or "") if ch.isdigit())
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+
+
+def ensure_vehicle_digits(conn: sqlite3.Connection, table: str) -> int:
+    """Legt fahrzeug_nummer samt Index an und füllt fehlende Werte (idempotent, nicht committet).
+
+    Nur für Import und Migration, nicht für lesende Aufrufer.
+
+    Neue Zeilen ohne Wert findet der Index über 'IS NULL', der Nachlauf kostet
+    daher nur die neuen Zeilen. Rückgabe: Anzahl gefüllter Zeilen.
+    """
+    columns = _columns(conn, table)
+    if "Fahrzeug" not in columns:
+        return 0
+    column_sql = _quote(VEHICLE_DIGITS_COLUMN)
+    if VEHICLE_DIGITS_COLUMN not in columns:
+        try:
+            conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {column_sql} TEXT")
+        except sqlite3.OperationalError:
+            # Paralleler Import/Migration hat die Spalte gerade angelegt
+            if VEHICLE_DIGITS_COLUMN not in _columns(conn, table):
+                raise
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS {_quote('idx_' + table + '_' + VEHICLE_DIGITS_COLUMN)} "
+        f"ON {_quote(table)} ({column_sql})"
+    )
+    conn.create_function("vehicle_digits", 1, vehicle_digits, deterministic=True)
+    cursor = conn.execute(
+        f"UPDATE {_quote(table)} SET {column_sql} = vehicle_digits(Fahrzeug) "
+        f"WHERE {column_sql} IS NULL AND Fahrzeug IS NOT NULL"
+    )
+    return cursor.rowcount
+
+
+@dataclass
+class TaxiTotals:
+    """Summen einer Taxi-Plattform für ein Fahrzeug in einer KW."""
+    platform: str
+    rows: int = 0
+    umsatz: float = 0.0            # Summe der Einzelumsätze zwischen -250 und 250 €
+    trinkgeld_gesamt: float = 0.0  # gesamtes Trinkgeld (wird vom Umsatz abgezogen)
+    trinkgeld: float = 0.0         # Trinkgeld gefilterter Fahrten ohne Bar-Buchung (Anzeige/Rest)
+    bargeld: float = 0.0           # 40100: Bargeld gefilterter Fahrten, 31300: Betrag der Bar-Buchungen
+
+    @property
+    def echter_umsatz(self) -> float:
+        return self.umsatz - self.trinkgeld_gesamt
+
+    @property
+    def anteil(self) -> float:
+        return self.echter_umsatz / 2
+
+    @property
+    def restbetrag(self) -> float:
+        return self.anteil - self.bargeld + self.trinkgeld
+
+
+def _digits_filter(conn: sqlite3.Connection, columns: List[str]) -> str:
+    """WHERE-Bedingung auf :digits – über den Index, für ungefüllte Zeilen berechnet."""
+    conn.create_function("vehicle_digits", 1, vehicle_digits, deterministic=True)
+    if VEHICLE_DIGITS_COLUMN not in columns:
+        return "vehicle_digits(Fahrzeug) = :digits"
+    column_sql = _quote(VEHICLE_DIGITS_COLUMN)
+    return (f"({column_sql} = :digits OR "
+            f"({column_sql} IS NULL AND vehicle_digits(Fahrzeug) = :digits))")
+
+
+def _aggregate_sql(platform: str, table: str, columns: List[str], digits_filter: str) -> str:
+    def col(name: str) -> str:
+        return _quote(name) if name in columns else "NULL"
+
+    def betrag_col(name: str) -> str:
+        # Altbestand kann Beträge noch als Text führen ('12,50'); gewandelt wird nur bei Import/Migration
+        return amount_sql(_quote(name)) if name in columns else "NULL"
+
+    betrag = betrag_col(AMOUNT_COLUMN[platform])
+    im_rahmen = f"{betrag} BETWEEN {MIN_UMSATZ_PRO_FAHRT} AND {MAX_UMSATZ_PRO_FAHRT}"
+    # instr statt LIKE: Groß-/Kleinschreibung wie bisher ('Bar' enthalten)
+    ist_bar = f"COALESCE(instr({col('Buchungsart')}, 'Bar'), 0) > 0"
+    if platform == "40100":
+        bargeld = f"SUM(CASE WHEN {im_rahmen} THEN {betrag_col('Bargeld')} END)"
+    else:
+        bargeld = f"SUM(CASE WHEN {ist_bar} THEN {betrag} END)"
+    return f"""
+        SELECT COUNT(*),
+               COALESCE(SUM(CASE WHEN {im_rahmen} THEN {betrag} END), 0),
+               COALESCE(SUM({betrag_col('Trinkgeld')}), 0),
+               COALESCE(SUM(CASE WHEN {im_rahmen} AND NOT ({ist_bar}) THEN {betrag_col('Trinkgeld')} END), 0),
+               COALESCE({bargeld}, 0)
+        FROM {_quote(table)}
+        WHERE {digits_filter}
+    """
+
+
+def load_taxi_totals(conn: sqlite3.Connection, platform: str, table: str,
+                     digits: str) -> Optional[TaxiTotals]:
+    """Wochensummen eines Fahrzeugs; None, wenn Tabelle oder Buchungen fehlen."""
+    if not digits:
+        return None
+    columns = _columns(conn, table)
+    if "Fahrzeug" not in columns:
+        return None
+    rows, umsatz, trinkgeld_gesamt, trinkgeld, bargeld = conn.execute(
+        _aggregate_sql(platform, table, columns, _digits_filter(conn, columns)), {"digits": digits}
+    ).fetchone()
+    if not rows:
+        return None
+    return TaxiTotals(platform, rows, float(umsatz), float(trinkgeld_gesamt), float(trinkgeld), float(bargeld))
+
+
+def load_taxi_rows(conn: sqlite3.Connection, table: str, digits: str) -> pd.DataFrame:
+    """Einzelbuchungen eines Fahrzeugs (nur für die Detailansicht)."""
+    digits_filter = _digits_filter(conn, _columns(conn, table))
+    return pd.read_sql_query(
+        f"SELECT * FROM {_quote(table)} WHERE {digits_filter} ORDER BY rowid",
+        conn, params={"digits": digits},
+    )
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test für den Warm-Start-Cache der Abrechnung
+Prüft Treffer, das gezielte Verwerfen bei Import in dieselbe Woche bzw.
+Deal-Änderung, die Grenzen für Anzahl und Speicher sowie das Vorladen der
+Nachbarwochen
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import pandas as pd
+
+from billing_cache import EvaluationCache, EvaluationPrefetcher, adjacent_weeks, cache_key
+
+
+class TestBillingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sql_dir = self.tmp.name
+        conn = sqlite3.connect(os.path.join(self.sql_dir, "40100.sqlite"))
+        for kw in (12, 13):
+            conn.execute(f'CREATE TABLE "report_KW{kw}" (Fahrzeug TEXT, Umsatz REAL)')
+            conn.execute(f'INSERT INTO "report_KW{kw}" VALUES (?, ?)', ("W135CTX", 50.0))
+        conn.commit()
+        conn.close()
+        conn = sqlite3.connect(os.path.join(self.sql_dir, "database.db"))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE deals (name TEXT UNIQUE, deal TEXT, garage REAL, pauschale REAL, umsatzgrenze REAL)")
+        conn.execute("INSERT INTO deals VALUES ('Max Muster', '%', 0, 500, 1200)")
+        conn.commit()
+        conn.close()
+        self.cache = EvaluationCache(self.sql_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _schreibe(self, datei, sql, params=()):
+        conn = sqlite3.connect(os.path.join(self.sql_dir, datei))
+        conn.execute(sql, params)
+        conn.commit()
+        conn.close()
+
+    def _lade(self, fahrer="Max Muster", kw=12):
+        key = cache_key(fahrer, "W135CTX", kw)
+        snapshot = self.cache.snapshot(fahrer, kw)
+        deal = snapshot.deal_row[0] if snapshot.deal_row else None
+        return key, self.cache.put(key, snapshot, [("40100", object(), deal)], {})
+
+    def test_treffer_und_import_anderer_woche(self):
+        key, eintrag = self._lade()
+        self.assertEqual(eintrag.deal_row, ("%", 0.0, 500.0, 1200.0))
+        self.assertIs(self.cache.get(key), eintrag)
+        # Import in KW13 betrifft KW12 nicht
+        self._schreibe("40100.sqlite", 'INSERT INTO "report_KW13" VALUES (?, ?)', ("W135CTX", 10.0))
+        self.assertIs(self.cache.get(key), eintrag)
+        # Eine andere Abrechnung speichert in database.db, der Deal bleibt gleich
+        self._schreibe("database.db", "INSERT INTO deals VALUES ('Erika Muster', 'P', 0, 500, 1200)")
+        self.assertIs(self.cache.get(key), eintrag)
+        self.assertEqual((self.cache.hits, self.cache.misses), (3, 0))
+
+    def test_import_derselben_woche_verwirft(self):
+        key, _ = self._lade()
+        self._schreibe("40100.sqlite", 'INSERT INTO "report_KW12" VALUES (?, ?)', ("W135CTX", 10.0))
+        self.assertIsNone(self.cache.get(key))
+        self.assertNotIn(key, self.cache)
+
+    def test_neue_wochentabelle_verwirft(self):
+        key, _ = self._lade(kw=14)
+        self._schreibe("40100.sqlite", 'CREATE TABLE "report_KW14" (Fahrzeug TEXT, Umsatz REAL)')
+        self.assertIsNone(self.cache.get(key))
+
+    def test_deal_aenderung_verwirft(self):
+        key, _ = self._lade()
+        self._schreibe("database.db", "UPDATE deals SET pauschale = 600 WHERE name = 'Max Muster'")
+        self.assertIsNone(self.cache.get(key))
+
+    def test_grenzen_und_invalidate(self):
+        self.cache.max_entries = 2
+        keys = [self._lade(fahrer=name)[0] for name in ("A", "B", "C")]
+        self.assertEqual(len(self.cache), 2)
+        self.assertNotIn(keys[0], self.cache)           # ältester Eintrag verdrängt
+
+        self.cache.max_bytes = 50_000
+        key = cache_key("D", "W135CTX", 12)
+        gross = pd.DataFrame({"x": ["y" * 100] * 1000})
+        self.cache.put(key, self.cache.snapshot("D", 12), [("Uber", gross, None)], {})
+        self.assertNotIn(key, self.cache)               # allein größer als die Grenze
+        self.assertLessEqual(self.cache.size_bytes, 50_000)
+
+        self.assertEqual(self.cache.invalidate(kw=12), 2)
+        self.assertEqual((len(self.cache), self.cache.size_bytes), (0, 0))
+
+
+class TestEvaluationPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = EvaluationCache(self.tmp.name)
+        self.geladen = []
+        self.freigabe = threading.Event()
+        self.freigabe.set()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _loader(self, fahrer, fahrzeug, kw, deal):
+        self.freigabe.wait(5)
+        self.geladen.append(kw)
+        return [("40100", f"Summen KW{kw}", deal)], {}, []
+
+    def test_nachbarwochen(self):
+        self.assertEqual(adjacent_weeks("31"), ["32", "30"])
+        self.assertEqual(adjacent_weeks(53), ["52"])
+        self.assertEqual(adjacent_weeks("KW1"), ["2"])
+        self.assertEqual(adjacent_weeks(""), [])
+
+    def test_vorladen_und_treffer(self):
+        prefetcher = EvaluationPrefetcher(self.cache, self._loader)
+        eintrag, aus_cache = prefetcher.load("Max Muster", "W135CTX", "31")
+        self.assertFalse(aus_cache)
+        prefetcher.prefetch("Max Muster", "W135CTX", "31").join(5)
+        self.assertEqual(self.geladen, ["31", "32", "30"])
+
+        eintrag, aus_cache = prefetcher.load("Max Muster", "W135CTX", "32")
+        self.assertTrue(aus_cache)
+        self.assertEqual(eintrag.found_pages[0][1], "Summen KW32")
+        self.assertEqual(self.geladen, ["31", "32", "30"])      # keine weitere Ladearbeit
+        self.assertIsNone(prefetcher.prefetch("Max Muster", "W135CTX", "31"))  # alles schon im Cache
+
+    def test_fehlgeschlagene_quelle_wird_nicht_gecacht(self):
+        def loader(fahrer, fahrzeug, kw, deal):
+            self.geladen.append(kw)
+            return [("40100", f"Summen KW{kw}", deal)], {}, ["31300"]
+
+        prefetcher = EvaluationPrefetcher(self.cache, loader)
+        eintrag, aus_cache = prefetcher.load("Max Muster", "W135CTX", "31")
+        self.assertEqual(eintrag.found_pages[0][1], "Summen KW31")
+        self.assertEqual(len(self.cache), 0)
+        # Beim nächsten Aufruf wird erneut geladen statt das unvollständige Ergebnis zu liefern
+        eintrag, aus_cache = prefetcher.load("Max Muster", "W135CTX", "31")
+        self.assertFalse(aus_cache)
+        self.assertEqual(self.geladen, ["31", "31"])
+
+    def test_wartet_auf_laufenden_prefetch(self):
+        prefetcher = EvaluationPrefetcher(self.cache, self._loader)
+        self.freigabe.clear()
+        thread = prefetcher.prefetch("Max Muster", "W135CTX", "31", offsets=(1,))
+        threading.Timer(0.1, self.freigabe.set).start()
+        eintrag, aus_cache = prefetcher.load("Max Muster", "W135CTX", "32")
+        thread.join(5)
+        self.assertTrue(aus_cache)
+        self.assertEqual(self.geladen, ["32"])
+
+    def test_neue_auswahl_loest_ab(self):
+        prefetcher = EvaluationPrefetcher(self.cache, self._loader)
+        self.freigabe.clear()
+        erster = prefetcher.prefetch("Max Muster", "W135CTX", "31")
+        zweiter = prefetcher.prefetch("Erika Muster", "W200XX", "10", offsets=(1,))
+        self.freigabe.set()
+        erster.join(5)
+        zweiter.join(5)
+        # Vom ersten Prefetch wird höchstens die bereits begonnene Woche fertig geladen
+        self.assertNotIn("30", self.geladen)
+        self.assertIn("11", self.geladen)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test für die asynchrone Auswertung der Abrechnungsseite
+Prüft, dass bei schneller Neuauswahl nur das Ergebnis der neuesten Anfrage
+geliefert wird und Fehler als Signal ankommen
+"""
+
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from billing_evaluation import EvaluationService
+
+
+class FakePrefetcher:
+    """Liefert (kw, aus_cache=False); KW '99' schlägt fehl, Laden meldet gestartet und wartet auf freigabe."""
+
+    def __init__(self):
+        self.gestartet = threading.Event()
+        self.freigabe = threading.Event()
+        self.geladen = []
+
+    def load(self, fahrer, fahrzeug, kw):
+        self.gestartet.set()
+        self.freigabe.wait(5)
+        if kw == "99":
+            raise RuntimeError("Datenbank gesperrt")
+        self.geladen.append(kw)
+        return kw, False
+
+
+class TestEvaluationService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    def setUp(self):
+        self.prefetcher = FakePrefetcher()
+        self.service = EvaluationService(self.prefetcher)
+        self.ergebnisse = []
+        self.fehler = []
+        self.service.evaluationFinished.connect(lambda gen, entry, cached: self.ergebnisse.append((gen, entry)))
+        self.service.evaluationFailed.connect(lambda gen, message: self.fehler.append((gen, message)))
+
+    def _warte(self, bedingung, timeout_ms=3000):
+        loop = QEventLoop()
+        timer = QTimer()
+        timer.timeout.connect(lambda: loop.quit() if bedingung() else None)
+        timer.start(10)
+        QTimer.singleShot(timeout_ms, loop.quit)
+        loop.exec()
+        timer.stop()
+
+    def test_nur_neueste_anfrage(self):
+        self.service.submit("Max Muster", "W135CTX", "30")
+        # KW 30 läuft sicher (blockiert in load), bevor sie überholt wird
+        self.assertTrue(self.prefetcher.gestartet.wait(3))
+        self.service.submit("Max Muster", "W135CTX", "31")
+        neueste = self.service.submit("Max Muster", "W135CTX", "32")
+        self.prefetcher.freigabe.set()
+        self._warte(lambda: self.ergebnisse)
+        self.service._pool.waitForDone(3000)
+        QCoreApplication.processEvents()
+        self.assertEqual(self.ergebnisse, [(neueste, "32")])
+        self.assertIn("30", self.prefetcher.geladen)   # überholt, läuft aber zu Ende (Cache)
+
+    def test_fehler_als_signal(self):
+        self.prefetcher.freigabe.set()
+        generation = self.service.submit("Max Muster", "W135CTX", "99")
+        self._warte(lambda: self.fehler)
+        self.assertEqual(self.fehler, [(generation, "Datenbank gesperrt")])
+        self.assertEqual(self.ergebnisse, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test für die inkrementelle Neuberechnung der Abrechnungsformeln
+Prüft die Deal-Formeln, dass nur betroffene Knoten neu berechnet werden und
+dass unveränderte Ergebnisse nicht als Änderung gemeldet werden
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from billing_graph import build_billing_graph, tagesgarage
+
+EINGABEN = {
+    "deal": "C", "pauschale": 500.0, "umsatzgrenze": 1200.0, "gesamt_umsatz": 1500.0,
+    "taxi_umsatz": 1000.0, "uber_umsatz": 300.0, "bolt_umsatz": 200.0, "einsteiger": 100.0, "tank": 80.0,
+    "taxi_faktor": 0.5, "uber_faktor": 0.4, "bolt_faktor": 0.3, "einsteiger_faktor": 1.0, "tank_faktor": 0.5,
+    "garage_faktor": 0.5, "monthly_garage": 0.0, "kw": "12", "expenses": 20.0, "credit_card": 900.0,
+}
+
+
+class TestBillingGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = build_billing_graph()
+        self.graph.set_inputs(EINGABEN)
+
+    def test_deal_formeln(self):
+        # C: 500 + 120 + 60 + 100 - 40
+        self.assertAlmostEqual(self.graph["anteil"], 740.0)
+        self.assertAlmostEqual(self.graph["income"], 720.0)
+        self.assertAlmostEqual(self.graph["abrechnungsergebnis"], 180.0)
+
+        self.graph.set_inputs({"deal": "%"})
+        self.assertAlmostEqual(self.graph["anteil"], 800.0)          # 1500 × 0.5 + 100 × 0.5
+        self.assertAlmostEqual(self.graph["income"], 800.0 - 40.0 - 20.0)
+
+        self.graph.set_inputs({"deal": "P"})
+        self.assertAlmostEqual(self.graph["anteil"], 530.0)          # Pauschale + 10 % von 300
+        self.assertAlmostEqual(self.graph["income"], 510.0)
+
+        self.graph.set_inputs({"deal": ""})
+        self.assertAlmostEqual(self.graph["anteil"], 750.0)
+
+    def test_nur_betroffene_knoten(self):
+        vorher = self.graph.evaluations
+        changed = self.graph.set_inputs({"taxi_faktor": 0.6})
+        # taxi_anteil → c_anteil → anteil → income → abrechnungsergebnis
+        self.assertEqual(self.graph.evaluations - vorher, 5)
+        self.assertTrue({"anteil", "income", "abrechnungsergebnis"} <= changed)
+        self.assertNotIn("p_anteil", changed)
+
+        vorher = self.graph.evaluations
+        self.assertEqual(self.graph.set_inputs(dict(EINGABEN, taxi_faktor=0.6)), set())
+        self.assertEqual(self.graph.evaluations, vorher)
+
+    def test_unveraenderter_anteil_wird_nicht_gemeldet(self):
+        self.graph.set_inputs({"deal": "P"})
+        vorher = self.graph.evaluations
+        changed = self.graph.set_inputs({"uber_faktor": 0.9})
+        self.assertEqual(changed, {"uber_faktor", "uber_anteil", "c_anteil"})
+        self.assertEqual(self.graph.evaluations - vorher, 3)   # anteil selbst bleibt gleich, Income wird nicht berührt
+
+    def test_garage(self):
+        # März 2025 hat 5 Montage, KW12 beginnt am 24.03.2025
+        self.assertAlmostEqual(tagesgarage(250.0, "12", 2025), 50.0)
+        self.assertEqual(tagesgarage(0.0, "12", 2025), 0.0)
+        self.assertEqual(tagesgarage(250.0, "", 2025), 0.0)
+        self.graph.set_inputs({"monthly_garage": 250.0, "jahr": 2025})
+        self.assertAlmostEqual(self.graph["garage_abzug"], 25.0)
+        self.assertAlmostEqual(self.graph["income"], 720.0 - 25.0 - 25.0)   # C: im Anteil und im Income
+
+    def test_unbekannte_eingabe(self):
+        with self.assertRaises(KeyError):
+            self.graph.set_inputs({"anteil": 1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test für das Zahlenmodell der Abrechnung
+Prüft die Plattform-Summen, die HeadCard-Summen und das Parsen der
+Einsteiger-Eingabe
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from billing_results import BillingResult, PlatformResult, parse_betrag
+from taxi_totals import TaxiTotals
+
+
+class TestBillingResults(unittest.TestCase):
+    def _billing(self):
+        billing = BillingResult(einsteiger=parse_betrag("20,50"))
+        billing.taxi_40100.add(PlatformResult.from_taxi(TaxiTotals("40100", 3, 190.0, 17.0, 5.0, 90.0)))
+        billing.taxi_31300.add(PlatformResult.from_taxi(TaxiTotals("31300", 2, 100.0, 0.0, 0.0, 40.0)))
+        billing.uber.add(PlatformResult.from_uber(300.0, 50.0))
+        billing.bolt.add(PlatformResult.from_bolt(210.0, 10.0, 30.0))
+        return billing
+
+    def test_plattform_umsaetze(self):
+        billing = self._billing()
+        self.assertAlmostEqual(billing.umsatz("40100"), 173.0)
+        self.assertAlmostEqual(billing.umsatz("Taxi"), 273.0)   # 40100 + 31300
+        self.assertAlmostEqual(billing.umsatz("Uber"), 300.0)
+        self.assertAlmostEqual(billing.umsatz("Bolt"), 200.0)
+        self.assertAlmostEqual(billing.umsatz("Einsteiger"), 20.5)
+        self.assertEqual(billing.umsatz("Unbekannt"), 0.0)
+
+    def test_headcard_summen(self):
+        billing = self._billing()
+        self.assertAlmostEqual(billing.gesamt_umsatz, 773.0)
+        self.assertAlmostEqual(billing.trinkgeld, 15.0)
+        self.assertAlmostEqual(billing.trinkgeld_gesamt, 27.0)
+        self.assertAlmostEqual(billing.bargeld, 210.0)
+        taxi = billing.taxi
+        self.assertEqual(taxi.quellen, 2)
+        self.assertAlmostEqual(taxi.restbetrag, (173.0 / 2 - 90.0 + 5.0) + (100.0 / 2 - 40.0))
+        self.assertAlmostEqual(billing.bolt.restbetrag, 200.0 / 2 - 30.0)
+        self.assertFalse(BillingResult().uber.vorhanden)
+
+    def test_parse_betrag(self):
+        self.assertEqual(parse_betrag(""), 0.0)
+        self.assertEqual(parse_betrag(None), 0.0)
+        self.assertEqual(parse_betrag("12.50 €"), 12.5)
+        self.assertEqual(parse_betrag(7), 7.0)
+        self.assertEqual(parse_betrag("abc"), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
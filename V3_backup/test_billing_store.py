@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test für die gemeinsame Schreibverbindung der Abrechnung
+Prüft einen Commit über revenue.db, running_costs.db und database.db,
+den vollständigen Rollback, die Trigger-Spiegelung in eingebundenen Dateien,
+die Duplikat-Vorprüfung und die Wochensumme mit gespeichertem Jahr in
+derselben Transaktion
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from billing_store import REVENUE_SCHEMA, RUNNING_COSTS_SCHEMA, billing_transaction, find_revenue_conflicts, qualified
+from vehicle_ledger import (
+    REVENUE, RUNNING_COSTS, billing_year, ensure_synced, ensure_weekly_summary, prepare_vehicle_table,
+    refresh_billing_week,
+)
+
+
+class TestBillingStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sql_dir = self.tmp.name
+        conn = sqlite3.connect(os.path.join(self.sql_dir, "revenue.db"))
+        conn.execute('CREATE TABLE "W135CTX" (id INTEGER PRIMARY KEY AUTOINCREMENT, cw INTEGER, deal TEXT, '
+                     'driver TEXT, total REAL, taxed REAL, income REAL, timestamp DATETIME)')
+        ensure_synced(conn, REVENUE)
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _anzahl(self, datei, tabelle):
+        conn = sqlite3.connect(os.path.join(self.sql_dir, datei))
+        try:
+            return conn.execute(f'SELECT COUNT(*) FROM "{tabelle}"').fetchone()[0]
+        finally:
+            conn.close()
+
+    def _schreibe(self, conn):
+        conn.execute(f"INSERT INTO {qualified(REVENUE_SCHEMA, 'W135CTX')} (cw, deal, driver, total, taxed, income, timestamp) "
+                     "VALUES (12, 'P', 'Max Muster', 1000, 400, 400, '2025-03-17 12:00:00')")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {qualified(RUNNING_COSTS_SCHEMA, 'W135CTX')} "
+                     "(id INTEGER PRIMARY KEY AUTOINCREMENT, cw INTEGER, amount REAL, category TEXT, details TEXT, timestamp DATETIME)")
+        conn.executemany(f"INSERT INTO {qualified(RUNNING_COSTS_SCHEMA, 'W135CTX')} (cw, amount, category) VALUES (?, ?, ?)",
+                         [(12, 50.0, "Parking"), (12, 80.0, "Gas")])
+        conn.execute("CREATE TABLE IF NOT EXISTS deals (name TEXT UNIQUE, deal TEXT)")
+        conn.execute("INSERT INTO deals VALUES ('Max Muster', 'P')")
+
+    def test_ein_commit_fuer_alle_dateien(self):
+        with billing_transaction(self.sql_dir) as conn:
+            self._schreibe(conn)
+        self.assertEqual(self._anzahl("revenue.db", "W135CTX"), 1)
+        self.assertEqual(self._anzahl("revenue.db", REVENUE), 1)   # Trigger der eingebundenen Datei
+        self.assertEqual(self._anzahl("running_costs.db", "W135CTX"), 2)
+        self.assertEqual(self._anzahl("database.db", "deals"), 1)
+
+    def test_fehler_rollt_alles_zurueck(self):
+        with self.assertRaises(RuntimeError):
+            with billing_transaction(self.sql_dir) as conn:
+                self._schreibe(conn)
+                raise RuntimeError("Abbruch nach allen Schreibvorgängen")
+        self.assertEqual(self._anzahl("revenue.db", "W135CTX"), 0)
+        self.assertEqual(self._anzahl("revenue.db", REVENUE), 0)
+        conn = sqlite3.connect(os.path.join(self.sql_dir, "running_costs.db"))
+        tabellen = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        conn.close()
+        self.assertEqual(tabellen, [])
+
+    def test_duplikat_vorpruefung(self):
+        self.assertEqual(find_revenue_conflicts([("W135CTX", 12, "Max Muster")], self.sql_dir), {})
+        with billing_transaction(self.sql_dir) as conn:
+            self._schreibe(conn)
+
+        konflikte = find_revenue_conflicts(
+            [("W135CTX", 12, "Max Muster"), ("W135CTX", 12, "Erika Muster"), ("W999XX", 12, "Max Muster"),
+             ("W135CTX", None, "Max Muster")],
+            self.sql_dir,
+        )
+        self.assertEqual(list(konflikte), [("W135CTX", 12, "Max Muster")])
+        eintrag = konflikte[("W135CTX", 12, "Max Muster")]
+        self.assertEqual((eintrag["deal"], eintrag["total"], eintrag["income"]), ("P", 1000.0, 400.0))
+        self.assertEqual([e["category"] for e in eintrag["expenses"]], ["Parking", "Gas"])
+
+        # Die Vorprüfung hält keine Sperre: eine Schreibtransaktion ist sofort möglich
+        with billing_transaction(self.sql_dir) as conn:
+            conn.execute(f"DELETE FROM {qualified(REVENUE_SCHEMA, 'W135CTX')} WHERE cw = 12")
+        self.assertEqual(self._anzahl("revenue.db", REVENUE), 0)
+
+    def test_wochensumme_in_der_transaktion(self):
+        conn = sqlite3.connect(os.path.join(self.sql_dir, "revenue.db"))
+        costs = sqlite3.connect(os.path.join(self.sql_dir, "running_costs.db"))
+        ensure_weekly_summary(conn, costs)  # Wochensummen bereits aufgebaut (leer)
+        conn.execute("INSERT INTO weekly_summary (license_plate, year, cw) VALUES ('W999XX', 2025, 1)")
+        conn.commit()
+        conn.close()
+        costs.close()
+
+        # KW 52 erst im Januar 2026 abgerechnet: Jahr 2025 wird gespeichert
+        jahr = billing_year(52, date(2026, 1, 8))
+        with billing_transaction(self.sql_dir) as conn:
+            self._schreibe(conn)
+            prepare_vehicle_table(conn, REVENUE, "W135CTX", REVENUE_SCHEMA)
+            prepare_vehicle_table(conn, RUNNING_COSTS, "W135CTX", RUNNING_COSTS_SCHEMA)
+            conn.execute(f"INSERT INTO {qualified(REVENUE_SCHEMA, 'W135CTX')} "
+                         "(cw, deal, driver, total, taxed, income, timestamp, year) "
+                         "VALUES (52, 'P', 'Max Muster', 900, 0, 0, '2026-03-02 12:00:00', ?)", (jahr,))
+            conn.execute(f"INSERT INTO {qualified(RUNNING_COSTS_SCHEMA, 'W135CTX')} (cw, amount, category, timestamp, year) "
+                         "VALUES (52, 30.0, 'Gas', '2026-03-02 12:00:00', ?)", (jahr,))
+            self.assertEqual(refresh_billing_week(conn, "W135CTX", 52, REVENUE_SCHEMA, RUNNING_COSTS_SCHEMA), 1)
+
+        conn = sqlite3.connect(os.path.join(self.sql_dir, "revenue.db"))
+        try:
+            self.assertEqual(
+                conn.execute("SELECT year, revenue, running_costs FROM weekly_summary WHERE cw = 52").fetchall(),
+                [(2025, 900.0, 30.0)])
+            self.assertEqual(conn.execute("SELECT year FROM revenue WHERE cw = 52").fetchall(), [(2025,)])
+            # KW 12 wurde nicht nachgerechnet und bleibt für ensure_weekly_summary vermerkt
+            self.assertEqual(conn.execute("SELECT cw FROM weekly_summary_stale").fetchall(), [(12,)])
+        finally:
+            conn.close()
+
+    def test_abrechnungsjahr(self):
+        self.assertEqual(billing_year(52, date(2026, 1, 8)), 2025)
+        self.assertEqual(billing_year(2, date(2026, 1, 8)), 2026)
+        self.assertEqual(billing_year(53, date(2027, 1, 2)), 2026)  # 2. Jänner 2027 liegt in KW 53/2026
+
+
+if __name__ == "__main__":
+    unittest.main()
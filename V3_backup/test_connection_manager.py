@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test für den gemeinsamen ConnectionManager
+Prüft eine Verbindung je Thread und Datenbank, die PRAGMAs, das Verwerfen
+offener Transaktionen, row_factory je Ausleihe, die Zustandsprüfung und die
+Kennzahlen
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from connection_manager import ConnectionManager, SharedConnection
+
+
+class TestConnectionManager(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "database.db")
+        self.manager = ConnectionManager()
+        with self.manager.connection(self.db_path) as conn:
+            conn.execute("CREATE TABLE drivers (driver_id INTEGER PRIMARY KEY, name TEXT)")
+            conn.commit()
+
+    def tearDown(self):
+        self.manager.close_all()
+        self.tmpdir.cleanup()
+
+    def test_eine_verbindung_je_thread(self):
+        erste = self.manager.acquire(self.db_path)
+        zweite = self.manager.acquire(os.path.relpath(self.db_path))
+        self.assertIs(erste, zweite)
+        self.assertIsInstance(erste, SharedConnection)
+        erste.close()
+        zweite.close()
+
+        andere = []
+        thread = threading.Thread(target=lambda: andere.append(id(self.manager.acquire(self.db_path))))
+        thread.start()
+        thread.join()
+        self.assertNotEqual(andere[0], id(erste))
+
+        stats = self.manager.stats()
+        self.assertEqual(stats["opened"], 2)
+        self.assertGreaterEqual(stats["reused"], 2)
+
+    def test_pragmas(self):
+        with self.manager.connection(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -16000)
+
+    def test_close_verwirft_offene_transaktion(self):
+        conn = self.manager.acquire(self.db_path)
+        conn.execute("INSERT INTO drivers (name) VALUES ('Max Muster')")
+        innen = self.manager.acquire(self.db_path)   # verschachtelte Ausleihe
+        innen.close()
+        self.assertTrue(conn.in_transaction)
+        conn.close()
+        self.assertFalse(conn.in_transaction)
+        with self.manager.connection(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM drivers").fetchone()[0], 0)
+        self.assertEqual(self.manager.stats()["rollbacks"], 1)
+
+    def test_row_factory_je_ausleihe(self):
+        with self.manager.connection(self.db_path) as conn:
+            conn.execute("INSERT INTO drivers (name) VALUES ('Max Muster')")
+            conn.commit()
+        aussen = self.manager.acquire(self.db_path)
+        innen = self.manager.acquire(self.db_path, row_factory=sqlite3.Row)
+        self.assertIs(aussen, innen)
+        zeile = innen.execute("SELECT name FROM drivers").fetchone()
+        self.assertEqual(zeile["name"], "Max Muster")
+        innen.close()
+        # Die äußere Ausleihe bekommt wieder Tupel
+        self.assertEqual(aussen.execute("SELECT name FROM drivers").fetchone(), ("Max Muster",))
+        self.assertIsNone(aussen.row_factory)
+        aussen.close()
+
+    def test_defekte_verbindung_wird_ersetzt(self):
+        self.manager.health_check_interval = 0
+        conn = self.manager.acquire(self.db_path)
+        conn.close()
+        conn._close_connection()
+        neu = self.manager.acquire(self.db_path, row_factory=sqlite3.Row)
+        self.assertIsNot(neu, conn)
+        neu.execute("INSERT INTO drivers (name) VALUES ('Anna')")
+        self.assertEqual(neu.execute("SELECT name FROM drivers").fetchone()["name"], "Anna")
+        neu.close()
+        self.assertEqual(self.manager.stats()["health_failures"], 1)
+
+    def test_close_all(self):
+        conn = self.manager.acquire(self.db_path)
+        self.assertEqual(self.manager.stats()["open"], 1)
+        self.manager.close_all()
+        self.assertEqual(self.manager.stats()["open"], 0)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test für den Daten-Explorer der Datenseite
+Prüft das Keyset-Blättern über mehrere Plattform-Datenbanken (vollständig,
+ohne Doppelte, nach Woche absteigend), die Filter, den Zeitraum, den Umsatz
+wie in der Abrechnung, noch nicht migrierte report_KW-Tabellen und die
+Indexnutzung
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from connection_manager import get_connection_manager
+from data_explorer import DataExplorer, ExplorerFilter, weeks_back
+from platform_reports import PLATFORM_DB_FILES, REPORT_TABLE, ensure_reports_table
+
+
+class TestDataExplorer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sql_dir = self.tmpdir.name
+        for platform in ("uber", "bolt", "40100"):
+            conn = sqlite3.connect(os.path.join(self.sql_dir, PLATFORM_DB_FILES[platform]))
+            ensure_reports_table(conn, platform)
+            for year, kw in ((2024, 52), (2025, 1), (2025, 2), (2025, 3)):
+                for i in range(7):
+                    if platform == "uber":
+                        conn.execute(f"INSERT INTO {REPORT_TABLE} (first_name, last_name, gross_total, cash_collected, year, kw) "
+                                     "VALUES (?, ?, ?, ?, ?, ?)", ("Max", f"Muster{i}", 100.0 + i, 10.0, year, kw))
+                    elif platform == "bolt":
+                        conn.execute(f"INSERT INTO {REPORT_TABLE} (driver_name, net_earnings, rider_tips, cash_collected, year, kw) "
+                                     "VALUES (?, ?, ?, ?, ?, ?)", (f"Anna Schmidt{i}", 50.0, 2.0, 5.0, year, kw))
+                    else:
+                        conn.execute(f"INSERT INTO {REPORT_TABLE} (Fahrzeug, Fahrername, Umsatz, Trinkgeld, Bargeld, year, kw) "
+                                     "VALUES (?, ?, ?, ?, ?, ?, ?)", ("W135CTX", "Max Muster", 20.0, 1.0, 0.0, year, kw))
+            conn.commit()
+            conn.close()
+        self.explorer = DataExplorer(self.sql_dir, page_size=10)
+
+    def tearDown(self):
+        get_connection_manager().close_thread_connections()
+        self.tmpdir.cleanup()
+
+    def _alle_seiten(self, filt, since=None):
+        rows, cursor, exhausted, seiten = [], None, frozenset(), 0
+        while True:
+            page = self.explorer.page(filt, cursor, exhausted, since=since)
+            rows.extend(page.rows)
+            cursor, exhausted = page.cursor, page.exhausted
+            seiten += 1
+            if not page.has_more:
+                return rows, seiten
+
+    def test_keyset_vollstaendig_und_sortiert(self):
+        rows, seiten = self._alle_seiten(ExplorerFilter(time_range="all"))
+        self.assertEqual(len(rows), 3 * 4 * 7)
+        self.assertEqual(len({(r["platform"], r["id"]) for r in rows}), len(rows))
+        wochen = [(r["year"], r["kw"]) for r in rows]
+        self.assertEqual(wochen, sorted(wochen, reverse=True))
+        self.assertEqual(seiten, 9)   # 84 Zeilen à 10, letzte Seite meldet das Ende
+
+    def test_filter_und_zeitraum(self):
+        filt = ExplorerFilter(time_range="week", driver="anna", platform="all")
+        since = self.explorer.since(filt)
+        self.assertEqual(since, (2025, 3))
+        rows, _ = self._alle_seiten(filt, since)
+        self.assertEqual({r["platform"] for r in rows}, {"bolt"})
+        self.assertEqual(len(rows), 7)
+
+        filt = ExplorerFilter(time_range="month", platform="40100", search="135")
+        summary = self.explorer.summary(filt, self.explorer.since(filt))
+        # Umsatz wie in der Abrechnung: 20 € je Fahrt abzüglich 1 € Trinkgeld
+        self.assertEqual(summary, {"40100": {"rows": 28, "earnings": 532.0, "cash": 0.0}})
+
+        # Platzhalter im Suchtext werden nicht als LIKE-Muster ausgewertet
+        self.assertEqual(self.explorer.summary(ExplorerFilter(time_range="all", search="%")), {
+            platform: {"rows": 0, "earnings": 0.0, "cash": 0.0} for platform in ("uber", "bolt", "40100")})
+
+    def test_nicht_migrierte_wochentabellen(self):
+        conn = sqlite3.connect(os.path.join(self.sql_dir, PLATFORM_DB_FILES["40100"]))
+        for tabelle in ("report_KW4", "report_KW3"):
+            conn.execute(f"CREATE TABLE {tabelle} (id INTEGER PRIMARY KEY AUTOINCREMENT, Fahrzeug TEXT, Fahrer TEXT, "
+                         "Fahrername TEXT, Buchungsart TEXT, Umsatz REAL, Trinkgeld REAL, Bargeld REAL, week TEXT)")
+        # Altbestand mit Text-Beträgen und einer Fahrt außerhalb des Abrechnungsrahmens
+        conn.executemany("INSERT INTO report_KW4 (Fahrzeug, Fahrername, Umsatz, Trinkgeld, Bargeld) VALUES (?, ?, ?, ?, ?)",
+                         [("W135CTX", "Max Muster", "30,50", "0,50", "10,00"), ("W135CTX", "Max Muster", 400.0, 0.0, 0.0)])
+        # Vom Import geschriebene Zeilen tragen ein Jahr und stehen schon in 'reports'
+        conn.execute("ALTER TABLE report_KW4 ADD COLUMN year INTEGER")
+        conn.execute("INSERT INTO report_KW4 (Fahrzeug, Fahrername, Umsatz, year) VALUES ('W135CTX', 'Max Muster', 50.0, 2025)")
+        # Bereits migrierte Tabellen stehen schon in 'reports'
+        conn.execute("INSERT INTO report_KW3 (Fahrzeug, Umsatz) VALUES ('W135CTX', 20.0)")
+        conn.execute("INSERT INTO reports_migrated (tabelle, year, rows, migrated_at) VALUES ('report_KW3', 2025, 1, '')")
+        conn.commit()
+        conn.close()
+
+        explorer = DataExplorer(self.sql_dir, page_size=10, legacy_year=2025)
+        filt = ExplorerFilter(time_range="week", platform="40100")
+        since = explorer.since(filt)
+        self.assertEqual(since, (2025, 4))
+        self.assertEqual(explorer.summary(filt, since), {"40100": {"rows": 2, "earnings": 30.0, "cash": 10.0}})
+
+        rows, cursor, exhausted = [], None, frozenset()
+        while True:
+            page = explorer.page(ExplorerFilter(time_range="all", platform="40100"), cursor, exhausted)
+            rows.extend(page.rows)
+            cursor, exhausted = page.cursor, page.exhausted
+            if not page.has_more:
+                break
+        self.assertEqual(len(rows), 4 * 7 + 2)
+        self.assertEqual([(r["year"], r["kw"]) for r in rows[:2]], [(2025, 4), (2025, 4)])
+        self.assertTrue(all(r["id"] < 0 for r in rows[:2]))
+        self.assertEqual(len({r["id"] for r in rows}), len(rows))
+
+    def test_wochen_zurueck(self):
+        self.assertEqual(weeks_back((2025, 3), 5), (2024, 51))
+        self.assertEqual(weeks_back((2025, 3), 1), (2025, 3))
+
+    def test_index_fuer_keyset(self):
+        conn = sqlite3.connect(os.path.join(self.sql_dir, "uber.sqlite"))
+        where, params = self.explorer._where("uber", ExplorerFilter(), (2025, 1), (2025, 3, 20))
+        plan = " ".join(row[-1] for row in conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT id FROM {REPORT_TABLE}{where} ORDER BY year DESC, kw DESC, id DESC LIMIT 10",
+            params))
+        conn.close()
+        self.assertIn("idx_reports_year_kw", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
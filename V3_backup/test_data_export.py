@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test für den Streaming-Export der Jahresdaten
+Prüft CSV/JSON/XLSX/Parquet aus Revenue und Monatstabellen (Gehälter),
+den blockweisen Fortschritt, den Abbruch und die Dateinamen
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from connection_manager import get_connection_manager
+from data_export import (OPENPYXL_AVAILABLE, PYARROW_AVAILABLE, ExportCancelled, export_dataset,
+                         export_filename)
+from vehicle_ledger import REVENUE, RUNNING_COSTS, ensure_synced
+
+
+class TestDataExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sql_dir = self.tmpdir.name
+        conn = sqlite3.connect(os.path.join(self.sql_dir, "revenue.db"))
+        conn.execute("CREATE TABLE [W135CTX] (id INTEGER PRIMARY KEY AUTOINCREMENT, cw INTEGER, deal TEXT, driver TEXT, "
+                     "total REAL, taxed REAL, income REAL, timestamp DATETIME)")
+        conn.executemany("INSERT INTO [W135CTX] (cw, deal, driver, total, taxed, income, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         [(kw, "P", "Max Muster", 1000.0 + kw, 0.0, 500.0, f"2025-{(kw % 12) + 1:02d}-01")
+                          for kw in range(1, 26)])
+        conn.commit()
+        ensure_synced(conn, REVENUE)
+        conn.commit()
+        conn.close()
+
+        conn = sqlite3.connect(os.path.join(self.sql_dir, "salaries.db"))
+        conn.execute('CREATE TABLE "01_25" (id INTEGER PRIMARY KEY, dienstnehmer TEXT, brutto REAL)')
+        conn.execute('CREATE TABLE "02_25" (id INTEGER PRIMARY KEY, dienstnehmer TEXT, brutto REAL, zahlbetrag REAL)')
+        conn.execute('CREATE TABLE "02_24" (id INTEGER PRIMARY KEY, dienstnehmer TEXT, brutto REAL)')
+        conn.execute("INSERT INTO \"01_25\" (dienstnehmer, brutto) VALUES ('Max Muster', 2000.0)")
+        conn.execute("INSERT INTO \"02_25\" (dienstnehmer, brutto, zahlbetrag) VALUES ('Max Muster', 2100.0, 1500.0)")
+        conn.execute("INSERT INTO \"02_24\" (dienstnehmer, brutto) VALUES ('Alt', 1.0)")
+        conn.commit()
+        conn.close()
+        self.out = os.path.join(self.sql_dir, "exports")
+
+    def tearDown(self):
+        get_connection_manager().close_thread_connections()
+        self.tmpdir.cleanup()
+
+    def test_csv_blockweise_mit_fortschritt(self):
+        path = os.path.join(self.out, "revenue.csv")
+        schritte = []
+        rows = export_dataset(self.sql_dir, REVENUE, 2025, "csv", path,
+                              progress=lambda done, total: schritte.append((done, total)), batch_size=10)
+        self.assertEqual(rows, 25)
+        self.assertEqual(schritte, [(0, 25), (10, 25), (20, 25), (25, 25)])
+        with open(path, encoding="utf-8") as f:
+            data = list(csv.DictReader(f))
+        self.assertEqual(len(data), 25)
+        self.assertEqual(data[0]["license_plate"], "W135CTX")
+        self.assertFalse(os.path.exists(path + ".part"))
+
+    def test_monatstabellen_json(self):
+        path = os.path.join(self.out, "salaries.json")
+        self.assertEqual(export_dataset(self.sql_dir, "salaries", 2025, "json", path), 2)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual([row["monat"] for row in data], ["01_25", "02_25"])
+        self.assertIsNone(data[0]["zahlbetrag"])     # Spalte fehlt im Januar
+        self.assertEqual(data[1]["zahlbetrag"], 1500.0)
+
+    def test_fehlende_datenbank_leer(self):
+        path = os.path.join(self.out, "funk.csv")
+        self.assertEqual(export_dataset(self.sql_dir, "funk", 2025, "csv", path), 0)
+        self.assertEqual(export_dataset(self.sql_dir, RUNNING_COSTS, 2025, "csv", path), 0)
+
+    def test_abbruch_entfernt_teildatei(self):
+        path = os.path.join(self.out, "revenue.csv")
+        cancel = threading.Event()
+
+        def progress(done, total):
+            if done >= 10:
+                cancel.set()
+
+        with self.assertRaises(ExportCancelled):
+            export_dataset(self.sql_dir, REVENUE, 2025, "csv", path, progress=progress, cancel=cancel, batch_size=10)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(path + ".part"))
+
+    @unittest.skipUnless(OPENPYXL_AVAILABLE, "openpyxl nicht installiert")
+    def test_xlsx(self):
+        from openpyxl import load_workbook
+        path = os.path.join(self.out, "revenue.xlsx")
+        export_dataset(self.sql_dir, REVENUE, 2025, "excel", path, batch_size=7)
+        sheet = load_workbook(path, read_only=True).active
+        # read_only kennt max_row nur mit Dimensions-Angabe, daher Zeilen zählen
+        self.assertEqual(sum(1 for _ in sheet.iter_rows()), 26)
+
+    @unittest.skipUnless(PYARROW_AVAILABLE, "pyarrow nicht installiert")
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+        path = os.path.join(self.out, "revenue.parquet")
+        export_dataset(self.sql_dir, REVENUE, 2025, "parquet", path, batch_size=10)
+        table = pq.read_table(path)
+        self.assertEqual(table.num_rows, 25)
+        self.assertEqual(pq.ParquetFile(path).num_row_groups, 3)
+
+    def test_dateiname(self):
+        when = datetime(2025, 3, 1, 12, 0, 0)
+        self.assertEqual(export_filename("export_{DATASET}_{YEAR}_{DATE}.ext", REVENUE, 2025, "excel", when),
+                         "export_revenue_2025_20250301_120000.xlsx")
+        self.assertEqual(export_filename("export_{DATE}_{FMT}.ext", "funk", 2025, "csv", when),
+                         "export_20250301_120000_csv.csv")
+
+
+if __name__ == "__main__":
+    unittest.main()
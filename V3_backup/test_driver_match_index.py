@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test für den persistenten Fahrernamen-Index (Uber/Bolt)
+Prüft Indexaufbau beim Import, 'el'-Varianten und Kandidatensuche
+"""
+
+import sys
+import sqlite3
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from driver_match_index import DriverNameIndex, clean_name, index_report_table, name_keys
+from fuzzy_matcher import BatchFuzzyMatcher
+
+
+class TestDriverMatchIndex(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("""
+            CREATE TABLE report_KW31 (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                first_name TEXT, last_name TEXT, gross_total REAL, week TEXT
+            )
+        """)
+        self.conn.executemany(
+            "INSERT INTO report_KW31 (first_name, last_name, gross_total, week) VALUES (?, ?, ?, 'KW31')",
+            [("Hersi Omar", "Mohamud", 812.5), ("Ahmed", "Al Sayed", 400.0), ("Max", "Muster", 120.0)],
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_clean_name_el_variante(self):
+        self.assertEqual(clean_name("  Ahmed  AL-Sayed "), "ahmed el sayed")
+        token_keys, gram_keys = name_keys("ahmed el sayed")
+        self.assertIn("t:elsayed", token_keys)
+        self.assertTrue(gram_keys)
+
+    def test_index_beim_import(self):
+        self.assertEqual(index_report_table(self.conn, "uber", "report_KW31"), 3)
+        # Zweiter Lauf indexiert nichts doppelt
+        self.assertEqual(index_report_table(self.conn, "uber", "report_KW31"), 0)
+        self.conn.execute("INSERT INTO report_KW31 (first_name, last_name, week) VALUES ('Neu', 'Fahrer', 'KW31')")
+        self.assertEqual(index_report_table(self.conn, "uber", "report_KW31"), 1)
+        # Plattformen ohne Namensindex werden ignoriert
+        self.assertEqual(index_report_table(self.conn, "40100", "report_KW31"), 0)
+
+    def test_kandidaten_ohne_vollscan(self):
+        index = DriverNameIndex(self.conn, "uber")
+        candidates = index.candidates("report_KW31", "Ahmed Elsayed")
+        self.assertEqual(candidates[0][1], "ahmed el sayed")
+        candidates = index.candidates("report_KW31", "Hersi Omar Mohamud")
+        self.assertEqual(candidates[0][1], "hersi omar mohamud")
+        self.assertEqual(index.candidates("report_KW99", "Max Muster"), [])
+
+    def test_trigramm_fallback(self):
+        index = DriverNameIndex(self.conn, "uber")
+        candidates = index.candidates("report_KW31", "Mux Mustr")
+        self.assertTrue(candidates)
+        self.assertEqual(candidates[0][1], "max muster")
+
+    def test_gleicher_vorname_vertippter_nachname(self):
+        # Mehrere Fahrer teilen den Vornamen; der gesuchte trifft nur über Trigramme des Nachnamens
+        self.conn.executemany(
+            "INSERT INTO report_KW31 (first_name, last_name, week) VALUES (?, ?, 'KW31')",
+            [("Ahmed", "Ali"), ("Ahmed", "Hassan"), ("Ahmed", "Mohamud")],
+        )
+        index = DriverNameIndex(self.conn, "uber")
+        candidates = index.candidates("report_KW31", "Ahmed Mohamed", limit=3)
+        names = [name_clean for _, name_clean in candidates]
+        # Obergrenze gilt für Token- und Trigramm-Kandidaten zusammen
+        self.assertEqual(len(names), 3)
+        self.assertEqual(names[0], "ahmed mohamud")
+        match = BatchFuzzyMatcher(names).best_matches(["ahmed mohamed"])[0]
+        self.assertEqual(match.target, "ahmed mohamud")
+
+if __name__ == "__main__":
+    unittest.main()
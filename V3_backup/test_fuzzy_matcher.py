@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test für den gemeinsamen Batch-Fuzzy-Matcher
+Vergleicht das N×M-Scoring mit dem bisherigen Einzel-Scoring und prüft die Schwellen
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from fuzzy_matcher import BatchFuzzyMatcher, clean_name, extend_el, levenshtein_matrix
+
+
+def levenshtein_distance(s1, s2):
+    """Referenz: bisherige Einzel-Implementierung"""
+    if len(s1) < len(s2):
+        return levenshtein_distance(s2, s1)
+    if len(s2) == 0:
+        return len(s1)
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            current_row.append(min(previous_row[j + 1] + 1, current_row[j] + 1, previous_row[j] + (c1 != c2)))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def fuzzy_match_score(search_name, target_name, max_distance=3):
+    """Referenz: bisheriges fuzzy_match_score aus auswerten()"""
+    if not search_name or not target_name:
+        return 0.0
+    if search_name == target_name:
+        return 100.0
+    search_tokens = clean_name(search_name).split()
+    target_tokens = clean_name(target_name).split()
+    set_search = set(extend_el(search_tokens))
+    set_target = set(extend_el(target_tokens))
+    inter_size = len(set_search & set_target)
+    if inter_size == 0 and levenshtein_distance(search_name, target_name) > max_distance:
+        return 0.0
+    dice = (2 * inter_size) / max(1, (len(set_search) + len(set_target)))
+    jaccard = inter_size / max(1, len(set_search | set_target))
+    coverage = inter_size / max(1, len(set_search))
+    order_bonus = 0.0
+    if search_tokens and target_tokens and search_tokens[0] == target_tokens[0]:
+        order_bonus += 8.0
+    if search_tokens and target_tokens and search_tokens[-1] == target_tokens[-1]:
+        order_bonus += 8.0
+    prefix_bonus = 0.0
+    for st in search_tokens:
+        if any(tt.startswith(st) or st.startswith(tt) for tt in target_tokens):
+            prefix_bonus += 2.0
+    prefix_bonus = min(prefix_bonus, 8.0)
+    arabic_bonus = 0.0
+    if any(t.startswith('el') for t in search_tokens) and any(t.startswith('el') for t in target_tokens):
+        arabic_bonus = 20.0
+    distance = levenshtein_distance(search_name, target_name)
+    max_len = max(len(search_name), len(target_name))
+    norm_dist = (distance / max_len) if max_len else 1.0
+    distance_score = max(0.0, 100.0 - (norm_dist * 100.0)) / 100.0
+    base = (0.55 * dice + 0.20 * coverage + 0.10 * jaccard + 0.15 * distance_score) * 100.0
+    return float(max(0.0, min(100.0, base + order_bonus + prefix_bonus + arabic_bonus)))
+
+
+DRIVERS = [
+    "Hersi Omar Mohamud", "Ahmed El Sayed", "Mohamed Ali", "Max Muster",
+    "Osama Ahmed", "Sara Benali", "Mahmoud Al Masri",
+]
+SEARCHES = [
+    "hersi omar mohamud", "ahmed elsayed", "mohamed ali hassan", "muster max",
+    "ahmed osama", "sarah ben ali", "mahmoud el masri", "unbekannt",
+]
+
+
+class TestBatchFuzzyMatcher(unittest.TestCase):
+    def test_levenshtein_matrix(self):
+        searches = ["kitten", "", "flaw"]
+        targets = ["sitting", "lawn", ""]
+        mat = levenshtein_matrix(searches, targets)
+        for i, s in enumerate(searches):
+            for j, t in enumerate(targets):
+                self.assertEqual(mat[i, j], levenshtein_distance(s, t))
+
+    def test_score_identisch_zum_einzelscoring(self):
+        targets = [clean_name(d) for d in DRIVERS]
+        matcher = BatchFuzzyMatcher(targets)
+        scores = matcher.score(SEARCHES)["score"]
+        for i, s in enumerate(SEARCHES):
+            for j, t in enumerate(targets):
+                self.assertAlmostEqual(scores[i, j], fuzzy_match_score(s, t), places=6)
+
+    def test_schwellen(self):
+        matcher = BatchFuzzyMatcher(DRIVERS)
+        results = matcher.best_matches(SEARCHES)
+        self.assertTrue(results[0].accepted)
+        self.assertEqual(results[0].target, "Hersi Omar Mohamud")
+        self.assertTrue(results[1].accepted)
+        self.assertEqual(results[1].target, "Ahmed El Sayed")
+        self.assertFalse(results[-1].accepted)
+
+    def test_leere_zielliste(self):
+        self.assertEqual(BatchFuzzyMatcher([]).best_matches(["max muster"]), [None])
+
+
+if __name__ == "__main__":
+    unittest.main()
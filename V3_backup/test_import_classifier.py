@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test für die inhaltsbasierte Klassifikation der Import-Dateien
+Prüft die Erkennung an der CSV-Kopfzeile (Uber, Bolt, 40100 vs. 31300, offene
+Taxi-Quelle bei Gleichstand),
+irreführende Dateinamen, die Schlüsselwörter im PDF-Text, den Rückfall
+auf den Dateinamen und den Cache je Inhalt
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "SQL"))
+
+import import_classifier
+from import_classifier import UNBEKANNT, classify_file, clear_cache, score_pdf_text
+from import_pipeline import FUNK, GEHALT, UMSATZ
+
+KOPF_40100 = "Fahrzeug;Fahrer;Fahrername;Abschluss;Buchungsart;Umsatz;Trinkgeld;Bargeld"
+KOPF_31300 = "Beleg;Zeitpunkt;Fahrzeug;Fahrer;Fahrername;Leistung;Tour;Trinkgeld;Gesamt;Kst;Bemerkung"
+KOPF_UBER = ("Vorname des Fahrers,Nachname des Fahrers,Gesamtumsätze,Umsätze/Std.,"
+             "Eingenommenes Bargeld,Stunden online")
+KOPF_BOLT = "Driver,Gross earnings (total),Net earnings,Rider tips,Collected cash"
+
+
+class TestImportClassifier(unittest.TestCase):
+    def setUp(self):
+        clear_cache()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        clear_cache()
+        self.tmpdir.cleanup()
+
+    def _datei(self, name, inhalt):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "wb") as f:
+            f.write(inhalt if isinstance(inhalt, bytes) else inhalt.encode("utf-8"))
+        return path
+
+    def test_taxi_quellen_an_spalten(self):
+        zeile = "\nW135CTX;1;Max Muster;x;y;20,0;1,0;0,0\n"
+        for kopf, erwartet in ((KOPF_40100, "40100"), (KOPF_31300, "31300")):
+            ergebnis = classify_file(self._datei(f"uportal_getumsatzliste_{erwartet}_KW31_2025.csv", kopf + zeile))
+            self.assertEqual((ergebnis.kind, ergebnis.platform, ergebnis.source), (UMSATZ, erwartet, "spalten"))
+
+    def test_taxi_quelle_unklar(self):
+        # Weder Umsatz/Bargeld noch Gesamt/Zeitpunkt: keine Quelle raten, Datei landet in der Quellenabfrage
+        kopf = "Fahrzeug;Fahrer;Fahrername;Abschluss;Buchungsart;Trinkgeld"
+        for name in ("uportal_getumsatzliste_KW31_2025.csv", "umsatz_KW31.csv"):
+            ergebnis = classify_file(self._datei(name, kopf + "\nW135CTX;1;Max Muster;x;Bar;1,0\n"))
+            self.assertEqual((ergebnis.kind, ergebnis.platform, ergebnis.source), (UMSATZ, None, "spalten"))
+
+    def test_uber_und_bolt(self):
+        uber = classify_file(self._datei("report_KW31_2025.csv", KOPF_UBER + "\nMax,Muster,100,10,5,8\n"))
+        bolt = classify_file(self._datei("export_KW31_2025.csv", KOPF_BOLT + "\nAnna Schmidt,50,40,2,5\n"))
+        self.assertEqual((uber.kind, uber.platform), (UMSATZ, "uber"))
+        self.assertEqual((bolt.kind, bolt.platform), (UMSATZ, "bolt"))
+
+    def test_irrefuehrender_dateiname(self):
+        # Dateiname klingt nach Funk-Rechnung, der Inhalt ist ein Uber-Bericht
+        ergebnis = classify_file(self._datei("rechnung_40100_KW31_2025.csv", KOPF_UBER + "\n"))
+        self.assertEqual((ergebnis.kind, ergebnis.platform), (UMSATZ, "uber"))
+
+    def test_pdf_text(self):
+        gehalt = score_pdf_text("Abrechnungsbeleg Lohn/Gehalt 03/2025\nDienstnehmer: Max Muster\nZahlbetrag 1.500,00")
+        funk = score_pdf_text("Taxi4Me Vermittlung GmbH\nRechnungsnummer 4711\nAuswertungen 40100")
+        self.assertEqual(gehalt.kind, GEHALT)
+        self.assertEqual(funk.kind, FUNK)
+        self.assertIsNone(score_pdf_text("Brutto 100,00 Netto 80,00"))
+
+    def test_pdf_ohne_text_faellt_auf_dateinamen_zurueck(self):
+        inhalt = b"%PDF-1.4\n% gescannt\n"
+        with mock.patch.object(import_classifier, "first_page_text", return_value=""):
+            gehalt = classify_file(self._datei("Abrechnungen_03_2025.pdf", inhalt))
+            unbekannt = classify_file(self._datei("scan_0001.pdf", inhalt))
+        self.assertEqual((gehalt.kind, gehalt.source), (GEHALT, "dateiname"))
+        self.assertEqual(unbekannt.kind, UNBEKANNT)
+
+    def test_cache_je_inhalt(self):
+        inhalt = b"%PDF-1.4\n% Lohnzettel\n"
+        text = "Lohnzettel\nDienstnehmer Max Muster\nZahlbetrag 1.500,00"
+        with mock.patch.object(import_classifier, "first_page_text", return_value=text) as first_page:
+            erste = classify_file(self._datei("a.pdf", inhalt))
+            zweite = classify_file(self._datei("kopie.pdf", inhalt))
+        self.assertEqual(first_page.call_count, 1)
+        self.assertEqual(erste, zweite)
+        self.assertEqual(erste.kind, GEHALT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test für die parallele Import-Pipeline
+Prüft, dass je Ziel-Datenbank nur ein Umsatz-Import gleichzeitig läuft (in
+Eingabereihenfolge), andere Datenbanken parallel weiterlaufen und Fehler
+einer Datei als fehlgeschlagenes Ergebnis gemeldet werden
+"""
+
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+import import_pipeline
+from import_pipeline import UMSATZ, ImportTask, run_pipeline
+
+
+class TestImportPipeline(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.lock = threading.Lock()
+        self.bolt_started = threading.Event()
+        # Threads statt Prozesse: gleiche Ablaufsteuerung, aber der Stub-Parser gilt auch in den Workern
+        patcher_pool = mock.patch.object(import_pipeline, "ProcessPoolExecutor", ThreadPoolExecutor)
+        patcher_parser = mock.patch.object(import_pipeline, "_run_umsatz", side_effect=self._parser)
+        patcher_pool.start()
+        patcher_parser.start()
+        self.addCleanup(patcher_pool.stop)
+        self.addCleanup(patcher_parser.stop)
+
+    def _log(self, event):
+        with self.lock:
+            self.events.append(event)
+
+    def _parser(self, path, platform):
+        self._log(("start", path))
+        try:
+            if platform == "bolt":
+                self.bolt_started.set()
+                raise RuntimeError("Datei beschädigt")
+            if path == "uber_kw30.csv":
+                # Läuft bolt nicht parallel, wird hier bis zum Timeout gewartet
+                self.assertTrue(self.bolt_started.wait(5))
+            return None if path == "uber_leer.csv" else 10
+        finally:
+            self._log(("ende", path))
+
+    def test_ein_schreiber_je_datenbank(self):
+        tasks = [ImportTask("uber_kw30.csv", UMSATZ, platform="uber"),
+                 ImportTask("uber_kw31.csv", UMSATZ, platform="uber"),
+                 ImportTask("bolt_kw30.csv", UMSATZ, platform="bolt")]
+        fortschritt = []
+        results = run_pipeline(tasks, on_progress=lambda result, done, total: fortschritt.append((done, total)),
+                               max_workers=3)
+
+        # uber.sqlite: zweite Datei startet erst nach dem Ende der ersten
+        uber = [event for event in self.events if event[1].startswith("uber")]
+        self.assertEqual(uber, [("start", "uber_kw30.csv"), ("ende", "uber_kw30.csv"),
+                                ("start", "uber_kw31.csv"), ("ende", "uber_kw31.csv")])
+        # bolt.sqlite läuft parallel zur ersten Uber-Datei
+        self.assertLess(self.events.index(("start", "bolt_kw30.csv")), self.events.index(("ende", "uber_kw30.csv")))
+        self.assertEqual(fortschritt, [(1, 3), (2, 3), (3, 3)])
+
+        by_file = {result.task.filename: result for result in results}
+        self.assertTrue(by_file["uber_kw30.csv"].success)
+        self.assertEqual(by_file["uber_kw31.csv"].count, 10)
+        self.assertFalse(by_file["bolt_kw30.csv"].success)
+        self.assertIn("Datei beschädigt", by_file["bolt_kw30.csv"].message)
+
+    def test_fehler_ohne_pool(self):
+        # Eine Datei: sequenziell, ein fehlgeschlagener Import (None) wird gemeldet
+        results = run_pipeline([ImportTask("uber_leer.csv", UMSATZ, platform="uber")])
+        self.assertEqual(len(results), 1)
+        self.assertFalse(results[0].success)
+        self.assertIn("uber_leer.csv", results[0].message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test für den gemeinsamen OCR-Cache der PDF-Importe
+Prüft Schlüssel (Inhalt, Seite, DPI, Konfiguration), das einmalige Lesen
+über page_text und die Verdrängung nach Größe
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from connection_manager import get_connection_manager
+from ocr_cache import OcrCache, file_sha256
+
+
+class TestOcrCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = OcrCache(os.path.join(self.tmpdir.name, "ocr_cache.db"))
+
+    def tearDown(self):
+        get_connection_manager().close_thread_connections()
+        self.tmpdir.cleanup()
+
+    def test_schluessel(self):
+        self.cache.put("abc", 1, 300, "deu --psm 6", "Rechnung 4711")
+        self.assertEqual(self.cache.get("abc", 1, 300, "deu --psm 6"), "Rechnung 4711")
+        self.assertIsNone(self.cache.get("abc", 2, 300, "deu --psm 6"))
+        self.assertIsNone(self.cache.get("abc", 1, 500, "deu --psm 6"))
+        self.assertIsNone(self.cache.get("abc", 1, 300, "deu --psm 11"))
+
+    def test_inhalt_statt_dateiname(self):
+        a = os.path.join(self.tmpdir.name, "rechnung.pdf")
+        b = os.path.join(self.tmpdir.name, "rechnung_kopie.pdf")
+        for path in (a, b):
+            with open(path, "wb") as f:
+                f.write(b"%PDF-1.4 gleiche Rechnung")
+        self.assertEqual(file_sha256(a), file_sha256(b))
+
+    def test_page_text_liest_einmal(self):
+        aufrufe = []
+
+        def ocr():
+            aufrufe.append(1)
+            return "Dienstnehmer Max Muster"
+
+        for _ in range(3):
+            self.assertEqual(self.cache.page_text("abc", 1, 300, "cfg", ocr), "Dienstnehmer Max Muster")
+        self.assertEqual(len(aufrufe), 1)
+
+        # Leere OCR-Ergebnisse werden nicht festgeschrieben
+        self.assertEqual(self.cache.page_text("abc", 2, 300, "cfg", lambda: ""), "")
+        self.assertIsNone(self.cache.get("abc", 2, 300, "cfg"))
+
+    def test_verdraengung_nach_groesse(self):
+        text = os.urandom(2000).hex()               # kaum komprimierbar, ~4 KB
+        self.cache.put("alt", 1, 300, "cfg", text)
+        self.cache.put("mittel", 1, 300, "cfg", text)
+        self.cache.get("alt", 1, 300, "cfg")        # "alt" zuletzt genutzt
+        self.cache.max_bytes = self.cache.stats()["bytes"] + 100
+        self.cache.put("neu", 1, 300, "cfg", text)
+        self.assertIsNotNone(self.cache.get("alt", 1, 300, "cfg"))
+        self.assertIsNone(self.cache.get("mittel", 1, 300, "cfg"))
+        self.assertIsNotNone(self.cache.get("neu", 1, 300, "cfg"))
+        self.assertLessEqual(self.cache.stats()["bytes"], self.cache.max_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
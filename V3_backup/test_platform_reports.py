@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test für die jahresfähigen Plattform-Tabellen (year, kw)
+Prüft Migration der report_KW-Tabellen, die Wochenliste über den Index
+und das Umwandeln von Text-Beträgen in REAL
+"""
+
+import sys
+import sqlite3
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from platform_reports import (
+    REPORT_TABLE, ensure_reports_table, legacy_week_tables, list_weeks, migrate_legacy_table, migrate_legacy_tables,
+    normalize_numeric_columns, numeric_columns,
+)
+
+
+class TestPlatformReports(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        for kw in (30, 31):
+            self.conn.execute(f"""
+                CREATE TABLE report_KW{kw} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    Fahrzeug TEXT, Fahrername TEXT, Abschluss TEXT, Umsatz REAL, week TEXT
+                )
+            """)
+            self.conn.executemany(
+                f"INSERT INTO report_KW{kw} (Fahrzeug, Fahrername, Abschluss, Umsatz, week) VALUES (?, ?, ?, ?, ?)",
+                [("W135CTX", "Max Muster", f"A{kw}-1", 12.5, f"KW{kw}"),
+                 ("W132CTX", "Erika Muster", f"A{kw}-2", 20.0, f"KW{kw}")],
+            )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_leere_datenbank(self):
+        self.assertEqual(list_weeks(self.conn), [])
+
+    def test_migration(self):
+        migrated = migrate_legacy_tables(self.conn, "40100", 2025)
+        self.assertEqual(migrated, {"report_KW30": 2, "report_KW31": 2})
+        self.assertEqual(list_weeks(self.conn), [(2025, 31), (2025, 30)])
+        self.assertEqual(list_weeks(self.conn, 2024), [])
+
+        # Zweiter Lauf migriert nichts doppelt
+        self.assertEqual(migrate_legacy_tables(self.conn, "40100", 2025), {})
+        count = self.conn.execute(f"SELECT COUNT(*) FROM {REPORT_TABLE}").fetchone()[0]
+        self.assertEqual(count, 4)
+
+        row = self.conn.execute(
+            f"SELECT Fahrername, Umsatz FROM {REPORT_TABLE} WHERE year = 2025 AND kw = 31 AND Fahrzeug = 'W135CTX'"
+        ).fetchone()
+        self.assertEqual(row, ("Max Muster", 12.5))
+
+    def test_nicht_migrierte_wochentabellen(self):
+        self.assertEqual(legacy_week_tables(self.conn), {30: "report_KW30", 31: "report_KW31"})
+        # Wie beim Import: eine Woche vorab übernommen, die Migration holt nur den Rest
+        self.assertEqual(migrate_legacy_table(self.conn, "40100", "report_KW31", 31, 2025), 2)
+        self.assertEqual(legacy_week_tables(self.conn), {30: "report_KW30"})
+        self.assertEqual(migrate_legacy_tables(self.conn, "40100", 2025), {"report_KW30": 2})
+        self.assertEqual(self.conn.execute(f"SELECT COUNT(*) FROM {REPORT_TABLE}").fetchone()[0], 4)
+
+    def test_indizes(self):
+        ensure_reports_table(self.conn, "40100")
+        plan = " ".join(
+            str(r) for r in self.conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT DISTINCT year, kw FROM {REPORT_TABLE} ORDER BY year DESC, kw DESC"
+            )
+        )
+        self.assertIn("idx_reports", plan)
+
+    def test_text_betraege_werden_real(self):
+        # Altbestand: Betragsspalte mit TEXT-Affinität und Komma-Dezimaltext, dazu ein import_key
+        self.conn.execute("""
+            CREATE TABLE report_KW32 (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                Fahrzeug TEXT, Umsatz TEXT, Trinkgeld REAL, Bargeld REAL, week TEXT, import_key TEXT
+            )
+        """)
+        self.conn.execute("CREATE UNIQUE INDEX idx_report_KW32_import_key ON report_KW32 (week, import_key)")
+        self.conn.executemany(
+            "INSERT INTO report_KW32 (Fahrzeug, Umsatz, Trinkgeld, Bargeld, week, import_key) VALUES (?, ?, ?, ?, 'KW32', ?)",
+            [("W135CTX", "100,50", "2,5", 0.0, "a"), ("W135CTX", "1 200,00", 0.0, "", "b"), ("W135CTX", "nan", 1.0, 3.0, "c")],
+        )
+
+        self.assertEqual(normalize_numeric_columns(self.conn, "report_KW32", numeric_columns("40100")), 5)
+        rows = self.conn.execute(
+            "SELECT Umsatz, typeof(Umsatz), Trinkgeld, Bargeld, import_key FROM report_KW32 ORDER BY id"
+        ).fetchall()
+        self.assertEqual(rows, [(100.5, "real", 2.5, 0.0, None), (1200.0, "real", 0.0, None, None),
+                                (None, "null", 1.0, 3.0, None)])
+        summe = self.conn.execute("SELECT SUM(Umsatz) FROM report_KW32").fetchone()[0]
+        self.assertAlmostEqual(summe, 1300.5)
+
+        # Zweiter Lauf: nichts mehr zu tun
+        self.assertEqual(normalize_numeric_columns(self.conn, "report_KW32", numeric_columns("40100")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
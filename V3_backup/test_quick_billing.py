@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test für die In-Process-Schnellabrechnung
+Prüft Plattformsummen (auch aus Text-Beträgen, ohne die Tabelle zu ändern),
+Deal-Berechnung, das QML-Textformat ohne Subprozess sowie die
+Sammelabrechnung der Flotte über die Kommandozeile
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from connection_manager import get_connection_manager
+from quick_billing import (
+    BATCH_COLUMNS, BillingJob, DealInfo, PlatformWeek, QuickBillingEngine, calculate_week,
+    export_csv, export_pdf, format_summary, main, results_to_dataframe,
+)
+
+REPORTLAB_AVAILABLE = importlib.util.find_spec("reportlab") is not None
+
+
+class TestQuickBillingEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        sql_dir = self.tmp.name
+
+        conn = sqlite3.connect(os.path.join(sql_dir, "40100.sqlite"))
+        conn.execute("CREATE TABLE report_KW30 (Fahrzeug TEXT, Umsatz TEXT, Trinkgeld REAL, Bargeld REAL, Buchungsart TEXT)")
+        conn.executemany("INSERT INTO report_KW30 VALUES (?, ?, ?, ?, ?)", [
+            ("W135CTX", "100,50", 5.0, 0.0, "Karte"),
+            ("W135CTX", "300", 0.0, 300.0, "Bar"),      # über 250 € → gefiltert
+            ("W135CTX", "50", 0.0, 50.0, "Bar"),
+            ("W999XX", "80", 0.0, 0.0, "Karte"),        # anderes Fahrzeug
+            ("W1350X", "70", 0.0, 0.0, "Karte"),        # früher per LIKE '%135%' mitgezählt
+        ])
+        conn.commit()
+        conn.close()
+
+        conn = sqlite3.connect(os.path.join(sql_dir, "bolt.sqlite"))
+        conn.execute("CREATE TABLE report_KW30 (driver_name TEXT, net_earnings REAL, rider_tips REAL, cash_collected REAL)")
+        conn.executemany("INSERT INTO report_KW30 VALUES (?, ?, ?, ?)", [
+            ("Max Muster", 400.0, 10.0, 100.0),
+            ("Erika Beispiel", 999.0, 0.0, 0.0),
+        ])
+        conn.commit()
+        conn.close()
+
+        conn = sqlite3.connect(os.path.join(sql_dir, "database.db"))
+        conn.execute("CREATE TABLE deals (name TEXT, deal TEXT, garage REAL, pauschale REAL, umsatzgrenze REAL)")
+        conn.execute("INSERT INTO deals VALUES ('Max Muster', '%', 0, NULL, NULL)")
+        conn.execute("CREATE TABLE vehicles (license_plate TEXT UNIQUE, status TEXT DEFAULT 'Aktiv', stammfahrer TEXT)")
+        conn.executemany("INSERT INTO vehicles VALUES (?, ?, ?)", [
+            ("W135CTX", "Aktiv", "Max Muster"),
+            ("W999XX", None, " Erika Beispiel "),
+            ("W200AB", "Aktiv", ""),                   # ohne Stammfahrer
+            ("W300AB", "Inaktiv", "Max Muster"),
+        ])
+        conn.commit()
+        conn.close()
+
+        self.engine = QuickBillingEngine(sql_dir=sql_dir)
+
+    def tearDown(self):
+        get_connection_manager().close_thread_connections()
+        self.tmp.cleanup()
+
+    def test_plattformsummen_und_ergebnis(self):
+        result = self.engine.run("W135CTX", "max muster", ["KW30", "31"], 0.1, 0.2, 20.0)
+        self.assertEqual(result.deal.deal, None)  # Deal-Name exakt ('max muster' ≠ 'Max Muster')
+        self.assertEqual(len(result.weeks), 1)     # KW31 ohne Daten entfällt
+
+        week = result.weeks[0]
+        labels = {p.label: p for p in week.platforms}
+        self.assertAlmostEqual(labels["40100"].umsatz, 145.5)   # 100,50 + 50 − 5 Trinkgeld
+        self.assertAlmostEqual(labels["40100"].bargeld, 50.0)
+        self.assertAlmostEqual(labels["Bolt"].umsatz, 390.0)
+        self.assertAlmostEqual(week.umsatz, 535.5)
+        self.assertAlmostEqual(week.credit_card, 535.5 + 10.0 - 150.0)
+
+        # Lesen wandelt die Text-Beträge nicht um (das erledigen Import/Migration)
+        conn = sqlite3.connect(os.path.join(self.tmp.name, "40100.sqlite"))
+        try:
+            self.assertEqual(conn.execute("SELECT typeof(Umsatz) FROM report_KW30 LIMIT 1").fetchone()[0], "text")
+        finally:
+            conn.close()
+
+    def test_prozent_deal(self):
+        deal = DealInfo(deal="%")
+        week = calculate_week("30", [PlatformWeek("Bolt", 1000.0, 200.0, 20.0)], deal, 0.1, 0.2, 10.0)
+        self.assertAlmostEqual(week.anteil, 500.0 + 100.0)
+        self.assertAlmostEqual(week.income, 600.0 - 50.0 - 10.0)
+        self.assertAlmostEqual(week.abrechnungsergebnis, (1000.0 + 20.0 - 200.0) - 540.0 + 20.0)
+
+    def test_textformat(self):
+        result = self.engine.run("W135CTX", "Max Muster", ["30"], 0.1, 0.2, 0.0)
+        text = format_summary(result)
+        self.assertIn("TEST-ZUSAMMENFASSUNG", text)
+        self.assertIn("\n30:\n", text)
+        self.assertIn("Deal-Typ: %", text)
+        self.assertIn("GESAMT:", text)
+
+
+    def _batch_jobs(self):
+        return [
+            BillingJob("W135CTX", "Max Muster", 30, 31),
+            BillingJob("W999XX", "Erika Beispiel", 30, 30),
+            BillingJob("W135CTX", "Max Muster", 30, 30),
+            BillingJob("W999XX", "Max Muster", 29, 30),
+        ]
+
+    def test_sammelabrechnung_wie_einzellauf(self):
+        results = self.engine.run_batch(self._batch_jobs(), 0.1, 0.2, 20.0, max_workers=1)
+        self.assertEqual([r.fahrzeug for r in results], ["W135CTX", "W999XX", "W135CTX", "W999XX"])
+        for job, result in zip(self._batch_jobs(), results):
+            einzeln = self.engine.run(job.fahrzeug, job.fahrer, [str(kw) for kw in job.weeks], 0.1, 0.2, 20.0)
+            self.assertEqual(result.to_dict(), einzeln.to_dict())
+        self.assertEqual(results[0].deal.deal, "%")
+
+    def test_kennzeichen_ohne_ziffern(self):
+        # Kein 'LIKE %%' über alle Fahrzeuge: Taxi-Plattformen entfallen, Bolt bleibt
+        result = self.engine.run_batch([BillingJob("ERSATZ", "Max Muster", 30, 30)], 0.1, 0.2, 0.0,
+                                       max_workers=1)[0]
+        self.assertEqual([p.label for p in result.weeks[0].platforms], ["Bolt"])
+
+    def test_ungueltiger_auftrag(self):
+        # KW53 ist gültig, KW54 scheitert nur für diesen Auftrag
+        jobs = [BillingJob("W135CTX", "Max Muster", 30, 53), BillingJob("W999XX", "Erika Beispiel", 30, 54),
+                BillingJob("W999XX", "Erika Beispiel", 30, 30)]
+        results = self.engine.run_batch(jobs, 0.1, 0.2, 0.0, max_workers=1)
+        self.assertEqual([r.fahrzeug for r in results], ["W135CTX", "W999XX", "W999XX"])
+        self.assertIsNone(results[0].fehler)
+        self.assertEqual(len(results[0].weeks), 1)
+        self.assertIn("54", results[1].fehler)
+        self.assertEqual(results[1].weeks, [])
+        self.assertIn("54", format_summary(results[1]))
+        self.assertEqual(len(results[2].weeks), 1)
+
+    def test_sammelabrechnung_prozess_pool(self):
+        sequenziell = self.engine.run_batch(self._batch_jobs(), 0.1, 0.2, 0.0, max_workers=1)
+        parallel = self.engine.run_batch(self._batch_jobs(), 0.1, 0.2, 0.0, max_workers=2)
+        self.assertEqual([r.to_dict() for r in parallel], [r.to_dict() for r in sequenziell])
+
+    def test_vorab_geladen_je_fahrer(self):
+        # Uber/Bolt: nur Wochensummen der Auftrags-Fahrer statt ganzer Tabellen
+        frames = self.engine.prefetch(self._batch_jobs())
+        self.assertEqual(set(frames[30]["Bolt"]), {"Max Muster", "Erika Beispiel"})
+        self.assertAlmostEqual(frames[30]["Bolt"]["Max Muster"].umsatz, 390.0)
+        self.assertNotIn("Uber", frames[30])  # keine uber.sqlite
+
+    def test_flotte(self):
+        jobs = self.engine.fleet_jobs(30, 31)
+        self.assertEqual([(job.fahrzeug, job.fahrer) for job in jobs],
+                         [("W135CTX", "Max Muster"), ("W999XX", "Erika Beispiel")])
+
+    def test_kommandozeile(self):
+        csv_path = os.path.join(self.tmp.name, "flotte.csv")
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = main(["--von", "KW30", "--bis", "31", "--sql-dir", self.tmp.name, "--export", csv_path,
+                         "--workers", "1"])
+        self.assertEqual(code, 0)
+        with open(csv_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], ",".join(BATCH_COLUMNS))
+        self.assertEqual(len(lines), 3)  # W135CTX und W999XX je KW30
+
+    def test_export(self):
+        results = self.engine.run_batch(self._batch_jobs(), 0.1, 0.2, 0.0, max_workers=1)
+        table = results_to_dataframe(results)
+        self.assertEqual(list(table.columns), BATCH_COLUMNS)
+        self.assertEqual(len(table), 4)  # eine Zeile je Job und KW mit Daten
+
+        csv_path = export_csv(results, os.path.join(self.tmp.name, "batch.csv"))
+        with open(csv_path, encoding="utf-8") as f:
+            self.assertEqual(f.readline().strip(), ",".join(BATCH_COLUMNS))
+
+        if REPORTLAB_AVAILABLE:
+            pdf_path = export_pdf(results, os.path.join(self.tmp.name, "batch.pdf"))
+            with open(pdf_path, "rb") as f:
+                self.assertEqual(f.read(4), b"%PDF")
+
+
+if __name__ == "__main__":
+    unittest.main()
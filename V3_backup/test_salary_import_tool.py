@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test für die Seiten-OCR des Gehaltsimports
+Prüft, dass ein Fehler auf einer Seite nur diese Seite leer lässt und dass
+die Import-Pipeline in ihren Pool-Prozessen keinen zweiten OCR-Pool startet
+"""
+
+import logging
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+# salary_import_tool lädt die OCR-Bibliotheken beim Import; ohne sie wird die Datei übersprungen
+for modul in ("pdf2image", "pdfplumber", "pytesseract"):
+    pytest.importorskip(modul)
+
+import import_pipeline
+import salary_import_tool
+from import_pipeline import GEHALT, ImportTask
+from salary_import_tool import SalaryImportTool, ocr_pdf_page
+
+
+def _convert(pdf_path, dpi, first_page, last_page, poppler_path):
+    if first_page == 2:
+        raise RuntimeError("Seite beschädigt")
+    return [f"bild {first_page}"]
+
+
+class TestSeitenOcr(unittest.TestCase):
+    def setUp(self):
+        patcher_convert = mock.patch.object(salary_import_tool, "convert_from_path", side_effect=_convert)
+        patcher_ocr = mock.patch.object(salary_import_tool, "ocr_image_text", side_effect=lambda image: f"text {image}")
+        patcher_convert.start()
+        patcher_ocr.start()
+        self.addCleanup(patcher_convert.stop)
+        self.addCleanup(patcher_ocr.stop)
+
+    def test_fehler_nur_fuer_die_seite(self):
+        self.assertEqual(ocr_pdf_page("lohn.pdf", 1), (1, "text bild 1"))
+        with self.assertLogs(salary_import_tool._ocr_logger, level="WARNING") as logs:
+            self.assertEqual(ocr_pdf_page("lohn.pdf", 2), (2, ""))
+        self.assertIn("Seite 2", logs.output[0])
+
+    def test_seitenweise_ohne_pool(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Log-Datei des Tools nicht im Arbeitsverzeichnis anlegen
+            with mock.patch.object(logging, "FileHandler", lambda *args, **kwargs: logging.NullHandler()):
+                tool = SalaryImportTool(Path(tmpdir) / "salaries.db", Path(tmpdir) / "database.db", ocr_workers=1)
+            with mock.patch.object(salary_import_tool, "_get_ocr_pool") as get_pool, \
+                    self.assertLogs(salary_import_tool._ocr_logger, level="WARNING"):
+                texts = tool._ocr_uncached_pages(Path("lohn.pdf"), [1, 2, 3])
+        get_pool.assert_not_called()
+        self.assertEqual(texts, {1: "text bild 1", 2: "", 3: "text bild 3"})
+
+
+class TestOcrWorkerInPipeline(unittest.TestCase):
+    def test_pool_worker_ohne_eigenen_ocr_pool(self):
+        task = ImportTask("lohn.pdf", GEHALT)
+        with mock.patch.object(salary_import_tool, "create_import_tool") as create:
+            import_pipeline._work(task)
+            create.assert_called_once_with(ocr_workers=1)
+
+            # Ohne Pipeline-Pool (eine Datei) nutzt die OCR wieder alle Kerne
+            create.reset_mock()
+            import_pipeline.run_pipeline([task])
+            create.assert_any_call(ocr_workers=None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test für die adaptive OCR der Funk-Rechnungen (SQL/Scanner.py)
+Prüft die Erkennung des Einzelposten-Bereichs aus den Layout-Zeilen, die
+Plausibilitätsprüfung der Kennung-Summen (auch gegen die Gesamtzeile und bei
+Beträgen gleich dem Steuersatz), den Cache für Seiten vor dem Bereich und das
+unveränderte Zuschneiden des Textes
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "SQL"))
+
+import Scanner
+from connection_manager import get_connection_manager
+from ocr_cache import OcrCache
+from Scanner import (_funk_text_complete, _gesamt_line_totals, _kennung_sums_match_total,
+                     _kennung_totals_plausible, _parse_gesamt_kennung_lines, _region_bounds,
+                     _slice_relevant_text)
+
+RECHNUNG = """Taxi4Me Vermittlung GmbH
+Rechnung 25004496
+Einzelposten zu Rechnung 25004496
+Gesamt Kennung 1234 100,00 20,00 20,00 120,00
+Gesamt Kennung 5678 1.000,00 20,00 200,00 1.200,00
+Gesamt 1.100,00 1.320,00
+Bankverbindung"""
+
+
+class TestScannerFunk(unittest.TestCase):
+    def test_einzelposten_bereich(self):
+        lines = [("Taxi4Me Vermittlung GmbH", 10, 30), ("Einzelposten zu Rechnung 25004496", 200, 220),
+                 ("Gesamt Kennung 1234 100,00 20,00 120,00", 240, 260), ("Gesamt 100,00 120,00", 300, 320),
+                 ("Bankverbindung", 900, 920)]
+        self.assertEqual(_region_bounds(lines, 1754, in_region=False), ((200, 320), True))
+        # Bereich läuft auf der nächsten Seite weiter
+        self.assertEqual(_region_bounds(lines[2:3], 1754, in_region=True), ((0, 1754), False))
+        self.assertIsNone(_region_bounds(lines[:1], 1754, in_region=False))
+
+    def test_plausibilitaet(self):
+        entries = _parse_gesamt_kennung_lines(RECHNUNG)
+        self.assertEqual([(e["kennung"], e["netto"], e["brutto"]) for e in entries],
+                         [("1234", 100.0, 120.0), ("5678", 1000.0, 1200.0)])
+        self.assertTrue(_kennung_totals_plausible(entries))
+        # OCR-Fehler bei geringem DPI (126,00 statt 120,00) → erneut mit höherem DPI lesen
+        self.assertFalse(_kennung_totals_plausible([{"kennung": "1234", "netto": 100.0, "brutto": 126.0}]))
+        self.assertFalse(_kennung_totals_plausible([]))
+
+    def test_abgleich_mit_gesamtzeile(self):
+        entries = _parse_gesamt_kennung_lines(RECHNUNG)
+        self.assertEqual(_gesamt_line_totals(RECHNUNG), (1100.0, 1320.0))
+        self.assertTrue(_kennung_sums_match_total(entries, (1100.0, 1320.0)))
+        self.assertTrue(_funk_text_complete(RECHNUNG, True, []))
+        # Je Kennung plausibel, aber eine Ziffer falsch gelesen (1.000 → 1.080): Summe passt nicht
+        falsch = RECHNUNG.replace("1.000,00 20,00 200,00 1.200,00", "1.080,00 20,00 216,00 1.296,00")
+        self.assertTrue(_kennung_totals_plausible(_parse_gesamt_kennung_lines(falsch)))
+        self.assertFalse(_funk_text_complete(falsch, True, []))
+        # Gesamtzeile nicht lesbar → höheres DPI versuchen
+        self.assertFalse(_kennung_sums_match_total(entries, None))
+        # Tausender mit Leerzeichen
+        self.assertEqual(_gesamt_line_totals("Gesamt 1 100,00 1 320,00"), (1100.0, 1320.0))
+
+    def test_betrag_gleich_steuersatz(self):
+        # Kennung mit 20,00 € brutto: nur die Satz-Spalte (Position 2) entfällt, nicht jeder Betrag 20,00
+        text = ("Einzelposten zu Rechnung 25004497\n"
+                "Gesamt Kennung 1234 16,67 20,00 3,33 20,00\n"
+                "Gesamt Kennung 5678 100,00 20,00 20,00 120,00\n"
+                "Gesamt 116,67 20,00 23,33 140,00")
+        entries = _parse_gesamt_kennung_lines(text)
+        self.assertEqual([(e["kennung"], e["netto"], e["brutto"]) for e in entries],
+                         [("1234", 16.67, 20.0), ("5678", 100.0, 120.0)])
+        self.assertEqual(_gesamt_line_totals(text), (116.67, 140.0))
+        self.assertEqual(_gesamt_line_totals("Gesamt 16,67 3,33 20,00"), (16.67, 20.0))
+        self.assertTrue(_funk_text_complete(text, True, []))
+
+    def test_seiten_vor_dem_bereich_gecacht(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pdf = Path(tmpdir) / "funk.pdf"
+            pdf.write_bytes(b"%PDF-1.4 Funk-Rechnung")
+            cache = OcrCache(os.path.join(tmpdir, "ocr_cache.db"))
+            seiten = {1: None, 2: (RECHNUNG, Scanner.FUNK_LAYOUT_DPI, True)}
+            # OCR-Abhängigkeiten (pdf2image, pytesseract) werden nicht gebraucht, nur ihr Vorhandensein geprüft
+            with mock.patch.object(Scanner, "convert_from_path", mock.Mock()), \
+                    mock.patch.object(Scanner, "pytesseract", mock.Mock()), \
+                    mock.patch.object(Scanner, "pdfinfo_from_path", return_value={"Pages": 3}), \
+                    mock.patch.object(Scanner, "get_ocr_cache", return_value=cache), \
+                    mock.patch.object(Scanner, "_ocr_funk_page",
+                                      side_effect=lambda path, page, *args, **kwargs: seiten[page]) as ocr_page:
+                self.assertEqual(Scanner._ocr_funk_invoice(pdf), RECHNUNG)
+                self.assertEqual([c.args[1] for c in ocr_page.call_args_list], [1, 2])
+                ocr_page.reset_mock()
+                self.assertEqual(Scanner._ocr_funk_invoice(pdf), RECHNUNG)
+                ocr_page.assert_not_called()
+            get_connection_manager().close_thread_connections()
+
+    def test_zuschnitt(self):
+        sliced = _slice_relevant_text(RECHNUNG)
+        self.assertTrue(sliced.startswith("Einzelposten zu Rechnung"))
+        self.assertNotIn("Gesamt 1.100,00", sliced)
+        self.assertEqual(_slice_relevant_text("ohne Marker"), "ohne Marker")
+
+
+if __name__ == "__main__":
+    unittest.main()
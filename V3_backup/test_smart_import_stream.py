@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test für den Streaming-Import von smart_import
+Prüft blockweises Einlesen, Duplikaterkennung über import_key (je Jahr), typisierte Beträge, den
+Altbestand ohne Jahr, die Formaterkennung am Dateianfang und die Fahrerliste je Datei
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Projektpfad und SQL-Ordner hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "SQL"))
+
+from platform_reports import legacy_week_tables, migrate_legacy_tables
+import smart_import
+from smart_import import importiere_csv_stream
+
+HEADER = "Fahrzeug;Fahrer;Fahrername;Abschluss;Buchungsart;Umsatz;Trinkgeld;Bargeld\n"
+ZEILEN = [
+    "W135CTX;1;Max Muster;A1;Bar;10,50;0;10,50\n",
+    "W135CTX;1;Max Muster;A1;Bar;10,50;0;10,50\n",   # identische zweite Fahrt
+    "W135CTX;1;Max Muster;A1;Karte;22,00;2;0\n",
+    "W132CTX;2;Erika Muster;A2;Karte;15,00;0;0\n",
+    "W132CTX;2;Erika Muster;A2;Bar;8,00;0;8\n",
+]
+
+
+class TestSmartImportStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(":memory:")
+
+    def tearDown(self):
+        self.conn.close()
+        self.tmp.cleanup()
+
+    def _csv(self, name, zeilen):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(HEADER)
+            f.writelines(zeilen)
+        return path
+
+    def _anzahl(self, tabelle="report_KW31"):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {tabelle}").fetchone()[0]
+
+    def test_blockweise_und_erneuter_import(self):
+        path = self._csv("40100_kw31.csv", ZEILEN)
+        self.assertEqual(importiere_csv_stream(path, self.conn, "40100", "31", 2025, chunksize=2), 5)
+        self.assertEqual(self._anzahl(), 5)
+
+        # Derselbe Export erneut (andere Blockgröße) fügt nichts hinzu
+        self.assertEqual(importiere_csv_stream(path, self.conn, "40100", "31", 2025, chunksize=3), 0)
+        self.assertEqual(self._anzahl(), 5)
+
+        # Erweiterter Export: nur die neue Buchung kommt hinzu, auch im selben Abschluss
+        neu = self._csv("40100_kw31_neu.csv", ZEILEN + ["W135CTX;1;Max Muster;A1;Bar;10,50;0;10,50\n"])
+        self.assertEqual(importiere_csv_stream(neu, self.conn, "40100", "31", 2025, chunksize=2), 1)
+        self.assertEqual(self._anzahl(), 6)
+
+        umsatz = self.conn.execute("SELECT SUM(Umsatz) FROM report_KW31").fetchone()[0]
+        self.assertAlmostEqual(umsatz, 10.5 * 3 + 22.0 + 15.0 + 8.0)
+
+    def test_betraege_als_zahlen(self):
+        path = self._csv("40100_kw31.csv", ZEILEN)
+        importiere_csv_stream(path, self.conn, "40100", "31", 2025)
+        typen = self.conn.execute(
+            "SELECT DISTINCT typeof(Umsatz), typeof(Trinkgeld), typeof(Bargeld) FROM report_KW31"
+        ).fetchall()
+        self.assertEqual(typen, [("real", "real", "real")])
+        # Summen mit Filter direkt in SQL, ohne Nachbearbeitung der Werte
+        summe = self.conn.execute(
+            "SELECT SUM(Umsatz) FROM report_KW31 WHERE Umsatz BETWEEN -250 AND 250 AND Buchungsart NOT LIKE '%Bar%'"
+        ).fetchone()[0]
+        self.assertAlmostEqual(summe, 22.0 + 15.0)
+
+    def test_altbestand_mit_text_betraegen(self):
+        # Woche aus einem älteren Import: Beträge als Text gespeichert
+        self.conn.execute("""
+            CREATE TABLE report_KW31 (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                Fahrzeug TEXT, Fahrer TEXT, Fahrername TEXT, Abschluss TEXT, Buchungsart TEXT,
+                Zahlungsmittel TEXT, Belegtext TEXT, Fahrtkosten TEXT, Trinkgeld TEXT, Umsatz TEXT,
+                Bargeld TEXT, Auftragsart TEXT, Status TEXT, week TEXT
+            )
+        """)
+        self.conn.execute(
+            "INSERT INTO report_KW31 (Fahrzeug, Fahrer, Fahrername, Abschluss, Buchungsart, Umsatz, Trinkgeld, Bargeld, week) "
+            "VALUES ('W135CTX', '1', 'Max Muster', 'A1', 'Karte', '22,00', '2', '0', 'KW31')"
+        )
+        path = self._csv("40100_kw31.csv", ZEILEN)
+        # Altbestand hat kein Jahr: er bekommt nicht das Jahr der importierten Datei
+        self.assertEqual(importiere_csv_stream(path, self.conn, "40100", "31", 2026), 5)
+        typen = self.conn.execute("SELECT DISTINCT typeof(Umsatz) FROM report_KW31").fetchall()
+        self.assertEqual(typen, [("real",)])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM report_KW31 WHERE year IS NULL").fetchone()[0], 1)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0], 5)
+        self.assertEqual(legacy_week_tables(self.conn), {31: "report_KW31"})
+
+        # Die Migration vergibt das ausdrücklich angegebene Jahr
+        self.assertEqual(migrate_legacy_tables(self.conn, "40100", 2025), {"report_KW31": 1})
+        jahre = self.conn.execute("SELECT year, COUNT(*) FROM reports GROUP BY year ORDER BY year").fetchall()
+        self.assertEqual(jahre, [(2025, 1), (2026, 5)])
+        self.assertEqual(legacy_week_tables(self.conn), {})
+
+    def test_jahrestabelle_parallel(self):
+        path = self._csv("40100_kw31.csv", ZEILEN)
+        importiere_csv_stream(path, self.conn, "40100", "31", 2025, chunksize=2)
+        importiere_csv_stream(path, self.conn, "40100", "31", 2025, chunksize=2)
+        count = self.conn.execute("SELECT COUNT(*) FROM reports WHERE year = 2025 AND kw = 31").fetchone()[0]
+        self.assertEqual(count, 5)
+
+        # Die nachträgliche Migration kopiert die vom Import beschriebene Woche nicht erneut
+        self.assertEqual(migrate_legacy_tables(self.conn, "40100", 2025), {})
+        count = self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+        self.assertEqual(count, 5)
+
+    def test_altbestand_ohne_import_key(self):
+        # Tabelle aus der Zeit vor import_key mit bereits importierter Datei
+        self.conn.execute("""
+            CREATE TABLE report_KW31 (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                Fahrzeug TEXT, Fahrer TEXT, Fahrername TEXT, Abschluss TEXT, Buchungsart TEXT,
+                Zahlungsmittel TEXT, Belegtext TEXT, Fahrtkosten REAL, Trinkgeld REAL, Umsatz REAL,
+                Bargeld REAL, Auftragsart TEXT, Status TEXT, week TEXT
+            )
+        """)
+        self.conn.executemany(
+            "INSERT INTO report_KW31 (Fahrzeug, Fahrer, Fahrername, Abschluss, Buchungsart, Umsatz, Trinkgeld, Bargeld, week) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'KW31')",
+            [("W135CTX", 1, "Max Muster", "A1", "Bar", 10.5, 0, 10.5),
+             ("W135CTX", 1, "Max Muster", "A1", "Bar", 10.5, 0, 10.5)],
+        )
+        path = self._csv("40100_kw31.csv", ZEILEN)
+        self.assertEqual(importiere_csv_stream(path, self.conn, "40100", "31", 2025), 5)
+        self.assertEqual(self._anzahl(), 7)
+
+        # Migration mit demselben Jahr: die zwei Altzeilen sind bereits importiert und entfallen
+        self.assertEqual(migrate_legacy_tables(self.conn, "40100", 2025), {"report_KW31": 0})
+        self.assertEqual(self._anzahl(), 5)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0], 5)
+
+    def test_gleiche_kw_in_zwei_jahren(self):
+        path = self._csv("40100_kw31.csv", ZEILEN)
+        self.assertEqual(importiere_csv_stream(path, self.conn, "40100", "31", 2025), 5)
+        # KW31 des Folgejahres mit denselben Buchungen ist kein Duplikat
+        self.assertEqual(importiere_csv_stream(path, self.conn, "40100", "31", 2026), 5)
+        self.assertEqual(importiere_csv_stream(path, self.conn, "40100", "31", 2026), 0)
+        jahre = self.conn.execute(
+            "SELECT year, COUNT(*) FROM reports WHERE kw = 31 GROUP BY year ORDER BY year"
+        ).fetchall()
+        self.assertEqual(jahre, [(2025, 5), (2026, 5)])
+
+        # Uber: Duplikatschlüssel nur aus den Namen
+        uber = os.path.join(self.tmp.name, "uber_kw31.csv")
+        with open(uber, "w", encoding="utf-8") as f:
+            f.write("Vorname des Fahrers,Nachname des Fahrers,Gesamtumsätze,Eingenommenes Bargeld\n")
+            f.write("Max,Muster,100,10\n")
+        uber_conn = sqlite3.connect(":memory:")
+        self.addCleanup(uber_conn.close)
+        self.assertEqual(importiere_csv_stream(uber, uber_conn, "uber", "31", 2025), 1)
+        self.assertEqual(importiere_csv_stream(uber, uber_conn, "uber", "31", 2026), 1)
+        self.assertEqual(importiere_csv_stream(uber, uber_conn, "uber", "31", 2026), 0)
+        self.assertEqual(uber_conn.execute("SELECT year FROM reports ORDER BY year").fetchall(), [(2025,), (2026,)])
+
+    def test_latin1_hinter_dem_dateianfang(self):
+        # Nur der Dateianfang wird geprüft; ein späteres latin-1-Zeichen führt zur Wiederholung mit latin-1
+        path = os.path.join(self.tmp.name, "40100_kw31.csv")
+        with open(path, "wb") as f:
+            f.write(HEADER.encode("utf-8"))
+            f.write("".join(ZEILEN).encode("utf-8"))
+            f.write("W132CTX;2;Jürgen Muster;A3;Bar;5,00;0;5\n".encode("latin-1"))
+        with mock.patch.object(smart_import, "HEADER_BYTES", len(HEADER)):
+            self.assertEqual(smart_import.erkenne_csv_format(path), (";", "utf-8"))
+            self.assertEqual(importiere_csv_stream(path, self.conn, "40100", "31", 2025, chunksize=2), 6)
+        self.assertEqual(self._anzahl(), 6)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0], 6)
+        self.assertEqual(self.conn.execute("SELECT Fahrername FROM report_KW31 WHERE Abschluss = 'A3'").fetchone(),
+                         ("Jürgen Muster",))
+
+    def test_fahrerliste_einmal_je_datei(self):
+        bolt = os.path.join(self.tmp.name, "bolt_kw31.csv")
+        with open(bolt, "w", encoding="utf-8") as f:
+            f.write("Driver,Net earnings|€,Collected cash|€\n")
+            f.writelines(f"Fahrer {i},{i}0,0\n" for i in range(5))
+        with mock.patch.object(smart_import, "lade_fahrerliste", return_value=["Fahrer 1"]) as lade:
+            self.assertEqual(importiere_csv_stream(bolt, self.conn, "bolt", "31", 2025, chunksize=2), 5)
+        lade.assert_called_once_with()
+        # 'reports' wird aus den Blöcken befüllt (ohne Rücklesen der Wochentabelle)
+        self.assertEqual(self.conn.execute("SELECT SUM(net_earnings) FROM reports").fetchone()[0], 100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test für die Taxi-Wochensummen aus SQLite
+Prüft die Summen gegenüber der bisherigen pandas-Berechnung (40100, 31300),
+die Indexnutzung über fahrzeug_nummer, das Nachfüllen neuer Zeilen, das
+verzögerte Laden der Einzelbuchungen und dass die Lesefunktionen das Schema
+nicht ändern
+"""
+
+import sqlite3
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from taxi_totals import VEHICLE_DIGITS_COLUMN, ensure_vehicle_digits, load_taxi_rows, load_taxi_totals, vehicle_digits
+
+
+class TestTaxiTotals(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute('CREATE TABLE "report_KW12" (id INTEGER PRIMARY KEY, Fahrzeug TEXT, Buchungsart TEXT, '
+                          'Umsatz REAL, Trinkgeld REAL, Bargeld REAL, Gesamt REAL)')
+        self.conn.executemany(
+            'INSERT INTO "report_KW12" (Fahrzeug, Buchungsart, Umsatz, Trinkgeld, Bargeld, Gesamt) VALUES (?, ?, ?, ?, ?, ?)',
+            [
+                ("W135CTX", "Karte", 100.0, 5.0, 0.0, 105.0),
+                ("W135CTX", "Bar", 50.0, 2.0, 50.0, 52.0),
+                ("W135CTX", "Karte", 300.0, 10.0, 0.0, 310.0),   # außerhalb ±250 €
+                ("135", "Bar", 40.0, 0.0, 40.0, 40.0),
+                ("W1350X", "Karte", 80.0, 0.0, 0.0, 80.0),       # früher per LIKE '%135%' mitgezählt
+                ("W999XX", "Karte", 70.0, 0.0, 0.0, 70.0),
+            ],
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_summen_40100(self):
+        totals = load_taxi_totals(self.conn, "40100", "report_KW12", vehicle_digits("W135CTX"))
+        self.assertEqual(totals.rows, 4)
+        self.assertAlmostEqual(totals.umsatz, 190.0)
+        self.assertAlmostEqual(totals.trinkgeld_gesamt, 17.0)
+        self.assertAlmostEqual(totals.trinkgeld, 5.0)
+        self.assertAlmostEqual(totals.bargeld, 90.0)
+        self.assertAlmostEqual(totals.echter_umsatz, 173.0)
+        self.assertAlmostEqual(totals.restbetrag, 173.0 / 2 - 90.0 + 5.0)
+
+    def test_summen_31300(self):
+        totals = load_taxi_totals(self.conn, "31300", "report_KW12", "135")
+        self.assertAlmostEqual(totals.umsatz, 197.0)
+        self.assertAlmostEqual(totals.bargeld, 92.0)
+        self.assertIsNone(load_taxi_totals(self.conn, "31300", "report_KW12", "4711"))
+        self.assertIsNone(load_taxi_totals(self.conn, "31300", "report_KW12", ""))
+
+    def test_index_und_nachfuellen(self):
+        self.assertEqual(ensure_vehicle_digits(self.conn, "report_KW12"), 6)
+        plan = " ".join(row[-1] for row in self.conn.execute(
+            f'EXPLAIN QUERY PLAN SELECT COUNT(*) FROM "report_KW12" WHERE {VEHICLE_DIGITS_COLUMN} = ?', ("135",)))
+        self.assertIn(f"idx_report_KW12_{VEHICLE_DIGITS_COLUMN}", plan)
+
+        # Nachimport: nur die neue Zeile wird gefüllt
+        self.conn.execute('INSERT INTO "report_KW12" (Fahrzeug, Buchungsart, Umsatz) VALUES (?, ?, ?)',
+                          ("W135CTX", "Karte", 10.0))
+        self.assertEqual(ensure_vehicle_digits(self.conn, "report_KW12"), 1)
+        self.assertEqual(ensure_vehicle_digits(self.conn, "report_KW12"), 0)
+        self.assertEqual(load_taxi_totals(self.conn, "40100", "report_KW12", "135").rows, 5)
+
+    def test_einzelbuchungen_fuer_details(self):
+        rows = load_taxi_rows(self.conn, "report_KW12", "135")
+        self.assertEqual(list(rows["Umsatz"]), [100.0, 50.0, 300.0, 40.0])
+        ensure_vehicle_digits(self.conn, "report_KW12")
+        rows = load_taxi_rows(self.conn, "report_KW12", "135")
+        self.assertEqual(list(rows["Umsatz"]), [100.0, 50.0, 300.0, 40.0])
+        self.assertTrue((rows[VEHICLE_DIGITS_COLUMN] == "135").all())
+
+    def test_lesen_ohne_schemaaenderung(self):
+        self.conn.commit()
+        schema = self.conn.execute("SELECT sql FROM sqlite_master").fetchall()
+        vorher = load_taxi_totals(self.conn, "40100", "report_KW12", "135")
+        self.assertEqual(self.conn.execute("SELECT sql FROM sqlite_master").fetchall(), schema)
+        self.assertFalse(self.conn.in_transaction)
+
+        # Nach der Migration gleiches Ergebnis; nicht gefüllte Zeilen zählen weiter mit
+        ensure_vehicle_digits(self.conn, "report_KW12")
+        self.assertEqual(load_taxi_totals(self.conn, "40100", "report_KW12", "135"), vorher)
+        self.conn.execute(f'UPDATE "report_KW12" SET {VEHICLE_DIGITS_COLUMN} = NULL WHERE Fahrzeug = ?', ("135",))
+        self.assertEqual(load_taxi_totals(self.conn, "40100", "report_KW12", "135"), vorher)
+
+    def test_text_betraege_altbestand(self):
+        self.conn.execute('CREATE TABLE "report_KW13" (Fahrzeug TEXT, Buchungsart TEXT, Gesamt TEXT, Trinkgeld TEXT)')
+        self.conn.executemany('INSERT INTO "report_KW13" VALUES (?, ?, ?, ?)',
+                              [("W135CTX", "Karte", "100,50", "1,50"), ("W135CTX", "Bar", "20", ""),
+                               ("W135CTX", "Karte", "300,00", "0")])
+        totals = load_taxi_totals(self.conn, "31300", "report_KW13", "135")
+        self.assertAlmostEqual(totals.umsatz, 120.5)
+        self.assertAlmostEqual(totals.trinkgeld_gesamt, 1.5)
+        self.assertAlmostEqual(totals.bargeld, 20.0)
+        self.assertEqual(self.conn.execute('SELECT typeof(Gesamt) FROM "report_KW13"').fetchone()[0], "text")
+
+    def test_spalte_parallel_angelegt(self):
+        # Ein zweiter Import hat die Spalte zwischen Prüfung und ALTER TABLE angelegt
+        self.conn.execute(f'ALTER TABLE "report_KW12" ADD COLUMN {VEHICLE_DIGITS_COLUMN} TEXT')
+        with mock.patch("taxi_totals._columns", side_effect=[["Fahrzeug"], ["Fahrzeug", VEHICLE_DIGITS_COLUMN]]):
+            self.assertEqual(ensure_vehicle_digits(self.conn, "report_KW12"), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test für die zentralen Revenue-/Running-Costs-Tabellen
+Prüft Migration der Fahrzeugtabellen, Trigger-Spiegelung (auch nach DROP und
+Neuanlage einer Fahrzeugtabelle), die Kalenderabfrage,
+die inkrementell gepflegten Wochensummen und das Nachrechnen veralteter Wochen
+"""
+
+import sys
+import sqlite3
+import unittest
+from pathlib import Path
+
+# Projektpfad hinzufügen
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from vehicle_ledger import (
+    REVENUE, RUNNING_COSTS, ensure_synced, ensure_weekly_summary, rebuild_weekly_summary,
+    refresh_weekly_summary, summary_weeks, week_summary, weeks_with_data,
+)
+
+
+def _create_revenue_table(conn, plate):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS "{plate}" (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cw INTEGER, deal TEXT, driver TEXT, total REAL, taxed REAL, income REAL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+class TestVehicleLedger(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        _create_revenue_table(self.conn, "W135CTX")
+        self.conn.executemany(
+            'INSERT INTO "W135CTX" (cw, deal, driver, total, taxed, income, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(10, "P", "Max Muster", 1000.0, 800.0, 400.0, "2025-03-10 12:00:00"),
+             (11, "P", "Max Muster", 900.0, 700.0, 350.0, "2025-03-17 12:00:00"),
+             (52, "%", "Max Muster", 500.0, 400.0, 200.0, "2026-01-05 12:00:00")],
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_migration_und_jahr(self):
+        self.assertEqual(ensure_synced(self.conn, REVENUE), 3)
+        self.assertEqual(ensure_synced(self.conn, REVENUE), 0)
+        self.assertEqual(weeks_with_data(self.conn, REVENUE, 2025), {"W135CTX": {10, 11, 52}})
+        self.assertEqual(weeks_with_data(self.conn, REVENUE, 2025, 10), {"W135CTX": {10}})
+        self.assertEqual(weeks_with_data(self.conn, REVENUE, 2026), {})
+
+    def test_trigger_spiegeln_schreibzugriffe(self):
+        ensure_synced(self.conn, REVENUE)
+        self.conn.execute('DELETE FROM "W135CTX" WHERE cw = 11')
+        self.conn.execute(
+            'INSERT INTO "W135CTX" (cw, deal, driver, total, taxed, income, timestamp) VALUES (12, "P", "Max", 1.0, 1.0, 1.0, "2025-03-24 08:00:00")'
+        )
+        self.conn.execute('UPDATE "W135CTX" SET total = 1200.0 WHERE cw = 10')
+        rows = self.conn.execute(
+            f"SELECT cw, total FROM {REVENUE} WHERE license_plate = 'W135CTX' AND year = 2025 ORDER BY cw"
+        ).fetchall()
+        self.assertEqual(rows, [(10, 1200.0), (12, 1.0), (52, 500.0)])
+
+    def test_geloeschte_und_neu_angelegte_tabelle(self):
+        ensure_synced(self.conn, REVENUE)
+        # Neu angelegt (z.B. CREATE TABLE IF NOT EXISTS nach einem DROP): Trigger fehlen, ledger_synced nicht
+        self.conn.execute('DROP TABLE "W135CTX"')
+        _create_revenue_table(self.conn, "W135CTX")
+        self.conn.execute(
+            'INSERT INTO "W135CTX" (cw, deal, driver, total, taxed, income, timestamp) VALUES (20, "P", "Max", 300.0, 0, 0, "2025-05-12 12:00:00")'
+        )
+        self.assertEqual(ensure_synced(self.conn, REVENUE), 1)
+        self.assertEqual(weeks_with_data(self.conn, REVENUE, 2025), {"W135CTX": {20}})
+        self.conn.execute('INSERT INTO "W135CTX" (cw, total, timestamp) VALUES (21, 1.0, "2025-05-19 12:00:00")')
+        self.assertEqual(weeks_with_data(self.conn, REVENUE, 2025), {"W135CTX": {20, 21}})
+
+        # Gelöscht: zentrale Zeilen und Vermerk verschwinden
+        self.conn.execute('DROP TABLE "W135CTX"')
+        ensure_synced(self.conn, REVENUE)
+        self.assertEqual(self.conn.execute(f"SELECT COUNT(*) FROM {REVENUE}").fetchone()[0], 0)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM ledger_synced").fetchone()[0], 0)
+
+    def test_neue_fahrzeugtabelle_und_fehlende_spalten(self):
+        ensure_synced(self.conn, RUNNING_COSTS)
+        self.conn.execute("""
+            CREATE TABLE "W132CTX" (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, cw INTEGER, amount REAL, category TEXT
+            )
+        """)
+        self.conn.execute('INSERT INTO "W132CTX" (cw, amount, category) VALUES (5, 20.0, "Parking")')
+        self.assertEqual(ensure_synced(self.conn, RUNNING_COSTS), 1)
+        plan = " ".join(str(r) for r in self.conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT cw FROM {RUNNING_COSTS} WHERE license_plate = 'W132CTX' AND year = 2025 AND cw = 5"
+        ))
+        self.assertIn("idx_running_costs_plate_year_cw", plan)
+
+
+class TestWeeklySummary(unittest.TestCase):
+    def setUp(self):
+        self.revenue = sqlite3.connect(":memory:")
+        self.costs = sqlite3.connect(":memory:")
+        _create_revenue_table(self.revenue, "W135CTX")
+        self.revenue.executemany(
+            'INSERT INTO "W135CTX" (cw, deal, driver, total, taxed, income, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(10, "P", "Max Muster", 1000.0, 800.0, 400.0, "2025-03-10 12:00:00"),
+             (10, "%", "Erika Muster", 300.0, 200.0, 100.0, "2025-03-10 13:00:00")],
+        )
+        self.costs.execute("""
+            CREATE TABLE "W135CTX" (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, cw INTEGER, amount REAL,
+                category TEXT, details TEXT, timestamp DATETIME
+            )
+        """)
+        self.costs.executemany(
+            'INSERT INTO "W135CTX" (cw, amount, category, details, timestamp) VALUES (?, ?, ?, ?, ?)',
+            [(10, 50.0, "Gas", "", "2025-03-10 12:00:00"),
+             (11, 20.0, "Parking", "", "2025-03-17 12:00:00")],
+        )
+        ensure_weekly_summary(self.revenue, self.costs)
+
+    def tearDown(self):
+        self.revenue.close()
+        self.costs.close()
+
+    def test_aufbau(self):
+        self.assertEqual(summary_weeks(self.revenue, 2025), {"W135CTX": {10, 11}})
+        self.assertEqual(week_summary(self.revenue, "W135CTX", 2025, 10, "Max Muster"),
+                         {"revenue": 1000.0, "running_costs": 50.0, "net_income": 950.0})
+        # Woche nur mit Kosten
+        self.assertEqual(week_summary(self.revenue, "W135CTX", 2025, 11, "Max Muster"),
+                         {"revenue": 0.0, "running_costs": 20.0, "net_income": -20.0})
+
+    def test_inkrementell_wie_neuaufbau(self):
+        self.revenue.execute('DELETE FROM "W135CTX" WHERE driver = ?', ("Erika Muster",))
+        self.costs.execute('DELETE FROM "W135CTX" WHERE cw = 11')
+        self.costs.execute(
+            'INSERT INTO "W135CTX" (cw, amount, category, details, timestamp) VALUES (10, 25.0, "Parking", "", "2025-03-11 09:00:00")'
+        )
+        refresh_weekly_summary(self.revenue, self.costs, "W135CTX", 10)
+        refresh_weekly_summary(self.revenue, self.costs, "W135CTX", 11)
+        query = "SELECT license_plate, driver, year, cw, revenue, running_costs, net_income FROM weekly_summary ORDER BY cw, driver"
+        incremental = self.revenue.execute(query).fetchall()
+        rebuild_weekly_summary(self.revenue, self.costs)
+        self.assertEqual(incremental, self.revenue.execute(query).fetchall())
+        self.assertEqual(incremental, [("W135CTX", "Max Muster", 2025, 10, 1000.0, 75.0, 925.0)])
+
+
+    def test_veraltete_wochen_beim_lesen_nachrechnen(self):
+        # Speichern ohne (bzw. mit fehlgeschlagenem) update_weekly_summary
+        self.revenue.execute(
+            'INSERT INTO "W135CTX" (cw, deal, driver, total, taxed, income, timestamp) VALUES (12, "P", "Max Muster", 700.0, 0, 0, "2025-03-24 12:00:00")'
+        )
+        self.revenue.execute('UPDATE "W135CTX" SET total = 1100.0 WHERE cw = 10 AND driver = "Max Muster"')
+        self.costs.execute('DELETE FROM "W135CTX" WHERE cw = 11')
+        self.revenue.commit()
+        self.costs.commit()
+
+        ensure_weekly_summary(self.revenue, self.costs)
+        self.assertEqual(summary_weeks(self.revenue, 2025), {"W135CTX": {10, 12}})
+        self.assertEqual(week_summary(self.revenue, "W135CTX", 2025, 10, "Max Muster"),
+                         {"revenue": 1100.0, "running_costs": 50.0, "net_income": 1050.0})
+        query = "SELECT license_plate, driver, year, cw, revenue, running_costs, net_income FROM weekly_summary ORDER BY cw, driver"
+        nachgerechnet = self.revenue.execute(query).fetchall()
+        rebuild_weekly_summary(self.revenue, self.costs)
+        self.assertEqual(nachgerechnet, self.revenue.execute(query).fetchall())
+        self.assertEqual(self.revenue.execute("SELECT COUNT(*) FROM weekly_summary_stale").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,589 @@
+"""
+Zentrale Revenue-/Running-Costs-Tabellen je Datenbank.
+
+revenue.db und running_costs.db enthalten historisch eine Tabelle pro
+Kennzeichen. Für Übersichten (Kalenderansicht, Wochensummen) wird daraus je
+Datenbank eine gemeinsame Tabelle 'revenue' bzw. 'running_costs' mit Index auf
+(license_plate, year, cw) geführt.
+
+Die Fahrzeugtabellen bleiben die Schreibquelle der bestehenden Speicherpfade;
+SQLite-Trigger spiegeln jedes INSERT/UPDATE/DELETE sofort in die zentrale
+Tabelle. Die Migration (einmalig bzw. für neu oder nach einem DROP wieder
+angelegte Fahrzeugtabellen) legt die Trigger an und übernimmt den Bestand;
+zentrale Zeilen gelöschter Fahrzeugtabellen entfernt sie:
+    python vehicle_ledger.py
+
+Zusätzlich hält revenue.db die materialisierte Tabelle 'weekly_summary'
+(Umsatz, laufende Kosten, Netto je Fahrzeug/Fahrer/Jahr/KW). Sie wird von den
+Speicher- und Löschpfaden je (Kennzeichen, KW) nachgeführt; Kalender und
+Schnellabrechnung lesen nur noch diese Summen.
+
+Das Speichern einer Abrechnung (billing_store.billing_transaction, revenue.db
+und running_costs.db per ATTACH eingebunden) legt das Abrechnungsjahr in der
+Spalte 'year' der Fahrzeugtabelle ab (prepare_vehicle_table, billing_year)
+und rechnet die Wochensumme in derselben Transaktion nach
+(refresh_billing_week). Nur Zeilen ohne gespeichertes Jahr (Bestand vor der
+Spalte) erhalten das Jahr weiterhin aus dem Speicher-Zeitstempel.
+
+Pfade, die nach ihrem Commit über eigene Verbindungen nachführen
+(update_weekly_summary), sichern Trigger auf den zentralen Tabellen ab: sie
+vermerken jede geänderte (Kennzeichen, KW) in derselben Transaktion in
+'weekly_summary_stale'. ensure_weekly_summary rechnet diese Wochen vor dem
+Lesen nach; eine fehlgeschlagene oder vergessene Aktualisierung bleibt so
+nicht stehen.
+"""
+
+import logging
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from connection_manager import connect
+
+logger = logging.getLogger(__name__)
+
+REVENUE = "revenue"
+RUNNING_COSTS = "running_costs"
+WEEKLY_SUMMARY = "weekly_summary"
+SUMMARY_STALE = "weekly_summary_stale"
+
+LEDGER_DB_FILES: Dict[str, str] = {
+    REVENUE: "revenue.db",
+    RUNNING_COSTS: "running_costs.db",
+}
+
+# Nutzdaten-Spalten der Fahrzeugtabellen je Ledger
+LEDGER_COLUMNS: Dict[str, List[str]] = {
+    REVENUE: ["cw", "deal", "driver", "total", "taxed", "income", "timestamp"],
+    RUNNING_COSTS: ["cw", "amount", "category", "details", "timestamp"],
+}
+
+_SCHEMA: Dict[str, str] = {
+    REVENUE: """
+        CREATE TABLE IF NOT EXISTS revenue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            license_plate TEXT NOT NULL,
+            source_id INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            cw INTEGER,
+            deal TEXT,
+            driver TEXT,
+            total REAL,
+            taxed REAL,
+            income REAL,
+            timestamp DATETIME,
+            UNIQUE (license_plate, source_id)
+        )
+    """,
+    RUNNING_COSTS: """
+        CREATE TABLE IF NOT EXISTS running_costs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            license_plate TEXT NOT NULL,
+            source_id INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            cw INTEGER,
+            amount REAL,
+            category TEXT,
+            details TEXT,
+            timestamp DATETIME,
+            UNIQUE (license_plate, source_id)
+        )
+    """,
+}
+
+# Reservierte Tabellennamen, die keine Fahrzeugtabellen sind
+_INTERNAL_TABLES = {REVENUE, RUNNING_COSTS, WEEKLY_SUMMARY, SUMMARY_STALE, "ledger_synced"}
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def billing_year(cw: int, today: Optional[date] = None) -> int:
+    """Abrechnungsjahr einer KW beim Speichern: das ISO-Jahr von heute, für eine
+    KW nach der laufenden (z.B. KW 52 im Januar abgerechnet) das Vorjahr."""
+    iso_year, iso_week, _ = (today or date.today()).isocalendar()
+    return iso_year - 1 if int(cw) > iso_week else iso_year
+
+
+def _year_expr(prefix: str, available: Set[str]) -> str:
+    """Gespeichertes Abrechnungsjahr (Spalte year); für Bestandszeilen ohne Jahr
+    aus dem Speicher-Zeitstempel, wobei KW 50-53, die im Januar gespeichert
+    wurden, zum Vorjahr gehören. Ohne Zeitstempel: aktuelles Jahr."""
+    if "timestamp" not in available:
+        legacy = "CAST(strftime('%Y', 'now') AS INTEGER)"
+    else:
+        ts = f"{prefix}timestamp"
+        cw = f"{prefix}cw"
+        legacy = (
+            f"(CASE WHEN {ts} IS NULL OR strftime('%Y', {ts}) IS NULL "
+            f"THEN CAST(strftime('%Y', 'now') AS INTEGER) "
+            f"WHEN {cw} >= 50 AND strftime('%m', {ts}) = '01' "
+            f"THEN CAST(strftime('%Y', {ts}) AS INTEGER) - 1 "
+            f"ELSE CAST(strftime('%Y', {ts}) AS INTEGER) END)"
+        )
+    if "year" not in available:
+        return legacy
+    return f"COALESCE({prefix}year, {legacy})"
+
+
+def ensure_ledger_table(conn: sqlite3.Connection, kind: str, schema: str = "main"):
+    """Legt die zentrale Tabelle samt Indizes an (idempotent); schema z.B. ein ATTACH-Alias."""
+    conn.execute(_SCHEMA[kind].replace(f"EXISTS {kind} (", f"EXISTS {schema}.{kind} ("))
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_{kind}_plate_year_cw ON {kind} (license_plate, year, cw)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_{kind}_year_cw ON {kind} (year, cw)")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.ledger_synced (
+            license_plate TEXT PRIMARY KEY,
+            synced_at TEXT NOT NULL
+        )
+    """)
+    _ensure_stale_triggers(conn, kind, schema)
+
+
+def _ensure_stale_triggers(conn: sqlite3.Connection, kind: str, schema: str = "main"):
+    """Vermerkt jede geänderte (Kennzeichen, KW) der zentralen Tabelle für die Wochensummen."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.{SUMMARY_STALE} (
+            license_plate TEXT NOT NULL,
+            cw INTEGER NOT NULL,
+            PRIMARY KEY (license_plate, cw)
+        )
+    """)
+    for event, refs in (("INSERT", ("NEW",)), ("UPDATE", ("OLD", "NEW")), ("DELETE", ("OLD",))):
+        body = "".join(
+            f"INSERT OR IGNORE INTO {SUMMARY_STALE} (license_plate, cw) "
+            f"SELECT {ref}.license_plate, {ref}.cw WHERE {ref}.cw IS NOT NULL;\n"
+            for ref in refs
+        )
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {schema}.{_quote(f'trg_{kind}_stale_{event.lower()}')}
+            AFTER {event} ON {kind}
+            BEGIN
+                {body}
+            END
+        """)
+
+
+def _vehicle_tables(conn: sqlite3.Connection, schema: str = "main") -> List[str]:
+    cursor = conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+    return [row[0] for row in cursor.fetchall() if row[0] not in _INTERNAL_TABLES]
+
+
+def _source_expr(kind: str, available: Set[str], prefix: str) -> List[str]:
+    return [f"{prefix}{_quote(c)}" if c in available else "NULL" for c in LEDGER_COLUMNS[kind]]
+
+
+def _table_columns(conn: sqlite3.Connection, plate: str, schema: str = "main") -> Set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({_quote(plate)})")}
+
+
+def sync_vehicle_table(conn: sqlite3.Connection, kind: str, plate: str, schema: str = "main") -> int:
+    """Installiert Spiegel-Trigger für eine Fahrzeugtabelle und übernimmt deren Bestand.
+
+    Bestehende Trigger werden ersetzt, damit eine später ergänzte year-Spalte
+    in die Spiegelung eingeht.
+    """
+    available = _table_columns(conn, plate, schema)
+    if "cw" not in available:
+        return 0
+
+    target_cols = ", ".join(["license_plate", "source_id", "year"] + LEDGER_COLUMNS[kind])
+    new_values = ", ".join(["NEW.rowid", _year_expr("NEW.", available)] + _source_expr(kind, available, "NEW."))
+    plate_literal = "'" + plate.replace("'", "''") + "'"
+    trigger_base = f"trg_{kind}_{plate}"
+    for suffix in ("_ins", "_upd", "_del"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {schema}.{_quote(trigger_base + suffix)}")
+
+    conn.execute(f"""
+        CREATE TRIGGER {schema}.{_quote(trigger_base + '_ins')}
+        AFTER INSERT ON {_quote(plate)}
+        BEGIN
+            INSERT OR REPLACE INTO {kind} ({target_cols})
+            VALUES ({plate_literal}, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER {schema}.{_quote(trigger_base + '_upd')}
+        AFTER UPDATE ON {_quote(plate)}
+        BEGIN
+            DELETE FROM {kind} WHERE license_plate = {plate_literal} AND source_id = OLD.rowid;
+            INSERT OR REPLACE INTO {kind} ({target_cols})
+            VALUES ({plate_literal}, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER {schema}.{_quote(trigger_base + '_del')}
+        AFTER DELETE ON {_quote(plate)}
+        BEGIN
+            DELETE FROM {kind} WHERE license_plate = {plate_literal} AND source_id = OLD.rowid;
+        END
+    """)
+
+    # Bestand übernehmen (idempotent über UNIQUE(license_plate, source_id))
+    select_cols = ", ".join(["?", "rowid", _year_expr("", available)] + _source_expr(kind, available, ""))
+    cursor = conn.execute(
+        f"INSERT OR IGNORE INTO {schema}.{kind} ({target_cols}) SELECT {select_cols} FROM {schema}.{_quote(plate)}",
+        (plate,),
+    )
+    conn.execute(
+        f"INSERT OR REPLACE INTO {schema}.ledger_synced (license_plate, synced_at) VALUES (?, ?)",
+        (plate, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+    )
+    return cursor.rowcount
+
+
+def _trigger_names(conn: sqlite3.Connection, schema: str = "main") -> Set[str]:
+    return {row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'trigger'")}
+
+
+def _is_mirrored(triggers: Set[str], kind: str, plate: str) -> bool:
+    """Spiegel-Trigger vorhanden? DROP TABLE entfernt sie mit der Tabelle, daher
+    zeigt ihr Fehlen eine neu (oder wieder) angelegte Fahrzeugtabelle an."""
+    return all(f"trg_{kind}_{plate}{suffix}" in triggers for suffix in ("_ins", "_upd", "_del"))
+
+
+def forget_vehicle_table(conn: sqlite3.Connection, kind: str, plate: str, schema: str = "main") -> int:
+    """Entfernt die zentralen Zeilen einer gelöschten Fahrzeugtabelle (ohne Commit)."""
+    cursor = conn.execute(f"DELETE FROM {schema}.{kind} WHERE license_plate = ?", (plate,))
+    conn.execute(f"DELETE FROM {schema}.ledger_synced WHERE license_plate = ?", (plate,))
+    return cursor.rowcount
+
+
+def ensure_synced(conn: sqlite3.Connection, kind: str) -> int:
+    """Stellt sicher, dass alle Fahrzeugtabellen gespiegelt werden.
+
+    Maßgeblich sind die Trigger in sqlite_master, nicht der Vermerk in
+    ledger_synced: Fahrzeugtabellen ohne Spiegel-Trigger (neu oder nach DROP
+    neu angelegt) werden nachgezogen, wobei zentrale Zeilen einer früheren
+    Tabelle gleichen Namens vorher verworfen werden. Zentrale Zeilen gelöschter
+    Fahrzeugtabellen werden entfernt. Sonst fallen nur Katalogabfragen an.
+    """
+    ensure_ledger_table(conn, kind)
+    plates = _vehicle_tables(conn)
+    known = {row[0] for row in conn.execute("SELECT license_plate FROM ledger_synced")}
+    known.update(row[0] for row in conn.execute(f"SELECT DISTINCT license_plate FROM {kind}"))
+    removed = 0
+    for plate in sorted(known - set(plates)):
+        removed += forget_vehicle_table(conn, kind, plate)
+
+    triggers = _trigger_names(conn)
+    migrated = 0
+    for plate in plates:
+        if not _is_mirrored(triggers, kind, plate):
+            conn.execute(f"DELETE FROM {kind} WHERE license_plate = ?", (plate,))
+            migrated += sync_vehicle_table(conn, kind, plate)
+    conn.commit()
+    if migrated:
+        logger.info(f"{kind}: {migrated} Zeilen in die zentrale Tabelle übernommen")
+    if removed:
+        logger.info(f"{kind}: {removed} Zeilen gelöschter Fahrzeugtabellen entfernt")
+    return migrated
+
+
+def weeks_with_data(conn: sqlite3.Connection, kind: str, year: int, max_cw: int = 53) -> Dict[str, Set[int]]:
+    """Kalenderwochen mit Einträgen je Kennzeichen – eine GROUP-BY-Abfrage."""
+    cursor = conn.execute(
+        f"""
+        SELECT license_plate, cw FROM {kind}
+        WHERE year = ? AND cw BETWEEN 1 AND ?
+        GROUP BY license_plate, cw
+        """,
+        (int(year), int(max_cw)),
+    )
+    result: Dict[str, Set[int]] = {}
+    for plate, cw in cursor.fetchall():
+        result.setdefault(plate, set()).add(int(cw))
+    return result
+
+
+def ensure_weekly_summary_table(conn: sqlite3.Connection, schema: str = "main"):
+    """Legt die Wochensummen-Tabelle an (idempotent)."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.{WEEKLY_SUMMARY} (
+            license_plate TEXT NOT NULL,
+            driver TEXT NOT NULL DEFAULT '',
+            year INTEGER NOT NULL,
+            cw INTEGER NOT NULL,
+            revenue REAL NOT NULL DEFAULT 0,
+            running_costs REAL NOT NULL DEFAULT 0,
+            net_income REAL NOT NULL DEFAULT 0,
+            has_data INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT,
+            PRIMARY KEY (license_plate, year, cw, driver)
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_{WEEKLY_SUMMARY}_year_cw ON {WEEKLY_SUMMARY} (year, cw)")
+
+
+def _summary_rows(revenue_rows, cost_rows) -> List[tuple]:
+    """Baut Wochensummen aus (plate, year, cw, driver, revenue) und (plate, year, cw, costs).
+
+    Laufende Kosten hängen am Fahrzeug, nicht am Fahrer: jede Fahrerzeile einer
+    Woche trägt die vollen Fahrzeugkosten (wie bisher in der Schnellabrechnung).
+    Wochen nur mit Kosten erhalten eine Zeile mit leerem Fahrer.
+    """
+    costs = {(plate, year, cw): float(amount or 0) for plate, year, cw, amount in cost_rows}
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = []
+    weeks_with_revenue = set()
+    for plate, year, cw, driver, revenue in revenue_rows:
+        key = (plate, year, cw)
+        weeks_with_revenue.add(key)
+        week_costs = costs.get(key, 0.0)
+        revenue = float(revenue or 0)
+        rows.append((plate, driver or "", year, cw, revenue, week_costs, revenue - week_costs, 1, now))
+    for key, week_costs in costs.items():
+        if key not in weeks_with_revenue:
+            plate, year, cw = key
+            rows.append((plate, "", year, cw, 0.0, week_costs, -week_costs, 1, now))
+    return rows
+
+
+def _write_summary(conn: sqlite3.Connection, rows: List[tuple], schema: str = "main"):
+    conn.executemany(
+        f"""
+        INSERT OR REPLACE INTO {schema}.{WEEKLY_SUMMARY}
+            (license_plate, driver, year, cw, revenue, running_costs, net_income, has_data, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+
+
+def _stale_weeks(conn: sqlite3.Connection) -> Set[Tuple[str, int]]:
+    return {(plate, int(cw)) for plate, cw in conn.execute(f"SELECT license_plate, cw FROM {SUMMARY_STALE}")}
+
+
+def _clear_stale(conn: sqlite3.Connection, plate: Optional[str] = None, cw: Optional[int] = None):
+    if plate is None:
+        conn.execute(f"DELETE FROM {SUMMARY_STALE}")
+    else:
+        conn.execute(f"DELETE FROM {SUMMARY_STALE} WHERE license_plate = ? AND cw = ?", (plate, int(cw)))
+    conn.commit()
+
+
+def refresh_weekly_summary(revenue_conn: sqlite3.Connection, running_costs_conn: sqlite3.Connection,
+                           plate: str, cw: int) -> int:
+    """Rechnet die Wochensummen eines Fahrzeugs für eine KW neu (alle Jahre).
+
+    Liest nur die per (license_plate, year, cw) indizierten Zeilen der zentralen
+    Tabellen; Löschungen verschwinden, weil die KW vorher geleert wird. Der
+    Veraltet-Vermerk wird vor dem Lesen entfernt (parallele Änderungen vermerken
+    die Woche erneut) und bei einem Fehler wiederhergestellt.
+    """
+    ensure_synced(revenue_conn, REVENUE)
+    ensure_synced(running_costs_conn, RUNNING_COSTS)
+    ensure_weekly_summary_table(revenue_conn)
+    _clear_stale(revenue_conn, plate, cw)
+    _clear_stale(running_costs_conn, plate, cw)
+    try:
+        return _refresh_week(revenue_conn, running_costs_conn, plate, int(cw))
+    except Exception:
+        revenue_conn.rollback()
+        revenue_conn.execute(f"INSERT OR IGNORE INTO {SUMMARY_STALE} (license_plate, cw) VALUES (?, ?)",
+                             (plate, int(cw)))
+        revenue_conn.commit()
+        raise
+
+
+def _refresh_week(revenue_conn: sqlite3.Connection, running_costs_conn: sqlite3.Connection,
+                  plate: str, cw: int) -> int:
+    rows = _replace_week(revenue_conn, running_costs_conn, plate, cw)
+    revenue_conn.commit()
+    return rows
+
+
+def _replace_week(revenue_conn: sqlite3.Connection, running_costs_conn: sqlite3.Connection, plate: str, cw: int,
+                  revenue_schema: str = "main", running_costs_schema: str = "main") -> int:
+    """Ersetzt die Wochenzeilen von (Kennzeichen, KW) ohne Commit."""
+    cost_rows = running_costs_conn.execute(
+        f"""
+        SELECT license_plate, year, cw, SUM(amount) FROM {running_costs_schema}.{RUNNING_COSTS}
+        WHERE license_plate = ? AND cw = ?
+        GROUP BY year
+        """,
+        (plate, int(cw)),
+    ).fetchall()
+    revenue_rows = revenue_conn.execute(
+        f"""
+        SELECT license_plate, year, cw, COALESCE(driver, ''), SUM(total) FROM {revenue_schema}.{REVENUE}
+        WHERE license_plate = ? AND cw = ?
+        GROUP BY year, COALESCE(driver, '')
+        """,
+        (plate, int(cw)),
+    ).fetchall()
+
+    rows = _summary_rows(revenue_rows, cost_rows)
+    revenue_conn.execute(f"DELETE FROM {revenue_schema}.{WEEKLY_SUMMARY} WHERE license_plate = ? AND cw = ?",
+                         (plate, int(cw)))
+    _write_summary(revenue_conn, rows, revenue_schema)
+    return len(rows)
+
+
+def prepare_vehicle_table(conn: sqlite3.Connection, kind: str, plate: str, schema: str = "main"):
+    """Bereitet eine (bereits angelegte) Fahrzeugtabelle auf das Speichern mit Jahr vor.
+
+    Ergänzt die Spalte year, legt die zentrale Tabelle an und installiert die
+    Spiegel-Trigger bei Bedarf neu – in der laufenden Transaktion, ohne Commit. Danach
+    gehen die Schreibzugriffe mit ihrem gespeicherten Jahr in die zentrale Tabelle.
+    """
+    ensure_ledger_table(conn, kind, schema)
+    mirrored = _is_mirrored(_trigger_names(conn, schema), kind, plate)
+    year_added = "year" not in _table_columns(conn, plate, schema)
+    if year_added:
+        conn.execute(f"ALTER TABLE {schema}.{_quote(plate)} ADD COLUMN year INTEGER")
+    if not mirrored:
+        # Neu (oder nach DROP wieder) angelegte Tabelle: Zeilen der früheren verwerfen
+        conn.execute(f"DELETE FROM {schema}.{kind} WHERE license_plate = ?", (plate,))
+    if year_added or not mirrored:
+        sync_vehicle_table(conn, kind, plate, schema)
+
+
+def refresh_billing_week(conn: sqlite3.Connection, plate: str, cw: int,
+                         revenue_schema: str = "main", running_costs_schema: str = "main") -> int:
+    """Rechnet die Wochensummen von (Kennzeichen, KW) in der laufenden Transaktion nach.
+
+    Für billing_transaction: revenue.db und running_costs.db sind unter den
+    angegebenen Schemas eingebunden, die Fahrzeugtabellen wurden vorher mit
+    prepare_vehicle_table vorbereitet. Der Veraltet-Vermerk der Woche wird in
+    derselben Transaktion entfernt; der Commit bleibt beim Aufrufer. Solange
+    die Wochensummen noch nie aufgebaut wurden, bleibt das ensure_weekly_summary
+    überlassen (Rückgabe 0).
+    """
+    try:
+        if conn.execute(f"SELECT 1 FROM {revenue_schema}.{WEEKLY_SUMMARY} LIMIT 1").fetchone() is None:
+            return 0
+    except sqlite3.OperationalError:
+        return 0
+    for kind, schema in ((REVENUE, revenue_schema), (RUNNING_COSTS, running_costs_schema)):
+        ensure_ledger_table(conn, kind, schema)
+        conn.execute(f"DELETE FROM {schema}.{SUMMARY_STALE} WHERE license_plate = ? AND cw = ?", (plate, int(cw)))
+    return _replace_week(conn, conn, plate, cw, revenue_schema, running_costs_schema)
+
+
+def rebuild_weekly_summary(revenue_conn: sqlite3.Connection, running_costs_conn: sqlite3.Connection) -> int:
+    """Baut die Wochensummen komplett aus den zentralen Tabellen neu auf."""
+    ensure_synced(revenue_conn, REVENUE)
+    ensure_synced(running_costs_conn, RUNNING_COSTS)
+    ensure_weekly_summary_table(revenue_conn)
+    _clear_stale(revenue_conn)
+    _clear_stale(running_costs_conn)
+
+    cost_rows = running_costs_conn.execute(
+        f"SELECT license_plate, year, cw, SUM(amount) FROM {RUNNING_COSTS} GROUP BY license_plate, year, cw"
+    ).fetchall()
+    revenue_rows = revenue_conn.execute(
+        f"""
+        SELECT license_plate, year, cw, COALESCE(driver, ''), SUM(total) FROM {REVENUE}
+        GROUP BY license_plate, year, cw, COALESCE(driver, '')
+        """
+    ).fetchall()
+
+    rows = _summary_rows(revenue_rows, cost_rows)
+    revenue_conn.execute(f"DELETE FROM {WEEKLY_SUMMARY}")
+    _write_summary(revenue_conn, rows)
+    revenue_conn.commit()
+    return len(rows)
+
+
+def update_weekly_summary(plate: str, cw: int, sql_dir: str = "SQL") -> int:
+    """Führt die Wochensummen nach einem Speichern/Löschen nach (öffnet beide Datenbanken)."""
+    revenue_conn = connect(Path(sql_dir) / LEDGER_DB_FILES[REVENUE])
+    running_costs_conn = connect(Path(sql_dir) / LEDGER_DB_FILES[RUNNING_COSTS])
+    try:
+        return refresh_weekly_summary(revenue_conn, running_costs_conn, plate, int(cw))
+    finally:
+        revenue_conn.close()
+        running_costs_conn.close()
+
+
+def ensure_weekly_summary(revenue_conn: sqlite3.Connection, running_costs_conn: sqlite3.Connection):
+    """Stellt sicher, dass die Wochensummen aktuell sind.
+
+    Baut sie beim ersten Zugriff auf und rechnet danach die seit der letzten
+    Aktualisierung geänderten Wochen (weekly_summary_stale beider Datenbanken) nach.
+    """
+    ensure_synced(revenue_conn, REVENUE)
+    ensure_synced(running_costs_conn, RUNNING_COSTS)
+    ensure_weekly_summary_table(revenue_conn)
+    if revenue_conn.execute(f"SELECT 1 FROM {WEEKLY_SUMMARY} LIMIT 1").fetchone() is None:
+        rebuild_weekly_summary(revenue_conn, running_costs_conn)
+        return
+    for plate, cw in sorted(_stale_weeks(revenue_conn) | _stale_weeks(running_costs_conn)):
+        refresh_weekly_summary(revenue_conn, running_costs_conn, plate, cw)
+
+
+def summary_weeks(conn: sqlite3.Connection, year: int, max_cw: int = 53) -> Dict[str, Set[int]]:
+    """Kalenderwochen mit Daten je Kennzeichen aus den Wochensummen."""
+    cursor = conn.execute(
+        f"""
+        SELECT license_plate, cw FROM {WEEKLY_SUMMARY}
+        WHERE year = ? AND cw BETWEEN 1 AND ? AND has_data = 1
+        GROUP BY license_plate, cw
+        """,
+        (int(year), int(max_cw)),
+    )
+    result: Dict[str, Set[int]] = {}
+    for plate, cw in cursor.fetchall():
+        result.setdefault(plate, set()).add(int(cw))
+    return result
+
+
+def week_summary(conn: sqlite3.Connection, plate: str, year: int, cw: int, driver: str) -> Dict[str, float]:
+    """Umsatz, Kosten und Netto eines Fahrers in einer KW (Kosten auch ohne Umsatz)."""
+    row = conn.execute(
+        f"""
+        SELECT revenue, running_costs, net_income FROM {WEEKLY_SUMMARY}
+        WHERE license_plate = ? AND year = ? AND cw = ? AND driver = ?
+        """,
+        (plate, int(year), int(cw), driver or ""),
+    ).fetchone()
+    if row is None:
+        # Fahrer ohne Umsatz: nur die Fahrzeugkosten der Woche
+        costs = conn.execute(
+            f"SELECT MAX(running_costs) FROM {WEEKLY_SUMMARY} WHERE license_plate = ? AND year = ? AND cw = ?",
+            (plate, int(year), int(cw)),
+        ).fetchone()[0] or 0.0
+        return {"revenue": 0.0, "running_costs": float(costs), "net_income": -float(costs)}
+    return {"revenue": float(row[0]), "running_costs": float(row[1]), "net_income": float(row[2])}
+
+
+def migrate_all(sql_dir: Path) -> Dict[str, int]:
+    """Einmalige Migration beider Datenbanken im SQL-Ordner."""
+    result: Dict[str, int] = {}
+    for kind, db_file in LEDGER_DB_FILES.items():
+        db_path = Path(sql_dir) / db_file
+        if not db_path.exists():
+            print(f"ℹ️ {db_file} nicht vorhanden – übersprungen")
+            continue
+        conn = connect(db_path)
+        try:
+            result[kind] = ensure_synced(conn, kind)
+            print(f"✅ {db_file}: {result[kind]} Zeilen nach '{kind}' migriert")
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Fehler bei der Migration von {db_file}: {e}")
+        finally:
+            conn.close()
+
+    revenue_path = Path(sql_dir) / LEDGER_DB_FILES[REVENUE]
+    running_costs_path = Path(sql_dir) / LEDGER_DB_FILES[RUNNING_COSTS]
+    if revenue_path.exists() and running_costs_path.exists():
+        revenue_conn = connect(revenue_path)
+        running_costs_conn = connect(running_costs_path)
+        try:
+            rows = rebuild_weekly_summary(revenue_conn, running_costs_conn)
+            print(f"✅ {WEEKLY_SUMMARY}: {rows} Wochenzeilen aufgebaut")
+        except Exception as e:
+            print(f"❌ Fehler beim Aufbau von {WEEKLY_SUMMARY}: {e}")
+        finally:
+            revenue_conn.close()
+            running_costs_conn.close()
+    return result
+
+
+if __name__ == "__main__":
+    print("🚀 Migration der Fahrzeugtabellen in zentrale Revenue-/Running-Costs-Tabellen")
+    migrate_all(Path(__file__).parent / "SQL")